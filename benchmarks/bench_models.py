@@ -0,0 +1,54 @@
+"""
+Microbenchmark de las rutas calientes de la capa de modelos.
+
+Compara el camino antiguo (execute_query + SELECT last_insert_rowid()) con
+la API explícita de lectura/escritura sobre una base en memoria.
+
+Uso:
+    python -m benchmarks.bench_models [--n 20000]
+"""
+import argparse
+import time
+from models.db_connection import DatabaseConnection
+from models.models import Cliente
+from models.queries import ClienteQueries
+
+def _medir(etiqueta: str, n: int, funcion):
+    inicio = time.perf_counter()
+    for i in range(n):
+        funcion(i)
+    transcurrido = time.perf_counter() - inicio
+    print(f"{etiqueta:<32} {transcurrido / n * 1e6:8.2f} us/op")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=20000, help="Operaciones por caso")
+    args = parser.parse_args(argv)
+
+    DatabaseConnection.configure(DatabaseConnection.memory_dsn("bench"))
+    db = DatabaseConnection()
+
+    def guardar_legacy(i):
+        db.execute_query(
+            "INSERT INTO clientes (nombre, email, telefono, direccion) VALUES (?, ?, ?, ?)",
+            (f"legacy {i}", f"legacy{i}@bench.com", "555", "Calle")
+        )
+        db.execute_query("SELECT last_insert_rowid()")[0][0]
+
+    def guardar(i):
+        Cliente(f"cliente {i}", f"cliente{i}@bench.com", "555", "Calle").guardar()
+
+    def buscar_legacy(i):
+        db.execute_query("SELECT * FROM clientes WHERE nombre = ?", (f"cliente {i}",))[0]
+
+    def buscar(i):
+        db.fetch_one(ClienteQueries.POR_NOMBRE, (f"cliente {i}",))
+
+    _medir("guardar (execute_query)", args.n, guardar_legacy)
+    _medir("guardar (execute_write)", args.n, guardar)
+    _medir("buscar por nombre (execute_query)", args.n, buscar_legacy)
+    _medir("buscar por nombre (fetch_one)", args.n, buscar)
+    DatabaseConnection.reset()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Técnicos más cercanos con el R*Tree contra un recorrido de todos los técnicos.
+
+Reparte técnicos al azar en una región de unos 600 x 600 km y mide el
+tiempo medio de buscar los 5 más cercanos a puntos al azar, para varias
+cantidades de técnicos. Con el índice el tiempo casi no debería crecer.
+
+Uso:
+    python -m benchmarks.bench_routing [--tecnicos 1000 10000 100000] [--consultas 200]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from models.db_connection import DatabaseConnection
+from models.queries import TecnicoQueries
+from models.routing import DispatchRouter, distancia_km
+from models.sync import nuevo_uuid
+
+REGION = ((-37.0, -31.5), (-64.0, -57.5))
+
+def _punto(azar: random.Random):
+    (lat_min, lat_max), (lon_min, lon_max) = REGION
+    return azar.uniform(lat_min, lat_max), azar.uniform(lon_min, lon_max)
+
+def _poblar(db: DatabaseConnection, cantidad: int, azar: random.Random):
+    with db.transaction():
+        db.execute_many(TecnicoQueries.INSERTAR, (
+            (f"Técnico {i}", "Hardware", None, None, nuevo_uuid()) for i in range(cantidad)))
+        db.execute_many("INSERT INTO ubicacion_tecnicos VALUES (?, ?, ?, ?, ?, ?, ?)", (
+            (i + 1, lat, lat, lon, lon, lat, lon)
+            for i, (lat, lon) in enumerate(_punto(azar) for _ in range(cantidad))))
+
+def _recorrido(db: DatabaseConnection, centro, k: int):
+    filas = db.fetch_all("SELECT id, latitud, longitud FROM ubicacion_tecnicos")
+    return sorted((distancia_km(centro, (lat, lon)), tecnico_id) for tecnico_id, lat, lon in filas)[:k]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tecnicos", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'técnicos':>10} {'recorrido':>12} {'R*Tree':>12}")
+    for cantidad in args.tecnicos:
+        azar = random.Random(cantidad)
+        with tempfile.TemporaryDirectory() as carpeta:
+            DatabaseConnection.configure(os.path.join(carpeta, "bench.db"))
+            db = DatabaseConnection()
+            _poblar(db, cantidad, azar)
+            router = DispatchRouter(db)
+            centros = [_punto(azar) for _ in range(args.consultas)]
+            tiempos, resultados = [], []
+            for buscar in (lambda c: [t for _, t in _recorrido(db, c, args.k)],
+                           lambda c: [t[0] for t in router.cercanos(c, args.k)]):
+                inicio = time.perf_counter()
+                resultados.append([buscar(centro) for centro in centros])
+                tiempos.append((time.perf_counter() - inicio) / args.consultas)
+            assert resultados[0] == resultados[1], "El R*Tree no devolvió los mismos técnicos"
+            DatabaseConnection.reset()
+        print(f"{cantidad:>10} {tiempos[0] * 1000:>10.2f}ms {tiempos[1] * 1000:>10.2f}ms")
+
+if __name__ == "__main__":
+    main()
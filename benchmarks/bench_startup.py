@@ -0,0 +1,67 @@
+"""
+Trabajo con la base de datos antes de que la primera pestaña muestre sus datos.
+
+Compara el arranque anterior (cargar las tres tablas de la interfaz y las
+listas completas de clientes y técnicos para los combobox) con el actual
+(solo la primera página de la pestaña Clientes) para varios tamaños de
+base. El arranque actual no debería crecer con la cantidad de filas.
+
+Uso:
+    python -m benchmarks.bench_startup [--filas 0 10000 100000]
+"""
+import argparse
+import os
+import tempfile
+import time
+from models.db_connection import DatabaseConnection
+from models.listing import LISTADO_CLIENTES, LISTADO_ORDENES, LISTADO_TECNICOS, ListingPager
+from models.models import Cliente
+from models.queries import ClienteQueries, TecnicoQueries
+from models.replica import ReadReplica
+from models.sync import nuevo_uuid
+
+def _poblar(db: DatabaseConnection, filas: int):
+    with db.transaction():
+        db.execute_many(ClienteQueries.INSERTAR, (
+            Cliente(f"Cliente {i}", f"cliente{i}@bench.com", f"555{i:07d}", "Calle").valores_insercion()
+            for i in range(filas)))
+        db.execute_many(TecnicoQueries.INSERTAR, (
+            (f"Técnico {i}", "Reparación", f"tecnico{i}@bench.com", "555", nuevo_uuid())
+            for i in range(filas // 10)))
+
+def _arranque_anterior(db: DatabaseConnection):
+    replica = ReadReplica(db)
+    ListingPager(LISTADO_CLIENTES, db, page_size=200).siguiente_pagina()
+    ListingPager(LISTADO_TECNICOS, db, page_size=200).siguiente_pagina()
+    ListingPager(LISTADO_ORDENES, db, "Fecha", True, page_size=200).siguiente_pagina()
+    replica.todos("clientes")
+    replica.todos("tecnicos")
+
+def _arranque_actual(db: DatabaseConnection):
+    ReadReplica(db)
+    ListingPager(LISTADO_CLIENTES, db, page_size=200).siguiente_pagina()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, nargs="+", default=[0, 10000, 100000],
+                        help="Cantidades de clientes a medir (técnicos: una décima parte)")
+    args = parser.parse_args(argv)
+
+    print(f"{'clientes':>10} {'anterior':>12} {'actual':>12}")
+    for filas in args.filas:
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "bench.db")
+            DatabaseConnection.configure(ruta)
+            _poblar(DatabaseConnection(), filas)
+            tiempos = []
+            for arranque in (_arranque_anterior, _arranque_actual):
+                # Conexión nueva en cada caso, como al abrir la aplicación
+                DatabaseConnection.reset()
+                inicio = time.perf_counter()
+                arranque(DatabaseConnection())
+                tiempos.append(time.perf_counter() - inicio)
+            DatabaseConnection.reset()
+        print(f"{filas:>10} {tiempos[0] * 1000:>10.1f}ms {tiempos[1] * 1000:>10.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Validación de registros de técnicos fila por fila contra validar_lote.
+
+Compara las mismas reglas escritas como en los formularios anteriores
+(re.match con el patrón como texto en cada llamada) con las reglas
+compiladas de models.validation, en un proceso y con un pool. El pool
+solo compensa con varios núcleos.
+
+Uso:
+    python -m benchmarks.bench_validation [--filas 200000] [--workers 4]
+"""
+import argparse
+import re
+import time
+from models.normalization import normalizar_texto
+from models.validation import especialidades_conocidas, validar_lote
+
+ESPECIALIDADES = ("Reparación", "Soporte IT", "Jardinería")
+
+def _generar(filas: int):
+    return [{"nombre": f"Técnico {i}" if i % 50 else "",
+             "especialidad": ESPECIALIDADES[i % 3],
+             "email": f"tecnico{i}@bench.com" if i % 7 else f"tecnico{i}@bench",
+             "telefono": f"+54 11 {i:08d}"} for i in range(filas)]
+
+def _validar_anterior(filas):
+    # Las mismas reglas escritas como en los formularios: patrón como texto
+    # en cada re.match y especialidad normalizada en cada fila
+    email = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    telefono = r'^\+?[0-9][0-9 ().-]{4,18}[0-9]$'
+    especialidades = especialidades_conocidas()
+    errores = []
+    for campos in filas:
+        mensajes = []
+        if not campos["nombre"].strip():
+            mensajes.append("nombre es obligatorio")
+        if not campos["especialidad"].strip():
+            mensajes.append("especialidad es obligatorio")
+        elif normalizar_texto(campos["especialidad"]) not in especialidades:
+            mensajes.append("especialidad no es una especialidad conocida")
+        if campos["email"] and not re.match(email, campos["email"].strip()):
+            mensajes.append("email no tiene un formato válido")
+        if campos["telefono"] and not re.match(telefono, campos["telefono"].strip()):
+            mensajes.append("telefono no tiene un formato válido")
+        errores.append(mensajes)
+    return errores
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, default=200000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+    filas = _generar(args.filas)
+
+    casos = (
+        ("anterior (re.match por fila)", lambda: _validar_anterior(filas)),
+        ("validar_lote, 1 proceso", lambda: validar_lote(filas, "tecnico", workers=1)),
+        (f"validar_lote, {args.workers} procesos", lambda: validar_lote(filas, "tecnico", workers=args.workers)),
+    )
+    for nombre, caso in casos:
+        inicio = time.perf_counter()
+        errores = caso()
+        segundos = time.perf_counter() - inicio
+        invalidas = sum(1 for mensajes in errores if mensajes)
+        print(f"{nombre:<30} {segundos * 1000:>8.0f}ms {args.filas / segundos:>10.0f} filas/s  inválidas={invalidas}")
+
+if __name__ == "__main__":
+    main()
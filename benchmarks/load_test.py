@@ -0,0 +1,277 @@
+"""
+Prueba de carga: muchos empleados de mostrador sobre una misma base.
+
+Cada actor simula un empleado que, sin pausa (o con --pausa-ms entre
+operaciones), repite una mezcla de lo que hace la interfaz:
+
+    guardar_cliente  Cliente.guardar() de un cliente nuevo
+    buscar_nombre    Cliente.buscar_por_nombre() de un cliente existente
+    guardar_orden    OrdenDeTrabajo.guardar() con cliente y técnico existentes
+    cargar_ordenes   primera página de la pestaña Órdenes (como cargar_ordenes)
+
+Para cada cantidad de actores se parte de una copia de la misma base
+inicial en un directorio temporal y se mide durante --duracion segundos.
+Los actores pueden ser hilos (cada uno con su conexión, ver
+DatabaseConnection.open_for_thread) o procesos, que es lo más parecido a
+varias instancias de la aplicación abiertas sobre un database.db
+compartido. Se informa el rendimiento, los percentiles de latencia y la
+proporción de operaciones que fallaron con 'database is locked'; con
+--csv los resultados se agregan a un archivo para comparar la curva entre
+versiones.
+
+Uso:
+    python -m benchmarks.load_test [--actores 1 2 4 8 16] [--modo hilos procesos]
+        [--duracion 5] [--pausa-ms 0] [--csv curva.csv --etiqueta v1.2]
+"""
+import argparse
+import csv
+import multiprocessing as mp
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List, Sequence, Tuple
+from models.db_connection import DatabaseConnection
+from models.listing import LISTADO_ORDENES, ListingPager
+from models.models import Cliente, OrdenDeTrabajo, Tecnico
+from models.queries import ClienteQueries, TecnicoQueries
+from models.service_factory import ServiceFactory
+from models.sync import nuevo_uuid
+
+OPERACIONES = ("guardar_cliente", "buscar_nombre", "guardar_orden", "cargar_ordenes")
+# Peso de cada operación en la mezcla de un empleado
+MEZCLA = (15, 40, 15, 30)
+ESTADOS_FILTRO = ("", "Pendiente", "Completada")
+
+class ResultadoActor:
+    """
+    Contadores de un actor (o de la suma de varios) por operación.
+
+    Atributos:
+        latencias (Dict[str, List[float]]): Segundos de cada operación exitosa
+        bloqueos (Dict[str, int]): Operaciones fallidas por 'database is locked'
+        errores (Dict[str, int]): Operaciones fallidas por otros motivos
+        ultimo_error (str): Mensaje del último error que no fue un bloqueo
+    """
+    def __init__(self):
+        self.latencias: Dict[str, List[float]] = {op: [] for op in OPERACIONES}
+        self.bloqueos: Dict[str, int] = dict.fromkeys(OPERACIONES, 0)
+        self.errores: Dict[str, int] = dict.fromkeys(OPERACIONES, 0)
+        self.ultimo_error = ""
+
+    def sumar(self, otro: "ResultadoActor"):
+        for op in OPERACIONES:
+            self.latencias[op].extend(otro.latencias[op])
+            self.bloqueos[op] += otro.bloqueos[op]
+            self.errores[op] += otro.errores[op]
+        self.ultimo_error = otro.ultimo_error or self.ultimo_error
+
+class Mostrador:
+    """
+    Operaciones de un empleado sobre la conexión del hilo o proceso actual.
+    """
+    def __init__(self, semilla: int, nombres: Sequence[str], tecnicos: Sequence[Tuple[int, str, str]]):
+        self.azar = random.Random(semilla)
+        self.nombres = nombres
+        self.tecnicos = tecnicos
+
+    def guardar_cliente(self):
+        marca = uuid.uuid4().hex[:12]
+        Cliente(f"Cliente {marca}", f"{marca}@carga.com", "555 0100", "Mostrador").guardar()
+
+    def buscar_nombre(self):
+        Cliente.buscar_por_nombre(self.azar.choice(self.nombres))
+
+    def guardar_orden(self):
+        cliente = Cliente.buscar_por_nombre(self.azar.choice(self.nombres))[0]
+        tecnico_id, nombre, especialidad = self.azar.choice(self.tecnicos)
+        servicio = ServiceFactory.create_service("reparacion", descripcion="Revisión general")
+        OrdenDeTrabajo(cliente, servicio, Tecnico(nombre, especialidad, id=tecnico_id), "Revisión general").guardar()
+
+    def cargar_ordenes(self):
+        pager = ListingPager(LISTADO_ORDENES, DatabaseConnection(), "Fecha", True,
+                             {"estado": self.azar.choice(ESTADOS_FILTRO)}, page_size=200)
+        pager.siguiente_pagina()
+
+def _actuar(semilla: int, nombres, tecnicos, inicio: float, fin: float, pausa: float) -> ResultadoActor:
+    mostrador = Mostrador(semilla, nombres, tecnicos)
+    operaciones = {op: getattr(mostrador, op) for op in OPERACIONES}
+    resultado = ResultadoActor()
+    DatabaseConnection()  # abrir la conexión antes de empezar a medir
+    time.sleep(max(0.0, inicio - time.time()))
+    while time.time() < fin:
+        op = mostrador.azar.choices(OPERACIONES, MEZCLA)[0]
+        antes = time.perf_counter()
+        try:
+            operaciones[op]()
+            resultado.latencias[op].append(time.perf_counter() - antes)
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                resultado.bloqueos[op] += 1
+            else:
+                resultado.errores[op] += 1
+                resultado.ultimo_error = str(e)
+        except Exception as e:
+            resultado.errores[op] += 1
+            resultado.ultimo_error = f"{type(e).__name__}: {e}"
+        if pausa:
+            time.sleep(pausa)
+    return resultado
+
+def _hilo(resultados: List[ResultadoActor], *args):
+    DatabaseConnection.open_for_thread()
+    try:
+        resultados.append(_actuar(*args))
+    finally:
+        DatabaseConnection.close_thread()
+
+def _proceso(cola, ruta: str, *args):
+    DatabaseConnection.configure(ruta)
+    try:
+        cola.put(_actuar(*args))
+    finally:
+        DatabaseConnection.reset()
+
+def preparar_base(ruta: str, clientes: int, tecnicos: int, ordenes: int):
+    """
+    Crea la base inicial de la prueba.
+
+    Returns:
+        Tuple[List[str], List[Tuple[int, str, str]]]: Nombres de clientes y
+            (id, nombre, especialidad) de técnicos para las operaciones
+    """
+    DatabaseConnection.configure(ruta)
+    db = DatabaseConnection()
+    with db.transaction():
+        db.execute_many(ClienteQueries.INSERTAR, (
+            Cliente(f"Cliente {i}", f"cliente{i}@carga.com", f"555{i:07d}", "Calle").valores_insercion()
+            for i in range(clientes)))
+        db.execute_many(TecnicoQueries.INSERTAR, (
+            (f"Técnico {i}", "Reparación", f"tecnico{i}@carga.com", "555", nuevo_uuid())
+            for i in range(tecnicos)))
+    nombres = [f"Cliente {i}" for i in range(clientes)]
+    lista_tecnicos = db.fetch_all("SELECT id, nombre, especialidad FROM tecnicos")
+    mostrador = Mostrador(0, nombres, lista_tecnicos)
+    with db.transaction():
+        for _ in range(ordenes):
+            mostrador.guardar_orden()
+    DatabaseConnection.reset()
+    return nombres, lista_tecnicos
+
+def ejecutar_nivel(plantilla: str, carpeta: str, modo: str, actores: int, duracion: float,
+                   pausa: float, nombres, tecnicos) -> Tuple[ResultadoActor, float]:
+    """
+    Mide una cantidad de actores sobre una copia nueva de la base inicial.
+
+    Returns:
+        Tuple[ResultadoActor, float]: Contadores sumados y segundos medidos
+    """
+    ruta = os.path.join(carpeta, f"{modo}_{actores}.db")
+    shutil.copyfile(plantilla, ruta)
+    DatabaseConnection.configure(ruta)
+    DatabaseConnection()  # migraciones y triggers antes de que arranquen los actores
+    # Margen para que todos abran su conexión antes de empezar
+    inicio = time.time() + 0.5 + (0.2 * actores if modo == "procesos" else 0.05 * actores)
+    fin = inicio + duracion
+    total = ResultadoActor()
+    if modo == "hilos":
+        resultados: List[ResultadoActor] = []
+        hilos = [threading.Thread(target=_hilo, args=(resultados, i, nombres, tecnicos, inicio, fin, pausa))
+                 for i in range(actores)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    else:
+        cola = mp.Queue()
+        procesos = [mp.Process(target=_proceso, args=(cola, ruta, i, nombres, tecnicos, inicio, fin, pausa))
+                    for i in range(actores)]
+        for proceso in procesos:
+            proceso.start()
+        resultados = [cola.get() for _ in procesos]
+        for proceso in procesos:
+            proceso.join()
+    for resultado in resultados:
+        total.sumar(resultado)
+    DatabaseConnection.reset()
+    return total, duracion
+
+def percentil(ordenados: Sequence[float], p: float) -> float:
+    """
+    Percentil p (0-100) por rango más cercano de una lista ordenada; 0 si está vacía.
+    """
+    if not ordenados:
+        return 0.0
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados))) - 1))
+    return ordenados[indice]
+
+def resumir(resultado: ResultadoActor, segundos: float, operaciones: Sequence[str] = OPERACIONES) -> Dict[str, float]:
+    """
+    Rendimiento, percentiles (ms) y tasas de error de las operaciones dadas.
+    """
+    latencias = sorted(l for op in operaciones for l in resultado.latencias[op])
+    bloqueos = sum(resultado.bloqueos[op] for op in operaciones)
+    errores = sum(resultado.errores[op] for op in operaciones)
+    intentos = len(latencias) + bloqueos + errores
+    return {
+        "operaciones": len(latencias),
+        "ops_s": len(latencias) / segundos if segundos else 0.0,
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p95_ms": percentil(latencias, 95) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "bloqueos_pct": 100.0 * bloqueos / intentos if intentos else 0.0,
+        "errores": errores,
+    }
+
+def _guardar_csv(ruta: str, filas: List[Dict[str, object]]):
+    nuevo = not os.path.exists(ruta)
+    with open(ruta, "a", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=list(filas[0]))
+        if nuevo:
+            escritor.writeheader()
+        escritor.writerows(filas)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga con empleados de mostrador concurrentes")
+    parser.add_argument("--actores", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--modo", nargs="+", choices=("hilos", "procesos"), default=["hilos", "procesos"])
+    parser.add_argument("--duracion", type=float, default=5.0, help="Segundos medidos por nivel")
+    parser.add_argument("--pausa-ms", type=float, default=0.0, help="Pausa de cada actor entre operaciones")
+    parser.add_argument("--clientes", type=int, default=2000)
+    parser.add_argument("--tecnicos", type=int, default=50)
+    parser.add_argument("--ordenes", type=int, default=2000)
+    parser.add_argument("--detalle", action="store_true", help="Mostrar también cada operación")
+    parser.add_argument("--csv", help="Agregar los resultados a este archivo CSV")
+    parser.add_argument("--etiqueta", default="", help="Versión o rama a la que corresponden los resultados")
+    args = parser.parse_args(argv)
+
+    filas = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        plantilla = os.path.join(carpeta, "plantilla.db")
+        nombres, tecnicos = preparar_base(plantilla, args.clientes, args.tecnicos, args.ordenes)
+        print(f"{'modo':<17} {'actores':>7} {'ops':>7} {'ops/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+              f"{'locked':>7} {'errores':>7}")
+        for modo in args.modo:
+            for actores in args.actores:
+                resultado, segundos = ejecutar_nivel(plantilla, carpeta, modo, actores, args.duracion,
+                                                     args.pausa_ms / 1000, nombres, tecnicos)
+                grupos = [("total", OPERACIONES)] + ([(op, (op,)) for op in OPERACIONES] if args.detalle else [])
+                for grupo, operaciones in grupos:
+                    r = resumir(resultado, segundos, operaciones)
+                    nombre = modo if grupo == "total" else f"  {grupo}"
+                    print(f"{nombre:<17} {actores:>7} {r['operaciones']:>7} {r['ops_s']:>8.0f} "
+                          f"{r['p50_ms']:>6.1f}ms {r['p95_ms']:>6.1f}ms {r['p99_ms']:>6.1f}ms "
+                          f"{r['bloqueos_pct']:>6.1f}% {r['errores']:>7}")
+                    filas.append({"etiqueta": args.etiqueta, "modo": modo, "actores": actores,
+                                  "operacion": grupo, **{k: round(v, 3) for k, v in r.items()}})
+                if resultado.ultimo_error:
+                    print(f"  último error: {resultado.ultimo_error}")
+    if args.csv:
+        _guardar_csv(args.csv, filas)
+
+if __name__ == "__main__":
+    main()
@@ -4,33 +4,27 @@ from models.models import Cliente, Tecnico, OrdenDeTrabajo
 from models.service_factory import ServiceFactory
 from models.observer import Observer, OrdenSubject
 from models.db_connection import DatabaseConnection
+from models.maintenance import MaintenanceRunner
+from models.metrics import MetricsServer, ENV_METRICS_PORT
+from models.replica import ReadReplica
+from models.validation import validar_registro
 from datetime import datetime
-import re
-from PIL import Image, ImageTk
-
-# Paleta de colores
-COLOR_PRIMARY_BG = "#1C1C1C"  # Fondo principal muy oscuro
-COLOR_SECONDARY_BG = "#2C2C2C" # Fondo de tarjetas/frames
-COLOR_HEADER_BLUE = "#2196F3" # Azul vibrante para header y acentos
-COLOR_ACCENT_BLUE = "#1976D2" # Azul un poco más oscuro para botones/hover
-COLOR_TEXT_LIGHT = "#FFFFFF" # Texto principal blanco
-COLOR_TEXT_DARK = "#CCCCCC"  # Texto secundario/placeholder gris claro
-COLOR_ENTRY_BG = "#3C3C3C"    # Fondo de campos de entrada
-COLOR_ENTRY_FG = "#FFFFFF"   # Texto de campos de entrada
-COLOR_BORDER = "#2196F3"     # Borde de campos de entrada, igual que accent
-FONT_MAIN = ("Segoe UI", 11)
-FONT_HEADER = ("Segoe UI", 14, "bold")
-
-# Paleta de colores para TEMA CLARO
-COLOR_LIGHT_PRIMARY_BG = "#F0F0F0" # Fondo principal claro
-COLOR_LIGHT_SECONDARY_BG = "#FFFFFF" # Fondo de tarjetas/frames claro
-COLOR_LIGHT_HEADER_BLUE = "#2196F3" # Azul vibrante (se mantiene)
-COLOR_LIGHT_ACCENT_BLUE = "#1976D2" # Azul acento (se mantiene)
-COLOR_LIGHT_TEXT_DARK = "#333333"  # Texto principal oscuro
-COLOR_LIGHT_TEXT_LIGHT = "#666666" # Texto secundario gris oscuro
-COLOR_LIGHT_ENTRY_BG = "#E0E0E0"   # Fondo de campos de entrada claro
-COLOR_LIGHT_ENTRY_FG = "#333333"   # Texto de campos de entrada oscuro
-COLOR_LIGHT_BORDER = "#BBBBBB"    # Borde de campos de entrada claro
+import logging
+import os
+import time
+from ui.theme import ThemeManager, FONT_MAIN, FONT_HEADER
+from ui.history import ClientHistoryWindow
+from ui.table import SortableTable
+from ui.profiler import UIProfiler, ENV_PROFILE
+from ui.icon import aplicar_icono
+from ui.tabs import LazyTabs
+from models.listing import LISTADO_CLIENTES, LISTADO_TECNICOS, LISTADO_ORDENES
+from models.models import ESTADOS_CERRADOS
+
+# Segundos desde que se crea la ventana hasta que la primera pestaña muestra sus datos
+PRESUPUESTO_ARRANQUE = 1.0
+
+logger = logging.getLogger("sgst.arranque")
 
 class NotificacionObserver(Observer):
     """
@@ -77,32 +71,44 @@ class TechnicalServiceApp:
         root (tk.Tk): Ventana principal de la aplicación
         orden_subject (OrdenSubject): Sujeto para el patrón Observer
         db (DatabaseConnection): Conexión a la base de datos
+        replica (ReadReplica): Lecturas de clientes y técnicos en memoria
+        profiler (UIProfiler): Medición de callbacks y bloqueos (solo con SGST_PROFILE)
+        metricas (MetricsServer): Endpoint /metrics de Prometheus (solo con SGST_METRICS_PORT)
+        tabs (LazyTabs): Pestañas, construidas y cargadas al mostrarse por primera vez
+        arranque (float): Segundos hasta que la primera pestaña mostró sus datos
     """
     def __init__(self):
         """
         Inicializa la aplicación y configura la interfaz gráfica.
+        
+        Solo se crean la ventana, el encabezado y las pestañas vacías; el
+        contenido de cada pestaña se construye y carga al mostrarla.
         """
+        self._inicio = time.perf_counter()
+        self.arranque = None
         self.root = tk.Tk()
         self.root.title("Sistema de Gestión de Servicios Técnicos")
         self.root.geometry("900x650")
         self.root.resizable(True, True)
         
-        # Estado del tema: True = oscuro, False = claro
-        self.is_dark_theme = True
+        # Modo de diagnóstico: mide cada callback de Tk y muestrea los bloqueos
+        self.profiler = UIProfiler(self.root).start() if os.environ.get(ENV_PROFILE) else None
+        # Métricas en formato Prometheus en 127.0.0.1:<puerto> (solo con SGST_METRICS_PORT)
+        puerto_metricas = os.environ.get(ENV_METRICS_PORT)
+        self.metricas = MetricsServer(int(puerto_metricas)).start() if puerto_metricas else None
         
-        try:
-            icon_image = Image.open("image.ico")
-            photo = ImageTk.PhotoImage(icon_image)
-            self.root.iconphoto(True, photo)
-        except Exception as e:
-            print(f"Error al cargar el icono: {e}")
+        # Tema: paletas y estilos precalculados, widgets registrados por rol
+        self.theme = ThemeManager()
+        self.theme.register(self.root, "root")
+        
+        aplicar_icono(self.root)
 
         # Crear el header una sola vez
-        self.header_frame = tk.Frame(self.root, height=75)
+        self.header_frame = self.theme.register(tk.Frame(self.root, height=75), "header")
         self.header_frame.pack(fill='x', side='top')
         
         # Ahora usamos un Canvas para el título para tener control total sobre el fondo
-        self.header_canvas = tk.Canvas(self.header_frame, bg=COLOR_HEADER_BLUE, highlightthickness=0)
+        self.header_canvas = self.theme.register(tk.Canvas(self.header_frame, highlightthickness=0), "header")
         self.header_canvas.pack(fill='both', expand=True)
 
         # Crear el texto del título en el Canvas
@@ -110,9 +116,12 @@ class TechnicalServiceApp:
             0, 0, # Posición inicial, se actualizará en _on_header_resize
             text="Sistema de Gestión de Servicios Técnicos", 
             font=FONT_HEADER, 
-            fill=COLOR_TEXT_LIGHT, # Color inicial del texto
+            fill=self.theme.colors["TEXT_LIGHT"], # Color inicial del texto
             anchor='center' # Asegurar que el ancla del texto sea el centro
         )
+        self.theme.on_change(
+            lambda colors: self.header_canvas.itemconfig(self.header_text_id, fill=colors["TEXT_LIGHT"])
+        )
         
         # Bind al evento Configure del frame para centrar el texto al redimensionar
         self.header_frame.bind("<Configure>", self._on_header_resize)
@@ -122,176 +131,93 @@ class TechnicalServiceApp:
         self.orden_subject.attach(NotificacionObserver())
         self.orden_subject.attach(TecnicoObserver())
         self.db = DatabaseConnection()
+        self.replica = ReadReplica(self.db)
         self.notebook = ttk.Notebook(self.root, style="TNotebook")
         self.notebook.pack(expand=True, fill='both', padx=20, pady=(0, 20))
         
-        self.clientes_frame = tk.Frame(self.notebook, bg=COLOR_PRIMARY_BG)
-        self.tecnicos_frame = tk.Frame(self.notebook, bg=COLOR_PRIMARY_BG)
-        self.ordenes_frame = tk.Frame(self.notebook, bg=COLOR_PRIMARY_BG)
+        self.clientes_frame = self.theme.register(tk.Frame(self.notebook), "page")
+        self.tecnicos_frame = self.theme.register(tk.Frame(self.notebook), "page")
+        self.ordenes_frame = self.theme.register(tk.Frame(self.notebook), "page")
         
-        self.notebook.add(self.clientes_frame, text='Clientes')
-        self.notebook.add(self.tecnicos_frame, text='Técnicos')
-        self.notebook.add(self.ordenes_frame, text='Órdenes de Trabajo')
+        self.tabs = LazyTabs(self.notebook, on_loaded=self._on_tab_loaded)
+        self.tabs.add(self.clientes_frame, 'Clientes', self._init_clientes_tab, self.cargar_clientes)
+        self.tabs.add(self.tecnicos_frame, 'Técnicos', self._init_tecnicos_tab, self.cargar_tecnicos)
+        self.tabs.add(self.ordenes_frame, 'Órdenes de Trabajo', self._init_ordenes_tab, self.cargar_ordenes)
         
-        self._init_clientes_tab()
-        self._init_tecnicos_tab()
-        self._init_ordenes_tab()
-        
-        self._apply_theme() # Aplicar el tema inicial
+        self.theme.apply() # Aplicar el tema inicial (estilos ttk)
         self._on_header_resize() # Centrar el texto del Canvas al inicio de la aplicación
 
-    def _get_current_colors(self):
-        if self.is_dark_theme:
-            return {
-                "PRIMARY_BG": COLOR_PRIMARY_BG,
-                "SECONDARY_BG": COLOR_SECONDARY_BG,
-                "HEADER_BLUE": COLOR_HEADER_BLUE,
-                "ACCENT_BLUE": COLOR_ACCENT_BLUE,
-                "TEXT_LIGHT": COLOR_TEXT_LIGHT,
-                "TEXT_DARK": COLOR_TEXT_DARK,
-                "ENTRY_BG": COLOR_ENTRY_BG,
-                "ENTRY_FG": COLOR_ENTRY_FG,
-                "BORDER": COLOR_BORDER
-            }
-        else:
-            return {
-                "PRIMARY_BG": COLOR_LIGHT_PRIMARY_BG,
-                "SECONDARY_BG": COLOR_LIGHT_SECONDARY_BG,
-                "HEADER_BLUE": COLOR_LIGHT_HEADER_BLUE,
-                "ACCENT_BLUE": COLOR_LIGHT_ACCENT_BLUE,
-                "TEXT_LIGHT": COLOR_LIGHT_TEXT_DARK, # En tema claro, el texto claro es el oscuro
-                "TEXT_DARK": COLOR_LIGHT_TEXT_LIGHT, # Y el texto oscuro es el claro
-                "ENTRY_BG": COLOR_LIGHT_ENTRY_BG,
-                "ENTRY_FG": COLOR_LIGHT_ENTRY_FG,
-                "BORDER": COLOR_LIGHT_BORDER
-            }
-
-    def _apply_theme(self):
-        colors = self._get_current_colors()
-        
-        # Configurar estilos de ttk
-        style = ttk.Style()
-        style.theme_use('clam')
-        
-        self.root.configure(bg=colors["PRIMARY_BG"])
-        
-        # Actualizar el header
-        self.header_frame.configure(bg=colors["HEADER_BLUE"])
-        # Actualizar el Canvas del título y el texto en él
-        self.header_canvas.configure(bg=colors["HEADER_BLUE"])
-        self.header_canvas.itemconfig(self.header_text_id, fill=colors["TEXT_LIGHT"])
-        
-        # Definir y aplicar estilo para el header_label
-        # style.configure("Header.TLabel", background=colors["HEADER_BLUE"], foreground=colors["TEXT_LIGHT"], padding=0)
-
-        style.configure("TFrame", background=colors["PRIMARY_BG"])
-        style.configure("Card.TFrame", background=colors["SECONDARY_BG"], relief="flat")
-        style.configure("TNotebook", background=colors["PRIMARY_BG"], borderwidth=0)
-        style.configure("TNotebook.Tab", font=FONT_MAIN, padding=[20, 10], background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"], borderwidth=0)
-        style.map("TNotebook.Tab",
-                  background=[("selected", colors["HEADER_BLUE"]), ("active", colors["ACCENT_BLUE"])],
-                  foreground=[("selected", colors["TEXT_LIGHT"]), ("active", colors["TEXT_LIGHT"])])
-        
-        style.configure("TLabel", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"], font=FONT_MAIN)
-        style.configure("TLabelFrame.Label", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"], font=FONT_MAIN)
-        
-        style.configure("TButton", background=colors["ACCENT_BLUE"], foreground=colors["TEXT_LIGHT"], font=FONT_MAIN, borderwidth=0, focusthickness=3, focuscolor=colors["ACCENT_BLUE"])
-        style.map("TButton",
-                  background=[("active", colors["HEADER_BLUE"]), ("pressed", colors["ACCENT_BLUE"])])
-        
-        style.configure("Treeview", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"], fieldbackground=colors["SECONDARY_BG"], font=FONT_MAIN, rowheight=28, borderwidth=0)
-        style.configure("Treeview.Heading", background=colors["ACCENT_BLUE"], foreground=colors["TEXT_LIGHT"], font=("Segoe UI", 12, "bold"), borderwidth=0)
-        style.map("Treeview.Heading", background=[("active", colors["HEADER_BLUE"])])
-        
-        style.configure("TEntry", fieldbackground=colors["ENTRY_BG"], foreground=colors["ENTRY_FG"], borderwidth=0, relief="flat", insertbackground=colors["ENTRY_FG"])
-        style.configure("TCombobox", fieldbackground=colors["ENTRY_BG"], foreground=colors["ENTRY_FG"], selectbackground=colors["ACCENT_BLUE"], selectforeground=colors["TEXT_LIGHT"], background=colors["ENTRY_BG"], borderwidth=0, relief="flat", insertbackground=colors["ENTRY_FG"])
-        style.map("TCombobox", fieldbackground=[('readonly', colors["ENTRY_BG"])])
-        style.configure("TText", background=colors["ENTRY_BG"], foreground=colors["ENTRY_FG"], borderwidth=0, relief="flat", insertbackground=colors["ENTRY_FG"])
-        
-        # Actualizar colores de widgets tk (directos)
-        self._update_tk_widgets_colors(self.root, colors)
-
-    def _update_tk_widgets_colors(self, parent, colors):
-        for widget in parent.winfo_children():
-            if isinstance(widget, (tk.Frame, tk.LabelFrame, tk.Label, tk.Button, tk.Entry, tk.Text)):
-                try:
-                    widget.configure(bg=colors["SECONDARY_BG"], fg=colors["TEXT_LIGHT"]) # Default para la mayoría
-                    if isinstance(widget, (tk.Button)):
-                        widget.configure(bg=colors["ACCENT_BLUE"], fg=colors["TEXT_LIGHT"], activebackground=colors["HEADER_BLUE"], activeforeground=colors["TEXT_LIGHT"])
-                    elif isinstance(widget, (tk.Entry, tk.Text)):
-                        widget.configure(bg=colors["ENTRY_BG"], fg=colors["ENTRY_FG"], insertbackground=colors["ENTRY_FG"], highlightbackground=colors["BORDER"], highlightcolor=colors["BORDER"])
-                    
-                    # Specific cases for labels within frames/labelframes
-                    if isinstance(widget, tk.Label) and widget.master in [self.clientes_frame, self.tecnicos_frame, self.ordenes_frame]:
-                        widget.configure(bg=colors["SECONDARY_BG"], fg=colors["TEXT_LIGHT"])
-
-                except tk.TclError: # Algunos widgets tk pueden no tener todas las propiedades
-                    pass
-            
-            # Recorrer widgets anidados
-            if hasattr(widget, "winfo_children") and widget.winfo_children():
-                self._update_tk_widgets_colors(widget, colors)
-
     def _on_header_resize(self, event=None):
         # Centrar el texto en el Canvas cuando el frame del header se redimensiona
         canvas_width = self.header_canvas.winfo_width()
         canvas_height = self.header_canvas.winfo_height()
         self.header_canvas.coords(self.header_text_id, canvas_width / 2, canvas_height / 2)
 
+    def _on_tab_loaded(self, texto: str, segundos: float):
+        if self.profiler is not None:
+            self.profiler.registrar(f"pestaña {texto}", segundos)
+        if self.arranque is not None:
+            return
+        self.arranque = time.perf_counter() - self._inicio
+        if self.profiler is not None:
+            self.profiler.registrar("arranque", self.arranque)
+        if self.arranque > PRESUPUESTO_ARRANQUE:
+            logger.warning("Arranque lento: %.2f s (presupuesto %.1f s)", self.arranque, PRESUPUESTO_ARRANQUE)
+
     def _crear_theme_toggle_button(self):
         self.theme_button = tk.Button(self.root, text="Alternar Tema", command=self._toggle_theme)
         self._estilizar_boton(self.theme_button)
         self.theme_button.place(relx=0.95, rely=0.02, anchor='ne')
 
     def _toggle_theme(self):
-        self.is_dark_theme = not self.is_dark_theme
-        self._apply_theme()
+        self.theme.switch()
 
     def _estilizar_boton(self, boton):
-        colors = self._get_current_colors()
-        boton.configure(bg=colors["ACCENT_BLUE"], fg=colors["TEXT_LIGHT"], 
-                        activebackground=colors["HEADER_BLUE"], activeforeground=colors["TEXT_LIGHT"], 
-                        relief="flat", bd=0, font=FONT_MAIN, cursor="hand2")
-        boton.bind("<Enter>", lambda e: boton.config(bg=colors["HEADER_BLUE"])) # Hover al color de header
-        boton.bind("<Leave>", lambda e: boton.config(bg=colors["ACCENT_BLUE"])) # Volver al color del botón
+        boton.configure(relief="flat", bd=0, font=FONT_MAIN, cursor="hand2")
+        self.theme.register(boton, "button")
+        # Los colores de hover se leen de la paleta activa en cada evento
+        boton.bind("<Enter>", lambda e: boton.config(bg=self.theme.colors["HEADER_BLUE"])) # Hover al color de header
+        boton.bind("<Leave>", lambda e: boton.config(bg=self.theme.colors["ACCENT_BLUE"])) # Volver al color del botón
 
     def _estilizar_entry(self, entry):
-        colors = self._get_current_colors()
-        entry.configure(bg=colors["ENTRY_BG"], fg=colors["ENTRY_FG"], insertbackground=colors["ENTRY_FG"], 
-                        relief="flat", font=FONT_MAIN, highlightthickness=1, 
-                        highlightbackground=colors["BORDER"], highlightcolor=colors["BORDER"])
+        entry.configure(relief="flat", font=FONT_MAIN, highlightthickness=1)
+        self.theme.register(entry, "entry")
+
+    def _crear_label(self, parent, texto):
+        return self.theme.register(ttk.Label(parent, text=texto), "label")
+
+    def _crear_formulario(self, parent, titulo):
+        return self.theme.register(tk.LabelFrame(parent, text=titulo, font=FONT_MAIN), "card")
 
     def _init_clientes_tab(self):
-        colors = self._get_current_colors()
-        
         # Configurar el grid de clientes_frame para que se expanda
         self.clientes_frame.grid_rowconfigure(0, weight=0) # Fila del formulario (no se expande verticalmente)
         self.clientes_frame.grid_rowconfigure(1, weight=1) # Fila de la tabla (se expande verticalmente)
         self.clientes_frame.grid_rowconfigure(2, weight=0) # Fila del botón cargar (no se expande verticalmente)
         self.clientes_frame.grid_columnconfigure(0, weight=1) # Columna única (se expande horizontalmente)
 
-        form_frame = tk.LabelFrame(self.clientes_frame, text="Registro de Cliente", bg=colors["SECONDARY_BG"], fg=colors["TEXT_LIGHT"], font=FONT_MAIN)
+        form_frame = self._crear_formulario(self.clientes_frame, "Registro de Cliente")
         form_frame.grid(row=0, column=0, padx=20, pady=20, sticky='ew') # Usar grid para el formulario
         
         # Configurar la columna 1 del form_frame para que se expanda horizontalmente
         form_frame.grid_columnconfigure(1, weight=1)
 
-        ttk.Label(form_frame, text="Nombre:", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"]).grid(row=0, column=0, padx=5, pady=8, sticky='e')
+        self._crear_label(form_frame, "Nombre:").grid(row=0, column=0, padx=5, pady=8, sticky='e')
         self.nombre_cliente = tk.Entry(form_frame)
         self.nombre_cliente.grid(row=0, column=1, padx=5, pady=8, sticky='ew')
         self._estilizar_entry(self.nombre_cliente)
 
-        ttk.Label(form_frame, text="Email:", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"]).grid(row=1, column=0, padx=5, pady=8, sticky='e')
+        self._crear_label(form_frame, "Email:").grid(row=1, column=0, padx=5, pady=8, sticky='e')
         self.email_cliente = tk.Entry(form_frame)
         self.email_cliente.grid(row=1, column=1, padx=5, pady=8, sticky='ew')
         self._estilizar_entry(self.email_cliente)
 
-        ttk.Label(form_frame, text="Teléfono:", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"]).grid(row=2, column=0, padx=5, pady=8, sticky='e')
+        self._crear_label(form_frame, "Teléfono:").grid(row=2, column=0, padx=5, pady=8, sticky='e')
         self.telefono_cliente = tk.Entry(form_frame)
         self.telefono_cliente.grid(row=2, column=1, padx=5, pady=8, sticky='ew')
         self._estilizar_entry(self.telefono_cliente)
 
-        ttk.Label(form_frame, text="Dirección:", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"]).grid(row=3, column=0, padx=5, pady=8, sticky='e')
+        self._crear_label(form_frame, "Dirección:").grid(row=3, column=0, padx=5, pady=8, sticky='e')
         self.direccion_cliente = tk.Entry(form_frame)
         self.direccion_cliente.grid(row=3, column=1, padx=5, pady=8, sticky='ew')
         self._estilizar_entry(self.direccion_cliente)
@@ -300,46 +226,54 @@ class TechnicalServiceApp:
         btn_registrar.grid(row=4, column=0, columnspan=2, pady=15)
         self._estilizar_boton(btn_registrar)
 
-        self.tabla_clientes = ttk.Treeview(self.clientes_frame, columns=("ID", "Nombre", "Email", "Teléfono", "Dirección"), show='headings', style="Treeview")
-        for col in ("ID", "Nombre", "Email", "Teléfono", "Dirección"):
-            self.tabla_clientes.heading(col, text=col)
-            self.tabla_clientes.column(col, anchor='center', width=120)
-        self.tabla_clientes.grid(row=1, column=0, sticky='nsew', padx=20, pady=10) # Eliminado fill/expand, añadido sticky='nsew'
-
-        btn_cargar = tk.Button(self.clientes_frame, text="Cargar Clientes", command=self.cargar_clientes)
-        btn_cargar.grid(row=2, column=0, pady=10) # Usar grid para el botón
+        # Tabla paginada: el orden (clic en el encabezado) y el filtro se resuelven en SQLite
+        self.lista_clientes = SortableTable(self.clientes_frame, self.theme, LISTADO_CLIENTES, self.db)
+        self.lista_clientes.frame.grid(row=1, column=0, sticky='nsew', padx=20, pady=10)
+        self.tabla_clientes = self.lista_clientes.tree
+        self.tabla_clientes.bind("<Double-1>", lambda e: self.ver_historial_cliente())
+
+        botones = self.theme.register(tk.Frame(self.clientes_frame), "page")
+        botones.grid(row=2, column=0, pady=10)
+        self._crear_label(botones, "Nombre:").pack(side='left', padx=5)
+        self.filtro_cliente = tk.Entry(botones, width=20)
+        self._estilizar_entry(self.filtro_cliente)
+        self.filtro_cliente.pack(side='left', padx=5)
+        self.filtro_cliente.bind("<Return>", lambda e: self.cargar_clientes())
+        btn_cargar = tk.Button(botones, text="Cargar Clientes", command=self.cargar_clientes)
+        btn_cargar.pack(side='left', padx=5)
         self._estilizar_boton(btn_cargar)
+        btn_historial = tk.Button(botones, text="Ver Historial", command=self.ver_historial_cliente)
+        btn_historial.pack(side='left', padx=5)
+        self._estilizar_boton(btn_historial)
 
     def _init_tecnicos_tab(self):
-        colors = self._get_current_colors()
-
         # Configurar el grid de tecnicos_frame para que se expanda
         self.tecnicos_frame.grid_rowconfigure(0, weight=0) # Fila del formulario
         self.tecnicos_frame.grid_rowconfigure(1, weight=1) # Fila de la tabla
         self.tecnicos_frame.grid_rowconfigure(2, weight=0) # Fila del botón cargar
         self.tecnicos_frame.grid_columnconfigure(0, weight=1) # Columna única
 
-        form_frame = tk.LabelFrame(self.tecnicos_frame, text="Registro de Técnico", bg=colors["SECONDARY_BG"], fg=colors["TEXT_LIGHT"], font=FONT_MAIN) # Usar tk.LabelFrame
+        form_frame = self._crear_formulario(self.tecnicos_frame, "Registro de Técnico") # Usar tk.LabelFrame
         form_frame.grid(row=0, column=0, padx=20, pady=20, sticky='ew') # Usar grid para el formulario
 
         # Configurar la columna 1 del form_frame para que se expanda
         form_frame.grid_columnconfigure(1, weight=1)
 
-        ttk.Label(form_frame, text="Nombre:", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"]).grid(row=0, column=0, padx=5, pady=8, sticky='e')
+        self._crear_label(form_frame, "Nombre:").grid(row=0, column=0, padx=5, pady=8, sticky='e')
         self.nombre_tecnico = tk.Entry(form_frame)
         self.nombre_tecnico.grid(row=0, column=1, padx=5, pady=8, sticky='ew')
         self._estilizar_entry(self.nombre_tecnico)
 
-        ttk.Label(form_frame, text="Especialidad:", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"]).grid(row=1, column=0, padx=5, pady=8, sticky='e')
+        self._crear_label(form_frame, "Especialidad:").grid(row=1, column=0, padx=5, pady=8, sticky='e')
         self.especialidad_tecnico = ttk.Combobox(form_frame, values=["Reparación", "Soporte IT"], style="TCombobox") # Apply style to Combobox
         self.especialidad_tecnico.grid(row=1, column=1, padx=5, pady=8, sticky='ew')
 
-        ttk.Label(form_frame, text="Email:", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"]).grid(row=2, column=0, padx=5, pady=8, sticky='e')
+        self._crear_label(form_frame, "Email:").grid(row=2, column=0, padx=5, pady=8, sticky='e')
         self.email_tecnico = tk.Entry(form_frame)
         self.email_tecnico.grid(row=2, column=1, padx=5, pady=8, sticky='ew')
         self._estilizar_entry(self.email_tecnico)
 
-        ttk.Label(form_frame, text="Teléfono:", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"]).grid(row=3, column=0, padx=5, pady=8, sticky='e')
+        self._crear_label(form_frame, "Teléfono:").grid(row=3, column=0, padx=5, pady=8, sticky='e')
         self.telefono_tecnico = tk.Entry(form_frame)
         self.telefono_tecnico.grid(row=3, column=1, padx=5, pady=8, sticky='ew')
         self._estilizar_entry(self.telefono_tecnico)
@@ -348,44 +282,46 @@ class TechnicalServiceApp:
         btn_registrar.grid(row=4, column=0, columnspan=2, pady=15)
         self._estilizar_boton(btn_registrar)
 
-        self.tabla_tecnicos = ttk.Treeview(self.tecnicos_frame, columns=("ID", "Nombre", "Especialidad", "Email", "Teléfono"), show='headings', style="Treeview")
-        for col in ("ID", "Nombre", "Especialidad", "Email", "Teléfono"):
-            self.tabla_tecnicos.heading(col, text=col)
-            self.tabla_tecnicos.column(col, anchor='center', width=120)
-        self.tabla_tecnicos.grid(row=1, column=0, sticky='nsew', padx=20, pady=10) # Eliminado fill/expand, añadido sticky='nsew'
-
-        btn_cargar = tk.Button(self.tecnicos_frame, text="Cargar Técnicos", command=self.cargar_tecnicos)
-        btn_cargar.grid(row=2, column=0, pady=10) # Usar grid para el botón
+        self.lista_tecnicos = SortableTable(self.tecnicos_frame, self.theme, LISTADO_TECNICOS, self.db)
+        self.lista_tecnicos.frame.grid(row=1, column=0, sticky='nsew', padx=20, pady=10)
+        self.tabla_tecnicos = self.lista_tecnicos.tree
+
+        botones = self.theme.register(tk.Frame(self.tecnicos_frame), "page")
+        botones.grid(row=2, column=0, pady=10)
+        self._crear_label(botones, "Especialidad:").pack(side='left', padx=5)
+        self.filtro_especialidad = ttk.Combobox(botones, values=["", "Reparación", "Soporte IT"], width=15, style="TCombobox")
+        self.filtro_especialidad.pack(side='left', padx=5)
+        btn_cargar = tk.Button(botones, text="Cargar Técnicos", command=self.cargar_tecnicos)
+        btn_cargar.pack(side='left', padx=5)
         self._estilizar_boton(btn_cargar)
 
     def _init_ordenes_tab(self):
-        colors = self._get_current_colors()
-
         # Configurar el grid de ordenes_frame para que se expanda
         self.ordenes_frame.grid_rowconfigure(0, weight=0) # Fila del formulario
         self.ordenes_frame.grid_rowconfigure(1, weight=1) # Fila de la tabla
-        self.ordenes_frame.grid_rowconfigure(2, weight=0) # Fila del botón cargar
+        self.ordenes_frame.grid_rowconfigure(2, weight=0) # Fila de filtros y botón cargar
         self.ordenes_frame.grid_columnconfigure(0, weight=1) # Columna única
 
-        form_frame = tk.LabelFrame(self.ordenes_frame, text="Nueva Orden de Trabajo", bg=colors["SECONDARY_BG"], fg=colors["TEXT_LIGHT"], font=FONT_MAIN) # Usar tk.LabelFrame
+        form_frame = self._crear_formulario(self.ordenes_frame, "Nueva Orden de Trabajo") # Usar tk.LabelFrame
         form_frame.grid(row=0, column=0, padx=20, pady=20, sticky='ew') # Usar grid para el formulario
 
         # Configurar la columna 1 del form_frame para que se expanda
         form_frame.grid_columnconfigure(1, weight=1)
 
-        ttk.Label(form_frame, text="Cliente:", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"]).grid(row=0, column=0, padx=5, pady=8, sticky='e')
-        self.cliente_orden = ttk.Combobox(form_frame, style="TCombobox")
+        self._crear_label(form_frame, "Cliente:").grid(row=0, column=0, padx=5, pady=8, sticky='e')
+        # Las listas de los combobox se llenan al desplegarlos, no al cargar las pestañas
+        self.cliente_orden = ttk.Combobox(form_frame, style="TCombobox", postcommand=self._listar_clientes)
         self.cliente_orden.grid(row=0, column=1, padx=5, pady=8, sticky='ew')
 
-        ttk.Label(form_frame, text="Técnico:", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"]).grid(row=1, column=0, padx=5, pady=8, sticky='e')
-        self.tecnico_orden = ttk.Combobox(form_frame, style="TCombobox")
+        self._crear_label(form_frame, "Técnico:").grid(row=1, column=0, padx=5, pady=8, sticky='e')
+        self.tecnico_orden = ttk.Combobox(form_frame, style="TCombobox", postcommand=self._listar_tecnicos)
         self.tecnico_orden.grid(row=1, column=1, padx=5, pady=8, sticky='ew')
 
-        ttk.Label(form_frame, text="Tipo de Servicio:", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"]).grid(row=2, column=0, padx=5, pady=8, sticky='e')
-        self.tipo_servicio = ttk.Combobox(form_frame, values=["Reparación", "Soporte IT"], style="TCombobox")
+        self._crear_label(form_frame, "Tipo de Servicio:").grid(row=2, column=0, padx=5, pady=8, sticky='e')
+        self.tipo_servicio = ttk.Combobox(form_frame, values=ServiceFactory.labels(), style="TCombobox")
         self.tipo_servicio.grid(row=2, column=1, padx=5, pady=8, sticky='ew')
 
-        ttk.Label(form_frame, text="Descripción:", background=colors["SECONDARY_BG"], foreground=colors["TEXT_LIGHT"]).grid(row=3, column=0, padx=5, pady=8, sticky='e')
+        self._crear_label(form_frame, "Descripción:").grid(row=3, column=0, padx=5, pady=8, sticky='e')
         self.descripcion_orden = tk.Text(form_frame, height=3, width=30)
         self._estilizar_entry(self.descripcion_orden)
         self.descripcion_orden.grid(row=3, column=1, padx=5, pady=8, sticky='ew')
@@ -394,29 +330,33 @@ class TechnicalServiceApp:
         btn_crear.grid(row=4, column=0, columnspan=2, pady=15)
         self._estilizar_boton(btn_crear)
 
-        self.tabla_ordenes = ttk.Treeview(self.ordenes_frame, columns=("ID", "Cliente", "Técnico", "Servicio", "Estado", "Fecha"), show='headings', style="Treeview")
-        for col in ("ID", "Cliente", "Técnico", "Servicio", "Estado", "Fecha"):
-            self.tabla_ordenes.heading(col, text=col)
-            self.tabla_ordenes.column(col, anchor='center', width=120)
-        self.tabla_ordenes.grid(row=1, column=0, sticky='nsew', padx=20, pady=10) # Eliminado fill/expand, añadido sticky='nsew'
-
-        btn_cargar = tk.Button(self.ordenes_frame, text="Cargar Órdenes", command=self.cargar_ordenes)
-        btn_cargar.grid(row=2, column=0, pady=10)
+        # Ordenadas por fecha, de la más reciente a la más antigua
+        self.lista_ordenes = SortableTable(self.ordenes_frame, self.theme, LISTADO_ORDENES, self.db,
+                                           orden="Fecha", descendente=True)
+        self.lista_ordenes.frame.grid(row=1, column=0, sticky='nsew', padx=20, pady=10)
+        self.tabla_ordenes = self.lista_ordenes.tree
+
+        filtros = self.theme.register(tk.Frame(self.ordenes_frame), "page")
+        filtros.grid(row=2, column=0, pady=10)
+        self._crear_label(filtros, "Estado:").pack(side='left', padx=5)
+        self.filtro_estado = ttk.Combobox(filtros, values=["", "Pendiente", *ESTADOS_CERRADOS], width=12, style="TCombobox")
+        self.filtro_estado.pack(side='left', padx=5)
+        self._crear_label(filtros, "Técnico:").pack(side='left', padx=5)
+        self.filtro_tecnico = ttk.Combobox(filtros, width=15, style="TCombobox",
+                                           postcommand=self._listar_tecnicos)
+        self.filtro_tecnico.pack(side='left', padx=5)
+        self._crear_label(filtros, "Desde:").pack(side='left', padx=5)
+        self.filtro_desde = tk.Entry(filtros, width=11)
+        self._estilizar_entry(self.filtro_desde)
+        self.filtro_desde.pack(side='left', padx=5)
+        self._crear_label(filtros, "Hasta:").pack(side='left', padx=5)
+        self.filtro_hasta = tk.Entry(filtros, width=11)
+        self._estilizar_entry(self.filtro_hasta)
+        self.filtro_hasta.pack(side='left', padx=5)
+        btn_cargar = tk.Button(filtros, text="Cargar Órdenes", command=self.cargar_ordenes)
+        btn_cargar.pack(side='left', padx=5)
         self._estilizar_boton(btn_cargar)
 
-    def validar_email(self, email: str) -> bool:
-        """
-        Valida el formato de un correo electrónico.
-        
-        Args:
-            email (str): Correo electrónico a validar
-            
-        Returns:
-            bool: True si el email es válido, False en caso contrario
-        """
-        patron = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(patron, email))
-
     def registrar_cliente(self):
         """
         Registra un nuevo cliente en el sistema.
@@ -429,12 +369,9 @@ class TechnicalServiceApp:
         telefono = self.telefono_cliente.get()
         direccion = self.direccion_cliente.get()
         
-        if not nombre:
-            messagebox.showerror("Error", "El nombre es obligatorio")
-            return
-        
-        if email and not self.validar_email(email):
-            messagebox.showerror("Error", "El formato del email no es válido")
+        errores = validar_registro({"nombre": nombre, "email": email, "telefono": telefono}, "cliente")
+        if errores:
+            messagebox.showerror("Error", "\n".join(errores))
             return
         
         try:
@@ -458,12 +395,10 @@ class TechnicalServiceApp:
         email = self.email_tecnico.get()
         telefono = self.telefono_tecnico.get()
         
-        if not nombre or not especialidad:
-            messagebox.showerror("Error", "Nombre y especialidad son obligatorios")
-            return
-        
-        if email and not self.validar_email(email):
-            messagebox.showerror("Error", "El formato del email no es válido")
+        errores = validar_registro({"nombre": nombre, "especialidad": especialidad,
+                                    "email": email, "telefono": telefono}, "tecnico")
+        if errores:
+            messagebox.showerror("Error", "\n".join(errores))
             return
         
         try:
@@ -500,23 +435,8 @@ class TechnicalServiceApp:
                 messagebox.showerror("Error", "Cliente o técnico no encontrado")
                 return
             
-            # Crear servicio usando el factory
-            if tipo_servicio.lower() == "reparación" or tipo_servicio.lower() == "reparacion":
-                servicio = ServiceFactory.create_service(
-                    "reparacion",
-                    descripcion=descripcion,
-                    costo=100.0,  # Puedes ajustar el costo según tu lógica
-                    duracion_estimada=60,  # Puedes ajustar la duración
-                    tipo_reparacion="General"
-                )
-            else:
-                servicio = ServiceFactory.create_service(
-                    "soporte_it",
-                    descripcion=descripcion,
-                    costo=80.0,  # Puedes ajustar el costo según tu lógica
-                    duracion_estimada=45,  # Puedes ajustar la duración
-                    nivel_soporte="Nivel 1"
-                )
+            # Crear servicio usando el factory (costo y duración por defecto del tipo)
+            servicio = ServiceFactory.create_service(tipo_servicio, descripcion=descripcion)
             
             # Crear orden
             orden = OrdenDeTrabajo(cliente, tecnico, servicio, descripcion)
@@ -532,28 +452,44 @@ class TechnicalServiceApp:
         except Exception as e:
             messagebox.showerror("Error", f"Error al crear orden: {str(e)}")
 
+    def ver_historial_cliente(self):
+        """
+        Abre el historial de órdenes del cliente seleccionado en la tabla.
+        """
+        seleccion = self.tabla_clientes.selection()
+        if not seleccion:
+            messagebox.showerror("Error", "Seleccione un cliente")
+            return
+        cliente_id, nombre = self.tabla_clientes.item(seleccion[0], "values")[:2]
+        ClientHistoryWindow(self.root, self.theme, int(cliente_id), nombre)
+
     def obtener_cliente_por_nombre(self, nombre: str) -> Cliente:
         """
         Busca un cliente por su nombre en la base de datos.
         
+        Acepta también la etiqueta 'Nombre <email>' del combobox, que
+        identifica al cliente de forma única por su email.
+        
         Args:
-            nombre (str): Nombre del cliente a buscar
+            nombre (str): Nombre del cliente a buscar o etiqueta del combobox
             
         Returns:
             Cliente: Objeto Cliente si se encuentra, None en caso contrario
+            
+        Raises:
+            ValueError: Si hay varios clientes con ese nombre
         """
-        query = "SELECT * FROM clientes WHERE nombre = ?"
-        resultado = self.db.execute_query(query, (nombre,))
-        if resultado:
-            fila = resultado[0]
-            return Cliente(
-                nombre=fila[1],
-                email=fila[2],
-                telefono=fila[3],
-                direccion=fila[4],
-                id=fila[0]
-            )
-        return None
+        if nombre.endswith(">") and "<" in nombre:
+            clientes = self.replica.buscar("clientes", "email", nombre[nombre.rindex("<") + 1:-1])
+        else:
+            clientes = self.replica.buscar("clientes", "nombre", nombre)
+            if len(clientes) > 1:
+                raise ValueError(f"Hay {len(clientes)} clientes llamados '{nombre}'; selecciónelo por su email")
+        if not clientes:
+            return None
+        fila = clientes[0]
+        return Cliente(nombre=fila.nombre, email=fila.email, telefono=fila.telefono,
+                       direccion=fila.direccion, id=fila.id, version=fila.version)
 
     def obtener_tecnico_por_nombre(self, nombre: str) -> Tecnico:
         """
@@ -565,69 +501,63 @@ class TechnicalServiceApp:
         Returns:
             Tecnico: Objeto Tecnico si se encuentra, None en caso contrario
         """
-        query = "SELECT * FROM tecnicos WHERE nombre = ?"
-        resultado = self.db.execute_query(query, (nombre,))
-        if resultado:
-            fila = resultado[0]
-            return Tecnico(
-                nombre=fila[1],
-                especialidad=fila[2],
-                email=fila[3],
-                telefono=fila[4],
-                id=fila[0]
-            )
+        for fila in self.replica.buscar("tecnicos", "nombre", nombre):
+            if fila.nombre == nombre:
+                return Tecnico(
+                    nombre=fila.nombre,
+                    especialidad=fila.especialidad,
+                    email=fila.email,
+                    telefono=fila.telefono,
+                    id=fila.id,
+                    version=fila.version
+                )
         return None
 
     def cargar_clientes(self):
         """
-        Carga la lista de clientes desde la base de datos y la muestra en la tabla.
+        Carga la primera página de clientes (filtrados por el comienzo del
+        nombre).
         """
-        for item in self.tabla_clientes.get_children():
-            self.tabla_clientes.delete(item)
-            
-        query = "SELECT * FROM clientes"
-        clientes = self.db.execute_query(query)
-        
-        for cliente in clientes:
-            self.tabla_clientes.insert("", "end", values=cliente)
-            
-        # Actualizar combobox de clientes en órdenes
-        self.cliente_orden['values'] = [cliente[1] for cliente in clientes]
+        self.lista_clientes.filtrar(nombre=self.filtro_cliente.get().strip())
 
     def cargar_tecnicos(self):
         """
-        Carga la lista de técnicos desde la base de datos y la muestra en la tabla.
+        Carga la primera página de técnicos (filtrados por especialidad).
         """
-        for item in self.tabla_tecnicos.get_children():
-            self.tabla_tecnicos.delete(item)
-            
-        query = "SELECT * FROM tecnicos"
-        tecnicos = self.db.execute_query(query)
-        
-        for tecnico in tecnicos:
-            self.tabla_tecnicos.insert("", "end", values=tecnico)
-            
-        # Actualizar combobox de técnicos en órdenes
-        self.tecnico_orden['values'] = [tecnico[1] for tecnico in tecnicos]
+        self.lista_tecnicos.filtrar(especialidad=self.filtro_especialidad.get())
+
+    def _listar_clientes(self):
+        # El email distingue a clientes con el mismo nombre
+        self.cliente_orden['values'] = [
+            f"{cliente.nombre} <{cliente.email}>" if cliente.email else cliente.nombre
+            for cliente in self.replica.todos("clientes")
+        ]
+
+    def _listar_tecnicos(self):
+        nombres = [tecnico.nombre for tecnico in self.replica.todos("tecnicos")]
+        self.tecnico_orden['values'] = nombres
+        self.filtro_tecnico['values'] = [""] + nombres
 
     def cargar_ordenes(self):
         """
-        Carga la lista de órdenes de trabajo desde la base de datos y la muestra en la tabla.
+        Carga la primera página de órdenes de trabajo con los filtros de
+        estado, técnico y rango de fechas (YYYY-MM-DD, hasta exclusivo).
         """
-        for item in self.tabla_ordenes.get_children():
-            self.tabla_ordenes.delete(item)
-            
-        query = """
-            SELECT o.id, c.nombre, t.nombre, s.tipo, o.estado, o.fecha_creacion
-            FROM ordenes_trabajo o
-            JOIN clientes c ON o.cliente_id = c.id
-            JOIN tecnicos t ON o.tecnico_id = t.id
-            JOIN servicios s ON o.servicio_id = s.id
-        """
-        ordenes = self.db.execute_query(query)
-        
-        for orden in ordenes:
-            self.tabla_ordenes.insert("", "end", values=orden)
+        try:
+            tecnico = None
+            if self.filtro_tecnico.get():
+                tecnico = self.obtener_tecnico_por_nombre(self.filtro_tecnico.get())
+                if tecnico is None:
+                    messagebox.showerror("Error", "Técnico no encontrado")
+                    return
+            self.lista_ordenes.filtrar(
+                estado=self.filtro_estado.get(),
+                tecnico_id=tecnico.id if tecnico else None,
+                desde=self.filtro_desde.get().strip(),
+                hasta=self.filtro_hasta.get().strip(),
+            )
+        except ValueError as e:
+            messagebox.showerror("Error", f"Filtro inválido: {str(e)}")
 
     def limpiar_campos_cliente(self):
         """
@@ -658,12 +588,20 @@ class TechnicalServiceApp:
 
     def run(self):
         """
-        Inicia la aplicación y carga los datos iniciales.
+        Inicia la aplicación y arranca el mantenimiento en segundo plano
+        (chequeos, optimización y copias). Los datos de la primera pestaña
+        se cargan ya dentro del bucle de eventos, con la ventana visible.
         """
-        self.cargar_clientes()
-        self.cargar_tecnicos()
-        self.cargar_ordenes()
-        self.root.mainloop()
+        mantenimiento = MaintenanceRunner()
+        mantenimiento.start()
+        try:
+            self.root.mainloop()
+        finally:
+            mantenimiento.close()
+            if self.profiler is not None:
+                self.profiler.stop()
+            if self.metricas is not None:
+                self.metricas.stop()
 
 if __name__ == "__main__":
     app = TechnicalServiceApp()
@@ -0,0 +1,183 @@
+import argparse
+from datetime import timedelta
+from typing import List, Tuple, Any, Optional, Sequence
+from models.db_connection import DatabaseConnection, COLUMNAS_AGREGADAS, COLUMNAS_RETIRADAS
+from models.models import ESTADOS_CERRADOS
+from models.queries import placeholders
+from models.timestamps import Fecha, ahora, a_epoch
+
+ARCHIVE_NAME = "archive"
+
+class OrderArchiver:
+    """
+    Archivo en frío de las órdenes de trabajo cerradas.
+    
+    Mueve las órdenes antiguas en estados cerrados desde la tabla principal
+    'ordenes_trabajo' a la misma tabla en una base de datos de archivo
+    adjunta con ATTACH, en lotes de transacciones cortas. Así la tabla
+    principal y sus índices se mantienen pequeños. Las consultas de
+    historial incluyen el archivo solo cuando el rango de fechas lo alcanza.
+    
+    Los clientes, técnicos y servicios permanecen en la base principal; el
+    archivo solo contiene las filas de órdenes.
+    
+    Atributos:
+        db (DatabaseConnection): Conexión a la base principal
+        alias (str): Esquema con el que se adjunta la base de archivo
+    """
+    def __init__(self, db: DatabaseConnection = None, archive_name: str = ARCHIVE_NAME):
+        """
+        Inicializa el archivador y adjunta la base de archivo.
+        
+        Args:
+            db (DatabaseConnection, opcional): Conexión principal
+            archive_name (str): Nombre lógico de la base de archivo
+        """
+        self.db = db or DatabaseConnection()
+        self.alias = self.db.attach(archive_name)
+        self._sync_schema()
+
+    def _sync_schema(self):
+        """
+        Crea o amplía la tabla de archivo para que tenga las mismas columnas
+        que la tabla principal, rellenando las columnas derivadas y quitando
+        las retiradas igual que la migración de la base principal.
+        """
+        self.db.execute_write(
+            f"CREATE TABLE IF NOT EXISTS {self.alias}.ordenes_trabajo AS "
+            "SELECT * FROM main.ordenes_trabajo WHERE 0"
+        )
+        archivadas = set(self.db.table_columns("ordenes_trabajo", self.alias))
+        rellenos = {columna: relleno for columna, _, relleno in COLUMNAS_AGREGADAS["ordenes_trabajo"]}
+        for columna in self.db.table_columns("ordenes_trabajo"):
+            if columna not in archivadas:
+                self.db.execute_write(f"ALTER TABLE {self.alias}.ordenes_trabajo ADD COLUMN {columna}")
+                if rellenos.get(columna):
+                    self.db.execute_write(f"UPDATE {self.alias}.ordenes_trabajo SET {columna} = {rellenos[columna]}")
+        # Las descripciones archivadas pasan a la tabla 'descripciones' de la base principal
+        with self.db.transaction():
+            self.db.migrate_descriptions("ordenes_trabajo", self.alias)
+        for columna, _ in COLUMNAS_RETIRADAS["ordenes_trabajo"]:
+            if columna in archivadas:
+                self.db.execute_write(f"DROP INDEX IF EXISTS {self.alias}.idx_archivo_fecha")
+                self.db.execute_write(f"ALTER TABLE {self.alias}.ordenes_trabajo DROP COLUMN {columna}")
+        self.db.execute_write(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {self.alias}.idx_archivo_id ON ordenes_trabajo (id)"
+        )
+        self.db.execute_write(
+            f"CREATE INDEX IF NOT EXISTS {self.alias}.idx_archivo_fecha ON ordenes_trabajo (creado_en)"
+        )
+
+    def archive_orders(self, older_than_days: int, batch_size: int = 500,
+                       estados: Sequence[str] = ESTADOS_CERRADOS) -> int:
+        """
+        Mueve al archivo las órdenes cerradas más antiguas que N días.
+        
+        Cada lote se copia y se borra de la tabla principal dentro de una
+        misma transacción, de modo que una orden nunca queda duplicada ni
+        perdida y los bloqueos de escritura duran poco.
+        
+        Args:
+            older_than_days (int): Antigüedad mínima en días
+            batch_size (int): Número de órdenes por transacción
+            estados (Sequence[str]): Estados considerados cerrados
+            
+        Returns:
+            int: Número total de órdenes archivadas
+        """
+        limite = a_epoch(ahora() - timedelta(days=older_than_days))
+        columnas = ", ".join(self.db.table_columns("ordenes_trabajo"))
+        seleccion = f"""
+            SELECT id FROM main.ordenes_trabajo
+            WHERE estado IN ({placeholders(len(estados))}) AND creado_en < ?
+            LIMIT ?
+        """
+        total = 0
+        while True:
+            ids = [fila[0] for fila in self.db.fetch_all(seleccion, (*estados, limite, batch_size))]
+            if not ids:
+                return total
+            lista = placeholders(len(ids))
+            with self.db.transaction():
+                self.db.execute_write(
+                    f"INSERT INTO {self.alias}.ordenes_trabajo ({columnas}) "
+                    f"SELECT {columnas} FROM main.ordenes_trabajo WHERE id IN ({lista})",
+                    tuple(ids)
+                )
+                self.db.execute_write(f"DELETE FROM main.ordenes_trabajo WHERE id IN ({lista})", tuple(ids))
+            total += len(ids)
+
+    def newest_archived(self) -> Optional[int]:
+        """
+        Devuelve la fecha de la orden archivada más reciente.
+        
+        Returns:
+            Optional[int]: Epoch de creación o None si el archivo está vacío
+        """
+        return self.db.fetch_one(f"SELECT MAX(creado_en) FROM {self.alias}.ordenes_trabajo")[0]
+
+    def query_history(self, desde: Fecha = None, hasta: Fecha = None,
+                      cliente_id: int = None) -> List[Tuple[Any, ...]]:
+        """
+        Consulta el historial de órdenes en un rango de fechas.
+        
+        La tabla de archivo solo se une (UNION ALL) cuando el rango no tiene
+        límite inferior o empieza antes de la orden archivada más reciente.
+        
+        Args:
+            desde (Fecha, opcional): Fecha inicial inclusiva (datetime, epoch
+                o texto 'YYYY-MM-DD[ HH:MM:SS]' en hora local)
+            hasta (Fecha, opcional): Fecha final exclusiva
+            cliente_id (int, opcional): Restringe el historial a un cliente
+            
+        Returns:
+            List[Tuple[Any, ...]]: Filas (id, cliente, técnico, servicio, estado, fecha)
+                ordenadas de la más reciente a la más antigua, con la fecha
+                como texto en hora local
+        """
+        condiciones, params = [], []
+        desde = a_epoch(desde) if desde is not None else None
+        if desde is not None:
+            condiciones.append("o.creado_en >= ?")
+            params.append(desde)
+        if hasta is not None:
+            condiciones.append("o.creado_en < ?")
+            params.append(a_epoch(hasta))
+        if cliente_id is not None:
+            condiciones.append("o.cliente_id = ?")
+            params.append(cliente_id)
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+
+        def _select(esquema: str) -> str:
+            return f"""
+                SELECT o.id, c.nombre AS cliente, t.nombre AS tecnico, s.tipo AS servicio, o.estado,
+                       datetime(o.creado_en, 'unixepoch', 'localtime') AS fecha, o.creado_en
+                FROM {esquema}.ordenes_trabajo o
+                JOIN main.clientes c ON o.cliente_id = c.id
+                JOIN main.tecnicos t ON o.tecnico_id = t.id
+                JOIN main.servicios s ON o.servicio_id = s.id
+                {where}
+            """
+
+        query, todos = _select("main"), list(params)
+        reciente = self.newest_archived()
+        if reciente is not None and (desde is None or desde <= reciente):
+            query += " UNION ALL " + _select(self.alias)
+            todos += params
+        return self.db.fetch_all(
+            f"SELECT id, cliente, tecnico, servicio, estado, fecha FROM ({query}) ORDER BY creado_en DESC, id DESC",
+            tuple(todos))
+
+def main(argv: List[str] = None):
+    """
+    Punto de entrada de línea de comandos para el archivado periódico.
+    """
+    parser = argparse.ArgumentParser(description="Archiva órdenes de trabajo cerradas")
+    parser.add_argument("--days", type=int, default=180, help="Antigüedad mínima en días")
+    parser.add_argument("--batch-size", type=int, default=500, help="Órdenes por transacción")
+    args = parser.parse_args(argv)
+    total = OrderArchiver().archive_orders(args.days, args.batch_size)
+    print(f"Órdenes archivadas: {total}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Lectura del registro de cambios de las tablas principales.
+
+Los triggers creados por DatabaseConnection (ver TABLAS_CDC) agregan una
+fila a 'cambios' por cada inserción, modificación o borrado en clientes,
+técnicos, servicios y órdenes, con una secuencia creciente. Cada
+consumidor (reportes, notificaciones, sincronización...) guarda en
+'cambios_cursores' la última secuencia procesada y lee desde ahí por
+lotes, sin recorrer las tablas completas. Funciona desde cualquier
+proceso que abra la misma base.
+
+Uso:
+    python -m models.cdc --consumidor reportes
+    python -m models.cdc --consumidor reportes --seguir 2
+"""
+import argparse
+import sqlite3
+import time
+from typing import Iterable, Iterator, List, Optional, Union
+from models.db_connection import DatabaseConnection, TABLAS_CDC
+from models.queries import CambioQueries, build_select, placeholders
+from models.records import CambioRegistro
+
+OP_INSERT = "insert"
+OP_UPDATE = "update"
+OP_DELETE = "delete"
+
+# Días que se conservan los cambios aunque algún consumidor no los haya leído
+RETENCION_DIAS = 30
+
+class ChangeFeed:
+    """
+    Consumidor del registro de cambios con cursor persistente.
+    
+    Los lotes se entregan con semántica "al menos una vez": el cursor solo
+    avanza cuando se confirma el lote, así que si el proceso se interrumpe
+    antes, el lote se vuelve a leer.
+    
+    Atributos:
+        consumidor (str): Nombre con el que se guarda el cursor
+        db (DatabaseConnection): Base cuyos cambios se leen
+        tablas (tuple): Tablas de interés (por defecto todas)
+        batch_size (int): Cambios por lote
+    """
+    def __init__(self, consumidor: str, db: DatabaseConnection = None,
+                 tablas: Iterable[str] = None, batch_size: int = 500):
+        self.consumidor = consumidor
+        self.db = db or DatabaseConnection()
+        self.tablas = tuple(tablas) if tablas else TABLAS_CDC
+        desconocidas = set(self.tablas) - set(TABLAS_CDC)
+        if desconocidas:
+            raise ValueError(f"Tablas sin registro de cambios: {', '.join(sorted(desconocidas))}")
+        self.batch_size = batch_size
+        where = ["seq > ?"]
+        if self.tablas != TABLAS_CDC:
+            where.append(f"tabla IN ({placeholders(len(self.tablas))})")
+        self._sql = build_select("cambios", CambioQueries.COLUMNAS, tuple(where), "seq", True)
+
+    @property
+    def posicion(self) -> int:
+        """
+        Última secuencia confirmada por este consumidor (0 si nunca leyó).
+        """
+        fila = self.db.fetch_one(CambioQueries.CURSOR, (self.consumidor,))
+        return fila[0] if fila else 0
+
+    def leer(self, limite: int = None) -> List[CambioRegistro]:
+        """
+        Devuelve los cambios posteriores al cursor sin avanzarlo.
+        
+        Args:
+            limite (int, opcional): Máximo de cambios (por defecto batch_size)
+            
+        Returns:
+            List[CambioRegistro]: Cambios en orden de secuencia
+        """
+        params = (self.posicion,)
+        if self.tablas != TABLAS_CDC:
+            params += self.tablas
+        filas = self.db.fetch_all(self._sql, params + (limite or self.batch_size,))
+        return [CambioRegistro(*fila) for fila in filas]
+
+    def confirmar(self, seq: int):
+        """
+        Guarda seq como último cambio procesado.
+        
+        Args:
+            seq (int): Secuencia del último cambio procesado
+        """
+        self.db.execute_write(CambioQueries.GUARDAR_CURSOR, (self.consumidor, seq))
+
+    def lotes(self) -> Iterator[List[CambioRegistro]]:
+        """
+        Entrega lotes hasta alcanzar el final del registro.
+        
+        Cada lote se confirma cuando el consumidor pide el siguiente.
+        
+        Yields:
+            List[CambioRegistro]: Lote de cambios
+        """
+        while True:
+            lote = self.leer()
+            if not lote:
+                return
+            yield lote
+            self.confirmar(lote[-1].seq)
+
+    def pendientes(self) -> int:
+        """
+        Número aproximado de cambios aún no leídos (todas las tablas).
+        """
+        return self.db.fetch_one(CambioQueries.ULTIMO)[0] - self.posicion
+
+def purgar(db: Union[DatabaseConnection, sqlite3.Connection] = None,
+           retencion_dias: Optional[int] = RETENCION_DIAS) -> int:
+    """
+    Borra los cambios ya procesados por todos los consumidores registrados
+    y los que superan el período de retención.
+    
+    La retención acota la tabla aunque no haya consumidores registrados o
+    uno haya dejado de leer; un consumidor atrasado más que ese período
+    pierde los cambios borrados (la réplica de lectura lo detecta y se
+    recarga completa).
+    
+    También acepta una conexión sqlite3 propia, como la de
+    MaintenanceRunner; en ese caso el borrado se confirma con ella.
+    
+    Args:
+        db (DatabaseConnection | sqlite3.Connection, opcional): Base a purgar
+        retencion_dias (Optional[int]): Días que se conservan los cambios no
+            leídos; None para conservarlos hasta que todos los lean
+        
+    Returns:
+        int: Número de cambios borrados
+    """
+    if isinstance(db, sqlite3.Connection):
+        with db:
+            return _purgar(lambda query, params=(): db.execute(query, params).rowcount, retencion_dias)
+    db = db or DatabaseConnection()
+    with db.transaction():
+        return _purgar(db.execute_update, retencion_dias)
+
+def _purgar(execute_update, retencion_dias: Optional[int]) -> int:
+    borrados = execute_update(CambioQueries.PURGAR)
+    if retencion_dias is not None:
+        borrados += execute_update(CambioQueries.PURGAR_ANTIGUOS, (f"-{int(retencion_dias)} days",))
+    return borrados
+
+def main(argv: List[str] = None):
+    """
+    Punto de entrada de línea de comandos: imprime los cambios pendientes.
+    """
+    parser = argparse.ArgumentParser(description="Lee el registro de cambios")
+    parser.add_argument("--consumidor", required=True, help="Nombre del cursor")
+    parser.add_argument("--tabla", action="append", choices=TABLAS_CDC, help="Filtrar por tabla (repetible)")
+    parser.add_argument("--seguir", type=float, metavar="SEGUNDOS",
+                        help="Seguir leyendo cada N segundos")
+    args = parser.parse_args(argv)
+    feed = ChangeFeed(args.consumidor, tablas=args.tabla)
+    while True:
+        for lote in feed.lotes():
+            for cambio in lote:
+                print(f"{cambio.seq}\t{cambio.momento}\t{cambio.tabla}\t{cambio.fila_id}\t{cambio.operacion}")
+        if args.seguir is None:
+            return
+        time.sleep(args.seguir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Codificación de los textos guardados en la tabla 'descripciones'.
+
+Cada texto se identifica por su huella SHA-256, así que dos servicios u
+órdenes con la misma descripción comparten una sola fila. El texto se
+guarda con un byte inicial que indica el formato: los textos cortos van
+sin comprimir (zlib no ahorra nada en ellos) y los largos comprimidos.
+
+Las funciones se registran también como funciones SQL en cada conexión
+(ver DatabaseConnection._initialize) para migrar las descripciones
+existentes y leerlas dentro de una consulta.
+"""
+import hashlib
+import zlib
+from typing import Optional
+
+FORMATO_PLANO = b"\x00"
+FORMATO_ZLIB = b"\x01"
+
+# Bytes UTF-8 a partir de los cuales se intenta comprimir
+MIN_COMPRESION = 64
+NIVEL_ZLIB = 6
+
+def huella(texto: str) -> Optional[bytes]:
+    """
+    Huella SHA-256 del texto (32 bytes), o None si texto es None.
+    """
+    if texto is None:
+        return None
+    return hashlib.sha256(texto.encode("utf-8")).digest()
+
+def empaquetar(texto: str) -> Optional[bytes]:
+    """
+    Codifica un texto para guardarlo; se comprime solo si así ocupa menos.
+
+    Args:
+        texto (str): Texto libre
+
+    Returns:
+        Optional[bytes]: Byte de formato seguido del contenido, o None si texto es None
+    """
+    if texto is None:
+        return None
+    datos = texto.encode("utf-8")
+    if len(datos) >= MIN_COMPRESION:
+        comprimido = zlib.compress(datos, NIVEL_ZLIB)
+        if len(comprimido) < len(datos):
+            return FORMATO_ZLIB + comprimido
+    return FORMATO_PLANO + datos
+
+def desempaquetar(dato: bytes) -> Optional[str]:
+    """
+    Recupera el texto codificado con empaquetar().
+
+    Raises:
+        ValueError: Si el formato no es conocido
+    """
+    if dato is None:
+        return None
+    formato, contenido = dato[:1], dato[1:]
+    if formato == FORMATO_ZLIB:
+        contenido = zlib.decompress(contenido)
+    elif formato != FORMATO_PLANO:
+        raise ValueError(f"Formato de texto desconocido: {formato!r}")
+    return bytes(contenido).decode("utf-8")
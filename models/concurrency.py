@@ -0,0 +1,118 @@
+"""
+Control de concurrencia optimista con la columna 'version'.
+
+Cada fila de clientes, técnicos, servicios y órdenes lleva un número de
+versión que todo UPDATE incrementa. Quien edita una fila recuerda la
+versión que leyó y, al guardar, la modificación se aplica solo si la fila
+sigue en esa versión (UPDATE ... WHERE id = ? AND version = ?), dentro de
+una transacción corta. Así nunca se mantiene un bloqueo de escritura
+mientras el usuario completa un formulario, y si otro usuario o proceso
+modificó la fila entre medio el cambio no la pisa: se lanza
+ConflictoDeVersion con los valores actuales para que la interfaz ofrezca
+recargar o reintentar.
+"""
+import sqlite3
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from models.db_connection import DatabaseConnection
+from models.queries import VersionQueries
+from models.sync import OP_DELETE, registrar_cambio
+
+# Tablas con columna 'version'
+TABLAS_VERSIONADAS = ("clientes", "tecnicos", "servicios", "ordenes_trabajo")
+
+class ConflictoDeVersion(RuntimeError):
+    """
+    La fila cambió desde que se leyó.
+
+    Atributos:
+        tabla (str): Tabla de la fila
+        fila_id (int): Id de la fila
+        esperada (int): Versión con la que se intentó escribir
+        actual (Optional[int]): Versión actual (None si la fila ya no existe)
+        valores (Optional[Dict[str, Any]]): Valores actuales de la fila
+    """
+    def __init__(self, tabla: str, fila_id: int, esperada: int,
+                 actual: Optional[int] = None, valores: Optional[Dict[str, Any]] = None):
+        self.tabla = tabla
+        self.fila_id = fila_id
+        self.esperada = esperada
+        self.actual = actual
+        self.valores = valores
+        super().__init__(self._mensaje())
+
+    def _mensaje(self) -> str:
+        return (f"{self.tabla} {self.fila_id} fue modificado por otro usuario "
+                f"(versión {self.esperada}, ahora {self.actual})")
+
+class FilaEliminada(ConflictoDeVersion):
+    """
+    La fila fue eliminada desde que se leyó.
+    """
+    def _mensaje(self) -> str:
+        return f"{self.tabla} {self.fila_id} fue eliminado por otro usuario"
+
+@lru_cache(maxsize=64)
+def _actualizar_sql(tabla: str, columnas: Tuple[str, ...]) -> str:
+    if tabla not in TABLAS_VERSIONADAS:
+        raise ValueError(f"La tabla {tabla} no tiene control de versión")
+    if not columnas or "version" in columnas or "id" in columnas:
+        raise ValueError("Columnas a modificar no válidas")
+    asignaciones = ", ".join(f"{columna} = ?" for columna in columnas)
+    return VersionQueries.ACTUALIZAR.format(tabla=tabla, asignaciones=asignaciones)
+
+def _conflicto(db: DatabaseConnection, tabla: str, fila_id: int, esperada: int) -> ConflictoDeVersion:
+    filas = db.iter_rows(VersionQueries.ACTUAL.format(tabla=tabla), (fila_id,), row_factory=sqlite3.Row)
+    fila = next(filas, None)
+    filas.close()
+    if fila is None:
+        return FilaEliminada(tabla, fila_id, esperada)
+    return ConflictoDeVersion(tabla, fila_id, esperada, fila["version"], dict(fila))
+
+def actualizar_fila(db: DatabaseConnection, tabla: str, fila_id: int, version: int,
+                    valores: Dict[str, Any]) -> int:
+    """
+    Modifica una fila solo si sigue en la versión leída.
+
+    La comparación y la escritura son una única sentencia y la entrada del
+    diario de sincronización se agrega en la misma transacción.
+
+    Args:
+        db (DatabaseConnection): Conexión a la base
+        tabla (str): Una de TABLAS_VERSIONADAS
+        fila_id (int): Id de la fila
+        version (int): Versión con la que se leyó la fila
+        valores (Dict[str, Any]): Columna -> valor nuevo
+
+    Returns:
+        int: Versión nueva de la fila
+
+    Raises:
+        ConflictoDeVersion: Si la fila cambió desde que se leyó
+        FilaEliminada: Si la fila ya no existe
+        ValueError: Si la tabla no tiene versión o no hay columnas válidas
+    """
+    columnas = tuple(sorted(valores))
+    sql = _actualizar_sql(tabla, columnas)
+    with db.transaction():
+        if not db.execute_update(sql, (*(valores[c] for c in columnas), fila_id, version)):
+            raise _conflicto(db, tabla, fila_id, version)
+        registrar_cambio(db, tabla, fila_id)
+    return version + 1
+
+def eliminar_fila(db: DatabaseConnection, tabla: str, fila_id: int, version: int):
+    """
+    Elimina una fila solo si sigue en la versión leída.
+
+    Raises:
+        ConflictoDeVersion: Si la fila cambió desde que se leyó
+        FilaEliminada: Si la fila ya no existe
+        ValueError: Si la tabla no tiene versión
+    """
+    if tabla not in TABLAS_VERSIONADAS:
+        raise ValueError(f"La tabla {tabla} no tiene control de versión")
+    with db.transaction():
+        # La entrada del diario se toma antes de borrar y se descarta si hay conflicto
+        registrar_cambio(db, tabla, fila_id, OP_DELETE)
+        if not db.execute_update(VersionQueries.ELIMINAR.format(tabla=tabla), (fila_id, version)):
+            raise _conflicto(db, tabla, fila_id, version)
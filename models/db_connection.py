@@ -1,46 +1,313 @@
 import sqlite3
-from typing import Optional, List, Tuple, Any
+from contextlib import contextmanager
+from typing import Optional, List, Tuple, Any, Dict, Iterator, Callable, Union
+import functools
 import os
+import threading
+import time
+import uuid
+from models.queries import STATEMENT_CACHE_SIZE, DescripcionQueries
+from models.normalization import normalizar_texto, normalizar_email, normalizar_telefono
+from models.compression import huella, empaquetar, desempaquetar
+
+# Variable de entorno con la ruta o DSN de la base de datos principal.
+# Las instancias con nombre usan SGST_DB_PATH_<NOMBRE> (por ejemplo SGST_DB_PATH_ARCHIVE).
+ENV_DB_PATH = "SGST_DB_PATH"
+DEFAULT_NAME = "default"
+
+# Filas leídas por cada fetchmany() en las lecturas por streaming
+DEFAULT_CHUNK_SIZE = 500
+
+# Columnas agregadas al esquema original, por tabla: (nombre, declaración,
+# expresión SQL con la que rellenar las filas existentes o None). Se añaden
+# con ALTER TABLE a las bases creadas con versiones anteriores.
+COLUMNAS_AGREGADAS: Dict[str, List[Tuple[str, str, Optional[str]]]] = {
+    "servicios": [
+        ("duracion_estimada", "INTEGER", None),
+        ("uuid", "TEXT", "nuevo_uuid()"),
+        # Se rellena con migrate_descriptions antes de retirar 'descripcion'
+        ("descripcion_id", "INTEGER REFERENCES descripciones (id)", None),
+        ("version", "INTEGER NOT NULL DEFAULT 1", None),
+    ],
+    "clientes": [
+        ("nombre_norm", "TEXT", "norm_texto(nombre)"),
+        ("email_norm", "TEXT", "norm_email(email)"),
+        ("telefono_norm", "TEXT", "norm_telefono(telefono)"),
+        ("uuid", "TEXT", "nuevo_uuid()"),
+        ("version", "INTEGER NOT NULL DEFAULT 1", None),
+    ],
+    "tecnicos": [
+        ("uuid", "TEXT", "nuevo_uuid()"),
+        ("version", "INTEGER NOT NULL DEFAULT 1", None),
+    ],
+    "ordenes_trabajo": [
+        ("uuid", "TEXT", "nuevo_uuid()"),
+        # El texto histórico está en hora local sin zona; 'utc' lo convierte
+        ("creado_en", "INTEGER", "CAST(strftime('%s', fecha_creacion, 'utc') AS INTEGER)"),
+        ("descripcion_id", "INTEGER REFERENCES descripciones (id)", None),
+        ("version", "INTEGER NOT NULL DEFAULT 1", None),
+    ],
+}
+
+# Columnas retiradas del esquema, por tabla: (nombre, índices que la usan).
+# Se eliminan después de rellenar las columnas que las reemplazan.
+COLUMNAS_RETIRADAS: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {
+    "servicios": [("descripcion", ())],
+    "ordenes_trabajo": [
+        ("fecha_creacion", ("idx_ordenes_estado_fecha", "idx_ordenes_cliente_fecha")),
+        ("descripcion", ()),
+    ],
+}
+
+# Tablas cuyo texto libre se guarda en 'descripciones' (ver models.descriptions)
+TABLAS_CON_DESCRIPCION = ("servicios", "ordenes_trabajo")
+
+# Tablas cuyas inserciones, modificaciones y borrados se registran por
+# triggers en la tabla 'cambios' (ver models.cdc)
+TABLAS_CDC = ("clientes", "tecnicos", "servicios", "ordenes_trabajo")
+
+def _cdc_triggers() -> str:
+    """
+    Genera los triggers que alimentan la tabla 'cambios'.
+    """
+    sentencias = []
+    for tabla in TABLAS_CDC:
+        for evento, fila in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            sentencias.append(f"""
+            CREATE TRIGGER IF NOT EXISTS cdc_{tabla}_{evento.lower()}
+            AFTER {evento} ON {tabla} BEGIN
+                INSERT INTO cambios (tabla, fila_id, operacion) VALUES ('{tabla}', {fila}.id, '{evento.lower()}');
+            END;""")
+    return "".join(sentencias)
+
+# Funciones Python disponibles en SQL en todas las conexiones
+FUNCIONES_SQL = {
+    "norm_texto": normalizar_texto,
+    "norm_email": normalizar_email,
+    "norm_telefono": normalizar_telefono,
+    "huella_texto": huella,
+    "empaquetar_texto": empaquetar,
+    "desempaquetar_texto": desempaquetar,
+}
+
+# Fábrica de filas: None (tuplas), sqlite3.Row o un callable que recibe las columnas
+RowFactory = Optional[Union[type, Callable[..., Any]]]
+
+# Métodos cuya latencia se mide mientras hay métricas instaladas (ver instrumentar)
+METODOS_MEDIDOS = ("fetch_all", "fetch_one", "execute_write", "execute_update", "execute_many", "execute_query")
+
+def _medido(metodo: Callable) -> Callable:
+    operacion = metodo.__name__
+
+    @functools.wraps(metodo)
+    def medido(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return metodo(self, *args, **kwargs)
+        finally:
+            metricas = DatabaseConnection._metricas
+            if metricas is not None:
+                metricas.consulta(self.name, operacion, time.perf_counter() - inicio)
+    return medido
 
 class DatabaseConnection:
     """
     Clase para manejar la conexión a la base de datos SQLite.
     
-    Esta clase implementa el patrón Singleton para asegurar una única
-    instancia de conexión a la base de datos. Proporciona métodos para
-    ejecutar consultas SQL y gestionar transacciones.
+    Esta clase implementa el patrón Singleton por nombre: cada nombre lógico
+    ("default", "archive", ...) tiene una única instancia de conexión.
+    Proporciona métodos para ejecutar consultas SQL y gestionar transacciones.
+    
+    Una conexión de sqlite3 solo puede usarse desde el hilo que la abrió.
+    Un hilo que necesite la base (por ejemplo los actores de
+    benchmarks.load_test) llama a open_for_thread(): desde ese momento
+    DatabaseConnection(name), y con ello los modelos, devuelven en ese hilo
+    su propia conexión a la misma ubicación.
+    
+    instrumentar() activa la medición de latencia de las consultas y el
+    conteo de commits (ver models.metrics); mientras no está activa los
+    métodos son los originales y no hay ningún costo agregado.
+    
+    La ubicación de cada base de datos se resuelve, en orden, desde
+    configure(), la variable de entorno correspondiente o la ruta por
+    defecto junto al paquete. Se aceptan rutas de archivo, ':memory:' y
+    URIs SQLite ('file:...?mode=memory&cache=shared').
     
     Atributos:
-        _instance (DatabaseConnection): Instancia única de la clase
+        _instances (Dict[str, DatabaseConnection]): Instancias por nombre
+        _thread_local (threading.local): Instancias propias de cada hilo
+        _paths (Dict[str, str]): Rutas o DSN configurados por nombre
+        _metricas (Optional[Any]): Receptor de métricas instalado con instrumentar()
+        name (str): Nombre lógico de la instancia
+        path (str): Ruta o DSN efectivo de la instancia
         _conn (sqlite3.Connection): Conexión a la base de datos
         _cursor (sqlite3.Cursor): Cursor para ejecutar consultas
     """
-    _instance = None
+    _instances: Dict[str, "DatabaseConnection"] = {}
+    _paths: Dict[str, str] = {}
+    _thread_local = threading.local()
+    _metricas: Optional[Any] = None
 
-    def __new__(cls):
+    def __new__(cls, name: str = DEFAULT_NAME):
         """
         Implementa el patrón Singleton para la conexión a la base de datos.
         
+        Args:
+            name (str): Nombre lógico de la base de datos
+        
+        Returns:
+            DatabaseConnection: La única instancia asociada a ese nombre (o
+                la del hilo actual si se abrió con open_for_thread)
+        """
+        propias = getattr(cls._thread_local, "instances", None)
+        if propias and name in propias:
+            return propias[name]
+        instance = cls._instances.get(name)
+        if instance is None:
+            instance = super(DatabaseConnection, cls).__new__(cls)
+            instance.name = name
+            instance._initialize()
+            cls._instances[name] = instance
+        return instance
+
+    @classmethod
+    def configure(cls, path: str, name: str = DEFAULT_NAME):
+        """
+        Configura la ruta o DSN de una base de datos.
+        
+        Si ya existe una instancia con ese nombre se cierra, de modo que la
+        siguiente llamada a DatabaseConnection(name) use la nueva ubicación.
+        
+        Args:
+            path (str): Ruta de archivo, ':memory:' o URI 'file:...'
+            name (str): Nombre lógico de la base de datos
+        """
+        cls._paths[name] = path
+        cls.reset(name)
+
+    @classmethod
+    def open_for_thread(cls, name: str = DEFAULT_NAME) -> "DatabaseConnection":
+        """
+        Abre una conexión propia del hilo actual.
+        
+        Las siguientes llamadas a DatabaseConnection(name) desde este hilo
+        la devuelven a ella en lugar de la instancia compartida. El hilo
+        debe cerrarla con close() (o close_thread()) antes de terminar.
+        
+        Args:
+            name (str): Nombre lógico de la base de datos
+            
+        Returns:
+            DatabaseConnection: La conexión del hilo
+        """
+        propias = cls._thread_local.__dict__.setdefault("instances", {})
+        if name not in propias:
+            instance = super(DatabaseConnection, cls).__new__(cls)
+            instance.name = name
+            instance._initialize()
+            propias[name] = instance
+        return propias[name]
+
+    @classmethod
+    def close_thread(cls):
+        """
+        Cierra las conexiones abiertas con open_for_thread() en el hilo actual.
+        """
+        for instance in list(getattr(cls._thread_local, "instances", {}).values()):
+            instance.close()
+
+    @classmethod
+    def reset(cls, name: Optional[str] = None):
+        """
+        Cierra y descarta las instancias existentes.
+        
+        Args:
+            name (Optional[str]): Nombre de la instancia a descartar; si es
+                None se descartan todas
+        """
+        names = list(cls._instances) if name is None else [name]
+        for key in names:
+            instance = cls._instances.pop(key, None)
+            if instance is not None:
+                instance.close()
+
+    @classmethod
+    def instrumentar(cls, metricas: Optional[Any]):
+        """
+        Instala (o con None retira) un receptor de métricas.
+        
+        Con un receptor instalado los métodos de METODOS_MEDIDOS se
+        reemplazan por versiones que miden su duración y cada commit se
+        informa; al retirarlo se restauran los métodos originales. Afecta a
+        todas las instancias, también a las de otros hilos.
+        
+        Args:
+            metricas (Optional[Any]): Objeto con consulta(base, operacion,
+                segundos) y commit(base), o None
+        """
+        cls._metricas = metricas
+        for nombre in METODOS_MEDIDOS:
+            original = getattr(cls, nombre)
+            original = getattr(original, "__wrapped__", original)
+            setattr(cls, nombre, _medido(original) if metricas is not None else original)
+
+    @staticmethod
+    def memory_dsn(label: str = None) -> str:
+        """
+        Genera un DSN de base de datos en memoria con caché compartida.
+        
+        Todas las conexiones abiertas con el mismo DSN dentro del proceso
+        ven los mismos datos, mientras que cada proceso (por ejemplo cada
+        worker de pruebas en paralelo) obtiene una base aislada.
+        
+        Args:
+            label (str, opcional): Prefijo legible del nombre
+            
+        Returns:
+            str: URI SQLite en memoria
+        """
+        label = label or "sgst"
+        return f"file:{label}_{os.getpid()}_{uuid.uuid4().hex}?mode=memory&cache=shared"
+
+    @classmethod
+    def resolve_path(cls, name: str = DEFAULT_NAME) -> str:
+        """
+        Determina la ruta o DSN de una base de datos.
+        
+        Args:
+            name (str): Nombre lógico de la base de datos
+            
         Returns:
-            DatabaseConnection: La única instancia de la clase
+            str: Ruta configurada, de entorno o por defecto
         """
-        if cls._instance is None:
-            cls._instance = super(DatabaseConnection, cls).__new__(cls)
-            cls._instance._initialize()
-        return cls._instance
+        if name in cls._paths:
+            return cls._paths[name]
+        env_var = ENV_DB_PATH if name == DEFAULT_NAME else f"{ENV_DB_PATH}_{name.upper()}"
+        if os.environ.get(env_var):
+            return os.environ[env_var]
+        filename = 'database.db' if name == DEFAULT_NAME else f'database_{name}.db'
+        return os.path.join(os.path.dirname(os.path.dirname(__file__)), filename)
 
     def _initialize(self):
         """
         Inicializa la conexión a la base de datos y crea las tablas necesarias.
         
         Este método es llamado automáticamente al crear la primera instancia
-        de la clase. Crea la base de datos si no existe y configura las
+        de cada nombre. Crea la base de datos si no existe y configura las
         tablas necesarias para el sistema.
         """
-        db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database.db')
-        self._conn = sqlite3.connect(db_path)
+        self.path = self.resolve_path(self.name)
+        # uri=True no altera las rutas normales y permite ATTACH de URIs
+        self._conn = sqlite3.connect(self.path, uri=True, cached_statements=STATEMENT_CACHE_SIZE)
         self._cursor = self._conn.cursor()
+        self._transaction_depth = 0
+        for nombre, funcion in FUNCIONES_SQL.items():
+            self._conn.create_function(nombre, 1, funcion, deterministic=True)
+        self._conn.create_function("nuevo_uuid", 0, lambda: uuid.uuid4().hex)
         self._create_tables()
+        # En WAL los lectores (por ejemplo una copia de seguridad en curso) no
+        # bloquean a los escritores; en bases en memoria no tiene efecto
+        self._cursor.execute("PRAGMA journal_mode = WAL")
 
     def _create_tables(self):
         """
@@ -51,14 +318,48 @@ class DatabaseConnection:
         - tecnicos: Almacena información de los técnicos
         - servicios: Almacena información de los servicios
         - ordenes_trabajo: Almacena las órdenes de trabajo
+        - descripciones: Textos libres de servicios y órdenes, uno por
+          contenido distinto y comprimidos (ver models.descriptions)
+        - agenda: Franjas horarias programadas de cada orden
+        - sync_journal, sync_estado, sync_alias, sync_rechazos: Diario,
+          estado y entradas apartadas de la sincronización entre
+          instalaciones (ver models.sync)
+        - cambios, cambios_cursores: Registro de cambios alimentado por
+          triggers y posición de cada consumidor (ver models.cdc)
+        - mantenimiento: Última ejecución de cada tarea de mantenimiento
+          (ver models.maintenance)
+        - ubicacion_clientes, ubicacion_tecnicos: Índices R*Tree con las
+          coordenadas opcionales de clientes y técnicos (ver models.routing)
+        
+        Las cuatro tablas principales tienen una columna 'version' que
+        cada UPDATE incrementa, para el control de concurrencia optimista
+        (ver models.concurrency).
+        
+        Las bases nuevas se crean con auto_vacuum incremental para que el
+        mantenimiento pueda liberar páginas sin un VACUUM completo.
+        
+        En bases existentes agrega las columnas nuevas (ver
+        COLUMNAS_AGREGADAS), mueve las descripciones a su tabla y elimina las
+        columnas retiradas (ver COLUMNAS_RETIRADAS) antes de crear los
+        índices que las usan. La vista
+        ordenes_trabajo_compat expone la fecha de creación como texto en
+        hora local para quien la lea con el formato anterior.
         """
+        # Solo tiene efecto en una base vacía; las existentes se convierten
+        # con MaintenanceRunner.enable_incremental_vacuum()
+        self._cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
         self._cursor.executescript('''
             CREATE TABLE IF NOT EXISTS clientes (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 nombre TEXT NOT NULL,
                 email TEXT UNIQUE,
                 telefono TEXT,
-                direccion TEXT
+                direccion TEXT,
+                nombre_norm TEXT,
+                email_norm TEXT,
+                telefono_norm TEXT,
+                uuid TEXT,
+                version INTEGER NOT NULL DEFAULT 1
             );
 
             CREATE TABLE IF NOT EXISTS tecnicos (
@@ -66,14 +367,26 @@ class DatabaseConnection:
                 nombre TEXT NOT NULL,
                 especialidad TEXT NOT NULL,
                 email TEXT UNIQUE,
-                telefono TEXT
+                telefono TEXT,
+                uuid TEXT,
+                version INTEGER NOT NULL DEFAULT 1
+            );
+
+            CREATE TABLE IF NOT EXISTS descripciones (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                huella BLOB NOT NULL UNIQUE,
+                texto BLOB NOT NULL
             );
 
             CREATE TABLE IF NOT EXISTS servicios (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 tipo TEXT NOT NULL,
-                descripcion TEXT NOT NULL,
-                costo_base REAL NOT NULL
+                descripcion_id INTEGER,
+                costo_base REAL NOT NULL,
+                duracion_estimada INTEGER,
+                uuid TEXT,
+                version INTEGER NOT NULL DEFAULT 1,
+                FOREIGN KEY (descripcion_id) REFERENCES descripciones (id)
             );
 
             CREATE TABLE IF NOT EXISTS ordenes_trabajo (
@@ -81,21 +394,355 @@ class DatabaseConnection:
                 cliente_id INTEGER,
                 tecnico_id INTEGER,
                 servicio_id INTEGER,
-                fecha_creacion TEXT NOT NULL,
+                creado_en INTEGER NOT NULL,
                 estado TEXT NOT NULL,
-                descripcion TEXT,
+                descripcion_id INTEGER,
                 costo_total REAL,
+                uuid TEXT,
+                version INTEGER NOT NULL DEFAULT 1,
                 FOREIGN KEY (cliente_id) REFERENCES clientes (id),
                 FOREIGN KEY (tecnico_id) REFERENCES tecnicos (id),
-                FOREIGN KEY (servicio_id) REFERENCES servicios (id)
+                FOREIGN KEY (servicio_id) REFERENCES servicios (id),
+                FOREIGN KEY (descripcion_id) REFERENCES descripciones (id)
+            );
+
+            CREATE TABLE IF NOT EXISTS agenda (
+                orden_id INTEGER PRIMARY KEY,
+                tecnico_id INTEGER NOT NULL,
+                inicio INTEGER NOT NULL,
+                fin INTEGER NOT NULL,
+                FOREIGN KEY (orden_id) REFERENCES ordenes_trabajo (id),
+                FOREIGN KEY (tecnico_id) REFERENCES tecnicos (id)
+            );
+
+            CREATE TABLE IF NOT EXISTS sync_journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                tabla TEXT NOT NULL,
+                uuid TEXT NOT NULL,
+                operacion TEXT NOT NULL,
+                datos TEXT,
+                origen TEXT NOT NULL
             );
+
+            CREATE TABLE IF NOT EXISTS sync_estado (
+                clave TEXT PRIMARY KEY,
+                valor TEXT
+            );
+
+            CREATE TABLE IF NOT EXISTS sync_alias (
+                uuid TEXT PRIMARY KEY,
+                tabla TEXT NOT NULL,
+                uuid_local TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS sync_rechazos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sentido TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                tabla TEXT NOT NULL,
+                uuid TEXT NOT NULL,
+                operacion TEXT NOT NULL,
+                datos TEXT,
+                origen TEXT NOT NULL,
+                error TEXT NOT NULL,
+                momento TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (sentido, seq)
+            );
+
+            CREATE TABLE IF NOT EXISTS cambios (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                tabla TEXT NOT NULL,
+                fila_id INTEGER NOT NULL,
+                operacion TEXT NOT NULL,
+                momento TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE TABLE IF NOT EXISTS cambios_cursores (
+                consumidor TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS mantenimiento (
+                tarea TEXT PRIMARY KEY,
+                ultima_ejecucion INTEGER NOT NULL,
+                duracion REAL NOT NULL,
+                resultado TEXT
+            );
+
+            -- Cada punto es una caja de tamaño cero; las columnas auxiliares
+            -- guardan las coordenadas exactas (el R*Tree usa float de 32 bits)
+            CREATE VIRTUAL TABLE IF NOT EXISTS ubicacion_clientes USING rtree(
+                id, min_lat, max_lat, min_lon, max_lon, +latitud REAL, +longitud REAL
+            );
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS ubicacion_tecnicos USING rtree(
+                id, min_lat, max_lat, min_lon, max_lon, +latitud REAL, +longitud REAL
+            );
+        ''')
+        self._add_missing_columns()
+        for tabla in TABLAS_CON_DESCRIPCION:
+            self.migrate_descriptions(tabla)
+        self._drop_retired_columns()
+        self._cursor.executescript('''
+            CREATE INDEX IF NOT EXISTS idx_clientes_nombre ON clientes (nombre);
+            CREATE INDEX IF NOT EXISTS idx_clientes_nombre_norm ON clientes (nombre_norm);
+            CREATE INDEX IF NOT EXISTS idx_clientes_email_norm ON clientes (email_norm);
+            CREATE INDEX IF NOT EXISTS idx_clientes_telefono_norm ON clientes (telefono_norm);
+            CREATE INDEX IF NOT EXISTS idx_tecnicos_nombre ON tecnicos (nombre);
+            CREATE INDEX IF NOT EXISTS idx_tecnicos_especialidad ON tecnicos (especialidad);
+
+            CREATE INDEX IF NOT EXISTS idx_ordenes_estado_fecha
+                ON ordenes_trabajo (estado, creado_en);
+            CREATE INDEX IF NOT EXISTS idx_ordenes_cliente_fecha
+                ON ordenes_trabajo (cliente_id, creado_en DESC, id DESC, servicio_id, estado, costo_total);
+            CREATE INDEX IF NOT EXISTS idx_ordenes_creado_en
+                ON ordenes_trabajo (creado_en, estado, costo_total);
+            CREATE INDEX IF NOT EXISTS idx_ordenes_tecnico_fecha
+                ON ordenes_trabajo (tecnico_id, creado_en);
+
+            CREATE INDEX IF NOT EXISTS idx_agenda_tecnico_inicio ON agenda (tecnico_id, inicio);
+
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_clientes_uuid ON clientes (uuid);
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_tecnicos_uuid ON tecnicos (uuid);
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_servicios_uuid ON servicios (uuid);
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_ordenes_uuid ON ordenes_trabajo (uuid);
+
+            CREATE INDEX IF NOT EXISTS idx_cambios_tabla_seq ON cambios (tabla, seq);
+
+            CREATE VIEW IF NOT EXISTS ordenes_trabajo_compat AS
+                SELECT *, datetime(creado_en, 'unixepoch', 'localtime') AS fecha_creacion
+                FROM ordenes_trabajo;
+
+            CREATE TRIGGER IF NOT EXISTS ubicacion_clientes_delete AFTER DELETE ON clientes
+            BEGIN
+                DELETE FROM ubicacion_clientes WHERE id = old.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS ubicacion_tecnicos_delete AFTER DELETE ON tecnicos
+            BEGIN
+                DELETE FROM ubicacion_tecnicos WHERE id = old.id;
+            END;
         ''')
+        # Los triggers se crean después de rellenar las columnas nuevas para
+        # que la migración no inunde el registro de cambios
+        self._cursor.executescript(_cdc_triggers())
         self._conn.commit()
 
+    def _add_missing_columns(self):
+        """
+        Agrega a las tablas existentes las columnas incorporadas después de
+        su creación, ya que CREATE TABLE IF NOT EXISTS no las modifica, y
+        rellena las filas existentes cuando la columna es derivada.
+        """
+        for tabla, columnas in COLUMNAS_AGREGADAS.items():
+            existentes = set(self.table_columns(tabla))
+            for columna, declaracion, relleno in columnas:
+                if columna not in existentes:
+                    self._cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {declaracion}")
+                    if relleno:
+                        self._cursor.execute(f"UPDATE {tabla} SET {columna} = {relleno}")
+
+    def migrate_descriptions(self, table: str, schema: str = "main"):
+        """
+        Mueve la columna de texto 'descripcion' de una tabla con el esquema
+        anterior a la tabla 'descripciones' de la base principal (una fila
+        por texto distinto) y rellena descripcion_id. No hace nada si la
+        tabla ya no tiene la columna.
+        
+        Args:
+            table (str): Tabla de TABLAS_CON_DESCRIPCION
+            schema (str): Esquema de la tabla ('main' o un alias adjunto)
+        """
+        if "descripcion" not in self.table_columns(table, schema):
+            return
+        tabla = f"{schema}.{table}"
+        # Reescribir descripcion_id no es un cambio de datos: sin el trigger
+        # la migración no inunda el registro de cambios (se recrea después)
+        if schema == "main":
+            self._cursor.execute(f"DROP TRIGGER IF EXISTS cdc_{table}_update")
+        self._cursor.execute(DescripcionQueries.MIGRAR_TEXTOS.format(tabla=tabla))
+        self._cursor.execute(DescripcionQueries.MIGRAR_REFERENCIAS.format(tabla=tabla))
+
+    def _drop_retired_columns(self):
+        """
+        Elimina de las tablas existentes las columnas retiradas, junto con
+        los índices que las usan (se recrean luego con su nueva definición).
+        """
+        for tabla, columnas in COLUMNAS_RETIRADAS.items():
+            existentes = set(self.table_columns(tabla))
+            for columna, indices in columnas:
+                if columna in existentes:
+                    for indice in indices:
+                        self._cursor.execute(f"DROP INDEX IF EXISTS {indice}")
+                    self._cursor.execute(f"ALTER TABLE {tabla} DROP COLUMN {columna}")
+
+    def fetch_all(self, query: str, params: tuple = ()) -> List[Tuple[Any, ...]]:
+        """
+        Ejecuta una consulta de lectura y devuelve todas las filas.
+        
+        Args:
+            query (str): Consulta SQL de lectura
+            params (tuple): Parámetros para la consulta SQL
+            
+        Returns:
+            List[Tuple[Any, ...]]: Filas resultantes
+        """
+        return self._cursor.execute(query, params).fetchall()
+
+    def fetch_one(self, query: str, params: tuple = ()) -> Optional[Tuple[Any, ...]]:
+        """
+        Ejecuta una consulta de lectura y devuelve la primera fila.
+        
+        Args:
+            query (str): Consulta SQL de lectura
+            params (tuple): Parámetros para la consulta SQL
+            
+        Returns:
+            Optional[Tuple[Any, ...]]: Primera fila o None si no hay resultados
+        """
+        return self._cursor.execute(query, params).fetchone()
+
+    def iter_chunks(self, query: str, params: tuple = (), chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    row_factory: RowFactory = None) -> Iterator[List[Any]]:
+        """
+        Ejecuta una consulta de lectura y entrega los resultados por bloques.
+        
+        Usa un cursor propio con fetchmany(), por lo que en memoria solo hay
+        un bloque a la vez y se pueden anidar otras consultas mientras se
+        recorre. El cursor se cierra al agotar o abandonar el generador.
+        
+        Args:
+            query (str): Consulta SQL de lectura
+            params (tuple): Parámetros para la consulta SQL
+            chunk_size (int): Filas por bloque
+            row_factory (RowFactory): None para tuplas, sqlite3.Row, o una
+                clase/callable (por ejemplo un registro con __slots__) que
+                recibe las columnas como argumentos posicionales
+                
+        Yields:
+            List[Any]: Bloques de hasta chunk_size filas
+        """
+        cursor = self._conn.cursor()
+        if row_factory is sqlite3.Row:
+            cursor.row_factory = sqlite3.Row
+        elif row_factory is not None:
+            cursor.row_factory = lambda _cursor, fila: row_factory(*fila)
+        try:
+            cursor.execute(query, params)
+            while True:
+                bloque = cursor.fetchmany(chunk_size)
+                if not bloque:
+                    break
+                yield bloque
+        finally:
+            cursor.close()
+
+    def iter_rows(self, query: str, params: tuple = (), chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  row_factory: RowFactory = None) -> Iterator[Any]:
+        """
+        Ejecuta una consulta de lectura y entrega las filas una a una.
+        
+        Equivale a recorrer iter_chunks() fila por fila; la memoria usada
+        queda acotada por chunk_size sin importar el tamaño del resultado.
+        
+        Args:
+            query (str): Consulta SQL de lectura
+            params (tuple): Parámetros para la consulta SQL
+            chunk_size (int): Filas leídas por cada fetchmany()
+            row_factory (RowFactory): Ver iter_chunks()
+            
+        Yields:
+            Any: Cada fila como tupla, sqlite3.Row o entidad
+        """
+        for bloque in self.iter_chunks(query, params, chunk_size, row_factory):
+            yield from bloque
+
+    def execute_write(self, query: str, params: tuple = ()) -> int:
+        """
+        Ejecuta una sentencia de escritura.
+        
+        Fuera de un bloque transaction() la escritura se confirma de
+        inmediato; si falla se deshace.
+        
+        Args:
+            query (str): Sentencia INSERT, UPDATE o DELETE
+            params (tuple): Parámetros para la sentencia
+            
+        Returns:
+            int: rowid de la última fila insertada (cursor.lastrowid)
+            
+        Raises:
+            sqlite3.Error: Si ocurre un error al ejecutar la sentencia
+        """
+        try:
+            cursor = self._cursor.execute(query, params)
+            if not self._transaction_depth:
+                self._commit()
+            return cursor.lastrowid
+        except sqlite3.Error:
+            if not self._transaction_depth:
+                self._conn.rollback()
+            raise
+
+    def execute_update(self, query: str, params: tuple = ()) -> int:
+        """
+        Ejecuta un UPDATE o DELETE y devuelve cuántas filas afectó.
+        
+        Fuera de un bloque transaction() la escritura se confirma de
+        inmediato; si falla se deshace.
+        
+        Args:
+            query (str): Sentencia UPDATE o DELETE
+            params (tuple): Parámetros para la sentencia
+            
+        Returns:
+            int: Filas modificadas (cursor.rowcount)
+            
+        Raises:
+            sqlite3.Error: Si ocurre un error al ejecutar la sentencia
+        """
+        try:
+            cursor = self._cursor.execute(query, params)
+            if not self._transaction_depth:
+                self._commit()
+            return cursor.rowcount
+        except sqlite3.Error:
+            if not self._transaction_depth:
+                self._conn.rollback()
+            raise
+
+    def execute_many(self, query: str, rows) -> int:
+        """
+        Ejecuta una sentencia de escritura para muchas filas.
+        
+        Args:
+            query (str): Sentencia INSERT, UPDATE o DELETE
+            rows (Iterable[tuple]): Parámetros de cada fila
+            
+        Returns:
+            int: Número de filas afectadas
+            
+        Raises:
+            sqlite3.Error: Si ocurre un error al ejecutar la sentencia
+        """
+        try:
+            cursor = self._cursor.executemany(query, rows)
+            if not self._transaction_depth:
+                self._commit()
+            return cursor.rowcount
+        except sqlite3.Error:
+            if not self._transaction_depth:
+                self._conn.rollback()
+            raise
+
     def execute_query(self, query: str, params: tuple = ()) -> Optional[List[Tuple[Any, ...]]]:
         """
         Ejecuta una consulta SQL en la base de datos.
         
+        Se mantiene por compatibilidad: decide entre lectura y escritura
+        inspeccionando el texto de la consulta. El código nuevo debe usar
+        fetch_all(), fetch_one() o execute_write().
+        
         Args:
             query (str): Consulta SQL a ejecutar
             params (tuple): Parámetros para la consulta SQL
@@ -110,18 +757,128 @@ class DatabaseConnection:
             self._cursor.execute(query, params)
             if query.strip().upper().startswith(('SELECT', 'PRAGMA')):
                 return self._cursor.fetchall()
-            self._conn.commit()
+            if not self._transaction_depth:
+                self._commit()
             return None
         except sqlite3.Error as e:
-            self._conn.rollback()
+            if not self._transaction_depth:
+                self._conn.rollback()
             raise e
 
+    @contextmanager
+    def transaction(self):
+        """
+        Agrupa varias escrituras en una única transacción.
+        
+        Dentro del bloque execute_query no confirma cada escritura; al salir
+        se hace commit, o rollback si se produjo una excepción. Los bloques
+        anidados se integran en la transacción externa.
+        
+        Yields:
+            DatabaseConnection: La propia conexión
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                self._conn.rollback()
+            raise
+        self._transaction_depth -= 1
+        if not self._transaction_depth:
+            self._commit()
+
+    def _commit(self):
+        self._conn.commit()
+        if self._metricas is not None:
+            self._metricas.commit(self.name)
+
+    @contextmanager
+    def savepoint(self):
+        """
+        Punto de guardado dentro de un bloque transaction().
+        
+        Si el bloque falla se deshacen solo sus escrituras y la transacción
+        externa sigue abierta; la excepción se propaga.
+        
+        Yields:
+            DatabaseConnection: La propia conexión
+            
+        Raises:
+            RuntimeError: Si no hay una transacción abierta
+        """
+        if not self._transaction_depth:
+            raise RuntimeError("savepoint() debe usarse dentro de transaction()")
+        # Sin un BEGIN previo, el RELEASE del SAVEPOINT externo confirmaría la transacción
+        if not self._conn.in_transaction:
+            self._cursor.execute("BEGIN")
+        self._cursor.execute("SAVEPOINT sgst")
+        try:
+            yield self
+        except BaseException:
+            self._cursor.execute("ROLLBACK TO sgst")
+            self._cursor.execute("RELEASE sgst")
+            raise
+        self._cursor.execute("RELEASE sgst")
+
+    def attach(self, name: str, alias: str = None) -> str:
+        """
+        Adjunta otra base de datos configurada a esta conexión.
+        
+        La ruta se resuelve igual que para DatabaseConnection(name). Si el
+        alias ya está adjunto no se hace nada.
+        
+        Args:
+            name (str): Nombre lógico de la base a adjuntar
+            alias (str, opcional): Esquema con el que se adjunta; por defecto el nombre
+            
+        Returns:
+            str: Alias del esquema adjunto
+        """
+        alias = alias or name
+        adjuntas = {fila[1] for fila in self.fetch_all("PRAGMA database_list")}
+        if alias not in adjuntas:
+            self._cursor.execute("ATTACH DATABASE ? AS " + alias, (self.resolve_path(name),))
+        return alias
+
+    def table_columns(self, table: str, schema: str = "main") -> List[str]:
+        """
+        Devuelve los nombres de las columnas de una tabla.
+        
+        Args:
+            table (str): Nombre de la tabla
+            schema (str): Esquema de la tabla ('main' o un alias adjunto)
+            
+        Returns:
+            List[str]: Columnas en el orden de la tabla
+        """
+        return [fila[1] for fila in self.fetch_all(f"PRAGMA {schema}.table_info({table})")]
+
+    @property
+    def total_changes(self) -> int:
+        """
+        Filas modificadas por esta conexión desde que se abrió.
+
+        Se lee sin ejecutar SQL, así que sirve para saber de forma barata si
+        esta conexión escribió algo desde la última vez que se consultó.
+        """
+        return self._conn.total_changes
+
     def close(self):
         """
         Cierra la conexión a la base de datos.
         
         Este método debe ser llamado cuando ya no se necesite la conexión
-        para liberar los recursos.
+        para liberar los recursos. La instancia deja de estar registrada,
+        por lo que la siguiente llamada a DatabaseConnection(name) abre una
+        conexión nueva.
         """
+        name = getattr(self, 'name', None)
+        if DatabaseConnection._instances.get(name) is self:
+            del DatabaseConnection._instances[name]
+        propias = getattr(DatabaseConnection._thread_local, "instances", {})
+        if propias.get(name) is self:
+            del propias[name]
         if hasattr(self, '_conn'):
             self._conn.close() 
\ No newline at end of file
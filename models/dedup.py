@@ -0,0 +1,226 @@
+"""
+Detección y fusión de clientes duplicados.
+
+En lugar de comparar cada par de clientes (O(n²)), cada cliente se asigna
+a bloques por claves normalizadas: email, teléfono (solo dígitos) y nombre
+(palabras normalizadas y ordenadas). Los bloques se arman con un
+diccionario en una sola pasada y los clientes que comparten un email o un
+teléfono se agrupan con union-find. Las coincidencias solo por nombre no
+se encadenan a esos grupos: se informan aparte para revisarlas a mano.
+
+Uso:
+    python -m models.dedup            # lista los grupos y las coincidencias por nombre
+    python -m models.dedup --merge    # fusiona los grupos por email o teléfono
+"""
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Set, Iterable
+from models.db_connection import DatabaseConnection
+from models.normalization import clave_nombre
+from models.queries import ClienteQueries, placeholders
+from models.sync import OP_DELETE, registrar_cambio
+
+# Motivos de coincidencia, de mayor a menor confianza
+MOTIVO_EMAIL = "email"
+MOTIVO_TELEFONO = "telefono"
+MOTIVO_NOMBRE = "nombre"
+
+class DuplicateGroup:
+    """
+    Grupo de clientes que probablemente son la misma persona.
+    
+    Atributos:
+        ids (List[int]): Ids de los clientes, ascendentes
+        motivos (Set[str]): Claves por las que coinciden
+    """
+    def __init__(self, ids: List[int], motivos: Set[str]):
+        self.ids = ids
+        self.motivos = motivos
+
+    @property
+    def fuerte(self) -> bool:
+        """
+        True si el grupo coincide por email o teléfono y no solo por nombre.
+        """
+        return bool(self.motivos & {MOTIVO_EMAIL, MOTIVO_TELEFONO})
+
+    def __repr__(self):
+        return f"DuplicateGroup(ids={self.ids}, motivos={sorted(self.motivos)})"
+
+class _UnionFind:
+    def __init__(self):
+        self.padre: Dict[int, int] = {}
+
+    def buscar(self, x: int) -> int:
+        self.padre.setdefault(x, x)
+        while self.padre[x] != x:
+            self.padre[x] = self.padre[self.padre[x]]
+            x = self.padre[x]
+        return x
+
+    def unir(self, a: int, b: int):
+        ra, rb = self.buscar(a), self.buscar(b)
+        if ra != rb:
+            self.padre[max(ra, rb)] = min(ra, rb)
+
+class ClientDeduplicator:
+    """
+    Busca y fusiona clientes duplicados.
+    
+    Atributos:
+        db (DatabaseConnection): Conexión a la base de datos
+    """
+    def __init__(self, db: DatabaseConnection = None):
+        self.db = db or DatabaseConnection()
+
+    def _bloques(self, motivos: Set[str]) -> Dict[tuple, List[int]]:
+        bloques: Dict[tuple, List[int]] = defaultdict(list)
+        for cliente_id, nombre, email_norm, telefono_norm in self.db.iter_rows(ClienteQueries.CLAVES):
+            if MOTIVO_EMAIL in motivos and email_norm:
+                bloques[(MOTIVO_EMAIL, email_norm)].append(cliente_id)
+            if MOTIVO_TELEFONO in motivos and telefono_norm:
+                bloques[(MOTIVO_TELEFONO, telefono_norm)].append(cliente_id)
+            if MOTIVO_NOMBRE in motivos and nombre:
+                bloques[(MOTIVO_NOMBRE, clave_nombre(nombre))].append(cliente_id)
+        return {clave: ids for clave, ids in bloques.items() if len(ids) > 1}
+
+    @staticmethod
+    def _agrupar(bloques: Dict[tuple, List[int]]) -> List[DuplicateGroup]:
+        grupos = _UnionFind()
+        motivos_por_id: Dict[int, Set[str]] = defaultdict(set)
+        for (motivo, _), ids in bloques.items():
+            for otro in ids[1:]:
+                grupos.unir(ids[0], otro)
+            for cliente_id in ids:
+                motivos_por_id[cliente_id].add(motivo)
+
+        miembros: Dict[int, List[int]] = defaultdict(list)
+        for cliente_id in grupos.padre:
+            miembros[grupos.buscar(cliente_id)].append(cliente_id)
+        resultado = []
+        for raiz in sorted(miembros):
+            ids = sorted(miembros[raiz])
+            resultado.append(DuplicateGroup(ids, set().union(*(motivos_por_id[i] for i in ids))))
+        return resultado
+
+    def find_duplicates(self, motivos: Iterable[str] = (MOTIVO_EMAIL, MOTIVO_TELEFONO)) -> List[DuplicateGroup]:
+        """
+        Devuelve los grupos de clientes unidos por alguna clave compartida.
+        
+        Por defecto solo se usan email y teléfono: son los grupos que
+        merge_all() fusiona. Las coincidencias solo por nombre se revisan
+        aparte con find_name_matches(), porque encadenarlas con las demás
+        uniría (y borraría) clientes distintos con nombres parecidos.
+        
+        Args:
+            motivos (Iterable[str]): Claves de bloqueo a usar
+            
+        Returns:
+            List[DuplicateGroup]: Grupos con dos o más clientes, por id del primero
+        """
+        return self._agrupar(self._bloques(set(motivos)))
+
+    def find_name_matches(self) -> List[DuplicateGroup]:
+        """
+        Devuelve los clientes que coinciden por nombre pero no por email ni teléfono.
+        
+        Cada resultado es un bloque de nombre cuyos clientes quedan en
+        grupos distintos de find_duplicates(); son para revisión manual y
+        merge_all() no los fusiona.
+        
+        Returns:
+            List[DuplicateGroup]: Grupos con motivo 'nombre', por id del primero
+        """
+        raiz = {}
+        for grupo in self.find_duplicates():
+            for cliente_id in grupo.ids:
+                raiz[cliente_id] = grupo.ids[0]
+        resultado = []
+        for ids in self._bloques({MOTIVO_NOMBRE}).values():
+            if len({raiz.get(cliente_id, cliente_id) for cliente_id in ids}) > 1:
+                resultado.append(DuplicateGroup(sorted(ids), {MOTIVO_NOMBRE}))
+        return sorted(resultado, key=lambda grupo: grupo.ids)
+
+    def merge(self, keep_id: int, duplicate_ids: Iterable[int]) -> int:
+        """
+        Fusiona clientes duplicados en uno solo.
+        
+        En una transacción: completa los datos vacíos del cliente conservado
+        con los de los duplicados, reasigna sus órdenes (también las de la
+        base de archivo si está adjunta) y elimina los duplicados.
+        
+        Args:
+            keep_id (int): Cliente que se conserva
+            duplicate_ids (Iterable[int]): Clientes que se eliminan
+            
+        Returns:
+            int: Número de órdenes reasignadas
+        """
+        duplicados = [i for i in duplicate_ids if i != keep_id]
+        if not duplicados:
+            return 0
+        esquemas = {fila[1] for fila in self.db.fetch_all("PRAGMA database_list")}
+        reasignadas = 0
+        with self.db.transaction():
+            filas = self.db.fetch_all(
+                f"SELECT email, telefono, direccion, email_norm, telefono_norm FROM clientes "
+                f"WHERE id IN ({placeholders(len(duplicados))}) ORDER BY id",
+                tuple(duplicados)
+            )
+            for cliente_id in duplicados:
+                reasignadas += self._reparentar(cliente_id, keep_id, esquemas)
+                registrar_cambio(self.db, "clientes", cliente_id, OP_DELETE)
+                self.db.execute_write(ClienteQueries.ELIMINAR, (cliente_id,))
+            # Tras borrar los duplicados su email ya no choca con el índice UNIQUE
+            for fila in filas:
+                self.db.execute_write(ClienteQueries.COMPLETAR, (*fila, keep_id))
+            registrar_cambio(self.db, "clientes", keep_id)
+        return reasignadas
+
+    def _reparentar(self, origen: int, destino: int, esquemas: Set[str]) -> int:
+        total = 0
+        ordenes = self.db.fetch_all("SELECT id FROM ordenes_trabajo WHERE cliente_id = ?", (origen,))
+        self.db.execute_write(ClienteQueries.REPARENTAR_ORDENES, (destino, origen))
+        total += self.db.fetch_one("SELECT changes()")[0]
+        for (orden_id,) in ordenes:
+            registrar_cambio(self.db, "ordenes_trabajo", orden_id)
+        if "archive" in esquemas:
+            self.db.execute_write(
+                "UPDATE archive.ordenes_trabajo SET cliente_id = ? WHERE cliente_id = ?", (destino, origen))
+            total += self.db.fetch_one("SELECT changes()")[0]
+        return total
+
+    def merge_all(self) -> int:
+        """
+        Fusiona cada grupo de find_duplicates() en su cliente más antiguo.
+        
+        Solo se fusionan clientes unidos por email o teléfono; los que
+        coinciden únicamente por nombre se conservan (ver find_name_matches).
+        
+        Returns:
+            int: Número de clientes eliminados
+        """
+        eliminados = 0
+        for grupo in self.find_duplicates():
+            self.merge(grupo.ids[0], grupo.ids[1:])
+            eliminados += len(grupo.ids) - 1
+        return eliminados
+
+def main(argv: List[str] = None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Detecta y fusiona clientes duplicados")
+    parser.add_argument("--merge", action="store_true", help="Fusiona los grupos por email o teléfono")
+    args = parser.parse_args(argv)
+    dedup = ClientDeduplicator()
+    if args.merge:
+        print(f"Clientes fusionados: {dedup.merge_all()}")
+        return
+    for grupo in dedup.find_duplicates():
+        print(f"{grupo.ids}: {', '.join(sorted(grupo.motivos))}")
+    for grupo in dedup.find_name_matches():
+        print(f"{grupo.ids}: nombre (revisar a mano)")
+
+if __name__ == "__main__":
+    main()
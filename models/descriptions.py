@@ -0,0 +1,48 @@
+"""
+Descripciones de servicios y órdenes guardadas por contenido.
+
+Los textos libres no se guardan en las filas de 'servicios' ni de
+'ordenes_trabajo': ambas tablas tienen solo un descripcion_id que apunta
+a la tabla 'descripciones', donde cada texto distinto aparece una vez,
+identificado por su huella SHA-256 y comprimido si es largo (ver
+models.compression). Una orden y su servicio, que comparten la
+descripción, usan la misma fila. Así las filas de las tablas que se
+recorren en listados, reportes e índices quedan angostas y caben más por
+página, y el texto se lee solo cuando se muestra el detalle.
+"""
+from typing import Optional
+from models.compression import huella, empaquetar, desempaquetar
+from models.db_connection import DatabaseConnection
+from models.queries import DescripcionQueries
+
+def guardar_descripcion(db: DatabaseConnection, texto: Optional[str]) -> Optional[int]:
+    """
+    Devuelve el id de la descripción, insertándola solo si el texto es nuevo.
+
+    Debe llamarse dentro de la transacción que guarda la fila que la usa.
+
+    Args:
+        db (DatabaseConnection): Conexión a la base principal
+        texto (str): Texto libre; None no se guarda
+
+    Returns:
+        Optional[int]: Id en 'descripciones', o None si texto es None
+    """
+    if texto is None:
+        return None
+    clave = huella(texto)
+    fila = db.fetch_one(DescripcionQueries.POR_HUELLA, (clave,))
+    if fila is None:
+        # OR IGNORE: otro proceso pudo insertar el mismo texto entre medio
+        db.execute_write(DescripcionQueries.INSERTAR, (clave, empaquetar(texto)))
+        fila = db.fetch_one(DescripcionQueries.POR_HUELLA, (clave,))
+    return fila[0]
+
+def leer_descripcion(db: DatabaseConnection, descripcion_id: Optional[int]) -> Optional[str]:
+    """
+    Devuelve el texto de una descripción, o None si no existe.
+    """
+    if descripcion_id is None:
+        return None
+    fila = db.fetch_one(DescripcionQueries.TEXTO, (descripcion_id,))
+    return desempaquetar(fila[0]) if fila else None
@@ -0,0 +1,84 @@
+"""
+Historial de órdenes de un cliente con paginación diferida.
+
+Cada página trae solo las columnas del listado desde el índice cubriente
+(cliente_id, creado_en DESC, ...) y continúa desde la última fila
+vista (keyset), así que abrir el historial de un cliente con miles de
+órdenes cuesta lo mismo que uno con diez. Las descripciones y los datos
+del servicio se leen por separado, solo cuando se expande una orden.
+"""
+from typing import List, Optional, Tuple, Any
+from models.db_connection import DatabaseConnection
+from models.queries import HistorialQueries
+from models.records import HistorialRegistro
+
+class ClientHistory:
+    """
+    Recorre las órdenes de un cliente de la más reciente a la más antigua.
+
+    Atributos:
+        cliente_id (int): Cliente consultado
+        db (DatabaseConnection): Conexión a la base de datos
+        page_size (int): Órdenes por página
+        agotado (bool): True cuando ya no quedan páginas
+    """
+    def __init__(self, cliente_id: int, db: DatabaseConnection = None, page_size: int = 50):
+        self.cliente_id = cliente_id
+        self.db = db or DatabaseConnection()
+        self.page_size = page_size
+        self.agotado = False
+        self._ultima: Optional[Tuple[int, int]] = None
+        self._detalles = {}
+
+    def total(self) -> int:
+        """
+        Número de órdenes del cliente (contado sobre el índice).
+
+        Returns:
+            int: Total de órdenes
+        """
+        return self.db.fetch_one(HistorialQueries.TOTAL, (self.cliente_id,))[0]
+
+    def siguiente_pagina(self) -> List[HistorialRegistro]:
+        """
+        Devuelve la página siguiente a la última entregada.
+
+        Returns:
+            List[HistorialRegistro]: Órdenes de la página (vacía al final)
+        """
+        if self.agotado:
+            return []
+        if self._ultima is None:
+            filas = self.db.fetch_all(HistorialQueries.PRIMERA_PAGINA, (self.cliente_id, self.page_size))
+        else:
+            filas = self.db.fetch_all(HistorialQueries.PAGINA_SIGUIENTE,
+                                      (self.cliente_id, *self._ultima, self.page_size))
+        if len(filas) < self.page_size:
+            self.agotado = True
+        if filas:
+            self._ultima = (filas[-1][1], filas[-1][0])
+        return [HistorialRegistro(*fila) for fila in filas]
+
+    def reiniciar(self):
+        """
+        Vuelve a la primera página y descarta los detalles leídos.
+        """
+        self.agotado = False
+        self._ultima = None
+        self._detalles.clear()
+
+    def detalle(self, orden_id: int) -> Optional[Tuple[Any, ...]]:
+        """
+        Devuelve el detalle de una orden, leyéndolo la primera vez que se pide.
+
+        Args:
+            orden_id (int): Orden expandida
+
+        Returns:
+            Optional[Tuple[Any, ...]]: (descripción de la orden, descripción
+            del servicio, costo base, duración estimada, técnico) o None si
+            la orden no existe
+        """
+        if orden_id not in self._detalles:
+            self._detalles[orden_id] = self.db.fetch_one(HistorialQueries.DETALLE, (orden_id,))
+        return self._detalles[orden_id]
@@ -0,0 +1,458 @@
+"""
+Pipeline de importación masiva de órdenes desde archivos de socios.
+
+Etapas:
+    1. Lectura (proceso principal): separa los registros de los archivos
+       CSV y los envía por bloques a una cola acotada.
+    2. Procesamiento (pool de procesos): analiza, valida y calcula el costo
+       (calcular_costo) de cada fila. Es la parte que usa CPU y se reparte
+       entre todos los núcleos.
+    3. Escritura (un único proceso): inserta las órdenes válidas en
+       transacciones grandes. Al haber un solo escritor no hay contención
+       por el bloqueo de SQLite.
+
+Las colas tienen tamaño máximo, así que si el escritor se atrasa los
+procesadores se bloquean y, a su vez, el lector: la memoria queda acotada.
+
+Formato CSV (con encabezado):
+    cliente,email,telefono,direccion,tecnico,tipo_servicio,descripcion,costo,duracion_estimada
+
+El escritor abre su propia conexión, por lo que la base debe ser un
+archivo (una base ':memory:' no se comparte entre procesos).
+
+Uso:
+    python -m models.ingest ordenes1.csv ordenes2.csv [--db ruta.db] [--workers N]
+"""
+import argparse
+import csv
+import multiprocessing as mp
+import os
+import queue
+import time
+from typing import List, Tuple, Any, Dict, Optional, Iterable
+from models.db_connection import DatabaseConnection
+from models.models import Cliente
+from models.normalization import normalizar_texto, normalizar_email
+from models.queries import ClienteQueries, TecnicoQueries, ServicioQueries, OrdenQueries
+from models.service_factory import ServiceFactory
+from models.sync import nuevo_uuid, registrar_cambio
+from models.descriptions import guardar_descripcion
+from models.timestamps import ahora, a_epoch
+from models.validation import validar_lote, validar_registro
+
+CAMPOS = ("cliente", "email", "telefono", "direccion", "tecnico",
+          "tipo_servicio", "descripcion", "costo", "duracion_estimada")
+
+# Marca de fin de datos en las colas
+_FIN = None
+# Segundos entre comprobaciones de que los procesos siguen vivos
+_ESPERA = 1.0
+
+class IngestStats:
+    """
+    Métricas de una ejecución del pipeline.
+    
+    Atributos:
+        leidas (int): Filas leídas de los archivos
+        validas (int): Filas que pasaron la validación
+        rechazadas (int): Filas descartadas por errores
+        escritas (int): Órdenes insertadas en la base
+        transacciones (int): Commits realizados por el escritor
+        errores (List[Tuple[str, int, str]]): (archivo, línea, motivo) de cada rechazo
+        segundos (float): Duración total
+    """
+    def __init__(self):
+        self.leidas = 0
+        self.validas = 0
+        self.rechazadas = 0
+        self.escritas = 0
+        self.transacciones = 0
+        self.errores: List[Tuple[str, int, str]] = []
+        self.segundos = 0.0
+
+    @property
+    def filas_por_segundo(self) -> float:
+        """
+        Rendimiento de extremo a extremo en filas leídas por segundo.
+        """
+        return self.leidas / self.segundos if self.segundos else 0.0
+
+    def resumen(self) -> str:
+        """
+        Devuelve un resumen legible de las métricas.
+        """
+        return (f"leídas={self.leidas} válidas={self.validas} rechazadas={self.rechazadas} "
+                f"escritas={self.escritas} transacciones={self.transacciones} "
+                f"tiempo={self.segundos:.2f}s ({self.filas_por_segundo:.0f} filas/s)")
+
+def procesar_fila(campos: Dict[str, str]) -> Tuple[Any, ...]:
+    """
+    Valida una fila y calcula el costo de su servicio.
+    
+    Args:
+        campos (Dict[str, str]): Valores de la fila por nombre de columna
+        
+    Returns:
+        Tuple[Any, ...]: (cliente, email, telefono, direccion, tecnico, tipo,
+            descripcion, costo_base, duracion_estimada, costo_total); tipo es
+            el mismo valor que guarda Servicio.guardar()
+            
+    Raises:
+        ValueError: Si la fila no es válida
+    """
+    errores = validar_registro(campos, "orden")
+    if errores:
+        raise ValueError("; ".join(errores))
+    return _construir_fila(campos)
+
+def _construir_fila(campos: Dict[str, str]) -> Tuple[Any, ...]:
+    """
+    Resuelve el tipo de servicio y calcula el costo de una fila que ya
+    pasó las reglas de models.validation.
+    """
+    email = campos.get("email") or None
+    spec = ServiceFactory.resolve(campos["tipo_servicio"].strip())
+    try:
+        costo = float(campos["costo"])
+        duracion = int(campos["duracion_estimada"]) if campos.get("duracion_estimada") else None
+    except ValueError:
+        raise ValueError("Costo o duración no numéricos")
+    if costo < 0:
+        raise ValueError("El costo no puede ser negativo")
+    servicio = spec.build((campos["descripcion"], costo, duracion))
+    return (campos["cliente"].strip(), email, campos.get("telefono") or None,
+            campos.get("direccion") or None, campos["tecnico"].strip(),
+            spec.tipo_guardado, servicio.descripcion, servicio.costo_base,
+            servicio.duracion_estimada, servicio.calcular_costo())
+
+def procesar_bloque(archivo: str, encabezado: List[str],
+                    registros: List[Tuple[int, List[str]]]) -> Tuple[List[Tuple[Any, ...]], List[Tuple[str, int, str]]]:
+    """
+    Procesa un bloque de registros CSV ya separados en campos.
+    
+    Args:
+        archivo (str): Archivo de origen (para los mensajes de error)
+        encabezado (List[str]): Nombres de columna del archivo
+        registros (List[Tuple[int, List[str]]]): Pares (línea, valores); la
+            línea es en la que termina el registro (csv.reader.line_num)
+        
+    Returns:
+        Tuple[List, List]: Filas válidas (archivo, línea, *procesar_fila()) y
+            errores (archivo, línea, motivo)
+    """
+    filas = [dict(zip(encabezado, valores)) for _, valores in registros]
+    # Ya se está en un proceso del pool: el bloque se valida aquí mismo
+    vectores = validar_lote(filas, "orden", workers=1)
+    validas, errores = [], []
+    for (numero, _), campos, mensajes in zip(registros, filas, vectores):
+        try:
+            if mensajes:
+                raise ValueError("; ".join(mensajes))
+            validas.append((archivo, numero) + _construir_fila(campos))
+        except ValueError as e:
+            errores.append((archivo, numero, str(e)))
+    return validas, errores
+
+def _procesador(entrada, salida):
+    """
+    Bucle de un proceso del pool: procesa bloques hasta recibir la marca de fin.
+    
+    Si un bloque falla, el error se envía al escritor y los bloques
+    siguientes se descartan; la marca de fin se envía siempre para que el
+    escritor no quede esperando.
+    """
+    fallo = False
+    try:
+        while True:
+            trabajo = entrada.get()
+            if trabajo is _FIN:
+                return
+            if fallo:
+                continue  # seguir vaciando la entrada para no bloquear al lector
+            try:
+                salida.put(procesar_bloque(*trabajo))
+            except Exception as e:
+                fallo = True
+                salida.put(RuntimeError(f"Error en un procesador ({trabajo[0]}): {e!r}"))
+    finally:
+        salida.put(_FIN)
+
+class OrderWriter:
+    """
+    Escritor único de órdenes importadas.
+    
+    Resuelve clientes (por email o, sin email, por un nombre que no sea
+    ambiguo) y técnicos (por nombre) con cachés en memoria, crea los
+    clientes que no existen y acumula las órdenes hasta confirmar una
+    transacción de commit_size filas.
+    
+    Atributos:
+        db (DatabaseConnection): Conexión de escritura
+        commit_size (int): Órdenes por transacción
+        pendientes (List[Tuple[Any, ...]]): Filas a la espera de commit
+    """
+    def __init__(self, db: DatabaseConnection, commit_size: int = 5000):
+        self.db = db
+        self.commit_size = commit_size
+        self.pendientes: List[Tuple[Any, ...]] = []
+        self._clientes: Dict[str, int] = {}
+        self._tecnicos: Dict[str, Optional[int]] = {}
+        self.escritas = 0
+        self.transacciones = 0
+        self.errores: List[Tuple[str, int, str]] = []
+
+    def agregar(self, filas: Iterable[Tuple[Any, ...]]):
+        """
+        Agrega filas procesadas y confirma cuando se alcanza commit_size.
+        """
+        self.pendientes.extend(filas)
+        if len(self.pendientes) >= self.commit_size:
+            self.confirmar()
+
+    def _cliente_id(self, nombre: str, email: str, telefono: str, direccion: str) -> int:
+        """
+        Id del cliente de una fila, creándolo si no existe.
+        
+        Sin email, el nombre solo identifica al cliente si hay uno solo con
+        ese nombre: nunca se elige uno entre varios homónimos.
+        
+        Raises:
+            ValueError: Si la fila no tiene email y hay varios clientes con ese nombre
+        """
+        clave = normalizar_email(email) or normalizar_texto(nombre)
+        if clave not in self._clientes:
+            if email:
+                fila = self.db.fetch_one(ClienteQueries.POR_EMAIL, (clave,))
+            else:
+                filas = self.db.fetch_all(ClienteQueries.POR_NOMBRE, (clave,))
+                if len(filas) > 1:
+                    raise ValueError(f"Hay {len(filas)} clientes llamados '{nombre}'; indique el email")
+                fila = filas[0] if filas else None
+            if fila:
+                self._clientes[clave] = fila[0]
+            else:
+                self._clientes[clave] = self.db.execute_write(
+                    ClienteQueries.INSERTAR, Cliente(nombre, email, telefono, direccion).valores_insercion())
+                registrar_cambio(self.db, "clientes", self._clientes[clave])
+        return self._clientes[clave]
+
+    def _tecnico_id(self, nombre: str) -> Optional[int]:
+        if nombre not in self._tecnicos:
+            fila = self.db.fetch_one(TecnicoQueries.POR_NOMBRE, (nombre,))
+            self._tecnicos[nombre] = fila[0] if fila else None
+        return self._tecnicos[nombre]
+
+    def confirmar(self):
+        """
+        Inserta las filas pendientes en una única transacción.
+        """
+        if not self.pendientes:
+            return
+        fecha = a_epoch(ahora())
+        with self.db.transaction():
+            for (archivo, numero, cliente, email, telefono, direccion, tecnico, tipo,
+                 descripcion, costo_base, duracion, costo_total) in self.pendientes:
+                tecnico_id = self._tecnico_id(tecnico)
+                if tecnico_id is None:
+                    self.errores.append((archivo, numero, f"Técnico no encontrado: {tecnico}"))
+                    continue
+                try:
+                    cliente_id = self._cliente_id(cliente, email, telefono, direccion)
+                except ValueError as e:
+                    self.errores.append((archivo, numero, str(e)))
+                    continue
+                # El servicio y la orden comparten la descripción
+                descripcion_id = guardar_descripcion(self.db, descripcion)
+                servicio_id = self.db.execute_write(
+                    ServicioQueries.INSERTAR, (tipo, descripcion_id, costo_base, duracion, nuevo_uuid()))
+                registrar_cambio(self.db, "servicios", servicio_id)
+                orden_id = self.db.execute_write(OrdenQueries.INSERTAR, (
+                    cliente_id, tecnico_id, servicio_id, fecha, "Pendiente", descripcion_id, costo_total, nuevo_uuid()))
+                registrar_cambio(self.db, "ordenes_trabajo", orden_id)
+                self.escritas += 1
+        self.transacciones += 1
+        self.pendientes = []
+
+def _escritor(salida, resultado, db_path: str, procesadores: int, commit_size: int):
+    """
+    Bucle del proceso escritor: consume resultados hasta recibir la marca
+    de fin de cada procesador y devuelve sus contadores.
+    
+    Si la base no se puede abrir, el error se publica en 'resultado' y el
+    proceso termina; el proceso principal lo detecta con is_alive().
+    """
+    try:
+        DatabaseConnection.configure(db_path)
+        writer = OrderWriter(DatabaseConnection(), commit_size)
+    except Exception as e:
+        resultado.put(RuntimeError(f"Error en el escritor: {e}"))
+        return
+    validas, errores, terminados, fallo = 0, [], 0, None
+    while terminados < procesadores:
+        bloque = salida.get()
+        if bloque is _FIN:
+            terminados += 1
+            continue
+        if fallo is not None:
+            continue  # seguir vaciando la cola para no bloquear a los procesadores
+        if isinstance(bloque, Exception):
+            fallo = bloque
+            continue
+        filas, errores_bloque = bloque
+        validas += len(filas)
+        errores.extend(errores_bloque)
+        try:
+            writer.agregar(filas)
+        except Exception as e:
+            fallo = e
+    try:
+        if fallo is None:
+            writer.confirmar()
+    except Exception as e:
+        fallo = e
+    DatabaseConnection.reset()
+    if isinstance(fallo, RuntimeError):
+        resultado.put(fallo)
+    elif fallo is not None:
+        resultado.put(RuntimeError(f"Error en el escritor: {fallo}"))
+    else:
+        resultado.put((validas, writer.escritas, writer.transacciones, errores + writer.errores))
+
+def _poner(cola, elemento, procesadores: List[mp.Process], escritor: mp.Process, resultado):
+    """
+    Encola un elemento esperando mientras los procesadores y el escritor
+    sigan vivos. Si el escritor termina, los procesadores quedan bloqueados
+    en la cola de salida llena, así que también se comprueba el escritor.
+    
+    Raises:
+        RuntimeError: Si el escritor o todos los procesadores terminaron con la cola llena
+    """
+    while True:
+        try:
+            cola.put(elemento, timeout=_ESPERA)
+            return
+        except queue.Full:
+            if not escritor.is_alive():
+                raise _error_escritor(resultado, escritor)
+            if not any(proceso.is_alive() for proceso in procesadores):
+                raise RuntimeError("Los procesadores terminaron antes de tiempo")
+
+def _error_escritor(resultado, escritor: mp.Process) -> RuntimeError:
+    """
+    Error publicado por un escritor que ya terminó o, si no publicó
+    ninguno, uno con su código de salida.
+    """
+    try:
+        salida = resultado.get(timeout=_ESPERA)
+    except queue.Empty:
+        return RuntimeError(f"El escritor terminó sin resultado (código {escritor.exitcode})")
+    if isinstance(salida, Exception):
+        return salida
+    return RuntimeError("El escritor terminó antes de recibir todos los bloques")
+
+def _esperar_resultado(resultado, procesadores: List[mp.Process], escritor: mp.Process):
+    """
+    Espera el resultado del escritor comprobando que los procesos sigan vivos.
+    
+    Raises:
+        RuntimeError: Si el escritor o un procesador terminaron sin completar
+    """
+    while True:
+        try:
+            return resultado.get(timeout=_ESPERA)
+        except queue.Empty:
+            if not escritor.is_alive():
+                raise _error_escritor(resultado, escritor)
+            caidos = [p.exitcode for p in procesadores if p.exitcode not in (None, 0)]
+            if caidos:
+                raise RuntimeError(f"Un procesador terminó con código {caidos[0]}")
+
+def leer_bloques(rutas: Iterable[str], chunk_size: int):
+    """
+    Lee los archivos y genera bloques (archivo, encabezado, registros).
+    
+    Los registros se separan con csv.reader, así que un campo entre
+    comillas con saltos de línea sigue siendo un solo registro.
+    """
+    for ruta in rutas:
+        with open(ruta, newline="", encoding="utf-8") as f:
+            lector = csv.reader(f)
+            encabezado = [campo.strip().lower() for campo in next(lector, [])]
+            bloque = []
+            for valores in lector:
+                if any(valores):
+                    bloque.append((lector.line_num, valores))
+                if len(bloque) >= chunk_size:
+                    yield ruta, encabezado, bloque
+                    bloque = []
+            if bloque:
+                yield ruta, encabezado, bloque
+
+def run_pipeline(rutas: List[str], db_path: str = None, workers: int = None,
+                 chunk_size: int = 500, commit_size: int = 5000) -> IngestStats:
+    """
+    Ejecuta el pipeline completo sobre uno o más archivos.
+    
+    Args:
+        rutas (List[str]): Archivos CSV a importar
+        db_path (str, opcional): Base destino; por defecto la configurada
+        workers (int, opcional): Procesos de validación; por defecto todos los núcleos
+        chunk_size (int): Filas por bloque enviado a los procesadores
+        commit_size (int): Órdenes por transacción del escritor
+        
+    Returns:
+        IngestStats: Métricas de la ejecución
+    """
+    workers = workers or os.cpu_count() or 1
+    db_path = db_path or DatabaseConnection.resolve_path()
+    stats = IngestStats()
+    inicio = time.perf_counter()
+
+    entrada = mp.Queue(maxsize=workers * 2)
+    salida = mp.Queue(maxsize=workers * 2)
+    resultado = mp.Queue()
+    procesadores = [mp.Process(target=_procesador, args=(entrada, salida), daemon=True)
+                    for _ in range(workers)]
+    escritor = mp.Process(target=_escritor, args=(salida, resultado, db_path, workers, commit_size),
+                          daemon=True)
+    for proceso in procesadores + [escritor]:
+        proceso.start()
+
+    try:
+        for bloque in leer_bloques(rutas, chunk_size):
+            stats.leidas += len(bloque[2])
+            _poner(entrada, bloque, procesadores, escritor, resultado)  # espera si los procesadores van atrasados
+        for _ in procesadores:
+            _poner(entrada, _FIN, procesadores, escritor, resultado)
+        salida_escritor = _esperar_resultado(resultado, procesadores, escritor)
+    except BaseException:
+        for proceso in procesadores + [escritor]:
+            proceso.terminate()
+        raise
+    for proceso in procesadores + [escritor]:
+        proceso.join()
+    if isinstance(salida_escritor, Exception):
+        raise salida_escritor
+    stats.validas, stats.escritas, stats.transacciones, stats.errores = salida_escritor
+    stats.rechazadas = stats.leidas - stats.escritas
+    stats.segundos = time.perf_counter() - inicio
+    return stats
+
+def main(argv: List[str] = None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Importa órdenes desde archivos CSV de socios")
+    parser.add_argument("archivos", nargs="+", help="Archivos CSV a importar")
+    parser.add_argument("--db", help="Base de datos destino")
+    parser.add_argument("--workers", type=int, help="Procesos de validación")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--commit-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+    stats = run_pipeline(args.archivos, args.db, args.workers, args.chunk_size, args.commit_size)
+    print(stats.resumen())
+    for archivo, linea, motivo in stats.errores[:20]:
+        print(f"  {archivo}:{linea}: {motivo}")
+
+if __name__ == "__main__":
+    main()
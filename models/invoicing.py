@@ -0,0 +1,338 @@
+"""
+Facturación por lotes de las órdenes completadas.
+
+Etapas:
+    1. Lectura (proceso principal): recorre por bloques las órdenes
+       completadas del período, con los datos de su cliente y servicio,
+       en orden de id.
+    2. Renderizado (pool de procesos): cada proceso compila la plantilla
+       una sola vez (queda en caché) y genera y escribe las facturas de un
+       bloque. Solo hay unos pocos bloques en vuelo, así que la memoria
+       queda acotada aunque el período tenga miles de órdenes.
+    3. Punto de control (proceso principal): los bloques se confirman en
+       orden y, tras cada uno, se guarda en la carpeta de salida el último
+       id facturado. Si la ejecución se interrumpe, la siguiente retoma
+       desde ahí en lugar de empezar de nuevo.
+
+Las facturas se escriben como HTML, texto o PDF (una imagen por página
+generada con Pillow), una por orden, con el nombre F-<id de orden>. Las
+plantillas usan la sintaxis de str.format ('{cliente}', '{total:.2f}')
+con los campos de CAMPOS; en HTML los valores se escapan.
+
+Uso:
+    python -m models.invoicing facturas/ [--periodo mes --fecha 2026-09-15] [--formato pdf]
+        [--plantilla factura.html] [--workers N] [--reiniciar]
+"""
+import argparse
+import hashlib
+import html
+import io
+import json
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from models.db_connection import DatabaseConnection
+from models.queries import FacturaQueries
+from models.records import FacturaRegistro
+from models.reports import PERIODOS
+from models.service_factory import ServiceFactory
+from models.timestamps import Fecha, a_epoch, desde_epoch
+
+FORMATOS = {"html": "html", "texto": "txt", "pdf": "pdf"}
+ARCHIVO_CONTROL = ".facturacion.json"
+
+# Campos disponibles en las plantillas: las columnas de FacturaRegistro y los calculados
+CAMPOS = FacturaRegistro.__slots__ + ("numero", "fecha", "servicio", "total")
+
+PLANTILLA_TEXTO = """FACTURA {numero}
+Fecha: {fecha}
+
+Cliente: {cliente}
+Dirección: {direccion}
+Email: {email}
+Teléfono: {telefono}
+
+Orden {orden_id} - {servicio}
+{descripcion}
+Técnico: {tecnico}
+
+Costo base: {costo_base:.2f}
+TOTAL: {total:.2f}
+"""
+
+PLANTILLA_HTML = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Factura {numero}</title></head>
+<body>
+<h1>Factura {numero}</h1>
+<p>Fecha: {fecha}</p>
+<p><strong>{cliente}</strong><br>{direccion}<br>{email}<br>{telefono}</p>
+<table>
+<tr><th>Orden</th><th>Servicio</th><th>Descripción</th><th>Técnico</th><th>Importe</th></tr>
+<tr><td>{orden_id}</td><td>{servicio}</td><td>{descripcion}</td><td>{tecnico}</td><td>{total:.2f}</td></tr>
+</table>
+<p><strong>Total: {total:.2f}</strong></p>
+</body></html>
+"""
+
+# Página A4 a 100 ppp para las facturas en PDF
+PAGINA_PDF = (827, 1169)
+MARGEN_PDF = 60
+ALTO_LINEA_PDF = 18
+
+Plantilla = Tuple[Tuple[str, Optional[str], str], ...]
+
+class InvoiceStats:
+    """
+    Métricas de una ejecución de la facturación.
+
+    Atributos:
+        facturas (int): Facturas generadas en esta ejecución
+        retomadas (int): Facturas de ejecuciones anteriores que no se repitieron
+        bytes (int): Tamaño total de los archivos generados
+        bloques (int): Bloques confirmados en el punto de control
+        segundos (float): Duración total
+    """
+    def __init__(self):
+        self.facturas = 0
+        self.retomadas = 0
+        self.bytes = 0
+        self.bloques = 0
+        self.segundos = 0.0
+
+    @property
+    def facturas_por_segundo(self) -> float:
+        return self.facturas / self.segundos if self.segundos else 0.0
+
+    def resumen(self) -> str:
+        """
+        Devuelve un resumen legible de las métricas.
+        """
+        return (f"facturas={self.facturas} retomadas={self.retomadas} bloques={self.bloques} "
+                f"tamaño={self.bytes / 1024:.0f}KB tiempo={self.segundos:.2f}s "
+                f"({self.facturas_por_segundo:.0f} facturas/s)")
+
+@lru_cache(maxsize=16)
+def compilar_plantilla(texto: str) -> Plantilla:
+    """
+    Divide una plantilla en partes (literal, campo, formato) una sola vez.
+
+    Raises:
+        ValueError: Si la plantilla es inválida o usa un campo desconocido
+    """
+    partes = []
+    for literal, campo, formato, conversion in Formatter().parse(texto):
+        if campo is not None and campo not in CAMPOS:
+            raise ValueError(f"Campo desconocido en la plantilla: {campo!r}")
+        if conversion:
+            raise ValueError(f"Conversión no admitida en la plantilla: !{conversion}")
+        partes.append((literal, campo, formato or ""))
+    return tuple(partes)
+
+def renderizar(plantilla: Plantilla, valores: Dict[str, Any], escapar: bool = False) -> str:
+    """
+    Completa una plantilla compilada; los valores None quedan vacíos.
+    """
+    salida = []
+    for literal, campo, formato in plantilla:
+        salida.append(literal)
+        if campo is not None:
+            valor = valores[campo]
+            texto = "" if valor is None else format(valor, formato)
+            salida.append(html.escape(texto) if escapar else texto)
+    return "".join(salida)
+
+@lru_cache(maxsize=1)
+def _etiquetas_servicio() -> Dict[str, str]:
+    return {spec.tipo_guardado: spec.etiqueta for spec in ServiceFactory.types()}
+
+def valores_factura(fila: Sequence[Any]) -> Dict[str, Any]:
+    """
+    Campos de la plantilla para una fila de FacturaQueries.COMPLETADAS.
+    """
+    valores = dict(zip(FacturaRegistro.__slots__, fila))
+    valores["numero"] = f"F-{valores['orden_id']:08d}"
+    valores["fecha"] = desde_epoch(valores["creado_en"]).strftime("%d/%m/%Y")
+    valores["servicio"] = _etiquetas_servicio().get(valores["tipo_servicio"], valores["tipo_servicio"])
+    valores["total"] = valores["costo_total"] or 0.0
+    return valores
+
+@lru_cache(maxsize=4096)
+def _linea_pdf(texto: str):
+    # Etiquetas, fechas e importes se repiten entre facturas: cada línea
+    # distinta se dibuja con la fuente una sola vez por proceso
+    from PIL import Image, ImageDraw, ImageFont
+    fuente = ImageFont.load_default()
+    _, _, ancho, alto = fuente.getbbox(texto) if texto else (0, 0, 1, 1)
+    imagen = Image.new("1", (max(1, int(ancho)), max(1, int(alto))), 1)
+    ImageDraw.Draw(imagen).text((0, 0), texto, fill=0, font=fuente)
+    return imagen
+
+def _pdf(texto: str) -> bytes:
+    from PIL import Image
+    lineas = texto.splitlines() or [""]
+    por_pagina = (PAGINA_PDF[1] - 2 * MARGEN_PDF) // ALTO_LINEA_PDF
+    paginas = []
+    for inicio in range(0, len(lineas), por_pagina):
+        # Páginas de 1 bit: el PDF ocupa una décima parte que en RGB
+        pagina = Image.new("1", PAGINA_PDF, 1)
+        for numero, linea in enumerate(lineas[inicio:inicio + por_pagina]):
+            pagina.paste(_linea_pdf(linea), (MARGEN_PDF, MARGEN_PDF + numero * ALTO_LINEA_PDF))
+        paginas.append(pagina)
+    salida = io.BytesIO()
+    paginas[0].save(salida, format="PDF", resolution=100, save_all=True, append_images=paginas[1:])
+    return salida.getvalue()
+
+def generar_factura(plantilla: Plantilla, formato: str, fila: Sequence[Any]) -> Tuple[str, bytes]:
+    """
+    Genera una factura.
+
+    Returns:
+        Tuple[str, bytes]: Nombre de archivo y contenido
+    """
+    valores = valores_factura(fila)
+    texto = renderizar(plantilla, valores, escapar=formato == "html")
+    contenido = _pdf(texto) if formato == "pdf" else texto.encode("utf-8")
+    return f"{valores['numero']}.{FORMATOS[formato]}", contenido
+
+def procesar_bloque(salida: str, texto_plantilla: str, formato: str, filas: List[Tuple[Any, ...]]) -> int:
+    """
+    Genera y escribe las facturas de un bloque.
+
+    Returns:
+        int: Bytes escritos
+    """
+    plantilla = compilar_plantilla(texto_plantilla)
+    escritos = 0
+    for fila in filas:
+        nombre, contenido = generar_factura(plantilla, formato, fila)
+        destino = os.path.join(salida, nombre)
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(contenido)
+        # Renombrar es atómico: nunca queda una factura a medio escribir
+        os.replace(temporal, destino)
+        escritos += len(contenido)
+    return escritos
+
+def leer_control(salida: str) -> Optional[Dict[str, Any]]:
+    """
+    Punto de control de la carpeta de salida, o None si no hay.
+    """
+    try:
+        with open(os.path.join(salida, ARCHIVO_CONTROL), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _guardar_control(salida: str, control: Dict[str, Any]):
+    ruta = os.path.join(salida, ARCHIVO_CONTROL)
+    with open(f"{ruta}.tmp", "w", encoding="utf-8") as f:
+        json.dump(control, f)
+    os.replace(f"{ruta}.tmp", ruta)
+
+def run_invoicing(salida: str, desde: Fecha, hasta: Fecha, formato: str = "html",
+                  plantilla: str = None, workers: int = None, chunk_size: int = 200,
+                  reiniciar: bool = False, db: DatabaseConnection = None) -> InvoiceStats:
+    """
+    Factura las órdenes completadas creadas en [desde, hasta).
+
+    Args:
+        salida (str): Carpeta de las facturas y del punto de control
+        desde (Fecha): Inicio inclusivo del período
+        hasta (Fecha): Fin exclusivo del período
+        formato (str): 'html', 'texto' o 'pdf'
+        plantilla (str, opcional): Texto de la plantilla; por defecto
+            PLANTILLA_HTML para HTML y PLANTILLA_TEXTO para texto y PDF
+        workers (int, opcional): Procesos de renderizado; por defecto todos
+            los núcleos. Con 1 se renderiza en el proceso actual
+        chunk_size (int): Órdenes por bloque (y por punto de control)
+        reiniciar (bool): Ignorar el punto de control y facturar todo de nuevo
+        db (DatabaseConnection, opcional): Conexión de lectura
+
+    Returns:
+        InvoiceStats: Métricas de la ejecución
+
+    Raises:
+        ValueError: Si el formato o la plantilla no son válidos, o si la
+            carpeta tiene un punto de control de otra facturación
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato}")
+    if plantilla is None:
+        plantilla = PLANTILLA_HTML if formato == "html" else PLANTILLA_TEXTO
+    compilar_plantilla(plantilla)  # plantilla inválida: fallar antes de crear el pool
+    db = db or DatabaseConnection()
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(salida, exist_ok=True)
+    stats = InvoiceStats()
+    inicio = time.perf_counter()
+
+    control = {"desde": a_epoch(desde), "hasta": a_epoch(hasta), "formato": formato,
+               "plantilla": hashlib.sha256(plantilla.encode("utf-8")).hexdigest(),
+               "ultimo_id": 0, "facturas": 0}
+    anterior = None if reiniciar else leer_control(salida)
+    if anterior is not None:
+        if any(anterior.get(clave) != control[clave] for clave in ("desde", "hasta", "formato", "plantilla")):
+            raise ValueError(f"{salida} tiene el punto de control de otra facturación; use reiniciar")
+        control["ultimo_id"], control["facturas"] = anterior["ultimo_id"], anterior["facturas"]
+        stats.retomadas = anterior["facturas"]
+
+    bloques = db.iter_chunks(FacturaQueries.COMPLETADAS,
+                             (control["ultimo_id"], control["desde"], control["hasta"]), chunk_size)
+
+    def confirmar(ultimo_id: int, facturas: int, escritos: int):
+        stats.facturas += facturas
+        stats.bytes += escritos
+        stats.bloques += 1
+        control["ultimo_id"] = ultimo_id
+        control["facturas"] += facturas
+        _guardar_control(salida, control)
+
+    if workers <= 1:
+        for filas in bloques:
+            confirmar(filas[-1][0], len(filas), procesar_bloque(salida, plantilla, formato, filas))
+    else:
+        with mp.Pool(workers) as pool:
+            # Como mucho dos bloques por proceso en vuelo; se confirman en orden de id
+            en_vuelo = deque()
+            for filas in bloques:
+                en_vuelo.append((filas[-1][0], len(filas),
+                                 pool.apply_async(procesar_bloque, (salida, plantilla, formato, filas))))
+                if len(en_vuelo) >= 2 * workers:
+                    ultimo_id, facturas, pendiente = en_vuelo.popleft()
+                    confirmar(ultimo_id, facturas, pendiente.get())
+            while en_vuelo:
+                ultimo_id, facturas, pendiente = en_vuelo.popleft()
+                confirmar(ultimo_id, facturas, pendiente.get())
+    stats.segundos = time.perf_counter() - inicio
+    return stats
+
+def main(argv: List[str] = None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Genera las facturas de las órdenes completadas")
+    parser.add_argument("salida", help="Carpeta de las facturas")
+    parser.add_argument("--periodo", choices=PERIODOS, default="mes")
+    parser.add_argument("--fecha", help="Día de referencia del período (YYYY-MM-DD); por defecto hoy")
+    parser.add_argument("--formato", choices=FORMATOS, default="html")
+    parser.add_argument("--plantilla", help="Archivo de plantilla (sintaxis de str.format)")
+    parser.add_argument("--workers", type=int, help="Procesos de renderizado")
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--reiniciar", action="store_true", help="Ignorar el punto de control")
+    args = parser.parse_args(argv)
+    plantilla = None
+    if args.plantilla:
+        with open(args.plantilla, encoding="utf-8") as f:
+            plantilla = f.read()
+    desde, hasta = PERIODOS[args.periodo](args.fecha)
+    stats = run_invoicing(args.salida, desde, hasta, args.formato, plantilla,
+                          args.workers, args.chunk_size, args.reiniciar)
+    print(stats.resumen())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Listados paginados con orden y filtros resueltos en SQLite.
+
+Cada tabla de la interfaz se describe con un Listado: columnas visibles,
+columnas por las que se puede ordenar (con el índice que las respalda) y
+filtros disponibles. ListingPager arma la consulta con ORDER BY, WHERE y
+LIMIT y recorre las páginas por keyset (valor de la columna de orden, id)
+sin OFFSET, así que la primera página de 500k órdenes ordenadas por fecha
+o cliente se obtiene recorriendo solo el comienzo del índice.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from models.db_connection import DatabaseConnection
+from models.normalization import normalizar_texto
+from models.queries import ListadoQueries, build_select, placeholders
+from models.timestamps import a_epoch
+
+class Listado:
+    """
+    Descripción de una tabla paginable.
+
+    Cada orden es una tupla de expresiones cuya última es única (el id),
+    elegida para que coincida con un índice: por ejemplo el orden por
+    técnico es (t.nombre, o.tecnico_id, o.creado_en, o.id), que recorre
+    tecnicos por nombre y luego idx_ordenes_tecnico_fecha sin ordenar en
+    memoria.
+
+    Atributos:
+        origen (str): Expresión FROM (tabla o joins)
+        columnas (Tuple[Tuple[str, str], ...]): (encabezado, expresión SQL) visibles
+        ordenables (Dict[str, Tuple[str, ...]]): encabezado -> expresiones de orden
+        nulables (Tuple[str, ...]): Órdenes de dos expresiones cuya primera
+            puede ser NULL
+        filtros (Dict[str, Tuple[str, callable]]): nombre -> (condición con
+            marcadores, función que convierte el valor del filtro en la
+            tupla de parámetros)
+    """
+    def __init__(self, origen: str, columnas: Sequence[Tuple[str, str]],
+                 ordenables: Dict[str, Tuple[str, ...]], filtros: Dict[str, Tuple[str, Any]],
+                 nulables: Sequence[str] = ()):
+        self.origen = " ".join(origen.split())
+        self.columnas = tuple(columnas)
+        self.encabezados = tuple(encabezado for encabezado, _ in columnas)
+        self.ordenables = ordenables
+        self.nulables = tuple(nulables)
+        self.filtros = filtros
+
+def _igual(valor: Any) -> Tuple[Any, ...]:
+    return (valor,)
+
+def _prefijo(valor: str) -> Tuple[str, str]:
+    # Rango [prefijo, prefijo + U+FFFF) sobre una columna normalizada e indexada
+    prefijo = normalizar_texto(valor)
+    return prefijo, prefijo + "\uffff"
+
+def _fecha(valor: Any) -> Tuple[int]:
+    return (a_epoch(valor),)
+
+LISTADO_CLIENTES = Listado(
+    "clientes",
+    (("ID", "id"), ("Nombre", "nombre"), ("Email", "email"),
+     ("Teléfono", "telefono"), ("Dirección", "direccion")),
+    {"ID": ("id",), "Nombre": ("nombre", "id"),
+     "Email": ("email_norm", "id"), "Teléfono": ("telefono_norm", "id")},
+    {"nombre": ("nombre_norm >= ? AND nombre_norm < ?", _prefijo)},
+    nulables=("Email", "Teléfono"),
+)
+
+LISTADO_TECNICOS = Listado(
+    "tecnicos",
+    (("ID", "id"), ("Nombre", "nombre"), ("Especialidad", "especialidad"),
+     ("Email", "email"), ("Teléfono", "telefono")),
+    {"ID": ("id",), "Nombre": ("nombre", "id"), "Especialidad": ("especialidad", "id")},
+    {"especialidad": ("especialidad = ?", _igual), "nombre": ("nombre = ?", _igual)},
+)
+
+LISTADO_ORDENES = Listado(
+    """ordenes_trabajo o
+       JOIN clientes c ON o.cliente_id = c.id
+       JOIN tecnicos t ON o.tecnico_id = t.id
+       JOIN servicios s ON o.servicio_id = s.id""",
+    (("ID", "o.id"), ("Cliente", "c.nombre"), ("Técnico", "t.nombre"), ("Servicio", "s.tipo"),
+     ("Estado", "o.estado"), ("Fecha", "datetime(o.creado_en, 'unixepoch', 'localtime')")),
+    {"ID": ("o.id",),
+     "Cliente": ("c.nombre", "c.id", "o.creado_en", "o.id"),
+     "Técnico": ("t.nombre", "t.id", "o.creado_en", "o.id"),
+     "Estado": ("o.estado", "o.creado_en", "o.id"),
+     "Fecha": ("o.creado_en", "o.id")},
+    {"estado": ("o.estado = ?", _igual), "tecnico_id": ("o.tecnico_id = ?", _igual),
+     "cliente_id": ("o.cliente_id = ?", _igual),
+     "desde": ("o.creado_en >= ?", _fecha), "hasta": ("o.creado_en < ?", _fecha)},
+)
+
+class ListingPager:
+    """
+    Recorre un Listado por páginas con un orden y filtros dados.
+
+    Atributos:
+        listado (Listado): Tabla recorrida
+        db (DatabaseConnection): Conexión a la base de datos
+        orden (str): Encabezado por el que se ordena
+        descendente (bool): Sentido del orden
+        filtros (Dict[str, Any]): Filtros activos (los None se ignoran)
+        page_size (int): Filas por página
+        agotado (bool): True cuando ya no quedan páginas
+    """
+    def __init__(self, listado: Listado, db: DatabaseConnection = None, orden: str = "ID",
+                 descendente: bool = False, filtros: Dict[str, Any] = None, page_size: int = 100):
+        self.listado = listado
+        self.db = db or DatabaseConnection()
+        self.page_size = page_size
+        self.agotado = False
+        self._ultima: Optional[Tuple[Any, Any]] = None
+        self.ordenar(orden, descendente)
+        self.filtrar(**(filtros or {}))
+
+    def ordenar(self, orden: str, descendente: bool = False):
+        """
+        Cambia el orden y vuelve a la primera página.
+
+        Raises:
+            ValueError: Si la columna no se puede ordenar
+        """
+        if orden not in self.listado.ordenables:
+            raise ValueError(f"No se puede ordenar por {orden}")
+        self.orden = orden
+        self.descendente = descendente
+        self.reiniciar()
+
+    def filtrar(self, **filtros):
+        """
+        Reemplaza los filtros activos y vuelve a la primera página.
+
+        Raises:
+            ValueError: Si un filtro no existe para el listado
+        """
+        desconocidos = set(filtros) - set(self.listado.filtros)
+        if desconocidos:
+            raise ValueError(f"Filtros desconocidos: {', '.join(sorted(desconocidos))}")
+        self.filtros = {nombre: valor for nombre, valor in filtros.items() if valor not in (None, "")}
+        self.reiniciar()
+
+    def reiniciar(self):
+        """
+        Vuelve a la primera página.
+        """
+        self.agotado = False
+        self._ultima = None
+
+    def siguiente_pagina(self) -> List[Tuple[Any, ...]]:
+        """
+        Devuelve la página siguiente a la última entregada.
+
+        Returns:
+            List[Tuple[Any, ...]]: Filas con las columnas visibles (vacía al final)
+        """
+        if self.agotado:
+            return []
+        condiciones, parametros = self._condiciones()
+        claves = self.listado.ordenables[self.orden]
+        sentido = " DESC" if self.descendente else ""
+        sql = build_select(self.listado.origen, tuple(sql for _, sql in self.listado.columnas) + claves,
+                           condiciones, ", ".join(clave + sentido for clave in claves), True)
+        filas = self.db.fetch_all(sql, (*parametros, self.page_size))
+        if len(filas) < self.page_size:
+            self.agotado = True
+        if filas:
+            self._ultima = filas[-1][-len(claves):]
+        return [fila[:-len(claves)] for fila in filas]
+
+    def _condiciones(self) -> Tuple[Tuple[str, ...], Tuple[Any, ...]]:
+        condiciones, parametros = [], []
+        for nombre in sorted(self.filtros):
+            condicion, convertir = self.listado.filtros[nombre]
+            condiciones.append(condicion)
+            parametros.extend(convertir(self.filtros[nombre]))
+        if self._ultima is not None:
+            condicion, valores = self._despues_de(self._ultima)
+            condiciones.append(condicion)
+            parametros.extend(valores)
+        return tuple(condiciones), tuple(parametros)
+
+    def _despues_de(self, valores: Tuple[Any, ...]) -> Tuple[str, Tuple[Any, ...]]:
+        # Filas posteriores a la última entregada en el orden actual. La
+        # primera expresión se compara también sola para que SQLite acote
+        # el rango en su índice aunque las expresiones sean de tablas
+        # distintas del join. Los NULL van primero en orden ascendente y al
+        # final en descendente.
+        claves = self.listado.ordenables[self.orden]
+        op = "<" if self.descendente else ">"
+        if len(claves) == 1:
+            return ListadoQueries.KEYSET_SIMPLE.format(e=claves[0], op=op), valores
+        if valores[0] is None:
+            consulta = ListadoQueries.NULOS_SIGUIENTES if self.descendente else ListadoQueries.NULOS_Y_VALORES
+            return consulta.format(e=claves[0], k=claves[-1], op=op), valores[-1:]
+        condicion = ListadoQueries.KEYSET.format(e=claves[0], claves=", ".join(claves), op=op,
+                                                 marcadores=placeholders(len(claves)))
+        if self.descendente and self.orden in self.listado.nulables:
+            condicion = f"({condicion} OR {claves[0]} IS NULL)"
+        return condicion, (valores[0], *valores)
@@ -0,0 +1,394 @@
+"""
+Mantenimiento en línea de la base de datos.
+
+MaintenanceRunner usa su propia conexión, de modo que puede trabajar en un
+hilo de fondo mientras la aplicación sigue escribiendo:
+
+- backup: copia con sqlite3.Connection.backup por tramos de páginas sobre
+  una instantánea de lectura; como la base está en modo WAL, los
+  escritores no esperan a la copia. La copia se verifica con quick_check.
+- quick_check, optimize, analyze e incremental_vacuum.
+- purgar_cambios: acota la tabla 'cambios' (ver models.cdc.purgar).
+
+Cada tarea tiene un intervalo (TAREAS_PROGRAMADAS); la última ejecución,
+su duración y su resultado se guardan en la tabla 'mantenimiento', así que
+la planificación sobrevive a los reinicios. restore() verifica la copia
+antes y después de restaurarla.
+
+Uso:
+    python -m models.maintenance run             # tareas vencidas
+    python -m models.maintenance run --all
+    python -m models.maintenance backup --dest copia.db
+    python -m models.maintenance restore copia.db
+    python -m models.maintenance status
+    python -m models.maintenance enable-vacuum   # una vez, en bases antiguas
+"""
+import argparse
+import glob
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from models.cdc import RETENCION_DIAS, purgar
+from models.db_connection import DatabaseConnection, DEFAULT_NAME
+from models.records import MantenimientoRegistro
+from models.timestamps import a_epoch, ahora
+
+# Intervalo de cada tarea programada, en segundos
+TAREAS_PROGRAMADAS: Dict[str, int] = {
+    "quick_check": 24 * 3600,
+    "optimize": 6 * 3600,
+    "analyze": 7 * 24 * 3600,
+    "incremental_vacuum": 24 * 3600,
+    "backup": 24 * 3600,
+    "purgar_cambios": 24 * 3600,
+}
+
+# Tablas cuyo conteo de filas se compara al restaurar una copia
+TABLAS_VERIFICADAS = ("clientes", "tecnicos", "servicios", "ordenes_trabajo")
+
+_REGISTRAR = """
+    INSERT INTO mantenimiento (tarea, ultima_ejecucion, duracion, resultado) VALUES (?, ?, ?, ?)
+    ON CONFLICT(tarea) DO UPDATE SET ultima_ejecucion = excluded.ultima_ejecucion,
+        duracion = excluded.duracion, resultado = excluded.resultado
+"""
+
+def _es_archivo(path: str) -> bool:
+    return path != ":memory:" and not path.startswith("file:")
+
+def _integridad(conn: sqlite3.Connection, pragma: str = "quick_check") -> str:
+    problemas = [fila[0] for fila in conn.execute(f"PRAGMA {pragma}")]
+    return "ok" if problemas == ["ok"] else "; ".join(problemas)
+
+def _conteos(conn: sqlite3.Connection) -> Dict[str, int]:
+    return {tabla: conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0] for tabla in TABLAS_VERIFICADAS}
+
+class MaintenanceRunner:
+    """
+    Ejecuta y planifica las tareas de mantenimiento de una base.
+
+    Atributos:
+        name (str): Nombre lógico de la base (ver DatabaseConnection)
+        path (str): Ruta o DSN resuelto
+        backup_dir (str): Carpeta de las copias automáticas
+        pages (int): Páginas copiadas por tramo de backup
+        pause (float): Segundos de espera entre tramos
+        keep (int): Copias automáticas que se conservan
+        vacuum_pages (int): Páginas liberadas como máximo por incremental_vacuum
+        retencion_cambios (int): Días que se conservan los cambios no leídos (ver purgar_cambios)
+    """
+    def __init__(self, name: str = DEFAULT_NAME, backup_dir: str = None, pages: int = 256,
+                 pause: float = 0.01, keep: int = 7, vacuum_pages: int = 1000,
+                 retencion_cambios: int = RETENCION_DIAS):
+        # Asegura el esquema (incluida la tabla 'mantenimiento')
+        DatabaseConnection(name)
+        self.name = name
+        self.path = DatabaseConnection.resolve_path(name)
+        self.backup_dir = backup_dir or (
+            os.path.join(os.path.dirname(os.path.abspath(self.path)), "backups") if _es_archivo(self.path) else None)
+        self.pages = pages
+        self.pause = pause
+        self.keep = keep
+        self.vacuum_pages = vacuum_pages
+        self.retencion_cambios = retencion_cambios
+        # Conexión propia, usable desde el hilo de fondo; _lock serializa las tareas
+        self._conn = sqlite3.connect(self.path, uri=True, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._tareas: Dict[str, Callable[[], str]] = {
+            "quick_check": self.quick_check,
+            "optimize": self.optimize,
+            "analyze": self.analyze,
+            "incremental_vacuum": self.incremental_vacuum,
+            "backup": lambda: self.backup(),
+            "purgar_cambios": self.purgar_cambios,
+        }
+
+    def quick_check(self) -> str:
+        """
+        Ejecuta PRAGMA quick_check.
+
+        Returns:
+            str: 'ok' o la lista de problemas encontrados
+        """
+        return _integridad(self._conn)
+
+    def optimize(self) -> str:
+        """
+        Ejecuta PRAGMA optimize (analiza solo lo que lo necesita).
+        """
+        self._conn.execute("PRAGMA optimize")
+        return "ok"
+
+    def analyze(self) -> str:
+        """
+        Recalcula las estadísticas de todos los índices.
+        """
+        self._conn.execute("ANALYZE")
+        self._conn.commit()
+        return "ok"
+
+    def incremental_vacuum(self) -> str:
+        """
+        Devuelve al sistema hasta vacuum_pages páginas libres.
+
+        Returns:
+            str: Páginas liberadas, o aviso si la base no usa auto_vacuum incremental
+        """
+        if self._conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return "auto_vacuum no es incremental (ver enable-vacuum)"
+        libres = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        self._conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})").fetchall()
+        liberadas = libres - self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return f"{liberadas} páginas liberadas"
+
+    def purgar_cambios(self) -> str:
+        """
+        Borra del registro de cambios lo que ya leyeron todos los consumidores
+        y lo que supera retencion_cambios días (ver models.cdc.purgar).
+
+        Returns:
+            str: Cambios borrados
+        """
+        return f"{purgar(self._conn, self.retencion_cambios)} cambios borrados"
+
+    def enable_incremental_vacuum(self):
+        """
+        Activa auto_vacuum incremental en una base existente (requiere un
+        VACUUM completo, por lo que conviene hacerlo con la aplicación cerrada).
+        """
+        with self._lock:
+            self._conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self._conn.execute("VACUUM")
+
+    def backup(self, destino: str = None, progreso: Callable[[int, int, int], None] = None) -> str:
+        """
+        Copia la base en línea, por tramos de páginas, y verifica la copia.
+
+        La copia se hace sobre una instantánea fija de la base: lo que otras
+        conexiones escriban mientras tanto no la interrumpe ni queda en ella.
+
+        Args:
+            destino (str, opcional): Archivo de la copia; por defecto uno con
+                fecha y hora en backup_dir (y se podan las copias más viejas)
+            progreso (Callable, opcional): Recibe (estado, restantes, total)
+
+        Returns:
+            str: Ruta de la copia y páginas copiadas
+
+        Raises:
+            ValueError: Si no se indica destino para una base en memoria
+            RuntimeError: Si la copia no pasa quick_check
+        """
+        automatico = destino is None
+        if automatico:
+            if not self.backup_dir:
+                raise ValueError("Indique un destino para copiar una base en memoria")
+            os.makedirs(self.backup_dir, exist_ok=True)
+            base = os.path.splitext(os.path.basename(self.path))[0]
+            destino = os.path.join(self.backup_dir, f"{base}-{ahora().strftime('%Y%m%d-%H%M%S')}.db")
+        paginas = [0]
+
+        def _progreso(estado, restantes, total):
+            paginas[0] = total
+            if progreso:
+                progreso(estado, restantes, total)
+
+        copia = sqlite3.connect(destino)
+        try:
+            # Una transacción de lectura abierta fija la instantánea: en WAL los
+            # escritores siguen trabajando y la copia no se reinicia por sus cambios
+            self._conn.execute("BEGIN")
+            self._conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            try:
+                self._conn.backup(copia, pages=self.pages, progress=_progreso, sleep=self.pause)
+            finally:
+                self._conn.rollback()
+            verificacion = _integridad(copia)
+        finally:
+            copia.close()
+        if verificacion != "ok":
+            raise RuntimeError(f"La copia {destino} no pasó quick_check: {verificacion}")
+        if automatico:
+            self._podar()
+        return f"{destino} ({paginas[0]} páginas)"
+
+    def _podar(self):
+        base = os.path.splitext(os.path.basename(self.path))[0]
+        copias = sorted(glob.glob(os.path.join(self.backup_dir, f"{base}-*.db")))
+        for vieja in copias[:-self.keep] if self.keep else []:
+            os.remove(vieja)
+
+    def run(self, tarea: str) -> MantenimientoRegistro:
+        """
+        Ejecuta una tarea, mide su duración y la registra.
+
+        Un error de la tarea se registra como resultado en lugar de propagarse,
+        para que el hilo de fondo siga funcionando.
+
+        Args:
+            tarea (str): Una de TAREAS_PROGRAMADAS
+
+        Returns:
+            MantenimientoRegistro: Tarea, momento, duración en segundos y resultado
+        """
+        with self._lock:
+            inicio = a_epoch(ahora())
+            t0 = time.perf_counter()
+            try:
+                resultado = self._tareas[tarea]()
+            except (sqlite3.Error, OSError, RuntimeError, ValueError) as e:
+                resultado = f"error: {e}"
+            registro = MantenimientoRegistro(tarea, inicio, round(time.perf_counter() - t0, 4), resultado)
+            self._conn.execute(_REGISTRAR, registro.as_tuple())
+            self._conn.commit()
+        return registro
+
+    def status(self) -> List[MantenimientoRegistro]:
+        """
+        Última ejecución registrada de cada tarea.
+        """
+        filas = self._conn.execute(
+            "SELECT tarea, ultima_ejecucion, duracion, resultado FROM mantenimiento ORDER BY tarea").fetchall()
+        return [MantenimientoRegistro(*fila) for fila in filas]
+
+    def due(self, momento: int = None) -> List[str]:
+        """
+        Tareas cuyo intervalo venció (o que nunca se ejecutaron).
+
+        Args:
+            momento (int, opcional): Epoch de referencia; por defecto ahora
+        """
+        momento = momento if momento is not None else a_epoch(ahora())
+        ultimas = {registro.tarea: registro.ultima_ejecucion for registro in self.status()}
+        return [tarea for tarea, intervalo in TAREAS_PROGRAMADAS.items()
+                if tarea not in ultimas or ultimas[tarea] + intervalo <= momento]
+
+    def run_due(self) -> List[MantenimientoRegistro]:
+        """
+        Ejecuta las tareas vencidas y devuelve sus registros.
+        """
+        return [self.run(tarea) for tarea in self.due()
+                if tarea != "backup" or self.backup_dir]
+
+    def start(self, interval: float = 300.0) -> threading.Thread:
+        """
+        Revisa las tareas vencidas cada interval segundos en un hilo de fondo.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, args=(interval,),
+                                            name="sgst-maintenance", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def _loop(self, interval: float):
+        while not self._stop.is_set():
+            self.run_due()
+            self._stop.wait(interval)
+
+    def stop(self):
+        """
+        Detiene el hilo de fondo (espera a que termine la tarea en curso).
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        """
+        Detiene el hilo de fondo y cierra la conexión propia.
+        """
+        self.stop()
+        self._conn.close()
+
+def restore(copia: str, name: str = DEFAULT_NAME, destino: str = None, pages: int = 256) -> Dict[str, int]:
+    """
+    Restaura una copia sobre la base, verificándola antes y después.
+
+    La copia se abre en solo lectura y debe pasar integrity_check y tener
+    las tablas principales. Tras copiarla, la base restaurada debe pasar
+    integrity_check y tener los mismos conteos de filas. Conviene ejecutarlo
+    con la aplicación cerrada.
+
+    Args:
+        copia (str): Archivo de la copia de seguridad
+        name (str): Nombre lógico de la base a restaurar
+        destino (str, opcional): Ruta a restaurar; por defecto la de name
+        pages (int): Páginas copiadas por tramo
+
+    Returns:
+        Dict[str, int]: Filas por tabla de la base restaurada
+
+    Raises:
+        RuntimeError: Si la copia o la base restaurada no pasan la verificación
+    """
+    if not os.path.exists(copia):
+        raise RuntimeError(f"No existe la copia {copia}")
+    origen = sqlite3.connect(f"file:{os.path.abspath(copia)}?mode=ro", uri=True)
+    try:
+        verificacion = _integridad(origen, "integrity_check")
+        if verificacion != "ok":
+            raise RuntimeError(f"La copia {copia} está dañada: {verificacion}")
+        try:
+            esperados = _conteos(origen)
+        except sqlite3.OperationalError as e:
+            raise RuntimeError(f"La copia {copia} no es una base del sistema: {e}")
+        DatabaseConnection.reset(name)
+        restaurada = sqlite3.connect(destino or DatabaseConnection.resolve_path(name), uri=True)
+        try:
+            origen.backup(restaurada, pages=pages)
+            verificacion = _integridad(restaurada, "integrity_check")
+            obtenidos = _conteos(restaurada)
+        finally:
+            restaurada.close()
+    finally:
+        origen.close()
+    if verificacion != "ok" or obtenidos != esperados:
+        raise RuntimeError(f"La base restaurada no coincide con la copia: {verificacion}, {obtenidos} != {esperados}")
+    return obtenidos
+
+def main(argv: List[str] = None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Mantenimiento de la base de datos")
+    parser.add_argument("--name", default=DEFAULT_NAME, help="Nombre lógico de la base")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    ejecutar = comandos.add_parser("run", help="Ejecuta las tareas vencidas")
+    ejecutar.add_argument("--all", action="store_true", help="Ejecuta todas las tareas")
+    copia = comandos.add_parser("backup", help="Copia de seguridad en línea")
+    copia.add_argument("--dest", help="Archivo de la copia")
+    restaurar = comandos.add_parser("restore", help="Restaura y verifica una copia")
+    restaurar.add_argument("copia")
+    comandos.add_parser("status", help="Última ejecución de cada tarea")
+    comandos.add_parser("enable-vacuum", help="Activa auto_vacuum incremental")
+    args = parser.parse_args(argv)
+
+    if args.comando == "restore":
+        for tabla, filas in restore(args.copia, args.name).items():
+            print(f"{tabla:<16} {filas:>8}")
+        return
+    runner = MaintenanceRunner(args.name)
+    try:
+        if args.comando == "enable-vacuum":
+            runner.enable_incremental_vacuum()
+            registros = []
+        elif args.comando == "backup":
+            inicio = time.perf_counter()
+            print(runner.backup(args.dest), f"{time.perf_counter() - inicio:.2f}s")
+            return
+        elif args.comando == "run":
+            registros = [runner.run(t) for t in TAREAS_PROGRAMADAS] if args.all else runner.run_due()
+        else:
+            registros = runner.status()
+        for registro in registros:
+            print(f"{registro.tarea:<20} {registro.duracion:>8.3f}s  {registro.resultado}")
+    finally:
+        runner.close()
+
+if __name__ == "__main__":
+    main()
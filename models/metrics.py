@@ -0,0 +1,445 @@
+"""
+Métricas de la aplicación en el formato de texto de Prometheus.
+
+MetricsRegistry guarda contadores, medidores e histogramas con etiquetas.
+Los módulos actualizan las métricas de REGISTRO (el registro global) con
+inc(), set() u observe(); los medidores que se calculan desde la base
+(órdenes abiertas, colas) o desde otros módulos (cachés) reciben una
+función de lectura que solo se evalúa al exportar.
+
+MetricsServer publica el registro en http://127.0.0.1:<puerto>/metrics
+desde un hilo de fondo. La medición de latencia de DatabaseConnection se
+instala con la primera lectura del endpoint y se retira si pasan
+'inactividad' segundos sin otra, así que mientras no hay un scraper
+conectado las consultas usan los métodos originales, sin costo agregado.
+
+Métricas publicadas:
+    sgst_db_consulta_segundos{base, operacion}  histograma
+    sgst_db_commits_total{base}                 contador
+    sgst_notificaciones_total{sujeto}           contador
+    sgst_ordenes_abiertas{estado}               medidor
+    sgst_cola_pendientes{cola}                  medidor ('planificador', 'cambios:<consumidor>')
+    sgst_cache_aciertos_total{cache}            contador
+    sgst_cache_fallos_total{cache}              contador
+    sgst_cache_entradas{cache}                  medidor
+
+Uso:
+    SGST_METRICS_PORT=9464 python main.py
+    python -m models.metrics --puerto 9464     # solo los medidores de la base
+    python -m models.metrics --imprimir
+"""
+import argparse
+import math
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from models.db_connection import DatabaseConnection
+from models.models import ESTADOS_CERRADOS
+from models.queries import AgendaQueries, CambioQueries, OrdenQueries, placeholders
+
+ENV_METRICS_PORT = "SGST_METRICS_PORT"
+PUERTO_POR_DEFECTO = 9464
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Segundos sin lecturas tras los cuales se retira la medición de latencia
+INACTIVIDAD = 300.0
+# Cada cuánto revisa el hilo del servidor si debe detenerse (segundos)
+_INTERVALO_SERVIDOR = 0.5
+
+# Límites superiores (segundos) de los buckets de latencia de consultas
+LIMITES_LATENCIA = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Funciones memorizadas con lru_cache, como (módulo, función). Solo se
+# publican las de módulos ya importados, sin forzar su importación.
+CACHES = (
+    ("models.queries", "build_select"),
+    ("models.queries", "placeholders"),
+    ("models.concurrency", "_actualizar_sql"),
+    ("models.validation", "compilar"),
+    ("models.invoicing", "compilar_plantilla"),
+    ("models.invoicing", "_linea_pdf"),
+)
+
+Etiquetas = Tuple[str, ...]
+Lectura = Callable[[], Dict[Etiquetas, float]]
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _numero(valor: float) -> str:
+    if isinstance(valor, int):
+        return str(valor)
+    if math.isnan(valor):
+        return "NaN"
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    return repr(valor)
+
+class Metric:
+    """
+    Métrica con nombre, texto de ayuda y nombres de etiquetas.
+
+    Los valores se guardan por tupla de valores de etiquetas. Si se indica
+    una función de lectura, los valores se obtienen de ella al exportar.
+
+    Atributos:
+        nombre (str): Nombre de la métrica en Prometheus
+        ayuda (str): Descripción publicada en '# HELP'
+        etiquetas (Tuple[str, ...]): Nombres de las etiquetas
+        tipo (str): Tipo publicado en '# TYPE'
+    """
+    tipo = "untyped"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (), leer: Optional[Lectura] = None):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._leer = leer
+        self._valores: Dict[Etiquetas, float] = {}
+        self._lock = threading.Lock()
+
+    def _clave(self, valores: Etiquetas) -> Etiquetas:
+        if len(valores) != len(self.etiquetas):
+            raise ValueError(f"{self.nombre} espera las etiquetas {self.etiquetas}")
+        return valores
+
+    def valores(self) -> Dict[Etiquetas, float]:
+        """
+        Valor actual de cada serie.
+
+        Returns:
+            Dict[Etiquetas, float]: Valores de etiquetas -> valor
+        """
+        if self._leer is not None:
+            return self._leer()
+        with self._lock:
+            return dict(self._valores)
+
+    def _selector(self, clave: Etiquetas, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pares = [*zip(self.etiquetas, clave), *extra]
+        if not pares:
+            return ""
+        return "{" + ",".join(f'{nombre}="{_escapar(str(valor))}"' for nombre, valor in pares) + "}"
+
+    def _muestras(self) -> Iterator[str]:
+        for clave, valor in sorted(self.valores().items()):
+            yield f"{self.nombre}{self._selector(clave)} {_numero(valor)}"
+
+    def exportar(self) -> Iterator[str]:
+        """
+        Líneas de la métrica en el formato de texto de Prometheus.
+        """
+        yield f"# HELP {self.nombre} {self.ayuda}"
+        yield f"# TYPE {self.nombre} {self.tipo}"
+        yield from self._muestras()
+
+class Counter(Metric):
+    """
+    Contador que solo crece.
+    """
+    tipo = "counter"
+
+    def inc(self, *etiquetas: str, cantidad: float = 1):
+        """
+        Suma cantidad a la serie de las etiquetas dadas.
+
+        Raises:
+            ValueError: Si cantidad es negativa o faltan etiquetas
+        """
+        if cantidad < 0:
+            raise ValueError("Un contador no puede disminuir")
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+class Gauge(Metric):
+    """
+    Medidor con el último valor asignado.
+    """
+    tipo = "gauge"
+
+    def set(self, valor: float, *etiquetas: str):
+        """
+        Asigna el valor de la serie de las etiquetas dadas.
+        """
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = valor
+
+class Histogram(Metric):
+    """
+    Histograma de observaciones con buckets acumulados, suma y cantidad.
+
+    Atributos:
+        limites (Tuple[float, ...]): Límites superiores de los buckets, crecientes
+    """
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                 limites: Sequence[float] = LIMITES_LATENCIA):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.limites = tuple(sorted(limites))
+        # Por serie: [conteo de cada bucket más el de +Inf, suma]
+        self._series: Dict[Etiquetas, List[Any]] = {}
+
+    def observe(self, valor: float, *etiquetas: str):
+        """
+        Registra una observación en la serie de las etiquetas dadas.
+        """
+        bucket = bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(etiquetas)
+            if serie is None:
+                serie = self._series[self._clave(etiquetas)] = [[0] * (len(self.limites) + 1), 0.0]
+            serie[0][bucket] += 1
+            serie[1] += valor
+
+    def valores(self) -> Dict[Etiquetas, float]:
+        """
+        Cantidad de observaciones de cada serie.
+        """
+        with self._lock:
+            return {clave: sum(serie[0]) for clave, serie in self._series.items()}
+
+    def _muestras(self) -> Iterator[str]:
+        with self._lock:
+            series = sorted((clave, list(serie[0]), serie[1]) for clave, serie in self._series.items())
+        for clave, conteos, suma in series:
+            acumulado = 0
+            for limite, conteo in zip((*self.limites, math.inf), conteos):
+                acumulado += conteo
+                yield f"{self.nombre}_bucket{self._selector(clave, (('le', _numero(limite)),))} {acumulado}"
+            yield f"{self.nombre}_sum{self._selector(clave)} {_numero(suma)}"
+            yield f"{self.nombre}_count{self._selector(clave)} {acumulado}"
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas exportadas juntas.
+    """
+    def __init__(self):
+        self._metricas: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, metrica: Metric) -> Metric:
+        """
+        Agrega una métrica al registro.
+
+        Returns:
+            Metric: La misma métrica
+
+        Raises:
+            ValueError: Si ya hay una métrica con ese nombre
+        """
+        with self._lock:
+            if metrica.nombre in self._metricas:
+                raise ValueError(f"La métrica {metrica.nombre} ya está registrada")
+            self._metricas[metrica.nombre] = metrica
+        return metrica
+
+    def counter(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                leer: Optional[Lectura] = None) -> Counter:
+        return self.registrar(Counter(nombre, ayuda, etiquetas, leer))
+
+    def gauge(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+              leer: Optional[Lectura] = None) -> Gauge:
+        return self.registrar(Gauge(nombre, ayuda, etiquetas, leer))
+
+    def histogram(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                  limites: Sequence[float] = LIMITES_LATENCIA) -> Histogram:
+        return self.registrar(Histogram(nombre, ayuda, etiquetas, limites))
+
+    def __getitem__(self, nombre: str) -> Metric:
+        return self._metricas[nombre]
+
+    def exportar(self) -> str:
+        """
+        Todas las métricas en el formato de texto de Prometheus.
+
+        Las funciones de lectura se evalúan en el hilo que exporta.
+        """
+        with self._lock:
+            metricas = list(self._metricas.values())
+        return "".join(linea + "\n" for metrica in metricas for linea in metrica.exportar())
+
+def _ordenes_abiertas() -> Dict[Etiquetas, float]:
+    sql = OrdenQueries.ABIERTAS_POR_ESTADO.format(marcadores=placeholders(len(ESTADOS_CERRADOS)))
+    return {(estado,): total for estado, total in DatabaseConnection().fetch_all(sql, ESTADOS_CERRADOS)}
+
+def _colas() -> Dict[Etiquetas, float]:
+    db = DatabaseConnection()
+    colas = {("planificador",): db.fetch_one(AgendaQueries.SIN_AGENDAR)[0]}
+    for consumidor, pendientes in db.fetch_all(CambioQueries.PENDIENTES_POR_CONSUMIDOR):
+        colas[(f"cambios:{consumidor}",)] = pendientes
+    return colas
+
+def _lectura_caches(campo: str) -> Lectura:
+    def leer() -> Dict[Etiquetas, float]:
+        valores = {}
+        for modulo, nombre in CACHES:
+            funcion = getattr(sys.modules.get(modulo), nombre, None)
+            if funcion is not None:
+                valores[(f"{modulo}.{nombre}",)] = getattr(funcion.cache_info(), campo)
+        return valores
+    return leer
+
+REGISTRO = MetricsRegistry()
+
+CONSULTAS = REGISTRO.histogram("sgst_db_consulta_segundos", "Duración de las consultas de DatabaseConnection",
+                               ("base", "operacion"))
+COMMITS = REGISTRO.counter("sgst_db_commits_total", "Transacciones confirmadas", ("base",))
+NOTIFICACIONES = REGISTRO.counter("sgst_notificaciones_total", "Notificaciones entregadas a observadores",
+                                  ("sujeto",))
+REGISTRO.gauge("sgst_ordenes_abiertas", "Órdenes no cerradas por estado", ("estado",), _ordenes_abiertas)
+REGISTRO.gauge("sgst_cola_pendientes", "Elementos en espera por cola", ("cola",), _colas)
+REGISTRO.counter("sgst_cache_aciertos_total", "Aciertos de las cachés en memoria", ("cache",),
+                 _lectura_caches("hits"))
+REGISTRO.counter("sgst_cache_fallos_total", "Fallos de las cachés en memoria", ("cache",),
+                 _lectura_caches("misses"))
+REGISTRO.gauge("sgst_cache_entradas", "Entradas de las cachés en memoria", ("cache",),
+               _lectura_caches("currsize"))
+
+class _MetricasDB:
+    # Receptor que DatabaseConnection.instrumentar() llama en cada consulta y commit
+    def __init__(self):
+        self.consulta = lambda base, operacion, segundos: CONSULTAS.observe(segundos, base, operacion)
+        self.commit = COMMITS.inc
+
+def instrumentar_db(activo: bool = True):
+    """
+    Activa o retira la medición de consultas y commits de DatabaseConnection.
+    """
+    DatabaseConnection.instrumentar(_MetricasDB() if activo else None)
+
+class MetricsServer:
+    """
+    Publica un registro en /metrics desde un hilo de fondo.
+
+    El hilo abre su propia conexión (open_for_thread) para calcular los
+    medidores que consultan la base.
+
+    Atributos:
+        puerto (int): Puerto en el que escucha (el real si se pidió 0)
+        host (str): Interfaz; por defecto solo la local
+        registro (MetricsRegistry): Métricas publicadas
+        inactividad (float): Segundos sin lecturas tras los que se retira
+            la medición de consultas
+        ultima_lectura (Optional[float]): time.monotonic() de la última lectura
+    """
+    def __init__(self, puerto: int = PUERTO_POR_DEFECTO, host: str = "127.0.0.1",
+                 registro: MetricsRegistry = None, inactividad: float = INACTIVIDAD):
+        self.puerto = puerto
+        self.host = host
+        self.registro = registro or REGISTRO
+        self.inactividad = inactividad
+        self.ultima_lectura: Optional[float] = None
+        self._instrumentado = False
+        self._servidor = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MetricsServer":
+        """
+        Empieza a escuchar y atiende las lecturas en un hilo de fondo.
+
+        Returns:
+            MetricsServer: La misma instancia, para encadenar
+
+        Raises:
+            OSError: Si el puerto no está disponible
+        """
+        if self._thread is None or not self._thread.is_alive():
+            # http.server solo se importa si se publican métricas
+            from http.server import HTTPServer
+            self._servidor = HTTPServer((self.host, self.puerto), _handler(self))
+            self._servidor.timeout = _INTERVALO_SERVIDOR
+            self.puerto = self._servidor.server_address[1]
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="sgst-metrics", daemon=True)
+            self._thread.start()
+        return self
+
+    def _loop(self):
+        DatabaseConnection.open_for_thread()
+        try:
+            while not self._stop.is_set():
+                self._servidor.handle_request()
+                if self._instrumentado and time.monotonic() - self.ultima_lectura > self.inactividad:
+                    self._instrumentar(False)
+        finally:
+            self._instrumentar(False)
+            DatabaseConnection.close_thread()
+            self._servidor.server_close()
+
+    def _instrumentar(self, activo: bool):
+        if activo != self._instrumentado:
+            instrumentar_db(activo)
+            self._instrumentado = activo
+
+    def leer(self) -> bytes:
+        """
+        Exporta el registro y anota la lectura.
+
+        Returns:
+            bytes: Cuerpo de la respuesta de /metrics
+        """
+        self.ultima_lectura = time.monotonic()
+        self._instrumentar(True)
+        return self.registro.exportar().encode("utf-8")
+
+    def stop(self):
+        """
+        Deja de escuchar y retira la medición de consultas.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+def _handler(servidor: MetricsServer):
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            cuerpo = servidor.leer()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    return MetricsHandler
+
+def main(argv: List[str] = None):
+    """
+    Punto de entrada de la línea de comandos.
+
+    En un proceso aparte solo hay datos de la base (órdenes abiertas y
+    colas); la latencia, los commits y las notificaciones se publican desde
+    la propia aplicación con SGST_METRICS_PORT.
+    """
+    parser = argparse.ArgumentParser(description="Publica las métricas en formato Prometheus")
+    parser.add_argument("--puerto", type=int, default=PUERTO_POR_DEFECTO, help="Puerto local")
+    parser.add_argument("--host", default="127.0.0.1", help="Interfaz en la que escuchar")
+    parser.add_argument("--imprimir", action="store_true", help="Imprimir las métricas una vez y salir")
+    args = parser.parse_args(argv)
+    if args.imprimir:
+        print(REGISTRO.exportar(), end="")
+        return
+    servidor = MetricsServer(args.puerto, args.host).start()
+    print(f"Métricas en http://{args.host}:{servidor.puerto}/metrics (Ctrl+C para salir)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.stop()
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,20 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
-from datetime import datetime
 from models.db_connection import DatabaseConnection
+from models.queries import ClienteQueries, TecnicoQueries, ServicioQueries, OrdenQueries
+from models.normalization import normalizar_texto, normalizar_email, normalizar_telefono
+from models.sync import nuevo_uuid, registrar_cambio
+from models.descriptions import guardar_descripcion
+from models.concurrency import actualizar_fila
+from models.timestamps import ahora, a_epoch
+
+# Estados en los que una orden ya no admite cambios y puede archivarse
+ESTADOS_CERRADOS = ("Completada", "Cancelada")
+
+def _validar_campos(cambios: dict, permitidos: tuple):
+    desconocidos = set(cambios) - set(permitidos)
+    if desconocidos:
+        raise ValueError(f"Campos no modificables: {', '.join(sorted(desconocidos))}")
 
 class Cliente:
     """
@@ -13,8 +26,12 @@ class Cliente:
         telefono (str): Número de teléfono del cliente
         direccion (str): Dirección del cliente
         id (Optional[int]): Identificador único del cliente
+        version (Optional[int]): Versión de la fila leída o guardada
     """
-    def __init__(self, nombre: str, email: str = None, telefono: str = None, direccion: str = None, id: int = None):
+    CAMPOS_MODIFICABLES = ("nombre", "email", "telefono", "direccion")
+
+    def __init__(self, nombre: str, email: str = None, telefono: str = None, direccion: str = None, id: int = None,
+                 version: int = None):
         """
         Inicializa una nueva instancia de Cliente.
         
@@ -24,29 +41,100 @@ class Cliente:
             telefono (str, opcional): Número de teléfono del cliente
             direccion (str, opcional): Dirección del cliente
             id (Optional[int]): Identificador único del cliente
+            version (Optional[int]): Versión de la fila leída
         """
         self.nombre = nombre
         self.email = email
         self.telefono = telefono
         self.direccion = direccion
         self.id = id
+        self.version = version
+        self.uuid = None
 
     def guardar(self):
         """
-        Guarda el cliente en la base de datos.
+        Guarda el cliente en la base de datos y lo registra en el diario
+        de sincronización.
         
         Returns:
             int: ID del cliente guardado
         """
         db = DatabaseConnection()
-        query = """
-            INSERT INTO clientes (nombre, email, telefono, direccion)
-            VALUES (?, ?, ?, ?)
-        """
-        db.execute_query(query, (self.nombre, self.email, self.telefono, self.direccion))
-        self.id = db.execute_query("SELECT last_insert_rowid()")[0][0]
+        with db.transaction():
+            self.id = db.execute_write(ClienteQueries.INSERTAR, self.valores_insercion())
+            registrar_cambio(db, "clientes", self.id)
+        self.version = 1
         return self.id
 
+    def actualizar(self, **cambios):
+        """
+        Guarda cambios del cliente solo si nadie lo modificó desde que se
+        leyó (ver models.concurrency).
+        
+        Args:
+            **cambios: Valores nuevos de nombre, email, telefono o direccion
+            
+        Raises:
+            ConflictoDeVersion: Si el cliente cambió desde que se leyó
+            FilaEliminada: Si el cliente fue eliminado
+            ValueError: Si un campo no es modificable
+        """
+        _validar_campos(cambios, self.CAMPOS_MODIFICABLES)
+        valores = dict(cambios)
+        if "nombre" in cambios:
+            valores["nombre_norm"] = normalizar_texto(cambios["nombre"])
+        if "email" in cambios:
+            valores["email_norm"] = normalizar_email(cambios["email"])
+        if "telefono" in cambios:
+            valores["telefono_norm"] = normalizar_telefono(cambios["telefono"])
+        self.version = actualizar_fila(DatabaseConnection(), "clientes", self.id, self.version, valores)
+        for campo, valor in cambios.items():
+            setattr(self, campo, valor)
+
+    def valores_insercion(self) -> tuple:
+        """
+        Devuelve los parámetros de ClienteQueries.INSERTAR, incluidas las
+        claves normalizadas de nombre, email y teléfono. Asigna el uuid
+        global si el cliente aún no lo tiene.
+        
+        Returns:
+            tuple: Valores en el orden de la sentencia
+        """
+        self.uuid = self.uuid or nuevo_uuid()
+        return (self.nombre, self.email, self.telefono, self.direccion,
+                normalizar_texto(self.nombre), normalizar_email(self.email),
+                normalizar_telefono(self.telefono), self.uuid)
+
+    @classmethod
+    def buscar_por_nombre(cls, nombre: str) -> List['Cliente']:
+        """
+        Busca clientes por nombre sin distinguir mayúsculas, acentos ni espacios.
+        
+        Args:
+            nombre (str): Nombre a buscar
+            
+        Returns:
+            List[Cliente]: Todos los clientes con ese nombre, por id ascendente
+        """
+        filas = DatabaseConnection().fetch_all(ClienteQueries.POR_NOMBRE, (normalizar_texto(nombre),))
+        return [cls(nombre=f[1], email=f[2], telefono=f[3], direccion=f[4], id=f[0], version=f[5]) for f in filas]
+
+    @classmethod
+    def buscar_por_email(cls, email: str) -> Optional['Cliente']:
+        """
+        Busca un cliente por email sin distinguir mayúsculas.
+        
+        Args:
+            email (str): Email a buscar
+            
+        Returns:
+            Optional[Cliente]: El cliente o None si no existe
+        """
+        fila = DatabaseConnection().fetch_one(ClienteQueries.POR_EMAIL, (normalizar_email(email),))
+        if fila is None:
+            return None
+        return cls(nombre=fila[1], email=fila[2], telefono=fila[3], direccion=fila[4], id=fila[0], version=fila[5])
+
 class Tecnico:
     """
     Clase que representa a un técnico en el sistema.
@@ -57,8 +145,12 @@ class Tecnico:
         email (str): Correo electrónico del técnico
         telefono (str): Número de teléfono del técnico
         id (Optional[int]): Identificador único del técnico
+        version (Optional[int]): Versión de la fila leída o guardada
     """
-    def __init__(self, nombre: str, especialidad: str, email: str = None, telefono: str = None, id: int = None):
+    CAMPOS_MODIFICABLES = ("nombre", "especialidad", "email", "telefono")
+
+    def __init__(self, nombre: str, especialidad: str, email: str = None, telefono: str = None, id: int = None,
+                 version: int = None):
         """
         Inicializa una nueva instancia de Tecnico.
         
@@ -68,6 +160,7 @@ class Tecnico:
             email (str, opcional): Correo electrónico del técnico
             telefono (str, opcional): Número de teléfono del técnico
             id (Optional[int]): Identificador único del técnico
+            version (Optional[int]): Versión de la fila leída
         """
         self.nombre = nombre
         self.especialidad = especialidad
@@ -75,6 +168,8 @@ class Tecnico:
         self.telefono = telefono
         self.ordenes = []
         self.id = id
+        self.version = version
+        self.uuid = None
 
     def agregar_orden(self, orden):
         """
@@ -87,20 +182,38 @@ class Tecnico:
 
     def guardar(self):
         """
-        Guarda el técnico en la base de datos.
+        Guarda el técnico en la base de datos y lo registra en el diario
+        de sincronización.
         
         Returns:
             int: ID del técnico guardado
         """
         db = DatabaseConnection()
-        query = """
-            INSERT INTO tecnicos (nombre, especialidad, email, telefono)
-            VALUES (?, ?, ?, ?)
-        """
-        db.execute_query(query, (self.nombre, self.especialidad, self.email, self.telefono))
-        self.id = db.execute_query("SELECT last_insert_rowid()")[0][0]
+        self.uuid = self.uuid or nuevo_uuid()
+        with db.transaction():
+            self.id = db.execute_write(TecnicoQueries.INSERTAR, (self.nombre, self.especialidad, self.email, self.telefono, self.uuid))
+            registrar_cambio(db, "tecnicos", self.id)
+        self.version = 1
         return self.id
 
+    def actualizar(self, **cambios):
+        """
+        Guarda cambios del técnico solo si nadie lo modificó desde que se
+        leyó (ver models.concurrency).
+        
+        Args:
+            **cambios: Valores nuevos de nombre, especialidad, email o telefono
+            
+        Raises:
+            ConflictoDeVersion: Si el técnico cambió desde que se leyó
+            FilaEliminada: Si el técnico fue eliminado
+            ValueError: Si un campo no es modificable
+        """
+        _validar_campos(cambios, self.CAMPOS_MODIFICABLES)
+        self.version = actualizar_fila(DatabaseConnection(), "tecnicos", self.id, self.version, cambios)
+        for campo, valor in cambios.items():
+            setattr(self, campo, valor)
+
 class Servicio(ABC):
     """
     Clase abstracta base para los servicios.
@@ -123,6 +236,7 @@ class Servicio(ABC):
         self.descripcion = descripcion
         self.costo_base = costo_base if costo_base is not None else costo
         self.duracion_estimada = duracion_estimada
+        self.uuid = None
 
     @abstractmethod
     def calcular_costo(self) -> float:
@@ -136,19 +250,20 @@ class Servicio(ABC):
 
     def guardar(self):
         """
-        Guarda el servicio en la base de datos.
+        Guarda el servicio en la base de datos y lo registra en el diario
+        de sincronización.
         
         Returns:
             int: ID del servicio guardado
         """
         db = DatabaseConnection()
-        query = """
-            INSERT INTO servicios (tipo, descripcion, costo_base)
-            VALUES (?, ?, ?)
-        """
         tipo = self.__class__.__name__.lower()
-        db.execute_query(query, (tipo, self.descripcion, self.costo_base))
-        return db.execute_query("SELECT last_insert_rowid()")[0][0]
+        self.uuid = self.uuid or nuevo_uuid()
+        with db.transaction():
+            descripcion_id = guardar_descripcion(db, self.descripcion)
+            servicio_id = db.execute_write(ServicioQueries.INSERTAR, (tipo, descripcion_id, self.costo_base, self.duracion_estimada, self.uuid))
+            registrar_cambio(db, "servicios", servicio_id)
+        return servicio_id
 
 class ServicioReparacion(Servicio):
     """
@@ -229,9 +344,13 @@ class OrdenDeTrabajo:
         tecnico (Tecnico): Técnico asignado a la orden
         servicio (Servicio): Servicio a realizar
         descripcion (str): Descripción detallada de la orden
-        fecha_creacion (str): Fecha de creación de la orden
+        fecha_creacion (datetime): Momento de creación, con zona horaria
+            (también se acepta un epoch o texto 'YYYY-MM-DD HH:MM:SS' local)
         estado (str): Estado actual de la orden
+        version (Optional[int]): Versión de la fila guardada
     """
+    CAMPOS_MODIFICABLES = ("estado", "tecnico", "descripcion", "costo_total")
+
     def __init__(self, cliente: Cliente, servicio: Servicio, tecnico: Tecnico = None, descripcion: str = None):
         """
         Inicializa una nueva instancia de OrdenDeTrabajo.
@@ -248,32 +367,60 @@ class OrdenDeTrabajo:
         self.tecnico = tecnico
         self.servicio = servicio
         self.descripcion = descripcion
-        self.fecha_creacion = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.fecha_creacion = ahora()
         self.estado = "Pendiente"
         self.costo_total = servicio.calcular_costo()
+        self.id = None
+        self.version = None
+        self.uuid = None
 
     def guardar(self):
         """
-        Guarda la orden de trabajo en la base de datos.
+        Guarda la orden de trabajo en la base de datos y la registra en el
+        diario de sincronización. Cliente, técnico y servicio se guardan en
+        la misma transacción cuando hace falta.
         
         Returns:
             int: ID de la orden guardada
         """
         db = DatabaseConnection()
-        query = """
-            INSERT INTO ordenes_trabajo (
-                cliente_id, tecnico_id, servicio_id, fecha_creacion,
-                estado, descripcion, costo_total
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """
-        # Solo guardar cliente/tecnico si no tienen id
-        cliente_id = self.cliente.id if hasattr(self.cliente, 'id') and self.cliente.id else self.cliente.guardar()
-        tecnico_id = self.tecnico.id if hasattr(self.tecnico, 'id') and self.tecnico.id else self.tecnico.guardar()
-        servicio_id = self.servicio.guardar()
-        db.execute_query(query, (
-            cliente_id, tecnico_id, servicio_id,
-            self.fecha_creacion, self.estado,
-            self.descripcion, self.costo_total
-        ))
-        return db.execute_query("SELECT last_insert_rowid()")[0][0] 
\ No newline at end of file
+        self.uuid = self.uuid or nuevo_uuid()
+        with db.transaction():
+            # Solo guardar cliente/tecnico si no tienen id
+            cliente_id = self.cliente.id if hasattr(self.cliente, 'id') and self.cliente.id else self.cliente.guardar()
+            tecnico_id = self.tecnico.id if hasattr(self.tecnico, 'id') and self.tecnico.id else self.tecnico.guardar()
+            servicio_id = self.servicio.guardar()
+            self.id = db.execute_write(OrdenQueries.INSERTAR, (
+                cliente_id, tecnico_id, servicio_id,
+                a_epoch(self.fecha_creacion), self.estado,
+                guardar_descripcion(db, self.descripcion), self.costo_total, self.uuid
+            ))
+            registrar_cambio(db, "ordenes_trabajo", self.id)
+        self.version = 1
+        return self.id
+
+    def actualizar(self, **cambios):
+        """
+        Guarda cambios de la orden solo si nadie la modificó desde que se
+        leyó (ver models.concurrency).
+        
+        Args:
+            **cambios: Valores nuevos de estado, tecnico (Tecnico ya
+                guardado), descripcion o costo_total
+            
+        Raises:
+            ConflictoDeVersion: Si la orden cambió desde que se leyó
+            FilaEliminada: Si la orden fue eliminada
+            ValueError: Si un campo no es modificable
+        """
+        _validar_campos(cambios, self.CAMPOS_MODIFICABLES)
+        db = DatabaseConnection()
+        valores = {campo: valor for campo, valor in cambios.items() if campo in ("estado", "costo_total")}
+        if "tecnico" in cambios:
+            valores["tecnico_id"] = cambios["tecnico"].id if cambios["tecnico"] else None
+        with db.transaction():
+            if "descripcion" in cambios:
+                valores["descripcion_id"] = guardar_descripcion(db, cambios["descripcion"])
+            self.version = actualizar_fila(db, "ordenes_trabajo", self.id, self.version, valores)
+        for campo, valor in cambios.items():
+            setattr(self, campo, valor) 
\ No newline at end of file
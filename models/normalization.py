@@ -0,0 +1,47 @@
+"""
+Normalización de datos de contacto para búsquedas y detección de duplicados.
+
+Las funciones se registran también como funciones SQL en cada conexión
+(ver DatabaseConnection._initialize) para poder rellenar columnas
+normalizadas con un simple UPDATE.
+"""
+import re
+import unicodedata
+
+_NO_DIGITOS = re.compile(r"\D+")
+_ESPACIOS = re.compile(r"\s+")
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Pasa un texto a minúsculas, sin acentos y con los espacios colapsados.
+    
+    Args:
+        texto (str): Texto libre (por ejemplo un nombre)
+        
+    Returns:
+        str: Texto normalizado; cadena vacía si texto es None
+    """
+    descompuesto = unicodedata.normalize("NFKD", texto or "")
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return _ESPACIOS.sub(" ", sin_acentos).strip().lower()
+
+def normalizar_email(email: str) -> str:
+    """
+    Devuelve el email en minúsculas y sin espacios, o None si está vacío.
+    """
+    email = (email or "").strip().lower()
+    return email or None
+
+def normalizar_telefono(telefono: str) -> str:
+    """
+    Devuelve solo los dígitos del teléfono, o None si no tiene ninguno.
+    """
+    digitos = _NO_DIGITOS.sub("", telefono or "")
+    return digitos or None
+
+def clave_nombre(nombre: str) -> str:
+    """
+    Clave de bloqueo de un nombre: palabras normalizadas y ordenadas, de
+    modo que 'Pérez, Juan' y 'juan perez' coinciden.
+    """
+    return " ".join(sorted(re.findall(r"\w+", normalizar_texto(nombre))))
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List
 from models.models import OrdenDeTrabajo
+from models.metrics import NOTIFICACIONES
 
 class Observer(ABC):
     """
@@ -81,13 +82,15 @@ class Subject(ABC):
         Notifica a todos los observadores sobre un cambio.
         
         Llama al método update() de cada observador registrado,
-        pasándole la orden de trabajo que ha cambiado.
+        pasándole la orden de trabajo que ha cambiado, y suma las
+        entregas a la métrica sgst_notificaciones_total.
         
         Args:
             orden (OrdenDeTrabajo): La orden de trabajo que ha cambiado
         """
         for observer in self._observers:
             observer.update(orden)
+        NOTIFICACIONES.inc(type(self).__name__, cantidad=len(self._observers))
 
 class OrdenSubject(Subject):
     """
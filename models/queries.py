@@ -0,0 +1,306 @@
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+# Tamaño de la caché de sentencias preparadas de sqlite3 (por defecto 128).
+# Cubre las sentencias estáticas de todas las entidades más las variantes
+# generadas por build_select() con holgura.
+STATEMENT_CACHE_SIZE = 256
+
+# Columnas en el orden en que las esperan los constructores de las entidades
+CLIENTE_COLUMNAS = "id, nombre, email, telefono, direccion, version"
+TECNICO_COLUMNAS = "id, nombre, especialidad, email, telefono, version"
+SERVICIO_COLUMNAS = "id, tipo, descripcion_id, costo_base, duracion_estimada, version"
+
+class ClienteQueries:
+    """
+    Sentencias SQL estáticas de la entidad Cliente.
+    
+    Al ser cadenas constantes, sqlite3 reutiliza la sentencia preparada de
+    su caché en cada llamada en lugar de volver a compilarla.
+    """
+    INSERTAR = """
+        INSERT INTO clientes (nombre, email, telefono, direccion, nombre_norm, email_norm, telefono_norm, uuid)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    POR_NOMBRE = f"SELECT {CLIENTE_COLUMNAS} FROM clientes WHERE nombre_norm = ? ORDER BY id"
+    POR_ID = f"SELECT {CLIENTE_COLUMNAS} FROM clientes WHERE id = ?"
+    POR_EMAIL = f"SELECT {CLIENTE_COLUMNAS} FROM clientes WHERE email_norm = ?"
+    CLAVES = "SELECT id, nombre, email_norm, telefono_norm FROM clientes"
+    REPARENTAR_ORDENES = "UPDATE ordenes_trabajo SET cliente_id = ?, version = version + 1 WHERE cliente_id = ?"
+    COMPLETAR = """
+        UPDATE clientes SET
+            email = COALESCE(email, ?), telefono = COALESCE(telefono, ?),
+            direccion = COALESCE(direccion, ?), email_norm = COALESCE(email_norm, ?),
+            telefono_norm = COALESCE(telefono_norm, ?), version = version + 1
+        WHERE id = ?
+    """
+    ELIMINAR = "DELETE FROM clientes WHERE id = ?"
+    TODOS = f"SELECT {CLIENTE_COLUMNAS} FROM clientes"
+
+class TecnicoQueries:
+    """
+    Sentencias SQL estáticas de la entidad Tecnico.
+    """
+    INSERTAR = "INSERT INTO tecnicos (nombre, especialidad, email, telefono, uuid) VALUES (?, ?, ?, ?, ?)"
+    POR_NOMBRE = f"SELECT {TECNICO_COLUMNAS} FROM tecnicos WHERE nombre = ?"
+    POR_ID = f"SELECT {TECNICO_COLUMNAS} FROM tecnicos WHERE id = ?"
+    TODOS = f"SELECT {TECNICO_COLUMNAS} FROM tecnicos"
+
+class ServicioQueries:
+    """
+    Sentencias SQL estáticas de la entidad Servicio.
+    """
+    INSERTAR = "INSERT INTO servicios (tipo, descripcion_id, costo_base, duracion_estimada, uuid) VALUES (?, ?, ?, ?, ?)"
+    POR_ID = f"SELECT {SERVICIO_COLUMNAS} FROM servicios WHERE id = ?"
+    TODOS = f"SELECT {SERVICIO_COLUMNAS} FROM servicios"
+
+class OrdenQueries:
+    """
+    Sentencias SQL estáticas de la entidad OrdenDeTrabajo.
+    """
+    INSERTAR = """
+        INSERT INTO ordenes_trabajo (
+            cliente_id, tecnico_id, servicio_id, creado_en,
+            estado, descripcion_id, costo_total, uuid
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    LISTADO = """
+        SELECT o.id, c.nombre, t.nombre, s.tipo, o.estado,
+               datetime(o.creado_en, 'unixepoch', 'localtime')
+        FROM ordenes_trabajo o
+        JOIN clientes c ON o.cliente_id = c.id
+        JOIN tecnicos t ON o.tecnico_id = t.id
+        JOIN servicios s ON o.servicio_id = s.id
+    """
+    # Rango [desde, hasta) en epoch sobre idx_ordenes_creado_en
+    POR_RANGO = LISTADO + " WHERE o.creado_en >= ? AND o.creado_en < ? ORDER BY o.creado_en, o.id"
+    POR_RANGO_ESTADO = LISTADO + """
+        WHERE o.creado_en >= ? AND o.creado_en < ? AND o.estado = ? ORDER BY o.creado_en, o.id
+    """
+    RESUMEN_RANGO = """
+        SELECT estado, COUNT(*), COALESCE(SUM(costo_total), 0)
+        FROM ordenes_trabajo
+        WHERE creado_en >= ? AND creado_en < ?
+        GROUP BY estado
+    """
+    # Recorre solo idx_ordenes_estado_fecha; {marcadores} son los estados cerrados
+    ABIERTAS_POR_ESTADO = """
+        SELECT estado, COUNT(*) FROM ordenes_trabajo
+        WHERE estado NOT IN ({marcadores})
+        GROUP BY estado
+    """
+
+class HistorialQueries:
+    """
+    Sentencias SQL del historial de órdenes de un cliente.
+    
+    Las páginas se recorren por keyset (creado_en, id) sobre el índice
+    cubriente idx_ordenes_cliente_fecha, sin OFFSET, por lo que el costo de
+    cada página no depende de cuántas órdenes tenga el cliente.
+    """
+    _PAGINA = """
+        SELECT o.id, o.creado_en, s.tipo, o.estado, o.costo_total
+        FROM ordenes_trabajo o
+        JOIN servicios s ON o.servicio_id = s.id
+        WHERE o.cliente_id = ? {}
+        ORDER BY o.creado_en DESC, o.id DESC
+        LIMIT ?
+    """
+    PRIMERA_PAGINA = _PAGINA.format("")
+    PAGINA_SIGUIENTE = _PAGINA.format("AND (o.creado_en, o.id) < (?, ?)")
+    TOTAL = "SELECT COUNT(*) FROM ordenes_trabajo WHERE cliente_id = ?"
+    DETALLE = """
+        SELECT desempaquetar_texto(d_o.texto), desempaquetar_texto(d_s.texto),
+               s.costo_base, s.duracion_estimada, t.nombre
+        FROM ordenes_trabajo o
+        JOIN servicios s ON o.servicio_id = s.id
+        LEFT JOIN tecnicos t ON o.tecnico_id = t.id
+        LEFT JOIN descripciones d_o ON d_o.id = o.descripcion_id
+        LEFT JOIN descripciones d_s ON d_s.id = s.descripcion_id
+        WHERE o.id = ?
+    """
+
+class DescripcionQueries:
+    """
+    Sentencias SQL de la tabla 'descripciones' (ver models.descriptions).
+    
+    MIGRAR_TEXTOS y MIGRAR_REFERENCIAS pasan la columna de texto de una
+    tabla con el esquema anterior ({tabla}, que puede llevar esquema) a la
+    tabla de descripciones y a su columna descripcion_id.
+    """
+    POR_HUELLA = "SELECT id FROM descripciones WHERE huella = ?"
+    INSERTAR = "INSERT OR IGNORE INTO descripciones (huella, texto) VALUES (?, ?)"
+    TEXTO = "SELECT texto FROM descripciones WHERE id = ?"
+    MIGRAR_TEXTOS = """
+        INSERT OR IGNORE INTO main.descripciones (huella, texto)
+        SELECT huella_texto(descripcion), empaquetar_texto(descripcion)
+        FROM (SELECT DISTINCT descripcion FROM {tabla} WHERE descripcion IS NOT NULL)
+    """
+    MIGRAR_REFERENCIAS = """
+        UPDATE {tabla} SET descripcion_id = (
+            SELECT id FROM main.descripciones WHERE huella = huella_texto(descripcion)
+        )
+        WHERE descripcion IS NOT NULL
+    """
+
+class VersionQueries:
+    """
+    Plantillas de escritura con control de versión (ver models.concurrency),
+    con {tabla} una de las tablas principales y {asignaciones} las
+    columnas modificadas ('col = ?, ...').
+    """
+    ACTUALIZAR = "UPDATE {tabla} SET {asignaciones}, version = version + 1 WHERE id = ? AND version = ?"
+    ELIMINAR = "DELETE FROM {tabla} WHERE id = ? AND version = ?"
+    ACTUAL = "SELECT * FROM {tabla} WHERE id = ?"
+
+class ListadoQueries:
+    """
+    Condiciones de keyset de models.listing, con {e} la primera expresión
+    de orden, {claves} todas ellas, {k} la última (única) y {op} '>' o '<'
+    según el sentido.
+    """
+    KEYSET_SIMPLE = "{e} {op} ?"
+    KEYSET = "{e} {op}= ? AND ({claves}) {op} ({marcadores})"
+    # Última fila con {e} NULL en orden descendente: solo quedan NULL
+    NULOS_SIGUIENTES = "{e} IS NULL AND {k} {op} ?"
+    # Última fila con {e} NULL en orden ascendente: NULL restantes y luego valores
+    NULOS_Y_VALORES = "(({e} IS NULL AND {k} {op} ?) OR {e} IS NOT NULL)"
+
+@lru_cache(maxsize=64)
+def placeholders(n: int) -> str:
+    """
+    Devuelve la lista de marcadores '?, ?, ...' para una cláusula IN.
+    
+    Args:
+        n (int): Número de marcadores
+        
+    Returns:
+        str: Marcadores separados por comas
+    """
+    return ", ".join("?" * n)
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE // 2)
+def build_select(table: str, columns: Sequence[str], where: Tuple[str, ...] = (),
+                 order_by: str = None, limit: bool = False) -> str:
+    """
+    Construye una sentencia SELECT parametrizada y la memoriza.
+    
+    Las condiciones se combinan con AND y cada una debe usar marcadores
+    '?'. Como el resultado se memoriza, la misma combinación devuelve
+    siempre la misma cadena y sqlite3 reutiliza su sentencia preparada.
+    
+    Args:
+        table (str): Tabla o expresión FROM
+        columns (Sequence[str]): Columnas a seleccionar (tupla, para poder memorizar)
+        where (Tuple[str, ...]): Condiciones con marcadores
+        order_by (str, opcional): Expresión ORDER BY
+        limit (bool): Si es True se agrega 'LIMIT ?'
+        
+    Returns:
+        str: Sentencia SQL
+    """
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if order_by:
+        sql += f" ORDER BY {order_by}"
+    if limit:
+        sql += " LIMIT ?"
+    return sql
+
+class AgendaQueries:
+    """
+    Sentencias SQL estáticas de la agenda de técnicos.
+    """
+    INSERTAR = "INSERT INTO agenda (orden_id, tecnico_id, inicio, fin) VALUES (?, ?, ?, ?)"
+    DESDE = "SELECT tecnico_id, inicio, fin FROM agenda WHERE fin > ?"
+    TECNICOS = "SELECT id, especialidad FROM tecnicos"
+    ORDEN = """
+        SELECT o.id, o.tecnico_id, s.tipo, s.duracion_estimada
+        FROM ordenes_trabajo o
+        JOIN servicios s ON o.servicio_id = s.id
+        WHERE o.id = ?
+    """
+    PENDIENTES = """
+        SELECT o.id, o.tecnico_id, s.tipo, s.duracion_estimada
+        FROM ordenes_trabajo o
+        JOIN servicios s ON o.servicio_id = s.id
+        LEFT JOIN agenda a ON a.orden_id = o.id
+        WHERE o.estado = 'Pendiente' AND a.orden_id IS NULL
+    """
+    # Cola del planificador: órdenes pendientes aún sin turno
+    SIN_AGENDAR = "SELECT COUNT(*) FROM (" + PENDIENTES + ")"
+    REASIGNAR_ORDEN = "UPDATE ordenes_trabajo SET tecnico_id = ?, version = version + 1 WHERE id = ?"
+
+class FacturaQueries:
+    """
+    Sentencias SQL de la facturación (ver models.invoicing).
+    """
+    # Órdenes completadas creadas en [desde, hasta) con id > ?, por id
+    COMPLETADAS = """
+        SELECT o.id, o.creado_en, o.costo_total,
+               c.id, c.nombre, c.email, c.telefono, c.direccion,
+               t.nombre, s.tipo, s.costo_base, s.duracion_estimada,
+               desempaquetar_texto(d.texto)
+        FROM ordenes_trabajo o
+        JOIN clientes c ON o.cliente_id = c.id
+        JOIN servicios s ON o.servicio_id = s.id
+        LEFT JOIN tecnicos t ON o.tecnico_id = t.id
+        LEFT JOIN descripciones d ON o.descripcion_id = d.id
+        WHERE o.estado = 'Completada' AND o.id > ? AND o.creado_en >= ? AND o.creado_en < ?
+        ORDER BY o.id
+    """
+
+class UbicacionQueries:
+    """
+    Sentencias SQL de los índices R*Tree de ubicaciones (ver
+    models.routing), con {tabla} 'clientes' o 'tecnicos'.
+    """
+    GUARDAR = """
+        INSERT OR REPLACE INTO ubicacion_{tabla} (id, min_lat, max_lat, min_lon, max_lon, latitud, longitud)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+    ELIMINAR = "DELETE FROM ubicacion_{tabla} WHERE id = ?"
+    POR_ID = "SELECT latitud, longitud FROM ubicacion_{tabla} WHERE id = ?"
+    CLIENTES_SIN_UBICAR = """
+        SELECT c.id, c.direccion FROM clientes c
+        WHERE c.direccion IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM ubicacion_clientes u WHERE u.id = c.id)
+    """
+    # Técnicos cuya ubicación cae en la caja (lat_min, lat_max, lon_min, lon_max)
+    TECNICOS_EN_CAJA = """
+        SELECT u.id, t.nombre, t.especialidad, u.latitud, u.longitud
+        FROM ubicacion_tecnicos u
+        JOIN tecnicos t ON t.id = u.id
+        WHERE u.max_lat >= ? AND u.min_lat <= ? AND u.max_lon >= ? AND u.min_lon <= ?
+    """
+    ORDEN = """
+        SELECT o.cliente_id, s.tipo
+        FROM ordenes_trabajo o
+        JOIN servicios s ON o.servicio_id = s.id
+        WHERE o.id = ?
+    """
+
+class CambioQueries:
+    """
+    Sentencias SQL del registro de cambios (tabla 'cambios').
+    """
+    COLUMNAS = ("seq", "tabla", "fila_id", "operacion", "momento")
+    CURSOR = "SELECT seq FROM cambios_cursores WHERE consumidor = ?"
+    GUARDAR_CURSOR = """
+        INSERT INTO cambios_cursores (consumidor, seq) VALUES (?, ?)
+        ON CONFLICT(consumidor) DO UPDATE SET seq = excluded.seq
+    """
+    ULTIMO = "SELECT COALESCE(MAX(seq), 0) FROM cambios"
+    # Contador de cambios: no retrocede aunque se purgue la tabla
+    CONTADOR = "SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'cambios'), 0)"
+    PRIMERO_DESDE = "SELECT MIN(seq) FROM cambios WHERE seq > ?"
+    PURGAR = "DELETE FROM cambios WHERE seq <= (SELECT MIN(seq) FROM cambios_cursores)"
+    # Retención: cambios con más de ? días (formato '-N days'), se hayan leído o no
+    PURGAR_ANTIGUOS = "DELETE FROM cambios WHERE momento < datetime('now', ?)"
+    # Cambios aún no leídos por cada consumidor
+    PENDIENTES_POR_CONSUMIDOR = """
+        SELECT k.consumidor, (SELECT COUNT(*) FROM cambios WHERE seq > k.seq)
+        FROM cambios_cursores k
+    """
@@ -0,0 +1,81 @@
+from typing import Tuple, Any
+
+class Registro:
+    """
+    Base de los registros ligeros de solo lectura devueltos por las
+    consultas de streaming.
+    
+    Cada subclase declara en __slots__ las columnas en el mismo orden que la
+    sentencia correspondiente de models.queries, de modo que puede usarse
+    directamente como row_factory de DatabaseConnection.iter_rows(). Sin
+    __dict__, cada instancia ocupa mucho menos que un objeto de dominio.
+    """
+    __slots__ = ()
+
+    def __init__(self, *valores):
+        for campo, valor in zip(self.__slots__, valores):
+            setattr(self, campo, valor)
+
+    def as_tuple(self) -> Tuple[Any, ...]:
+        """
+        Devuelve los valores en el orden de las columnas, por ejemplo para
+        insertarlos en un ttk.Treeview.
+        
+        Returns:
+            Tuple[Any, ...]: Valores del registro
+        """
+        return tuple(getattr(self, campo) for campo in self.__slots__)
+
+    def __repr__(self):
+        valores = ", ".join(f"{campo}={getattr(self, campo)!r}" for campo in self.__slots__)
+        return f"{self.__class__.__name__}({valores})"
+
+class ClienteRegistro(Registro):
+    """
+    Fila de ClienteQueries.TODOS / POR_NOMBRE / POR_ID.
+    """
+    __slots__ = ("id", "nombre", "email", "telefono", "direccion", "version")
+
+class TecnicoRegistro(Registro):
+    """
+    Fila de TecnicoQueries.TODOS / POR_NOMBRE / POR_ID.
+    """
+    __slots__ = ("id", "nombre", "especialidad", "email", "telefono", "version")
+
+class ServicioRegistro(Registro):
+    """
+    Fila de ServicioQueries.TODOS / POR_ID.
+    """
+    __slots__ = ("id", "tipo", "descripcion_id", "costo_base", "duracion_estimada", "version")
+
+class OrdenListadoRegistro(Registro):
+    """
+    Fila de OrdenQueries.LISTADO.
+    """
+    __slots__ = ("id", "cliente", "tecnico", "servicio", "estado", "fecha_creacion")
+
+class CambioRegistro(Registro):
+    """
+    Fila de la tabla 'cambios' (ver models.cdc).
+    """
+    __slots__ = ("seq", "tabla", "fila_id", "operacion", "momento")
+
+class HistorialRegistro(Registro):
+    """
+    Fila de HistorialQueries.PRIMERA_PAGINA / PAGINA_SIGUIENTE.
+    """
+    __slots__ = ("id", "creado_en", "servicio", "estado", "costo_total")
+
+class MantenimientoRegistro(Registro):
+    """
+    Fila de la tabla 'mantenimiento' (ver models.maintenance).
+    """
+    __slots__ = ("tarea", "ultima_ejecucion", "duracion", "resultado")
+
+class FacturaRegistro(Registro):
+    """
+    Fila de FacturaQueries.COMPLETADAS.
+    """
+    __slots__ = ("orden_id", "creado_en", "costo_total",
+                 "cliente_id", "cliente", "email", "telefono", "direccion",
+                 "tecnico", "tipo_servicio", "costo_base", "duracion_estimada", "descripcion")
@@ -0,0 +1,371 @@
+"""
+Réplica de lectura en memoria de clientes, técnicos y servicios.
+
+Cada tabla se guarda por columnas (los enteros y reales en array.array,
+el texto en listas) con índices hash por id, nombre y email. Las lecturas
+del UI (listados, búsquedas por nombre o email, combobox) se resuelven en
+memoria sin tocar SQLite.
+
+La réplica se mantiene al día con el contador de la tabla 'cambios' (ver
+models.cdc): al leer, si esta conexión escribió algo (total_changes) o
+pasó más de 'max_lag' segundos desde la última revisión, se leen los
+cambios nuevos y solo se vuelven a consultar las filas afectadas. Si los
+cambios pendientes ya fueron purgados, la tabla se recarga completa.
+
+El tamaño en memoria se estima por tabla; si la suma supera 'max_bytes'
+se descarta la tabla usada hace más tiempo y sus lecturas vuelven a ir a
+SQLite hasta que se vuelva a cargar.
+
+Uso:
+    SGST_REPLICA_MB=0 python main.py     # desactiva la réplica
+"""
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from models.db_connection import DatabaseConnection
+from models.normalization import normalizar_email, normalizar_texto
+from models.queries import (CambioQueries, ClienteQueries, TecnicoQueries, ServicioQueries,
+                            build_select, placeholders)
+from models.records import ClienteRegistro, TecnicoRegistro, ServicioRegistro, Registro
+
+ENV_REPLICA_MB = "SGST_REPLICA_MB"
+MAX_MB_POR_DEFECTO = 64
+# Bytes estimados por fila para las entradas de los índices
+_COSTO_INDICE = 120
+# Ids por consulta al releer filas modificadas
+_LOTE_IDS = 500
+
+class TablaReplicada:
+    """
+    Descripción de una tabla replicada.
+
+    Atributos:
+        nombre (str): Tabla de SQLite
+        registro (type): Subclase de Registro con las columnas, id primero
+        tipos (Tuple[str, ...]): Código de array.array por columna o '' para
+            guardar la columna en una lista (texto o valores que pueden ser NULL)
+        indices (Dict[str, Tuple[Callable, str]]): campo -> (normalizador,
+            condición SQL equivalente para leer sin réplica)
+        todos (str): Consulta de todas las filas
+        por_id (str): Consulta de una fila por id
+    """
+    def __init__(self, nombre: str, registro: type, tipos: Sequence[str],
+                 indices: Dict[str, Tuple[Callable[[Any], Any], str]], todos: str, por_id: str):
+        self.nombre = nombre
+        self.registro = registro
+        self.columnas = registro.__slots__
+        self.tipos = tuple(tipos)
+        self.indices = indices
+        self.todos = todos
+        self.por_id = por_id
+
+TABLAS_REPLICADAS: Dict[str, TablaReplicada] = {
+    tabla.nombre: tabla for tabla in (
+        TablaReplicada("clientes", ClienteRegistro, ("q", "", "", "", "", "q"), {
+            "nombre": (normalizar_texto, "nombre_norm = ?"),
+            "email": (normalizar_email, "email_norm = ?"),
+        }, ClienteQueries.TODOS, ClienteQueries.POR_ID),
+        TablaReplicada("tecnicos", TecnicoRegistro, ("q", "", "", "", "", "q"), {
+            "nombre": (normalizar_texto, "norm_texto(nombre) = ?"),
+            "email": (normalizar_email, "norm_email(email) = ?"),
+            "especialidad": (normalizar_texto, "norm_texto(especialidad) = ?"),
+        }, TecnicoQueries.TODOS, TecnicoQueries.POR_ID),
+        TablaReplicada("servicios", ServicioRegistro, ("q", "", "", "d", "", "q"), {
+            "tipo": (normalizar_texto, "norm_texto(tipo) = ?"),
+        }, ServicioQueries.TODOS, ServicioQueries.POR_ID),
+    )
+}
+
+class ColumnStore:
+    """
+    Filas de una tabla guardadas por columnas, con índices hash.
+
+    Los borrados mueven la última fila al hueco, así que el orden físico
+    no es el de los ids; todas() ordena por id solo cuando hace falta.
+
+    Atributos:
+        tabla (TablaReplicada): Tabla almacenada
+        bytes (int): Tamaño estimado en memoria
+    """
+    def __init__(self, tabla: TablaReplicada):
+        self.tabla = tabla
+        self._columnas = [array(tipo) if tipo else [] for tipo in tabla.tipos]
+        self._pos: Dict[int, int] = {}
+        self._indices: Dict[str, Dict[Any, List[int]]] = {campo: {} for campo in tabla.indices}
+        self._normalizadores = [(campo, tabla.columnas.index(campo), tabla.indices[campo][0])
+                                for campo in tabla.indices]
+        self._ordenado = True
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    def cargar(self, filas: Iterable[Sequence[Any]]):
+        """
+        Agrega filas (por ejemplo todas las de la tabla al crear la réplica).
+        """
+        for fila in filas:
+            self.upsert(fila)
+
+    def upsert(self, fila: Sequence[Any]):
+        """
+        Inserta o reemplaza una fila, manteniendo los índices.
+        """
+        fila_id = fila[0]
+        pos = self._pos.get(fila_id)
+        if pos is not None:
+            self._desindexar(pos)
+            self.bytes -= self._tamano(pos)
+            for columna, valor in zip(self._columnas, fila):
+                columna[pos] = valor
+        else:
+            if self._pos and fila_id < self._columnas[0][-1]:
+                self._ordenado = False
+            pos = len(self._pos)
+            self._pos[fila_id] = pos
+            for columna, valor in zip(self._columnas, fila):
+                columna.append(valor)
+        self.bytes += self._tamano(pos)
+        for campo, i, normalizar in self._normalizadores:
+            self._indices[campo].setdefault(normalizar(fila[i]), []).append(fila_id)
+
+    def eliminar(self, fila_id: int):
+        """
+        Quita una fila si está presente.
+        """
+        pos = self._pos.pop(fila_id, None)
+        if pos is None:
+            return
+        self._desindexar(pos)
+        self.bytes -= self._tamano(pos)
+        ultima = len(self._pos)
+        if pos != ultima:
+            for columna in self._columnas:
+                columna[pos] = columna[ultima]
+            self._pos[self._columnas[0][pos]] = pos
+            self._ordenado = False
+        for columna in self._columnas:
+            columna.pop()
+
+    def fila(self, fila_id: int) -> Optional[Registro]:
+        """
+        Devuelve la fila con ese id o None.
+        """
+        pos = self._pos.get(fila_id)
+        return None if pos is None else self._registro(pos)
+
+    def buscar(self, campo: str, valor: Any) -> List[Registro]:
+        """
+        Filas cuyo campo normalizado coincide con el valor normalizado, por id.
+        """
+        normalizar = self.tabla.indices[campo][0]
+        ids = self._indices[campo].get(normalizar(valor), ())
+        return [self._registro(self._pos[fila_id]) for fila_id in sorted(ids)]
+
+    def todas(self) -> List[Registro]:
+        """
+        Todas las filas por id ascendente, como las devuelve SQLite.
+        """
+        if not self._ordenado:
+            self._reordenar()
+        return [self._registro(pos) for pos in range(len(self._pos))]
+
+    def _registro(self, pos: int) -> Registro:
+        return self.tabla.registro(*(columna[pos] for columna in self._columnas))
+
+    def _desindexar(self, pos: int):
+        fila_id = self._columnas[0][pos]
+        for campo, i, normalizar in self._normalizadores:
+            clave = normalizar(self._columnas[i][pos])
+            ids = self._indices[campo][clave]
+            ids.remove(fila_id)
+            if not ids:
+                del self._indices[campo][clave]
+
+    def _tamano(self, pos: int) -> int:
+        return _COSTO_INDICE + sum(sys.getsizeof(columna[pos]) if not tipo else columna.itemsize
+                                   for columna, tipo in zip(self._columnas, self.tabla.tipos))
+
+    def _reordenar(self):
+        orden = sorted(range(len(self._pos)), key=self._columnas[0].__getitem__)
+        self._columnas = [array(tipo, (columna[i] for i in orden)) if tipo else [columna[i] for i in orden]
+                          for columna, tipo in zip(self._columnas, self.tabla.tipos)]
+        self._pos = {fila_id: pos for pos, fila_id in enumerate(self._columnas[0])}
+        self._ordenado = True
+
+class ReadReplica:
+    """
+    Capa de lectura en memoria sobre DatabaseConnection.
+
+    Las tablas se cargan la primera vez que se leen. Si una tabla no está
+    cargada (réplica desactivada o tabla descartada por memoria) la lectura
+    va a SQLite con el mismo resultado.
+
+    Atributos:
+        db (DatabaseConnection): Base replicada
+        max_bytes (int): Memoria máxima estimada; 0 desactiva la réplica
+        max_lag (float): Segundos que una lectura puede servirse sin revisar
+            los cambios de otros procesos
+    """
+    def __init__(self, db: DatabaseConnection = None, max_bytes: int = None, max_lag: float = 1.0):
+        self.db = db or DatabaseConnection()
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get(ENV_REPLICA_MB, MAX_MB_POR_DEFECTO)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.max_lag = max_lag
+        self._tablas: "OrderedDict[str, ColumnStore]" = OrderedDict()
+        # Tablas que por sí solas superan max_bytes: se leen siempre de SQLite
+        self._excluidas = set()
+        self._seq = 0
+        self._cambios_locales = -1
+        self._revisado = 0.0
+        self._lock = threading.RLock()
+        self.lecturas_memoria = 0
+        self.lecturas_sqlite = 0
+
+    def todos(self, tabla: str) -> List[Registro]:
+        """
+        Todas las filas de la tabla por id ascendente.
+        """
+        with self._lock:
+            store = self._store(tabla)
+            if store is not None:
+                return store.todas()
+        return list(self.db.iter_rows(TABLAS_REPLICADAS[tabla].todos,
+                                      row_factory=TABLAS_REPLICADAS[tabla].registro))
+
+    def por_id(self, tabla: str, fila_id: int) -> Optional[Registro]:
+        """
+        Fila con ese id o None.
+        """
+        with self._lock:
+            store = self._store(tabla)
+            if store is not None:
+                return store.fila(fila_id)
+        fila = self.db.fetch_one(TABLAS_REPLICADAS[tabla].por_id, (fila_id,))
+        return TABLAS_REPLICADAS[tabla].registro(*fila) if fila else None
+
+    def buscar(self, tabla: str, campo: str, valor: Any) -> List[Registro]:
+        """
+        Filas cuyo campo coincide con el valor, sin distinguir mayúsculas ni
+        acentos (nombres) o mayúsculas y espacios (emails), por id ascendente.
+
+        Raises:
+            ValueError: Si el campo no tiene índice
+        """
+        definicion = TABLAS_REPLICADAS[tabla]
+        if campo not in definicion.indices:
+            raise ValueError(f"{tabla}.{campo} no tiene índice en la réplica")
+        with self._lock:
+            store = self._store(tabla)
+            if store is not None:
+                return store.buscar(campo, valor)
+        normalizar, condicion = definicion.indices[campo]
+        sql = build_select(tabla, definicion.columnas, (condicion,), "id")
+        return list(self.db.iter_rows(sql, (normalizar(valor),), row_factory=definicion.registro))
+
+    def refrescar(self, forzar: bool = False):
+        """
+        Aplica los cambios registrados desde la última revisión.
+
+        Sin 'forzar', no ejecuta SQL si esta conexión no escribió nada y la
+        última revisión tiene menos de 'max_lag' segundos.
+        """
+        with self._lock:
+            if not self._tablas:
+                return
+            cambios_locales = self.db.total_changes
+            if (not forzar and cambios_locales == self._cambios_locales
+                    and time.monotonic() - self._revisado < self.max_lag):
+                return
+            contador = self.db.fetch_one(CambioQueries.CONTADOR)[0]
+            if contador != self._seq:
+                primero = self.db.fetch_one(CambioQueries.PRIMERO_DESDE, (self._seq,))[0]
+                if contador < self._seq or primero is None or primero > self._seq + 1:
+                    # Cambios purgados antes de leerlos: recargar todo
+                    for tabla in list(self._tablas):
+                        self._tablas[tabla] = self._cargar(tabla)
+                else:
+                    self._aplicar(contador)
+                self._seq = contador
+            self._cambios_locales = self.db.total_changes
+            self._revisado = time.monotonic()
+
+    def memoria(self) -> Dict[str, int]:
+        """
+        Bytes estimados por tabla cargada.
+        """
+        return {tabla: store.bytes for tabla, store in self._tablas.items()}
+
+    def limpiar(self):
+        """
+        Descarta todas las tablas cargadas.
+        """
+        with self._lock:
+            self._tablas.clear()
+            self._excluidas.clear()
+
+    def _store(self, tabla: str) -> Optional[ColumnStore]:
+        if tabla not in TABLAS_REPLICADAS:
+            raise ValueError(f"Tabla no replicada: {tabla}")
+        if self.max_bytes <= 0 or tabla in self._excluidas:
+            self.lecturas_sqlite += 1
+            return None
+        self.refrescar()
+        store = self._tablas.get(tabla)
+        if store is None:
+            if not self._tablas:
+                self._seq = self.db.fetch_one(CambioQueries.CONTADOR)[0]
+                self._cambios_locales = self.db.total_changes
+                self._revisado = time.monotonic()
+            store = self._cargar(tabla)
+            if store.bytes > self.max_bytes:
+                self._excluidas.add(tabla)
+                self.lecturas_sqlite += 1
+                return None
+            self._tablas[tabla] = store
+            self._liberar()
+        self._tablas.move_to_end(tabla)
+        self.lecturas_memoria += 1
+        return store
+
+    def _cargar(self, tabla: str) -> ColumnStore:
+        store = ColumnStore(TABLAS_REPLICADAS[tabla])
+        store.cargar(self.db.iter_rows(TABLAS_REPLICADAS[tabla].todos))
+        return store
+
+    def _aplicar(self, hasta: int):
+        cambiados: Dict[str, set] = {tabla: set() for tabla in self._tablas}
+        sql = build_select("cambios", ("tabla", "fila_id"),
+                           ("seq > ?", "seq <= ?", f"tabla IN ({placeholders(len(cambiados))})"))
+        for tabla, fila_id in self.db.iter_rows(sql, (self._seq, hasta, *cambiados)):
+            cambiados[tabla].add(fila_id)
+        for tabla, ids in cambiados.items():
+            store = self._tablas[tabla]
+            if len(ids) > len(store) // 2 + _LOTE_IDS:
+                self._tablas[tabla] = self._cargar(tabla)
+                continue
+            pendientes = sorted(ids)
+            for inicio in range(0, len(pendientes), _LOTE_IDS):
+                lote = pendientes[inicio:inicio + _LOTE_IDS]
+                sql = build_select(tabla, store.tabla.columnas, (f"id IN ({placeholders(len(lote))})",))
+                presentes = set()
+                for fila in self.db.fetch_all(sql, tuple(lote)):
+                    store.upsert(fila)
+                    presentes.add(fila[0])
+                for fila_id in lote:
+                    if fila_id not in presentes:
+                        store.eliminar(fila_id)
+        self._liberar()
+
+    def _liberar(self):
+        # Descarta tablas, de la usada hace más tiempo a la más reciente,
+        # hasta entrar en max_bytes
+        total = sum(store.bytes for store in self._tablas.values())
+        while self._tablas and total > self.max_bytes:
+            _, store = self._tablas.popitem(last=False)
+            total -= store.bytes
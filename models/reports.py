@@ -0,0 +1,91 @@
+"""
+Reportes de órdenes por período.
+
+Los períodos se traducen a un rango [desde, hasta) de epoch y se consultan
+sobre el índice idx_ordenes_creado_en (creado_en, estado, costo_total),
+por lo que "las órdenes de esta semana" lee solo esa porción del índice y
+el resumen por estado no toca la tabla.
+
+Uso:
+    python -m models.reports --periodo semana
+    python -m models.reports --periodo mes --fecha 2026-09-15 --detalle
+"""
+import argparse
+from typing import Dict, List, Tuple
+from models.db_connection import DatabaseConnection
+from models.queries import OrdenQueries
+from models.records import OrdenListadoRegistro
+from models.timestamps import Fecha, Rango, a_epoch, rango_dia, rango_semana, rango_mes
+
+PERIODOS = {"dia": rango_dia, "semana": rango_semana, "mes": rango_mes}
+
+class OrderReport:
+    """
+    Consultas de órdenes por rango de fechas.
+
+    Atributos:
+        db (DatabaseConnection): Conexión a la base de datos
+    """
+    def __init__(self, db: DatabaseConnection = None):
+        self.db = db or DatabaseConnection()
+
+    def ordenes(self, desde: Fecha, hasta: Fecha, estado: str = None) -> List[OrdenListadoRegistro]:
+        """
+        Órdenes creadas en [desde, hasta), de la más antigua a la más reciente.
+
+        Args:
+            desde (Fecha): Inicio inclusivo
+            hasta (Fecha): Fin exclusivo
+            estado (str, opcional): Solo las órdenes en ese estado
+
+        Returns:
+            List[OrdenListadoRegistro]: Órdenes del rango
+        """
+        if estado is None:
+            filas = self.db.iter_rows(OrdenQueries.POR_RANGO, (a_epoch(desde), a_epoch(hasta)),
+                                      row_factory=OrdenListadoRegistro)
+        else:
+            filas = self.db.iter_rows(OrdenQueries.POR_RANGO_ESTADO, (a_epoch(desde), a_epoch(hasta), estado),
+                                      row_factory=OrdenListadoRegistro)
+        return list(filas)
+
+    def resumen(self, desde: Fecha, hasta: Fecha) -> Dict[str, Tuple[int, float]]:
+        """
+        Cantidad de órdenes y facturación por estado en [desde, hasta).
+
+        Returns:
+            Dict[str, Tuple[int, float]]: estado -> (órdenes, suma de costo_total)
+        """
+        filas = self.db.fetch_all(OrdenQueries.RESUMEN_RANGO, (a_epoch(desde), a_epoch(hasta)))
+        return {estado: (cantidad, total) for estado, cantidad, total in filas}
+
+    def periodo(self, nombre: str, referencia: Fecha = None) -> Rango:
+        """
+        Rango del período ('dia', 'semana' o 'mes') que contiene la referencia.
+
+        Raises:
+            ValueError: Si el período no existe
+        """
+        if nombre not in PERIODOS:
+            raise ValueError(f"Período desconocido: {nombre}")
+        return PERIODOS[nombre](referencia)
+
+def main(argv: List[str] = None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Resumen de órdenes por período")
+    parser.add_argument("--periodo", choices=PERIODOS, default="semana")
+    parser.add_argument("--fecha", help="Día de referencia (YYYY-MM-DD); por defecto hoy")
+    parser.add_argument("--detalle", action="store_true", help="Listar también las órdenes")
+    args = parser.parse_args(argv)
+    reporte = OrderReport()
+    desde, hasta = reporte.periodo(args.periodo, args.fecha)
+    for estado, (cantidad, total) in sorted(reporte.resumen(desde, hasta).items()):
+        print(f"{estado:<12} {cantidad:>6} {total:>12.2f}")
+    if args.detalle:
+        for orden in reporte.ordenes(desde, hasta):
+            print("\t".join(str(valor) for valor in orden.as_tuple()))
+
+if __name__ == "__main__":
+    main()
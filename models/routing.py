@@ -0,0 +1,280 @@
+"""
+Técnicos más cercanos a un cliente.
+
+Clientes y técnicos pueden tener una ubicación (latitud y longitud en
+grados) guardada en los índices R*Tree 'ubicacion_clientes' y
+'ubicacion_tecnicos'. Las ubicaciones se obtienen sin conexión a
+internet de un nomenclador local: un CSV 'lugar,latitud,longitud' con
+direcciones o localidades (ver Gazetteer).
+
+La búsqueda de los k técnicos más cercanos consulta el R*Tree con una
+caja alrededor del cliente y la duplica hasta que contiene k técnicos
+capacitados a una distancia no mayor que su radio. Cada consulta recorre
+solo las ramas del árbol que tocan la caja, así que el costo depende de
+los técnicos de la zona y no del total.
+
+Uso:
+    python -m models.routing --gazetteer lugares.csv [--tecnicos bases.csv]
+    python -m models.routing --orden 42 [-k 5]
+"""
+import argparse
+import csv
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+from models.db_connection import DatabaseConnection
+from models.normalization import normalizar_texto
+from models.queries import TecnicoQueries, UbicacionQueries
+from models.scheduling import especialidades_por_tipo
+
+RADIO_TIERRA_KM = 6371.0
+# Radio de la primera caja y radio a partir del cual se abarca todo el planeta
+RADIO_INICIAL_KM = 2.0
+RADIO_MAXIMO_KM = math.pi * RADIO_TIERRA_KM
+
+Coordenadas = Tuple[float, float]
+# (tecnico_id, nombre, especialidad, distancia_km)
+Cercano = Tuple[int, str, str, float]
+
+def distancia_km(a: Coordenadas, b: Coordenadas) -> float:
+    """
+    Distancia de círculo máximo (haversine) entre dos puntos en grados.
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * math.asin(min(1.0, math.sqrt(h)))
+
+def caja(centro: Coordenadas, radio_km: float) -> Tuple[float, float, float, float]:
+    """
+    Caja (lat_min, lat_max, lon_min, lon_max) que contiene el círculo dado.
+
+    Si el círculo llega a un polo o cruza el antimeridiano la caja abarca
+    todas las longitudes: sigue siendo correcta, solo menos selectiva.
+    """
+    lat, lon = centro
+    delta = radio_km / RADIO_TIERRA_KM
+    lat_min, lat_max = lat - math.degrees(delta), lat + math.degrees(delta)
+    if lat_min <= -90.0 or lat_max >= 90.0:
+        return max(lat_min, -90.0), min(lat_max, 90.0), -180.0, 180.0
+    dlon = math.degrees(math.asin(math.sin(delta) / math.cos(math.radians(lat))))
+    if lon - dlon < -180.0 or lon + dlon > 180.0:
+        return lat_min, lat_max, -180.0, 180.0
+    return lat_min, lat_max, lon - dlon, lon + dlon
+
+def _clave(lugar: str) -> Tuple[str, ...]:
+    return tuple(parte for parte in (normalizar_texto(p) for p in (lugar or "").split(",")) if parte)
+
+class Gazetteer:
+    """
+    Nomenclador local de direcciones y localidades.
+
+    Una dirección se busca completa y, si no está, sin su primer tramo
+    (separado por comas) y así sucesivamente: 'Av. Siempreviva 742,
+    Palermo, CABA' cae en 'Palermo, CABA' y luego en 'CABA'. Las
+    comparaciones no distinguen mayúsculas, acentos ni espacios.
+
+    Atributos:
+        lugares (Dict[Tuple[str, ...], Coordenadas]): Coordenadas por lugar normalizado
+    """
+    def __init__(self, lugares: Iterable[Tuple[str, float, float]] = ()):
+        self.lugares: Dict[Tuple[str, ...], Coordenadas] = {}
+        for lugar, latitud, longitud in lugares:
+            self.agregar(lugar, latitud, longitud)
+
+    @classmethod
+    def desde_csv(cls, ruta: str) -> "Gazetteer":
+        """
+        Carga un CSV con encabezado 'lugar,latitud,longitud'.
+
+        Raises:
+            ValueError: Si falta una columna o una coordenada no es numérica
+        """
+        with open(ruta, newline="", encoding="utf-8") as f:
+            lector = csv.DictReader(f)
+            try:
+                return cls((fila["lugar"], float(fila["latitud"]), float(fila["longitud"])) for fila in lector)
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"{ruta}:{lector.line_num}: fila inválida ({e})")
+
+    def agregar(self, lugar: str, latitud: float, longitud: float):
+        """
+        Agrega o reemplaza un lugar.
+
+        Raises:
+            ValueError: Si las coordenadas están fuera de rango
+        """
+        validar_coordenadas(latitud, longitud)
+        self.lugares[_clave(lugar)] = (latitud, longitud)
+
+    def ubicar(self, direccion: str) -> Optional[Coordenadas]:
+        """
+        Coordenadas de la dirección o de la localidad más precisa que la
+        contiene, o None si no se encuentra.
+        """
+        clave = _clave(direccion)
+        for inicio in range(len(clave)):
+            coordenadas = self.lugares.get(clave[inicio:])
+            if coordenadas is not None:
+                return coordenadas
+        return None
+
+def validar_coordenadas(latitud: float, longitud: float):
+    """
+    Raises:
+        ValueError: Si la latitud o la longitud están fuera de rango
+    """
+    if not (-90.0 <= latitud <= 90.0 and -180.0 <= longitud <= 180.0):
+        raise ValueError(f"Coordenadas fuera de rango: {latitud}, {longitud}")
+
+def _fila_ubicacion(fila_id: int, latitud: float, longitud: float) -> Tuple:
+    validar_coordenadas(latitud, longitud)
+    return (fila_id, latitud, latitud, longitud, longitud, latitud, longitud)
+
+class DispatchRouter:
+    """
+    Ubicaciones de clientes y técnicos y búsqueda de los técnicos más cercanos.
+
+    Atributos:
+        db (DatabaseConnection): Conexión a la base de datos
+    """
+    def __init__(self, db: DatabaseConnection = None):
+        self.db = db or DatabaseConnection()
+
+    def ubicar(self, tabla: str, fila_id: int, latitud: Optional[float], longitud: Optional[float]):
+        """
+        Guarda (o borra, con coordenadas None) la ubicación de un cliente o técnico.
+
+        Args:
+            tabla (str): 'clientes' o 'tecnicos'
+            fila_id (int): Id del cliente o técnico
+            latitud (float): Latitud en grados
+            longitud (float): Longitud en grados
+
+        Raises:
+            ValueError: Si la tabla no tiene ubicaciones o las coordenadas están fuera de rango
+        """
+        if tabla not in ("clientes", "tecnicos"):
+            raise ValueError(f"La tabla {tabla} no tiene ubicaciones")
+        if latitud is None or longitud is None:
+            self.db.execute_update(UbicacionQueries.ELIMINAR.format(tabla=tabla), (fila_id,))
+        else:
+            self.db.execute_write(UbicacionQueries.GUARDAR.format(tabla=tabla),
+                                  _fila_ubicacion(fila_id, latitud, longitud))
+
+    def ubicacion(self, tabla: str, fila_id: int) -> Optional[Coordenadas]:
+        """
+        Ubicación guardada de un cliente o técnico, o None.
+        """
+        if tabla not in ("clientes", "tecnicos"):
+            raise ValueError(f"La tabla {tabla} no tiene ubicaciones")
+        fila = self.db.fetch_one(UbicacionQueries.POR_ID.format(tabla=tabla), (fila_id,))
+        return (fila[0], fila[1]) if fila else None
+
+    def geocodificar_clientes(self, gazetteer: Gazetteer) -> Tuple[int, int]:
+        """
+        Ubica los clientes con dirección que aún no tienen ubicación.
+
+        Returns:
+            Tuple[int, int]: (clientes ubicados, clientes no encontrados en el nomenclador)
+        """
+        ubicados, faltantes = [], 0
+        for cliente_id, direccion in self.db.iter_rows(UbicacionQueries.CLIENTES_SIN_UBICAR):
+            coordenadas = gazetteer.ubicar(direccion)
+            if coordenadas is None:
+                faltantes += 1
+            else:
+                ubicados.append(_fila_ubicacion(cliente_id, *coordenadas))
+        with self.db.transaction():
+            self.db.execute_many(UbicacionQueries.GUARDAR.format(tabla="clientes"), ubicados)
+        return len(ubicados), faltantes
+
+    def cercanos(self, centro: Coordenadas, k: int = 5,
+                 especialidades: Iterable[str] = None) -> List[Cercano]:
+        """
+        Los k técnicos ubicados más cercanos a un punto.
+
+        Args:
+            centro (Coordenadas): (latitud, longitud) en grados
+            k (int): Cantidad de técnicos
+            especialidades (Iterable[str], opcional): Especialidades admitidas
+                (se comparan normalizadas); None admite cualquiera
+
+        Returns:
+            List[Cercano]: (id, nombre, especialidad, km), del más cercano al más lejano
+        """
+        admitidas = None if especialidades is None else {normalizar_texto(e) for e in especialidades}
+        radio = RADIO_INICIAL_KM
+        while True:
+            dentro = []
+            for tecnico_id, nombre, especialidad, latitud, longitud in self.db.iter_rows(
+                    UbicacionQueries.TECNICOS_EN_CAJA, caja(centro, radio)):
+                if admitidas is not None and normalizar_texto(especialidad) not in admitidas:
+                    continue
+                distancia = distancia_km(centro, (latitud, longitud))
+                if distancia <= radio or radio >= RADIO_MAXIMO_KM:
+                    dentro.append((tecnico_id, nombre, especialidad, distancia))
+            # Los de fuera del círculo podrían estar más lejos que alguno no visto
+            if len(dentro) >= k or radio >= RADIO_MAXIMO_KM:
+                dentro.sort(key=lambda tecnico: (tecnico[3], tecnico[0]))
+                return dentro[:k]
+            radio = min(radio * 2, RADIO_MAXIMO_KM)
+
+    def nearest_technicians(self, orden_id: int, k: int = 5) -> List[Cercano]:
+        """
+        Los k técnicos capacitados para el servicio de una orden más
+        cercanos a su cliente.
+
+        Raises:
+            ValueError: Si la orden no existe o su cliente no tiene ubicación
+        """
+        fila = self.db.fetch_one(UbicacionQueries.ORDEN, (orden_id,))
+        if fila is None:
+            raise ValueError(f"Orden no encontrada: {orden_id}")
+        cliente_id, tipo = fila
+        centro = self.ubicacion("clientes", cliente_id)
+        if centro is None:
+            raise ValueError(f"El cliente {cliente_id} no tiene ubicación")
+        return self.cercanos(centro, k, especialidades_por_tipo().get(tipo, ()))
+
+def _cargar_tecnicos(router: DispatchRouter, ruta: str, gazetteer: Optional[Gazetteer]) -> Tuple[int, int]:
+    """
+    Ubica técnicos desde un CSV 'nombre,latitud,longitud' o 'nombre,lugar'.
+    """
+    ubicados = faltantes = 0
+    with open(ruta, newline="", encoding="utf-8") as f:
+        for fila in csv.DictReader(f):
+            tecnico = router.db.fetch_one(TecnicoQueries.POR_NOMBRE, (fila["nombre"],))
+            if fila.get("latitud") and fila.get("longitud"):
+                coordenadas = (float(fila["latitud"]), float(fila["longitud"]))
+            else:
+                coordenadas = gazetteer.ubicar(fila.get("lugar")) if gazetteer else None
+            if tecnico is None or coordenadas is None:
+                faltantes += 1
+                continue
+            router.ubicar("tecnicos", tecnico[0], *coordenadas)
+            ubicados += 1
+    return ubicados, faltantes
+
+def main(argv: List[str] = None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Ubicaciones y técnicos más cercanos")
+    parser.add_argument("--gazetteer", help="CSV 'lugar,latitud,longitud' para ubicar a los clientes")
+    parser.add_argument("--tecnicos", help="CSV 'nombre,latitud,longitud' o 'nombre,lugar' con la base de cada técnico")
+    parser.add_argument("--orden", type=int, help="Orden para la que buscar técnicos")
+    parser.add_argument("-k", type=int, default=5, help="Cantidad de técnicos")
+    args = parser.parse_args(argv)
+    router = DispatchRouter()
+    gazetteer = Gazetteer.desde_csv(args.gazetteer) if args.gazetteer else None
+    if gazetteer is not None:
+        ubicados, faltantes = router.geocodificar_clientes(gazetteer)
+        print(f"Clientes ubicados: {ubicados} (sin coincidencia: {faltantes})")
+    if args.tecnicos:
+        ubicados, faltantes = _cargar_tecnicos(router, args.tecnicos, gazetteer)
+        print(f"Técnicos ubicados: {ubicados} (sin coincidencia: {faltantes})")
+    if args.orden is not None:
+        for tecnico_id, nombre, especialidad, km in router.nearest_technicians(args.orden, args.k):
+            print(f"{km:8.2f} km  {nombre} ({especialidad}, id {tecnico_id})")
+
+if __name__ == "__main__":
+    main()
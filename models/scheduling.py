@@ -0,0 +1,350 @@
+"""
+Planificación de órdenes en la agenda de los técnicos.
+
+Cada técnico tiene una línea de tiempo con sus franjas ocupadas. El tiempo
+se maneja internamente en minutos desde 1970-01-01 (hora local, sin zona,
+para que la jornada se compare con la hora de reloj) y las franjas se
+guardan en la tabla 'agenda' como segundos desde la época Unix, igual que
+creado_en (ver models.timestamps).
+
+Uso:
+    python -m models.scheduling [--fecha 2026-10-20] [--reasignar]
+"""
+import argparse
+import heapq
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple, Optional, Iterable
+from models.db_connection import DatabaseConnection
+from models.normalization import normalizar_texto
+from models.queries import AgendaQueries
+from models.service_factory import ServiceFactory
+from models.sync import registrar_cambio
+from models.timestamps import a_epoch, desde_epoch
+
+MINUTOS_DIA = 24 * 60
+_EPOCA = datetime(1970, 1, 1)
+
+def especialidades_por_tipo() -> Dict[str, Tuple[str, ...]]:
+    """
+    Especialidades (normalizadas) capacitadas para cada tipo de servicio
+    guardado, según los tipos registrados en ServiceFactory.
+    """
+    return {spec.tipo_guardado: spec.especialidades for spec in ServiceFactory.types()}
+
+# Duración usada cuando el servicio no la tiene registrada
+DURACION_POR_DEFECTO = 60
+
+Asignacion = Tuple[int, int, datetime, datetime]
+
+def a_minutos(fecha: datetime) -> int:
+    return int((fecha - _EPOCA).total_seconds() // 60)
+
+def desde_minutos(minutos: int) -> datetime:
+    return _EPOCA + timedelta(minutes=minutos)
+
+def _minutos_de_epoch(segundos: int) -> int:
+    # Epoch de la base -> minutos en hora local sin zona
+    return a_minutos(desde_epoch(segundos).replace(tzinfo=None))
+
+class Jornada:
+    """
+    Horario laboral en el que se pueden programar órdenes.
+    
+    Atributos:
+        inicio (int): Minuto del día en que empieza la jornada
+        fin (int): Minuto del día en que termina la jornada
+        dias (frozenset): Días laborables (0 = lunes)
+    """
+    def __init__(self, hora_inicio: int = 8, hora_fin: int = 18, dias: Iterable[int] = range(5)):
+        self.inicio = hora_inicio * 60
+        self.fin = hora_fin * 60
+        self.dias = frozenset(dias)
+
+    def ajustar(self, t: int, duracion: int) -> int:
+        """
+        Devuelve el primer minuto >= t en que una franja de la duración dada
+        cabe entera dentro de una jornada.
+        
+        Raises:
+            ValueError: Si la duración excede la jornada
+        """
+        if duracion > self.fin - self.inicio or not self.dias:
+            raise ValueError(f"Una franja de {duracion} minutos no cabe en la jornada")
+        dia, minuto = divmod(t, MINUTOS_DIA)
+        if minuto + duracion > self.fin:
+            dia, minuto = dia + 1, self.inicio
+        elif minuto < self.inicio:
+            minuto = self.inicio
+        # 1970-01-01 fue jueves: (dia + 3) % 7 da 0 para lunes
+        while (dia + 3) % 7 not in self.dias:
+            dia, minuto = dia + 1, self.inicio
+        return dia * MINUTOS_DIA + minuto
+
+class Timeline:
+    """
+    Franjas ocupadas de un técnico, ordenadas por inicio.
+    
+    La búsqueda de hueco localiza la posición de partida con bisect en
+    O(log n) y solo recorre las franjas que se interponen desde ese punto,
+    nunca la agenda completa. Agregar una franja al final (el caso habitual,
+    ya que se programa hacia adelante) es O(1); intercalarla en un hueco
+    desplaza las franjas posteriores, que se limitan a las cargadas desde
+    el momento indicado a Scheduler.cargar().
+    
+    Atributos:
+        inicios (List[int]): Inicio de cada franja, en minutos
+        fines (List[int]): Fin de cada franja, en minutos
+    """
+    __slots__ = ("inicios", "fines")
+
+    def __init__(self):
+        self.inicios: List[int] = []
+        self.fines: List[int] = []
+
+    def agregar(self, inicio: int, fin: int):
+        """
+        Registra una franja ocupada.
+        """
+        i = bisect_right(self.inicios, inicio)
+        self.inicios.insert(i, inicio)
+        self.fines.insert(i, fin)
+
+    def primer_hueco(self, desde: int, duracion: int, jornada: Jornada) -> int:
+        """
+        Devuelve el primer inicio >= desde con un hueco libre de la duración dada.
+        
+        Args:
+            desde (int): Minuto a partir del cual buscar
+            duracion (int): Minutos requeridos
+            jornada (Jornada): Horario laboral
+            
+        Returns:
+            int: Minuto de inicio del hueco
+        """
+        i = max(bisect_right(self.inicios, desde) - 1, 0)
+        t = desde
+        n = len(self.inicios)
+        while True:
+            t = jornada.ajustar(t, duracion)
+            while i < n and self.fines[i] <= t:
+                i += 1
+            if i < n and self.inicios[i] < t + duracion:
+                t = self.fines[i]
+                i += 1
+                continue
+            return t
+
+class Scheduler:
+    """
+    Motor de planificación de órdenes de trabajo.
+    
+    Mantiene en memoria una Timeline por técnico, cargada desde la tabla
+    'agenda', y busca para cada orden el primer hueco factible entre los
+    técnicos capacitados para su tipo de servicio.
+    
+    Para no calcular el hueco de cada técnico capacitado en cada búsqueda,
+    cada par (tipo de servicio, duración) tiene una frontera: un heap con
+    el primer hueco de cada técnico capacitado desde el momento de la
+    búsqueda. La frontera se arma en O(T) la primera vez; después cada
+    búsqueda lee la cima en O(log T) y programar() solo recalcula el hueco
+    del técnico que recibió la franja, una vez por duración en uso. Las
+    franjas deben agregarse con programar() para que las fronteras se
+    mantengan al día.
+    
+    Atributos:
+        db (DatabaseConnection): Conexión a la base de datos
+        jornada (Jornada): Horario laboral
+        timelines (Dict[int, Timeline]): Agenda en memoria por técnico
+        tecnicos_por_tipo (Dict[str, List[int]]): Técnicos capacitados por tipo de servicio
+    """
+    def __init__(self, db: DatabaseConnection = None, jornada: Jornada = None,
+                 duracion_por_defecto: int = DURACION_POR_DEFECTO):
+        self.db = db or DatabaseConnection()
+        self.jornada = jornada or Jornada()
+        self.duracion_por_defecto = duracion_por_defecto
+        self.timelines: Dict[int, Timeline] = {}
+        self.tecnicos_por_tipo: Dict[str, List[int]] = {}
+        self._tipos_por_tecnico: Dict[int, List[str]] = {}
+        # Fronteras por tipo y duración: heaps de (inicio, técnico, franjas
+        # del técnico al calcularlo), con huecos desde el minuto _t0
+        self._t0: Optional[int] = None
+        self._fronteras: Dict[str, Dict[int, List[Tuple[int, int, int]]]] = {}
+        self.cargar()
+
+    def cargar(self, desde: datetime = None):
+        """
+        Carga los técnicos y las franjas que terminan después de 'desde'.
+        
+        Args:
+            desde (datetime, opcional): Por defecto el momento actual
+        """
+        desde = desde or datetime.now()
+        self.timelines = {}
+        self._t0, self._fronteras = None, {}
+        especialidades = especialidades_por_tipo()
+        self.tecnicos_por_tipo = {tipo: [] for tipo in especialidades}
+        self._tipos_por_tecnico = {}
+        for tecnico_id, especialidad in self.db.iter_rows(AgendaQueries.TECNICOS):
+            self.timelines[tecnico_id] = Timeline()
+            especialidad = normalizar_texto(especialidad)
+            for tipo, aceptadas in especialidades.items():
+                if especialidad in aceptadas:
+                    self.tecnicos_por_tipo[tipo].append(tecnico_id)
+                    self._tipos_por_tecnico.setdefault(tecnico_id, []).append(tipo)
+        for tecnico_id, inicio, fin in self.db.iter_rows(AgendaQueries.DESDE, (a_epoch(desde),)):
+            if tecnico_id in self.timelines:
+                self.timelines[tecnico_id].agregar(_minutos_de_epoch(inicio), _minutos_de_epoch(fin))
+
+    def earliest_slot(self, tipo: str, duracion: int = None, desde: datetime = None,
+                      tecnicos: Iterable[int] = None) -> Optional[Tuple[int, datetime, datetime]]:
+        """
+        Busca el primer hueco factible entre los técnicos capacitados.
+        
+        Args:
+            tipo (str): Tipo de servicio guardado (por ejemplo 'servicioreparacion')
+            duracion (int, opcional): Minutos requeridos
+            desde (datetime, opcional): Momento a partir del cual buscar
+            tecnicos (Iterable[int], opcional): Restringe la búsqueda a estos técnicos
+            
+        Returns:
+            Optional[Tuple[int, datetime, datetime]]: (técnico, inicio, fin) o
+                None si no hay técnicos capacitados
+        """
+        duracion = duracion or self.duracion_por_defecto
+        t0 = a_minutos(desde or datetime.now())
+        if tecnicos is None:
+            mejor = self._mejor_capacitado(tipo, duracion, t0)
+        else:
+            mejor = None
+            for tecnico_id in tecnicos:
+                timeline = self.timelines.get(tecnico_id)
+                if timeline is None:
+                    continue
+                candidato = (timeline.primer_hueco(t0, duracion, self.jornada), tecnico_id)
+                if mejor is None or candidato < mejor:
+                    mejor = candidato
+        if mejor is None:
+            return None
+        inicio, tecnico_id = mejor
+        return tecnico_id, desde_minutos(inicio), desde_minutos(inicio + duracion)
+
+    def _mejor_capacitado(self, tipo: str, duracion: int, t0: int) -> Optional[Tuple[int, int]]:
+        """
+        Hueco más temprano entre los técnicos capacitados, como (inicio, técnico).
+        
+        Las entradas calculadas antes de la última franja de su técnico
+        quedan obsoletas y se descartan al llegar a la cima.
+        """
+        frontera = self._frontera(tipo, duracion, t0)
+        while frontera:
+            inicio, tecnico_id, franjas = frontera[0]
+            if franjas == len(self.timelines[tecnico_id].inicios):
+                return inicio, tecnico_id
+            heapq.heappop(frontera)
+        return None
+
+    def _frontera(self, tipo: str, duracion: int, t0: int) -> List[Tuple[int, int, int]]:
+        """
+        Heap del primer hueco desde t0 de cada técnico capacitado para el
+        tipo. Las fronteras se descartan si cambia t0.
+        """
+        if t0 != self._t0:
+            self._t0, self._fronteras = t0, {}
+        por_duracion = self._fronteras.setdefault(tipo, {})
+        frontera = por_duracion.get(duracion)
+        if frontera is None:
+            frontera = por_duracion[duracion] = [
+                self._entrada(tecnico_id, duracion)
+                for tecnico_id in self.tecnicos_por_tipo.get(tipo, []) if tecnico_id in self.timelines]
+            heapq.heapify(frontera)
+        return frontera
+
+    def _entrada(self, tecnico_id: int, duracion: int) -> Tuple[int, int, int]:
+        timeline = self.timelines[tecnico_id]
+        return timeline.primer_hueco(self._t0, duracion, self.jornada), tecnico_id, len(timeline.inicios)
+
+    def programar(self, orden_id: int, tecnico_id: int, inicio: datetime, fin: datetime):
+        """
+        Registra una franja en la agenda y en la línea de tiempo del técnico.
+        """
+        self.db.execute_write(AgendaQueries.INSERTAR, (
+            orden_id, tecnico_id, a_epoch(inicio), a_epoch(fin)))
+        self.timelines.setdefault(tecnico_id, Timeline()).agregar(a_minutos(inicio), a_minutos(fin))
+        for tipo in self._tipos_por_tecnico.get(tecnico_id, ()):
+            for duracion, frontera in self._fronteras.get(tipo, {}).items():
+                heapq.heappush(frontera, self._entrada(tecnico_id, duracion))
+                if len(frontera) > 2 * len(self.tecnicos_por_tipo[tipo]):
+                    # Retira las entradas obsoletas que no llegaron a la cima
+                    frontera[:] = [e for e in frontera if e[2] == len(self.timelines[e[1]].inicios)]
+                    heapq.heapify(frontera)
+
+    def programar_orden(self, orden_id: int, desde: datetime = None,
+                        reasignar: bool = False) -> Optional[Asignacion]:
+        """
+        Programa una orden en el primer hueco disponible.
+        
+        Si la orden ya tiene técnico y no se pide reasignar, solo se busca
+        en la agenda de ese técnico.
+        
+        Returns:
+            Optional[Asignacion]: (orden, técnico, inicio, fin) o None si no hay técnico posible
+        """
+        fila = self.db.fetch_one(AgendaQueries.ORDEN, (orden_id,))
+        if fila is None:
+            raise ValueError(f"Orden no encontrada: {orden_id}")
+        asignaciones = self._asignar([fila], desde, reasignar)
+        return asignaciones[0] if asignaciones else None
+
+    def plan_day(self, fecha: datetime = None, reasignar: bool = False) -> List[Asignacion]:
+        """
+        Programa todas las órdenes pendientes que aún no tienen franja.
+        
+        Heurística voraz: las órdenes se procesan de mayor a menor duración
+        (LPT) y cada una va al técnico capacitado que puede empezarla antes.
+        Las que no caben en el día pasan a los siguientes días laborables.
+        Todas las franjas se guardan en una sola transacción.
+        
+        Args:
+            fecha (datetime, opcional): Día a planificar; por defecto ahora
+            reasignar (bool): Permite cambiar el técnico ya asignado a la orden
+            
+        Returns:
+            List[Asignacion]: Franjas creadas (orden, técnico, inicio, fin)
+        """
+        pendientes = self.db.fetch_all(AgendaQueries.PENDIENTES)
+        return self._asignar(pendientes, fecha, reasignar)
+
+    def _asignar(self, ordenes, desde: datetime, reasignar: bool) -> List[Asignacion]:
+        # Un mismo momento de partida para todo el lote reutiliza las fronteras
+        desde = desde or datetime.now()
+        ordenes = sorted(ordenes, key=lambda fila: fila[3] or self.duracion_por_defecto, reverse=True)
+        asignaciones = []
+        with self.db.transaction():
+            for orden_id, tecnico_id, tipo, duracion in ordenes:
+                tecnicos = None if reasignar or tecnico_id is None else [tecnico_id]
+                slot = self.earliest_slot(tipo, duracion, desde, tecnicos)
+                if slot is None:
+                    continue
+                elegido, inicio, fin = slot
+                self.programar(orden_id, elegido, inicio, fin)
+                if elegido != tecnico_id:
+                    self.db.execute_write(AgendaQueries.REASIGNAR_ORDEN, (elegido, orden_id))
+                    registrar_cambio(self.db, "ordenes_trabajo", orden_id)
+                asignaciones.append((orden_id, elegido, inicio, fin))
+        return asignaciones
+
+def main(argv: List[str] = None):
+    """
+    Punto de entrada de línea de comandos para planificar el día.
+    """
+    parser = argparse.ArgumentParser(description="Planifica las órdenes pendientes")
+    parser.add_argument("--fecha", help="Día a planificar (YYYY-MM-DD); por defecto hoy")
+    parser.add_argument("--reasignar", action="store_true", help="Permite cambiar el técnico asignado")
+    args = parser.parse_args(argv)
+    fecha = datetime.strptime(args.fecha, "%Y-%m-%d") if args.fecha else None
+    for orden_id, tecnico_id, inicio, fin in Scheduler().plan_day(fecha, args.reasignar):
+        print(f"Orden {orden_id}: técnico {tecnico_id} {inicio:%Y-%m-%d %H:%M}-{fin:%H:%M}")
+
+if __name__ == "__main__":
+    main()
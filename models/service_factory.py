@@ -1,59 +1,268 @@
-from typing import Dict, Type
+import inspect
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Type
 from models.models import Servicio, ServicioReparacion, ServicioSoporteIT
+from models.normalization import normalizar_texto
+
+# Campos comunes a todos los servicios; los tipos agregan los suyos al final
+CAMPOS_BASE: Tuple[Tuple[str, type], ...] = (
+    ("descripcion", str), ("costo_base", float), ("duracion_estimada", int),
+)
+# Nombres alternativos aceptados por create_service (compatibilidad)
+CAMPOS_ALIAS = {"costo": "costo_base"}
+
+def _clave(nombre: str) -> str:
+    # 'Soporte IT', 'soporte_it' y 'soporte it' son la misma clave
+    return normalizar_texto(nombre.replace("_", " "))
+
+class ServiceSpec:
+    """
+    Tipo de servicio registrado en ServiceFactory.
+
+    El constructor se arma y valida una sola vez al registrar el tipo: los
+    valores llegan en el orden de 'campos', los vacíos (None) toman el valor
+    por defecto y cada uno se convierte a su tipo antes de pasarse por
+    posición a la clase.
+
+    Atributos:
+        nombre (str): Nombre canónico del tipo ('reparacion')
+        etiqueta (str): Texto para la interfaz ('Reparación')
+        clase (Type[Servicio]): Clase que implementa el servicio
+        campos (Tuple[str, ...]): Campos del esquema, en orden
+        defaults (Dict[str, Any]): Valores por defecto por campo
+        especialidades (Tuple[str, ...]): Especialidades (normalizadas) de
+            los técnicos capacitados para el servicio
+        tipo_guardado (str): Valor de servicios.tipo para este servicio
+    """
+    __slots__ = ("nombre", "etiqueta", "clase", "campos", "defaults", "especialidades",
+                 "tipo_guardado", "_conversores", "_orden", "_requeridos")
+
+    def __init__(self, nombre: str, clase: Type[Servicio], esquema: Sequence[Tuple[str, type]],
+                 defaults: Dict[str, Any], etiqueta: str, especialidades: Sequence[str]):
+        self.nombre = nombre
+        self.etiqueta = etiqueta
+        self.clase = clase
+        self.campos = tuple(campo for campo, _ in esquema)
+        self.defaults = dict(defaults)
+        self.especialidades = tuple(normalizar_texto(e) for e in especialidades)
+        self.tipo_guardado = clase.__name__.lower()
+        self._conversores = tuple(tipo for _, tipo in esquema)
+        parametros = dict(list(inspect.signature(clase.__init__).parameters.items())[1:])
+        desconocidos = [campo for campo in self.campos if campo not in parametros]
+        if desconocidos:
+            raise TypeError(f"{clase.__name__} no acepta los campos {', '.join(desconocidos)}")
+        sobrantes = set(self.defaults) - set(self.campos)
+        if sobrantes:
+            raise TypeError(f"Valores por defecto sin campo en el esquema: {', '.join(sorted(sobrantes))}")
+        # Los campos se pasan por posición: deben ser los primeros parámetros
+        if set(list(parametros)[:len(self.campos)]) != set(self.campos):
+            raise TypeError(f"Los campos deben ser los primeros parámetros de {clase.__name__}")
+        # Posición en el esquema de cada parámetro del constructor
+        self._orden = tuple(self.campos.index(p) for p in list(parametros)[:len(self.campos)])
+        # Requeridos: sin valor por defecto ni en el esquema ni en la clase
+        self._requeridos = tuple(i for i, campo in enumerate(self.campos) if campo not in self.defaults
+                                 and parametros[campo].default is inspect.Parameter.empty)
+
+    def build(self, valores: Sequence[Any]) -> Servicio:
+        """
+        Crea un servicio a partir de valores en el orden de 'campos'.
+
+        Args:
+            valores (Sequence[Any]): Valores (pueden faltar los últimos)
+
+        Returns:
+            Servicio: Instancia de 'clase'
+
+        Raises:
+            ValueError: Si falta un campo requerido o un valor no es convertible
+        """
+        completos = list(valores) + [None] * (len(self.campos) - len(valores))
+        for i in self._requeridos:
+            if completos[i] is None:
+                raise ValueError(f"Falta el campo '{self.campos[i]}' para {self.nombre}")
+        for i, (campo, conversor) in enumerate(zip(self.campos, self._conversores)):
+            valor = completos[i]
+            if valor is None:
+                completos[i] = self.defaults.get(campo)
+            elif not isinstance(valor, conversor):
+                try:
+                    completos[i] = conversor(valor)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Valor inválido para '{campo}': {valor!r}")
+        return self.clase(*(completos[i] for i in self._orden))
 
 class ServiceFactory:
     """
     Fábrica para la creación de diferentes tipos de servicios.
-    
-    Esta clase implementa el patrón Factory Method para encapsular la lógica
-    de creación de diferentes tipos de servicios. Permite crear instancias
-    de servicios específicos sin exponer la lógica de creación al cliente.
-    
+
+    Esta clase implementa el patrón Factory Method como un registro
+    extensible: cada tipo de servicio se registra con su esquema de campos,
+    sus alias y sus valores por defecto (ver register()). Los nombres se
+    buscan sin distinguir mayúsculas, acentos ni '_' frente a espacio, así
+    que 'Reparación', 'reparacion' y 'REPARACION' son el mismo tipo.
+
     Atributos:
-        _service_types (Dict[str, Type[Servicio]]): Diccionario que mapea
-            tipos de servicio con sus clases correspondientes
-    
+        _service_types (Dict[str, ServiceSpec]): Tipos por nombre canónico
+        _aliases (Dict[str, ServiceSpec]): Tipos por clave normalizada
+
     Métodos:
+        register(): Registra un tipo de servicio
+        resolve(): Devuelve el tipo registrado para un nombre o alias
         create_service(): Crea una instancia del tipo de servicio solicitado
+        create_services(): Crea servicios en lote a partir de filas
     """
-    _service_types: Dict[str, Type[Servicio]] = {
-        'reparacion': ServicioReparacion,
-        'soporte_it': ServicioSoporteIT
-    }
+    _service_types: Dict[str, ServiceSpec] = {}
+    _aliases: Dict[str, ServiceSpec] = {}
+
+    @classmethod
+    def register(cls, nombre: str, clase: Type[Servicio], campos: Sequence[Tuple[str, type]] = (),
+                 aliases: Iterable[str] = (), defaults: Dict[str, Any] = None,
+                 etiqueta: str = None, especialidades: Iterable[str] = ()) -> ServiceSpec:
+        """
+        Registra (o reemplaza) un tipo de servicio.
+
+        Args:
+            nombre (str): Nombre canónico del tipo
+            clase (Type[Servicio]): Clase que implementa el servicio
+            campos (Sequence[Tuple[str, type]]): Campos propios del tipo, que
+                se agregan a CAMPOS_BASE
+            aliases (Iterable[str]): Otros nombres aceptados
+            defaults (Dict[str, Any], opcional): Valores por defecto por campo
+            etiqueta (str, opcional): Texto para la interfaz; por defecto el nombre
+            especialidades (Iterable[str]): Especialidades de los técnicos
+                capacitados para el servicio (ver models.scheduling)
+
+        Returns:
+            ServiceSpec: El tipo registrado
+
+        Raises:
+            TypeError: Si el esquema no coincide con el constructor de la clase
+            ValueError: Si un alias ya pertenece a otro tipo
+        """
+        spec = ServiceSpec(nombre, clase, CAMPOS_BASE + tuple(campos), defaults or {},
+                           etiqueta or nombre, especialidades)
+        claves = {_clave(nombre), _clave(spec.etiqueta), *(_clave(alias) for alias in aliases)}
+        for clave in claves:
+            existente = cls._aliases.get(clave)
+            if existente is not None and existente.nombre != nombre:
+                raise ValueError(f"El alias '{clave}' ya corresponde al servicio {existente.nombre}")
+        cls.unregister(nombre)
+        cls._service_types[nombre] = spec
+        for clave in claves:
+            cls._aliases[clave] = spec
+        return spec
+
+    @classmethod
+    def unregister(cls, nombre: str):
+        """
+        Quita un tipo de servicio y sus alias.
+        """
+        spec = cls._service_types.pop(nombre, None)
+        if spec is not None:
+            for clave in [clave for clave, valor in cls._aliases.items() if valor is spec]:
+                del cls._aliases[clave]
+
+    @classmethod
+    def resolve(cls, service_type: str) -> ServiceSpec:
+        """
+        Devuelve el tipo registrado para un nombre, etiqueta o alias.
+
+        Raises:
+            ValueError: Si el tipo de servicio no está soportado
+        """
+        spec = cls._service_types.get(service_type) or cls._aliases.get(_clave(service_type or ""))
+        if spec is None:
+            raise ValueError(f"Tipo de servicio no soportado: {service_type}")
+        return spec
+
+    @classmethod
+    def types(cls) -> List[ServiceSpec]:
+        """
+        Tipos registrados, en orden de registro.
+        """
+        return list(cls._service_types.values())
+
+    @classmethod
+    def labels(cls) -> List[str]:
+        """
+        Etiquetas de los tipos registrados, para los combobox de la interfaz.
+        """
+        return [spec.etiqueta for spec in cls._service_types.values()]
 
     @classmethod
     def create_service(cls, service_type: str, **kwargs) -> Servicio:
         """
         Crea una instancia del tipo de servicio solicitado.
-        
-        Este método actúa como fábrica para crear diferentes tipos de servicios
-        basándose en el tipo especificado. Utiliza el diccionario _service_types
-        para mapear el tipo de servicio con su clase correspondiente.
-        
+
+        Los campos que no se indican toman el valor por defecto del tipo.
+
         Args:
-            service_type (str): Tipo de servicio a crear ('reparacion' o 'soporte_it')
-            **kwargs: Argumentos adicionales requeridos para la creación del servicio
-                - Para reparacion:
-                    - descripcion (str)
-                    - costo (float)
-                    - duracion_estimada (int)
-                    - tipo_reparacion (str)
-                - Para soporte_it:
-                    - descripcion (str)
-                    - costo (float)
-                    - duracion_estimada (int)
-                    - nivel_soporte (str)
-        
+            service_type (str): Nombre, etiqueta o alias del tipo
+                ('reparacion', 'Reparación', 'soporte_it', 'Soporte IT', ...)
+            **kwargs: Campos del esquema del tipo (ver ServiceSpec.campos);
+                'costo' se acepta como sinónimo de 'costo_base', que tiene
+                precedencia si se pasan ambos
+
         Returns:
             Servicio: Una instancia del tipo de servicio solicitado
-        
+
         Raises:
-            ValueError: Si el tipo de servicio no está soportado
+            ValueError: Si el tipo no está soportado, sobra o falta un campo
+                o un valor no es válido
         """
-        if service_type not in cls._service_types:
-            raise ValueError(f"Tipo de servicio no soportado: {service_type}")
-        # Compatibilidad: mapear 'costo' a 'costo_base' si es necesario
-        if 'costo' in kwargs and 'costo_base' not in kwargs:
-            kwargs['costo_base'] = kwargs['costo']
-        service_class = cls._service_types[service_type]
-        return service_class(**kwargs) 
\ No newline at end of file
+        spec = cls.resolve(service_type)
+        valores = [None] * len(spec.campos)
+        for campo, valor in kwargs.items():
+            if campo not in spec.campos:
+                canonico = CAMPOS_ALIAS.get(campo)
+                if canonico not in spec.campos:
+                    raise ValueError(f"Campo desconocido para {spec.nombre}: {campo}")
+                if canonico in kwargs:
+                    continue  # el nombre canónico tiene precedencia sobre el alias
+                campo = canonico
+            valores[spec.campos.index(campo)] = valor
+        return spec.build(valores)
+
+    @classmethod
+    def create_services(cls, rows: Iterable[Sequence[Any]], service_type: str = None) -> List[Servicio]:
+        """
+        Crea servicios en lote.
+
+        Cada fila trae los valores en el orden de ServiceSpec.campos. Si no
+        se indica service_type, el primer valor de cada fila es el tipo. El
+        tipo se resuelve una vez por nombre distinto y cada fila va directo
+        al constructor ya validado.
+
+        Args:
+            rows (Iterable[Sequence[Any]]): Filas de valores
+            service_type (str, opcional): Tipo común a todas las filas
+
+        Returns:
+            List[Servicio]: Servicios creados, en el orden de las filas
+
+        Raises:
+            ValueError: En la primera fila inválida
+        """
+        if service_type is not None:
+            build = cls.resolve(service_type).build
+            return [build(fila) for fila in rows]
+        specs: Dict[str, ServiceSpec] = {}
+        servicios = []
+        for tipo, *valores in rows:
+            spec = specs.get(tipo)
+            if spec is None:
+                spec = specs[tipo] = cls.resolve(tipo)
+            servicios.append(spec.build(valores))
+        return servicios
+
+ServiceFactory.register(
+    "reparacion", ServicioReparacion, (("tipo_reparacion", str),),
+    etiqueta="Reparación",
+    defaults={"costo_base": 100.0, "duracion_estimada": 60, "tipo_reparacion": "General"},
+    especialidades=("reparacion", "hardware"),
+)
+ServiceFactory.register(
+    "soporte_it", ServicioSoporteIT, (("nivel_soporte", str),),
+    etiqueta="Soporte IT",
+    defaults={"costo_base": 80.0, "duracion_estimada": 45, "nivel_soporte": "Nivel 1"},
+    especialidades=("soporte it", "soporte_it", "software"),
+)
@@ -0,0 +1,343 @@
+"""
+Sincronización entre instalaciones con escritura local primero.
+
+Cada instalación escribe en su propia base y registra en 'sync_journal'
+una instantánea de cada fila guardada desde los métodos guardar(). Las
+filas se identifican entre instalaciones por su columna 'uuid' (no por el
+id AUTOINCREMENT, que es local), así que las inserciones de distintas
+instalaciones nunca chocan. Las referencias (cliente, técnico, servicio)
+viajan también como uuid.
+
+SyncClient envía por lotes las entradas locales nuevas a la instancia
+central y trae las de otras instalaciones. Aplicar una entrada es un
+upsert por uuid, por lo que reenviarla no tiene efecto. Si un cliente
+llega con un email que ya existe con otro uuid, se registra un alias y
+ambos uuid apuntan a la misma fila. Una entrada que no se puede aplicar
+(por ejemplo porque referencia una fila que no llegó) se aparta en
+'sync_rechazos' sin detener el lote y se reintenta en cada sync().
+
+Las descripciones viajan como texto: cada base las guarda en su propia
+tabla 'descripciones' (ver models.descriptions).
+
+Uso:
+    SGST_DB_PATH_CENTRAL=//servidor/sgst/central.db python -m models.sync
+"""
+import argparse
+import json
+import sqlite3
+import uuid
+from typing import Dict, List, Tuple, Any, Optional
+from models.db_connection import DatabaseConnection
+from models.descriptions import guardar_descripcion
+
+CENTRAL_NAME = "central"
+OP_UPSERT = "upsert"
+OP_DELETE = "delete"
+SENTIDO_PUSH = "push"
+SENTIDO_PULL = "pull"
+
+# Errores de una entrada que no deben detener el lote: la entrada se aparta
+# en sync_rechazos y el cursor sigue avanzando
+ERRORES_DE_ENTRADA = (LookupError, sqlite3.IntegrityError)
+
+# Columnas replicadas por tabla, referencias a otras tablas (columna -> tabla)
+# y textos guardados en 'descripciones' (campo replicado -> columna con el id)
+TABLAS_SINCRONIZADAS: Dict[str, Dict[str, Any]] = {
+    "clientes": {
+        "columnas": ("nombre", "email", "telefono", "direccion"),
+        "derivadas": {"nombre_norm": "norm_texto(:nombre)", "email_norm": "norm_email(:email)",
+                      "telefono_norm": "norm_telefono(:telefono)"},
+        "referencias": {},
+        "textos": {},
+    },
+    "tecnicos": {
+        "columnas": ("nombre", "especialidad", "email", "telefono"),
+        "derivadas": {},
+        "referencias": {},
+        "textos": {},
+    },
+    "servicios": {
+        "columnas": ("tipo", "descripcion", "costo_base", "duracion_estimada"),
+        "derivadas": {},
+        "referencias": {},
+        "textos": {"descripcion": "descripcion_id"},
+    },
+    "ordenes_trabajo": {
+        "columnas": ("creado_en", "estado", "descripcion", "costo_total"),
+        "derivadas": {},
+        "referencias": {"cliente_id": "clientes", "tecnico_id": "tecnicos", "servicio_id": "servicios"},
+        "textos": {"descripcion": "descripcion_id"},
+    },
+}
+
+_INSERTAR_ENTRADA = "INSERT INTO sync_journal (tabla, uuid, operacion, datos, origen) VALUES (?, ?, ?, ?, ?)"
+_LEER_ESTADO = "SELECT valor FROM sync_estado WHERE clave = ?"
+_APARTAR = """
+    INSERT OR REPLACE INTO sync_rechazos (sentido, seq, tabla, uuid, operacion, datos, origen, error)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_RECHAZADAS = "SELECT id, sentido, tabla, uuid, operacion, datos, origen FROM sync_rechazos ORDER BY id"
+_ACTUALIZAR_RECHAZO = "UPDATE sync_rechazos SET error = ?, momento = CURRENT_TIMESTAMP WHERE id = ?"
+_BORRAR_RECHAZO = "DELETE FROM sync_rechazos WHERE id = ?"
+_GUARDAR_ESTADO = "INSERT INTO sync_estado (clave, valor) VALUES (?, ?) ON CONFLICT(clave) DO UPDATE SET valor = excluded.valor"
+
+def nuevo_uuid() -> str:
+    """
+    Genera un identificador global para una fila nueva.
+    """
+    return uuid.uuid4().hex
+
+def _instantanea_sql(tabla: str) -> str:
+    config = TABLAS_SINCRONIZADAS[tabla]
+    columnas, uniones = [], []
+    for i, columna in enumerate(config["columnas"]):
+        if columna in config["textos"]:
+            columnas.append(f"desempaquetar_texto(d{i}.texto)")
+            uniones.append(f"LEFT JOIN descripciones d{i} ON d{i}.id = t.{config['textos'][columna]}")
+        else:
+            columnas.append(f"t.{columna}")
+    for i, (columna, destino) in enumerate(config["referencias"].items()):
+        columnas.append(f"r{i}.uuid")
+        uniones.append(f"LEFT JOIN {destino} r{i} ON r{i}.id = t.{columna}")
+    return f"SELECT t.uuid, {', '.join(columnas)} FROM {tabla} t {' '.join(uniones)} WHERE t.id = ?"
+
+def _upsert_sql(tabla: str) -> str:
+    config = TABLAS_SINCRONIZADAS[tabla]
+    propias = [config["textos"].get(c, c) for c in config["columnas"]]
+    columnas = ["uuid", *propias, *config["referencias"], *config["derivadas"]]
+    valores = [":uuid", *(f":{c}" for c in propias),
+               *(f":{c}" for c in config["referencias"]), *config["derivadas"].values()]
+    # Cada actualización cambia la versión local (ver models.concurrency)
+    actualizar = ", ".join([*(f"{c} = excluded.{c}" for c in columnas[1:]), "version = version + 1"])
+    return (f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join(valores)}) "
+            f"ON CONFLICT(uuid) DO UPDATE SET {actualizar}")
+
+_INSTANTANEAS = {tabla: _instantanea_sql(tabla) for tabla in TABLAS_SINCRONIZADAS}
+_UPSERTS = {tabla: _upsert_sql(tabla) for tabla in TABLAS_SINCRONIZADAS}
+
+# node_id ya leídos, por (nombre, ruta) de la conexión
+_NODOS: Dict[Tuple[str, str], str] = {}
+
+def node_id(db: DatabaseConnection) -> str:
+    """
+    Devuelve el identificador de esta instalación, creándolo la primera vez.
+    
+    El valor leído de la base se guarda en memoria por conexión, así que
+    registrar_cambio() no lo vuelve a consultar en cada escritura. Un id
+    recién creado no se guarda hasta leerlo, por si la transacción que lo
+    insertó se deshace.
+    """
+    clave = (db.name, db.path)
+    valor = _NODOS.get(clave)
+    if valor is not None:
+        return valor
+    fila = db.fetch_one(_LEER_ESTADO, ("node_id",))
+    if fila:
+        _NODOS[clave] = fila[0]
+        return fila[0]
+    valor = nuevo_uuid()
+    db.execute_write(_GUARDAR_ESTADO, ("node_id", valor))
+    return valor
+
+def registrar_cambio(db: DatabaseConnection, tabla: str, fila_id: int, operacion: str = OP_UPSERT):
+    """
+    Agrega al diario la instantánea actual de una fila.
+    
+    Debe llamarse dentro de la misma transacción que la escritura, para que
+    la fila y su entrada del diario se confirmen juntas.
+    
+    Args:
+        db (DatabaseConnection): Conexión local
+        tabla (str): Tabla sincronizada
+        fila_id (int): Id local de la fila
+        operacion (str): OP_UPSERT u OP_DELETE (llamar antes de borrar la fila)
+    """
+    config = TABLAS_SINCRONIZADAS[tabla]
+    fila = db.fetch_one(_INSTANTANEAS[tabla], (fila_id,))
+    if fila is None:
+        return
+    datos = None
+    if operacion == OP_UPSERT:
+        datos = json.dumps(dict(zip((*config["columnas"], *config["referencias"]), fila[1:])))
+    db.execute_write(_INSERTAR_ENTRADA, (tabla, fila[0], operacion, datos, node_id(db)))
+
+def _id_por_uuid(db: DatabaseConnection, tabla: str, valor: Optional[str]) -> Optional[int]:
+    if valor is None:
+        return None
+    fila = db.fetch_one(f"SELECT id FROM {tabla} WHERE uuid = ?", (valor,))
+    if fila is None:
+        alias = db.fetch_one("SELECT uuid_local FROM sync_alias WHERE uuid = ?", (valor,))
+        if alias:
+            fila = db.fetch_one(f"SELECT id FROM {tabla} WHERE uuid = ?", (alias[0],))
+    if fila is None:
+        raise LookupError(f"Referencia inexistente: {tabla} {valor}")
+    return fila[0]
+
+def aplicar(db: DatabaseConnection, tabla: str, valor_uuid: str, operacion: str, datos: Optional[str]):
+    """
+    Aplica una entrada del diario sobre una base (upsert o borrado por uuid).
+    
+    No registra nada en el diario de esa base.
+    """
+    if operacion == OP_DELETE:
+        db.execute_write(f"DELETE FROM {tabla} WHERE uuid = ?", (valor_uuid,))
+        return
+    valores = json.loads(datos)
+    for columna, destino in TABLAS_SINCRONIZADAS[tabla]["referencias"].items():
+        valores[columna] = _id_por_uuid(db, destino, valores[columna])
+    for campo, columna in TABLAS_SINCRONIZADAS[tabla]["textos"].items():
+        valores[columna] = guardar_descripcion(db, valores.pop(campo))
+    valores["uuid"] = valor_uuid
+    try:
+        db.execute_write(_UPSERTS[tabla], valores)
+    except sqlite3.IntegrityError:
+        # Mismo email registrado en dos instalaciones: se trata como la misma fila
+        if not valores.get("email"):
+            raise
+        existente = db.fetch_one(f"SELECT uuid FROM {tabla} WHERE email = ?", (valores["email"],))
+        if existente is None:
+            raise
+        db.execute_write(
+            "INSERT OR REPLACE INTO sync_alias (uuid, tabla, uuid_local) VALUES (?, ?, ?)",
+            (valor_uuid, tabla, existente[0]))
+
+class SyncClient:
+    """
+    Sincroniza la base local con una instancia central.
+    
+    Atributos:
+        local (DatabaseConnection): Base de esta instalación
+        central (DatabaseConnection): Base central compartida
+        batch_size (int): Entradas del diario por transacción
+    """
+    def __init__(self, local: DatabaseConnection = None, central: DatabaseConnection = None,
+                 batch_size: int = 500):
+        self.local = local or DatabaseConnection()
+        self.central = central or DatabaseConnection(CENTRAL_NAME)
+        self.batch_size = batch_size
+        self.node_id = node_id(self.local)
+
+    def _cursor(self, clave: str) -> int:
+        fila = self.local.fetch_one(_LEER_ESTADO, (clave,))
+        return int(fila[0]) if fila else 0
+
+    def _apartar(self, sentido: str, seq: int, entrada: Tuple[Any, ...], error: Exception):
+        self.local.execute_write(_APARTAR, (sentido, seq, *entrada, str(error)))
+
+    def push(self) -> int:
+        """
+        Envía a la central las entradas locales aún no enviadas.
+        
+        Las entradas se copian al diario central con el origen de esta
+        instalación para que las demás puedan traerlas. Una entrada que no
+        se puede aplicar en la central (por ejemplo una referencia que no
+        existe allí) se aparta en sync_rechazos y el resto del lote se envía.
+        
+        Returns:
+            int: Número de entradas enviadas
+        """
+        enviadas = 0
+        while True:
+            desde = self._cursor("ultimo_enviado")
+            entradas = self.local.fetch_all(
+                "SELECT seq, tabla, uuid, operacion, datos FROM sync_journal "
+                "WHERE seq > ? AND origen = ? ORDER BY seq LIMIT ?",
+                (desde, self.node_id, self.batch_size))
+            if not entradas:
+                return enviadas
+            with self.central.transaction():
+                for seq, tabla, valor_uuid, operacion, datos in entradas:
+                    try:
+                        with self.central.savepoint():
+                            aplicar(self.central, tabla, valor_uuid, operacion, datos)
+                            self.central.execute_write(
+                                _INSERTAR_ENTRADA, (tabla, valor_uuid, operacion, datos, self.node_id))
+                    except ERRORES_DE_ENTRADA as e:
+                        self._apartar(SENTIDO_PUSH, seq, (tabla, valor_uuid, operacion, datos, self.node_id), e)
+                        continue
+                    enviadas += 1
+            self.local.execute_write(_GUARDAR_ESTADO, ("ultimo_enviado", str(entradas[-1][0])))
+
+    def pull(self) -> int:
+        """
+        Trae de la central las entradas de otras instalaciones.
+        
+        Como en push(), una entrada que no se puede aplicar se aparta en
+        sync_rechazos sin detener el lote.
+        
+        Returns:
+            int: Número de entradas aplicadas
+        """
+        aplicadas = 0
+        while True:
+            desde = self._cursor("ultimo_recibido")
+            entradas = self.central.fetch_all(
+                "SELECT seq, tabla, uuid, operacion, datos, origen FROM sync_journal "
+                "WHERE seq > ? ORDER BY seq LIMIT ?",
+                (desde, self.batch_size))
+            if not entradas:
+                return aplicadas
+            with self.local.transaction():
+                for seq, tabla, valor_uuid, operacion, datos, origen in entradas:
+                    if origen == self.node_id:
+                        continue
+                    try:
+                        with self.local.savepoint():
+                            aplicar(self.local, tabla, valor_uuid, operacion, datos)
+                    except ERRORES_DE_ENTRADA as e:
+                        self._apartar(SENTIDO_PULL, seq, (tabla, valor_uuid, operacion, datos, origen), e)
+                        continue
+                    aplicadas += 1
+                self.local.execute_write(_GUARDAR_ESTADO, ("ultimo_recibido", str(entradas[-1][0])))
+
+    def reintentar(self) -> int:
+        """
+        Vuelve a aplicar las entradas apartadas en sync_rechazos.
+        
+        Las que ahora se aplican (por ejemplo porque ya llegó la fila
+        referenciada) salen de la tabla; las demás guardan el último error.
+        
+        Returns:
+            int: Número de entradas aplicadas
+        """
+        aplicadas = 0
+        for rechazo_id, sentido, tabla, valor_uuid, operacion, datos, origen in self.local.fetch_all(_RECHAZADAS):
+            destino = self.central if sentido == SENTIDO_PUSH else self.local
+            try:
+                with destino.transaction():
+                    aplicar(destino, tabla, valor_uuid, operacion, datos)
+                    if sentido == SENTIDO_PUSH:
+                        destino.execute_write(_INSERTAR_ENTRADA, (tabla, valor_uuid, operacion, datos, origen))
+            except ERRORES_DE_ENTRADA as e:
+                self.local.execute_write(_ACTUALIZAR_RECHAZO, (str(e), rechazo_id))
+                continue
+            self.local.execute_write(_BORRAR_RECHAZO, (rechazo_id,))
+            aplicadas += 1
+        return aplicadas
+
+    def sync(self) -> Tuple[int, int]:
+        """
+        Envía y luego trae cambios; al final reintenta las entradas
+        apartadas, cuyas referencias pueden haber llegado en este ciclo.
+        
+        Returns:
+            Tuple[int, int]: (entradas enviadas, entradas recibidas)
+        """
+        enviadas, recibidas = self.push(), self.pull()
+        self.reintentar()
+        return enviadas, recibidas
+
+def main(argv: List[str] = None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Sincroniza la base local con la central")
+    parser.add_argument("--central", help="Ruta de la base central (por defecto SGST_DB_PATH_CENTRAL)")
+    args = parser.parse_args(argv)
+    if args.central:
+        DatabaseConnection.configure(args.central, name=CENTRAL_NAME)
+    enviadas, recibidas = SyncClient().sync()
+    print(f"Enviadas: {enviadas}  Recibidas: {recibidas}")
+
+if __name__ == "__main__":
+    main()
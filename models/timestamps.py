@@ -0,0 +1,84 @@
+"""
+Marcas de tiempo de las órdenes.
+
+Las fechas se guardan como segundos desde la época Unix (UTC) en columnas
+INTEGER indexadas, de modo que los filtros por rango ("esta semana",
+"este mes") son recorridos de índice y no comparaciones de texto. Los
+valores se crean con zona horaria y se muestran en la hora local.
+"""
+from datetime import date, datetime, timedelta
+from typing import Tuple, Union
+
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+# Valores aceptados donde se espera una fecha: datetime (sin zona se toma
+# como hora local), date, epoch entero o texto 'YYYY-MM-DD[ HH:MM:SS]'
+Fecha = Union[datetime, date, int, str]
+Rango = Tuple[int, int]
+
+def ahora() -> datetime:
+    """
+    Devuelve el momento actual con la zona horaria local.
+    """
+    return datetime.now().astimezone()
+
+def a_epoch(valor: Fecha) -> int:
+    """
+    Convierte una fecha a segundos desde la época Unix.
+
+    Args:
+        valor (Fecha): Fecha a convertir
+
+    Returns:
+        int: Segundos desde 1970-01-01 UTC
+
+    Raises:
+        ValueError: Si el texto no tiene un formato de fecha válido
+    """
+    if isinstance(valor, int):
+        return valor
+    if isinstance(valor, str):
+        valor = datetime.fromisoformat(valor.strip())
+    elif not isinstance(valor, datetime):
+        valor = datetime(valor.year, valor.month, valor.day)
+    return int(valor.timestamp())
+
+def desde_epoch(segundos: int) -> datetime:
+    """
+    Convierte segundos desde la época a un datetime en la hora local.
+    """
+    return datetime.fromtimestamp(segundos).astimezone()
+
+def formatear(segundos: int) -> str:
+    """
+    Texto en hora local con el formato histórico de fecha_creacion.
+    """
+    return desde_epoch(segundos).strftime(FORMATO_FECHA) if segundos is not None else ""
+
+def rango_dia(referencia: Fecha = None) -> Rango:
+    """
+    Rango [inicio, fin) del día local que contiene la referencia.
+    """
+    inicio = _dia(referencia)
+    return a_epoch(inicio), a_epoch(inicio + timedelta(days=1))
+
+def rango_semana(referencia: Fecha = None) -> Rango:
+    """
+    Rango [lunes, lunes siguiente) de la semana local que contiene la referencia.
+    """
+    inicio = _dia(referencia)
+    inicio -= timedelta(days=inicio.weekday())
+    return a_epoch(inicio), a_epoch(inicio + timedelta(days=7))
+
+def rango_mes(referencia: Fecha = None) -> Rango:
+    """
+    Rango [día 1, día 1 del mes siguiente) del mes local que contiene la referencia.
+    """
+    inicio = _dia(referencia).replace(day=1)
+    siguiente = (inicio + timedelta(days=32)).replace(day=1)
+    return a_epoch(inicio), a_epoch(siguiente)
+
+def _dia(referencia: Fecha = None) -> datetime:
+    # Medianoche local (sin zona, a_epoch la interpreta como hora local)
+    momento = desde_epoch(a_epoch(referencia)) if referencia is not None else ahora()
+    return datetime(momento.year, momento.month, momento.day)
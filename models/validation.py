@@ -0,0 +1,193 @@
+"""
+Validación de clientes, técnicos y filas importadas.
+
+Las reglas de cada tipo de registro se declaran en REGLAS como pares
+(campo, regla) y se compilan una sola vez en una tupla de funciones con
+las expresiones regulares ya compiladas y la lista de especialidades
+conocidas ya normalizada. La interfaz, la importación masiva y cualquier
+otro punto de entrada validan con las mismas funciones:
+
+    validar_registro(campos, "cliente")  -> errores de un registro
+    validar_lote(filas, "tecnico")       -> un vector de errores por fila
+
+Los lotes grandes se reparten en bloques entre un pool de procesos; el
+resultado conserva el orden de las filas.
+"""
+import csv
+import multiprocessing as mp
+import os
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Sequence, Tuple
+from models.normalization import normalizar_texto
+from models.service_factory import ServiceFactory
+
+PATRON_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# Dígitos con separadores habituales y prefijo internacional opcional
+PATRON_TELEFONO = re.compile(r'^\+?[0-9][0-9 ().-]{4,18}[0-9]$')
+
+OBLIGATORIO = "obligatorio"
+EMAIL = "email"
+TELEFONO = "telefono"
+ESPECIALIDAD = "especialidad"
+
+REGLAS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "cliente": (
+        ("nombre", OBLIGATORIO), ("email", EMAIL), ("telefono", TELEFONO),
+    ),
+    "tecnico": (
+        ("nombre", OBLIGATORIO), ("especialidad", OBLIGATORIO), ("especialidad", ESPECIALIDAD),
+        ("email", EMAIL), ("telefono", TELEFONO),
+    ),
+    # Filas de los archivos de socios (ver models.ingest)
+    "orden": (
+        ("cliente", OBLIGATORIO), ("tecnico", OBLIGATORIO), ("tipo_servicio", OBLIGATORIO),
+        ("descripcion", OBLIGATORIO), ("costo", OBLIGATORIO), ("email", EMAIL), ("telefono", TELEFONO),
+    ),
+}
+
+# Filas a partir de las cuales validar_lote usa un pool de procesos
+UMBRAL_PROCESOS = 50000
+
+ReglaCompilada = Tuple[str, Tuple[Tuple[Callable[[Any], bool], str], ...]]
+
+def email_valido(email: str) -> bool:
+    """
+    Indica si el email tiene un formato válido.
+    """
+    return PATRON_EMAIL.match(email) is not None
+
+def especialidades_conocidas() -> FrozenSet[str]:
+    """
+    Especialidades (normalizadas) asociadas a algún tipo de servicio registrado.
+    """
+    return frozenset(e for spec in ServiceFactory.types() for e in spec.especialidades)
+
+@lru_cache(maxsize=32)
+def compilar(conjunto: str, especialidades: FrozenSet[str]) -> Tuple[ReglaCompilada, ...]:
+    """
+    Compila un conjunto de REGLAS en pares (campo, comprobaciones), con
+    las comprobaciones de un mismo campo juntas para leerlo una sola vez.
+
+    Las reglas de formato aceptan valores vacíos; solo 'obligatorio' los rechaza.
+
+    Args:
+        conjunto (str): Clave de REGLAS
+        especialidades (FrozenSet[str]): Especialidades admitidas, normalizadas
+
+    Raises:
+        ValueError: Si el conjunto o una regla no existen
+    """
+    if conjunto not in REGLAS:
+        raise ValueError(f"Conjunto de reglas desconocido: {conjunto}")
+    # Normalizar es lo más caro de la validación y los valores se repiten mucho
+    especialidad_conocida = lru_cache(maxsize=1024)(lambda valor: normalizar_texto(valor) in especialidades)
+    comprobaciones = {
+        OBLIGATORIO: (lambda valor: bool(valor), "{} es obligatorio"),
+        EMAIL: (lambda valor: not valor or PATRON_EMAIL.match(valor) is not None,
+                "{} no tiene un formato válido"),
+        TELEFONO: (lambda valor: not valor or PATRON_TELEFONO.match(valor) is not None,
+                   "{} no tiene un formato válido"),
+        ESPECIALIDAD: (lambda valor: not valor or especialidad_conocida(valor),
+                       "{} no es una especialidad conocida"),
+    }
+    por_campo: Dict[str, List[Tuple[Callable[[Any], bool], str]]] = {}
+    for campo, regla in REGLAS[conjunto]:
+        if regla not in comprobaciones:
+            raise ValueError(f"Regla desconocida: {regla}")
+        es_valido, mensaje = comprobaciones[regla]
+        por_campo.setdefault(campo, []).append((es_valido, mensaje.format(campo)))
+    return tuple((campo, tuple(lista)) for campo, lista in por_campo.items())
+
+def _errores(reglas: Tuple[ReglaCompilada, ...], campos: Dict[str, Any]) -> List[str]:
+    errores = []
+    for campo, comprobaciones in reglas:
+        valor = campos.get(campo)
+        if valor.__class__ is str:
+            valor = valor.strip()
+        for es_valido, mensaje in comprobaciones:
+            if not es_valido(valor):
+                errores.append(mensaje)
+    return errores
+
+def validar_registro(campos: Dict[str, Any], conjunto: str) -> List[str]:
+    """
+    Valida un registro.
+
+    Args:
+        campos (Dict[str, Any]): Valores por nombre de campo
+        conjunto (str): Clave de REGLAS ("cliente", "tecnico" u "orden")
+
+    Returns:
+        List[str]: Mensajes de error; vacía si el registro es válido
+
+    Raises:
+        ValueError: Si el conjunto no existe
+    """
+    return _errores(compilar(conjunto, especialidades_conocidas()), campos)
+
+def _validar_bloque(trabajo: Tuple[str, FrozenSet[str], Sequence[Dict[str, Any]]]) -> List[List[str]]:
+    conjunto, especialidades, filas = trabajo
+    reglas = compilar(conjunto, especialidades)
+    return [_errores(reglas, campos) for campos in filas]
+
+def _bloques(filas: Sequence[Dict[str, Any]], chunk_size: int) -> Iterator[Sequence[Dict[str, Any]]]:
+    for inicio in range(0, len(filas), chunk_size):
+        yield filas[inicio:inicio + chunk_size]
+
+def validar_lote(filas: Sequence[Dict[str, Any]], conjunto: str, workers: int = None,
+                 chunk_size: int = 5000) -> List[List[str]]:
+    """
+    Valida un lote de registros.
+
+    Args:
+        filas (Sequence[Dict[str, Any]]): Registros a validar
+        conjunto (str): Clave de REGLAS
+        workers (int, opcional): Procesos a usar; por defecto todos los
+            núcleos si el lote tiene al menos UMBRAL_PROCESOS filas y uno
+            (sin pool) en otro caso
+        chunk_size (int): Filas por bloque enviado a cada proceso
+
+    Returns:
+        List[List[str]]: Errores de cada fila, en el mismo orden que filas
+
+    Raises:
+        ValueError: Si el conjunto no existe
+    """
+    especialidades = especialidades_conocidas()
+    compilar(conjunto, especialidades)  # conjunto desconocido: fallar antes de crear el pool
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(filas) >= UMBRAL_PROCESOS else 1
+    if workers <= 1 or len(filas) <= chunk_size:
+        return _validar_bloque((conjunto, especialidades, filas))
+    errores: List[List[str]] = []
+    with mp.Pool(workers) as pool:
+        trabajos = ((conjunto, especialidades, bloque) for bloque in _bloques(filas, chunk_size))
+        for resultado in pool.imap(_validar_bloque, trabajos):
+            errores.extend(resultado)
+    return errores
+
+def validar_csv(ruta: str, conjunto: str, workers: int = None,
+                chunk_size: int = 5000) -> List[Tuple[int, List[str]]]:
+    """
+    Valida un archivo CSV con encabezado.
+
+    Args:
+        ruta (str): Archivo a validar
+        conjunto (str): Clave de REGLAS
+        workers (int, opcional): Procesos a usar (ver validar_lote)
+        chunk_size (int): Filas por bloque
+
+    Returns:
+        List[Tuple[int, List[str]]]: (línea, errores) de las filas inválidas
+    """
+    with open(ruta, newline="", encoding="utf-8") as f:
+        lector = csv.reader(f)
+        encabezado = [campo.strip().lower() for campo in next(lector, [])]
+        numeros, filas = [], []
+        for valores in lector:
+            if any(valores):
+                numeros.append(lector.line_num)
+                filas.append(dict(zip(encabezado, valores)))
+    errores = validar_lote(filas, conjunto, workers, chunk_size)
+    return [(numero, mensajes) for numero, mensajes in zip(numeros, errores) if mensajes]
@@ -0,0 +1,11 @@
+import pytest
+from models.db_connection import DatabaseConnection
+
+@pytest.fixture(autouse=True)
+def db_en_memoria():
+    # Cada prueba usa bases en memoria aisladas para no tocar database.db
+    DatabaseConnection.configure(DatabaseConnection.memory_dsn("test"))
+    DatabaseConnection.configure(DatabaseConnection.memory_dsn("archive"), name="archive")
+    yield DatabaseConnection()
+    DatabaseConnection.reset()
+    DatabaseConnection._paths.clear()
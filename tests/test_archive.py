@@ -0,0 +1,30 @@
+from models.archive import OrderArchiver
+from models.db_connection import DatabaseConnection
+from models.models import Cliente, Tecnico, ServicioReparacion, OrdenDeTrabajo
+
+def _crear_orden(fecha: str, estado: str) -> int:
+    cliente = Cliente("Juan Pérez", None)
+    tecnico = Tecnico("María García", "Hardware")
+    orden = OrdenDeTrabajo(cliente, ServicioReparacion("Reparación", 100.0), tecnico)
+    orden.fecha_creacion = fecha
+    orden.estado = estado
+    return orden.guardar()
+
+def test_archiva_solo_ordenes_cerradas_antiguas():
+    antigua = _crear_orden("2020-01-01 10:00:00", "Completada")
+    _crear_orden("2020-01-02 10:00:00", "Pendiente")
+    _crear_orden("2999-01-01 10:00:00", "Completada")
+    archiver = OrderArchiver()
+    assert archiver.archive_orders(older_than_days=30, batch_size=1) == 1
+    db = DatabaseConnection()
+    ids = [fila[0] for fila in db.execute_query("SELECT id FROM main.ordenes_trabajo")]
+    assert antigua not in ids and len(ids) == 2
+    assert db.execute_query("SELECT id FROM archive.ordenes_trabajo") == [(antigua,)]
+
+def test_historial_une_archivo_segun_rango():
+    antigua = _crear_orden("2020-01-01 10:00:00", "Cancelada")
+    reciente = _crear_orden("2999-01-01 10:00:00", "Pendiente")
+    archiver = OrderArchiver()
+    archiver.archive_orders(older_than_days=30)
+    assert [fila[0] for fila in archiver.query_history()] == [reciente, antigua]
+    assert [fila[0] for fila in archiver.query_history(desde="2021-01-01")] == [reciente]
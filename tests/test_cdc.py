@@ -0,0 +1,47 @@
+import pytest
+from models.cdc import ChangeFeed, purgar
+from models.db_connection import DatabaseConnection
+from models.models import Cliente, Tecnico, ServicioReparacion, OrdenDeTrabajo
+
+def _crear_orden():
+    orden = OrdenDeTrabajo(Cliente("Ana", "ana@email.com"), ServicioReparacion("Pantalla", 10.0), Tecnico("Luis", "Hardware"))
+    orden.guardar()
+    return orden
+
+def test_triggers_registran_insert_update_delete():
+    orden = _crear_orden()
+    db = DatabaseConnection()
+    db.execute_write("UPDATE ordenes_trabajo SET estado = 'Completada' WHERE id = ?", (orden.id,))
+    db.execute_write("DELETE FROM ordenes_trabajo WHERE id = ?", (orden.id,))
+    cambios = [(c.tabla, c.operacion) for c in ChangeFeed("test").leer()]
+    assert cambios == [("clientes", "insert"), ("tecnicos", "insert"), ("servicios", "insert"),
+                       ("ordenes_trabajo", "insert"), ("ordenes_trabajo", "update"), ("ordenes_trabajo", "delete")]
+
+def test_cursor_por_consumidor_y_lotes():
+    _crear_orden()
+    reportes = ChangeFeed("reportes", batch_size=3)
+    assert [len(lote) for lote in reportes.lotes()] == [3, 1]
+    assert reportes.pendientes() == 0
+    assert ChangeFeed("reportes").leer() == []
+    # Otro consumidor conserva su propia posición
+    assert len(ChangeFeed("otro").leer()) == 4
+
+def test_lote_no_confirmado_se_vuelve_a_leer():
+    _crear_orden()
+    feed = ChangeFeed("notificaciones", tablas=["ordenes_trabajo"])
+    primero = next(feed.lotes())
+    assert [c.tabla for c in primero] == ["ordenes_trabajo"]
+    assert feed.posicion == 0
+    assert [c.seq for c in feed.leer()] == [primero[0].seq]
+
+def test_tabla_desconocida():
+    with pytest.raises(ValueError):
+        ChangeFeed("x", tablas=["agenda"])
+
+def test_purgar_respeta_el_consumidor_mas_atrasado():
+    _crear_orden()
+    rapido, lento = ChangeFeed("rapido"), ChangeFeed("lento")
+    rapido.confirmar(4)
+    lento.confirmar(2)
+    assert purgar() == 2
+    assert [c.seq for c in lento.leer()] == [3, 4]
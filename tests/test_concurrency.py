@@ -0,0 +1,56 @@
+import sqlite3
+import pytest
+from models.concurrency import ConflictoDeVersion, FilaEliminada, actualizar_fila, eliminar_fila
+from models.db_connection import DatabaseConnection
+from models.models import Cliente, Tecnico, ServicioReparacion, OrdenDeTrabajo
+
+def test_actualizar_incrementa_version():
+    cliente = Cliente("Ana", "ana@x.com")
+    cliente.guardar()
+    assert cliente.version == 1
+    cliente.actualizar(email="Ana@Y.com", telefono="555-01")
+    assert cliente.version == 2
+    leido = Cliente.buscar_por_email("ana@y.com")
+    assert (leido.telefono, leido.version) == ("555-01", 2)
+    with pytest.raises(ValueError):
+        cliente.actualizar(id=9)
+
+def test_version_vieja_lanza_conflicto_con_valores_actuales():
+    tecnico = Tecnico("Luis", "Hardware")
+    tecnico.guardar()
+    otra_copia = Tecnico("Luis", "Hardware", id=tecnico.id, version=tecnico.version)
+    tecnico.actualizar(especialidad="Redes")
+    with pytest.raises(ConflictoDeVersion) as error:
+        otra_copia.actualizar(telefono="555")
+    assert (error.value.esperada, error.value.actual) == (1, 2)
+    assert error.value.valores["especialidad"] == "Redes"
+    assert otra_copia.version == 1 and otra_copia.telefono is None
+    db = DatabaseConnection()
+    assert db.fetch_one("SELECT telefono FROM tecnicos WHERE id = ?", (tecnico.id,))[0] is None
+
+def test_orden_eliminada_lanza_fila_eliminada():
+    orden = OrdenDeTrabajo(Cliente("Eva", None), ServicioReparacion("Disco", 10.0), Tecnico("Sol", "Hardware"), "Disco")
+    orden.guardar()
+    orden.actualizar(estado="Completada", descripcion="Disco reemplazado")
+    db = DatabaseConnection()
+    assert db.fetch_one("SELECT version, estado FROM ordenes_trabajo WHERE id = ?", (orden.id,)) == (2, "Completada")
+    with pytest.raises(ConflictoDeVersion):
+        eliminar_fila(db, "ordenes_trabajo", orden.id, 1)
+    eliminar_fila(db, "ordenes_trabajo", orden.id, 2)
+    with pytest.raises(FilaEliminada):
+        orden.actualizar(estado="Cancelada")
+    with pytest.raises(ValueError):
+        actualizar_fila(db, "cambios", 1, 1, {"tabla": "x"})
+
+def test_migra_version_en_base_anterior(tmp_path):
+    ruta = str(tmp_path / "antigua.db")
+    antigua = sqlite3.connect(ruta)
+    antigua.executescript("""
+        CREATE TABLE clientes (id INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT NOT NULL,
+            email TEXT, telefono TEXT, direccion TEXT);
+        INSERT INTO clientes (nombre) VALUES ('Ana');
+    """)
+    antigua.close()
+    DatabaseConnection.configure(ruta, name="antigua")
+    db = DatabaseConnection("antigua")
+    assert db.fetch_one("SELECT version FROM clientes WHERE nombre = 'Ana'") == (1,)
@@ -0,0 +1,117 @@
+import os
+import sqlite3
+import threading
+import pytest
+from models.db_connection import DatabaseConnection
+from models.models import Cliente
+from models.queries import ClienteQueries, build_select
+from models.records import ClienteRegistro
+from models.timestamps import a_epoch
+
+def test_usa_base_configurada():
+    db = DatabaseConnection()
+    assert db.path.startswith("file:test_")
+    assert DatabaseConnection() is db
+
+def test_reset_crea_instancia_nueva():
+    Cliente("Ana", "ana@email.com").guardar()
+    DatabaseConnection.configure(DatabaseConnection.memory_dsn("test"))
+    assert DatabaseConnection().execute_query("SELECT COUNT(*) FROM clientes")[0][0] == 0
+
+def test_instancias_con_nombre(tmp_path):
+    DatabaseConnection.configure(str(tmp_path / "archivo.db"), name="archive")
+    archive = DatabaseConnection("archive")
+    assert archive is not DatabaseConnection()
+    assert DatabaseConnection("archive") is archive
+    assert os.path.exists(tmp_path / "archivo.db")
+
+def test_ruta_desde_entorno(monkeypatch, tmp_path):
+    ruta = str(tmp_path / "entorno.db")
+    monkeypatch.setenv("SGST_DB_PATH_REPORTES", ruta)
+    assert DatabaseConnection.resolve_path("reportes") == ruta
+
+def test_memoria_compartida_entre_conexiones():
+    db = DatabaseConnection()
+    Cliente("Luis", "luis@email.com").guardar()
+    otra = sqlite3.connect(db.path, uri=True)
+    assert otra.execute("SELECT nombre FROM clientes").fetchall() == [("Luis",)]
+    otra.close()
+
+def test_conexion_propia_por_hilo():
+    compartida = DatabaseConnection()
+    Cliente("Ana", "ana@email.com").guardar()
+    vistas = []
+
+    def hilo():
+        propia = DatabaseConnection.open_for_thread()
+        Cliente("Luis", "luis@email.com").guardar()
+        vistas.append((propia is not compartida, DatabaseConnection() is propia))
+        DatabaseConnection.close_thread()
+        vistas.append(DatabaseConnection() is compartida)
+
+    trabajador = threading.Thread(target=hilo)
+    trabajador.start()
+    trabajador.join()
+    assert vistas == [(True, True), True]
+    assert compartida.fetch_one("SELECT COUNT(*) FROM clientes")[0] == 2
+
+def test_api_lectura_escritura():
+    db = DatabaseConnection()
+    rowid = db.execute_write(ClienteQueries.INSERTAR, Cliente("Eva", "eva@email.com").valores_insercion())
+    assert db.fetch_one(ClienteQueries.POR_ID, (rowid,))[1] == "Eva"
+    assert db.fetch_one(ClienteQueries.POR_ID, (rowid + 1,)) is None
+
+def test_transaccion_deshace_si_falla():
+    db = DatabaseConnection()
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction():
+            db.execute_write(ClienteQueries.INSERTAR, Cliente("Eva", "eva@email.com").valores_insercion())
+            db.execute_write(ClienteQueries.INSERTAR, Cliente("Eva", "eva@email.com").valores_insercion())
+    assert db.fetch_all(ClienteQueries.TODOS) == []
+
+def test_build_select_memoriza():
+    sql = build_select("clientes", ("id", "nombre"), ("nombre = ?",), "id", True)
+    assert sql == "SELECT id, nombre FROM clientes WHERE nombre = ? ORDER BY id LIMIT ?"
+    assert build_select("clientes", ("id", "nombre"), ("nombre = ?",), "id", True) is sql
+
+def test_iter_rows_por_bloques_con_registros():
+    db = DatabaseConnection()
+    db.execute_many(ClienteQueries.INSERTAR, [Cliente(f"c{i}", f"c{i}@email.com").valores_insercion() for i in range(7)])
+    bloques = list(db.iter_chunks(ClienteQueries.TODOS, chunk_size=3))
+    assert [len(b) for b in bloques] == [3, 3, 1]
+    registros = list(db.iter_rows(ClienteQueries.TODOS, chunk_size=2, row_factory=ClienteRegistro))
+    assert registros[6].nombre == "c6" and registros[6].as_tuple()[2] == "c6@email.com"
+    fila = next(db.iter_rows(ClienteQueries.TODOS, row_factory=sqlite3.Row))
+    assert fila["email"] == "c0@email.com"
+
+def test_migra_fecha_de_texto_a_epoch(tmp_path):
+    ruta = str(tmp_path / "antigua.db")
+    antigua = sqlite3.connect(ruta)
+    antigua.executescript("""
+        CREATE TABLE ordenes_trabajo (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, cliente_id INTEGER, tecnico_id INTEGER,
+            servicio_id INTEGER, fecha_creacion TEXT NOT NULL, estado TEXT NOT NULL,
+            descripcion TEXT, costo_total REAL
+        );
+        CREATE INDEX idx_ordenes_estado_fecha ON ordenes_trabajo (estado, fecha_creacion);
+        INSERT INTO ordenes_trabajo (fecha_creacion, estado) VALUES ('2025-06-11 12:23:16', 'Pendiente');
+    """)
+    antigua.close()
+    DatabaseConnection.configure(ruta, name="antigua")
+    db = DatabaseConnection("antigua")
+    assert "fecha_creacion" not in db.table_columns("ordenes_trabajo")
+    assert db.fetch_one("SELECT creado_en FROM ordenes_trabajo")[0] == a_epoch("2025-06-11 12:23:16")
+    assert db.fetch_one("SELECT fecha_creacion FROM ordenes_trabajo_compat")[0] == "2025-06-11 12:23:16"
+
+def test_savepoint_deshace_solo_su_bloque():
+    db = DatabaseConnection()
+    with db.transaction():
+        with pytest.raises(sqlite3.IntegrityError):
+            with db.savepoint():
+                Cliente("Ana", "ana@email.com").guardar()
+                Cliente("Otra Ana", "ana@email.com").guardar()
+        Cliente("Luis", "luis@email.com").guardar()
+    assert db.fetch_all("SELECT nombre FROM clientes") == [("Luis",)]
+    with pytest.raises(RuntimeError):
+        with db.savepoint():
+            pass
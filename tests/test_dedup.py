@@ -0,0 +1,44 @@
+from models.db_connection import DatabaseConnection
+from models.dedup import ClientDeduplicator
+from models.models import Cliente, Tecnico, ServicioReparacion, OrdenDeTrabajo
+
+def test_busqueda_normalizada():
+    Cliente("José  Pérez", "Jose@Email.com").guardar()
+    assert [c.email for c in Cliente.buscar_por_nombre("jose perez")] == ["Jose@Email.com"]
+    assert Cliente.buscar_por_email("jose@email.com ").nombre == "José  Pérez"
+
+def test_detecta_grupos_por_bloques():
+    a = Cliente("Juan Pérez", "juan@email.com", "(011) 4555-1234").guardar()
+    b = Cliente("Pérez, Juan", None, "011 4555 1234").guardar()
+    c = Cliente("Juan Perez", "otro@email.com").guardar()
+    d = Cliente("Ana Gómez", "ana@email.com", "999").guardar()
+    dedup = ClientDeduplicator()
+    grupos = dedup.find_duplicates()
+    assert [g.ids for g in grupos] == [[a, b]]
+    assert grupos[0].motivos == {"telefono"}
+    assert [g.ids for g in dedup.find_name_matches()] == [[a, b, c]]
+    assert d not in grupos[0].ids
+
+def test_coincidencia_solo_por_nombre_no_se_fusiona():
+    a = Cliente("Juan Pérez", "a@x.com", "111").guardar()
+    b = Cliente("J. Perez", "b@x.com", "111").guardar()
+    c = Cliente("Juan Perez", "zzz@x.com", "999").guardar()
+    dedup = ClientDeduplicator()
+    assert dedup.merge_all() == 1
+    assert [fila[0] for fila in DatabaseConnection().fetch_all("SELECT id FROM clientes ORDER BY id")] == [a, c]
+    assert [g.ids for g in dedup.find_name_matches()] == [[a, c]]
+
+def test_merge_reasigna_ordenes_y_completa_datos():
+    tecnico = Tecnico("Luis", "Hardware")
+    tecnico.guardar()
+    original = Cliente("Juan Pérez", None, "4555-1234")
+    original.guardar()
+    duplicado = Cliente("Juan Perez", "juan@email.com", "45551234", "Calle 1")
+    duplicado.guardar()
+    OrdenDeTrabajo(duplicado, ServicioReparacion("Falla", 10.0), tecnico).guardar()
+
+    dedup = ClientDeduplicator()
+    assert dedup.merge_all() == 1
+    db = DatabaseConnection()
+    assert db.fetch_all("SELECT id, email, direccion FROM clientes") == [(original.id, "juan@email.com", "Calle 1")]
+    assert db.fetch_all("SELECT cliente_id FROM ordenes_trabajo") == [(original.id,)]
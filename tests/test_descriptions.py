@@ -0,0 +1,67 @@
+import sqlite3
+from models.archive import OrderArchiver
+from models.compression import empaquetar, desempaquetar, FORMATO_ZLIB
+from models.db_connection import DatabaseConnection
+from models.descriptions import guardar_descripcion, leer_descripcion
+from models.history import ClientHistory
+from models.models import Cliente, Tecnico, ServicioReparacion, OrdenDeTrabajo
+
+LARGA = "La pantalla parpadea al encender y se apaga tras unos minutos de uso. " * 10
+
+def test_descripcion_compartida_y_comprimida():
+    db = DatabaseConnection()
+    orden = OrdenDeTrabajo(Cliente("Ana", None), ServicioReparacion(LARGA, 100.0), Tecnico("Luis", "Hardware"), LARGA)
+    orden.guardar()
+    OrdenDeTrabajo(Cliente("Eva", None), ServicioReparacion("Pantalla", 50.0), Tecnico("Sol", "Hardware"), "Pantalla").guardar()
+
+    # Cuatro filas (dos servicios y dos órdenes) y solo dos textos distintos
+    assert db.fetch_one("SELECT COUNT(*) FROM descripciones")[0] == 2
+    servicio_id, orden_desc = db.fetch_one(
+        "SELECT s.descripcion_id, o.descripcion_id FROM ordenes_trabajo o JOIN servicios s ON s.id = o.servicio_id WHERE o.id = ?",
+        (orden.id,))
+    assert servicio_id == orden_desc == guardar_descripcion(db, LARGA)
+    guardado = db.fetch_one("SELECT texto FROM descripciones WHERE id = ?", (servicio_id,))[0]
+    assert guardado[:1] == FORMATO_ZLIB and len(guardado) < len(LARGA) / 5
+    assert leer_descripcion(db, servicio_id) == LARGA
+    assert ClientHistory(orden.cliente.id).detalle(orden.id)[:2] == (LARGA, LARGA)
+    assert desempaquetar(empaquetar("ñ")) == "ñ" and empaquetar(None) is None
+
+def test_migra_descripciones_de_texto(tmp_path):
+    ruta = str(tmp_path / "antigua.db")
+    antigua = sqlite3.connect(ruta)
+    antigua.executescript(f"""
+        CREATE TABLE servicios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, tipo TEXT NOT NULL,
+            descripcion TEXT NOT NULL, costo_base REAL NOT NULL
+        );
+        CREATE TABLE ordenes_trabajo (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, cliente_id INTEGER, tecnico_id INTEGER,
+            servicio_id INTEGER, creado_en INTEGER NOT NULL, estado TEXT NOT NULL,
+            descripcion TEXT, costo_total REAL
+        );
+        INSERT INTO servicios (tipo, descripcion, costo_base) VALUES ('reparacion', '{LARGA}', 1), ('reparacion', 'Disco', 1);
+        INSERT INTO ordenes_trabajo (servicio_id, creado_en, estado, descripcion)
+            VALUES (1, 0, 'Completada', '{LARGA}'), (2, 0, 'Completada', NULL);
+    """)
+    antigua.close()
+    DatabaseConnection.configure(ruta, name="antigua")
+    db = DatabaseConnection("antigua")
+    assert "descripcion" not in db.table_columns("servicios") + db.table_columns("ordenes_trabajo")
+    assert db.fetch_all("SELECT descripcion_id FROM ordenes_trabajo ORDER BY id") == [(1,), (None,)]
+    assert leer_descripcion(db, 1) == LARGA and leer_descripcion(db, 2) == "Disco"
+    assert db.fetch_one("SELECT COUNT(*) FROM cambios")[0] == 0
+
+def test_archivo_anterior_conserva_descripciones(tmp_path):
+    ruta = str(tmp_path / "archivo.db")
+    archivo = sqlite3.connect(ruta)
+    archivo.executescript("""
+        CREATE TABLE ordenes_trabajo (id INTEGER, creado_en INTEGER, estado TEXT, descripcion TEXT);
+        INSERT INTO ordenes_trabajo VALUES (7, 0, 'Completada', 'Teclado');
+    """)
+    archivo.close()
+    DatabaseConnection.configure(ruta, name="archive")
+    db = DatabaseConnection()
+    OrderArchiver(db)
+    assert "descripcion" not in db.table_columns("ordenes_trabajo", "archive")
+    descripcion_id = db.fetch_one("SELECT descripcion_id FROM archive.ordenes_trabajo WHERE id = 7")[0]
+    assert leer_descripcion(db, descripcion_id) == "Teclado"
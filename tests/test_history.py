@@ -0,0 +1,45 @@
+from models.db_connection import DatabaseConnection
+from models.history import ClientHistory
+from models.models import Cliente, Tecnico, ServicioReparacion, OrdenDeTrabajo
+
+def _crear_ordenes(cliente, tecnico, fechas):
+    ids = []
+    for i, fecha in enumerate(fechas):
+        orden = OrdenDeTrabajo(cliente, ServicioReparacion(f"Falla {i}", 10.0), tecnico, f"Orden {i}")
+        orden.fecha_creacion = fecha
+        ids.append(orden.guardar())
+    return ids
+
+def test_paginas_por_keyset_de_la_mas_reciente():
+    cliente, otro, tecnico = Cliente("Ana", "ana@email.com"), Cliente("Beto"), Tecnico("Luis", "Hardware")
+    # Dos órdenes con la misma fecha: el id desempata sin repetir ni saltar filas
+    fechas = ["2026-01-01 10:00:00", "2026-03-01 10:00:00", "2026-03-01 10:00:00",
+              "2026-02-01 10:00:00", "2026-05-01 10:00:00"]
+    ids = _crear_ordenes(cliente, tecnico, fechas)
+    _crear_ordenes(otro, tecnico, ["2026-04-01 10:00:00"])
+
+    historial = ClientHistory(cliente.id, page_size=2)
+    assert historial.total() == 5
+    paginas = []
+    while not historial.agotado:
+        paginas.append([orden.id for orden in historial.siguiente_pagina()])
+    assert paginas == [[ids[4], ids[2]], [ids[1], ids[3]], [ids[0]]]
+    assert historial.siguiente_pagina() == []
+
+    historial.reiniciar()
+    assert historial.siguiente_pagina()[0].servicio == "servicioreparacion"
+
+def test_detalle_diferido():
+    cliente, tecnico = Cliente("Ana"), Tecnico("Luis", "Hardware")
+    orden_id = _crear_ordenes(cliente, tecnico, ["2026-01-01 10:00:00"])[0]
+    historial = ClientHistory(cliente.id)
+    assert historial.detalle(orden_id) == ("Orden 0", "Falla 0", 10.0, None, "Luis")
+    assert historial.detalle(orden_id + 100) is None
+
+def test_paginas_usan_indice_cubriente():
+    plan = DatabaseConnection().fetch_all(
+        "EXPLAIN QUERY PLAN SELECT id, creado_en, estado, costo_total FROM ordenes_trabajo "
+        "WHERE cliente_id = ? ORDER BY creado_en DESC, id DESC", (1,))
+    detalle = " ".join(fila[-1] for fila in plan)
+    assert "COVERING INDEX idx_ordenes_cliente_fecha" in detalle
+    assert "TEMP B-TREE" not in detalle
@@ -0,0 +1,19 @@
+import os
+from PIL import Image
+from ui import icon
+
+def test_icono_se_convierte_una_sola_vez(tmp_path, monkeypatch):
+    monkeypatch.setattr(icon.tempfile, "gettempdir", lambda: str(tmp_path))
+    ruta = str(tmp_path / "icono.ico")
+    Image.new("RGBA", (32, 32), (255, 0, 0, 255)).save(ruta)
+
+    png = icon.icono_png(ruta)
+    with Image.open(png) as imagen:
+        assert imagen.format == "PNG" and imagen.size == (32, 32)
+    generado = os.stat(png).st_mtime_ns
+    assert icon.icono_png(ruta) == png and os.stat(png).st_mtime_ns == generado
+
+    # Un icono modificado usa otra entrada de la caché
+    Image.new("RGBA", (16, 16)).save(ruta)
+    os.utime(ruta, ns=(0, 10 ** 9))
+    assert icon.icono_png(ruta) != png
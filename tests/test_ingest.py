@@ -0,0 +1,98 @@
+import pytest
+from models import ingest
+from models.db_connection import DatabaseConnection
+from models.ingest import procesar_fila, run_pipeline
+from models.models import Cliente, Tecnico
+
+ENCABEZADO = "cliente,email,telefono,direccion,tecnico,tipo_servicio,descripcion,costo,duracion_estimada\n"
+
+def test_procesar_fila_calcula_costo():
+    fila = procesar_fila({
+        "cliente": "Ana", "email": "ana@email.com", "tecnico": "Luis",
+        "tipo_servicio": "Reparación", "descripcion": "Pantalla", "costo": "100",
+    })
+    assert fila[5] == "servicioreparacion" and fila[-1] == 110.0
+
+def test_procesar_fila_rechaza_invalidas():
+    with pytest.raises(ValueError):
+        procesar_fila({"cliente": "Ana", "tecnico": "Luis", "tipo_servicio": "otro",
+                       "descripcion": "x", "costo": "1"})
+
+def test_pipeline_multiproceso(tmp_path):
+    ruta_db = str(tmp_path / "ingesta.db")
+    DatabaseConnection.configure(ruta_db)
+    Tecnico("Luis", "Hardware").guardar()
+    DatabaseConnection.reset()
+
+    archivo = tmp_path / "ordenes.csv"
+    lineas = [f"Cliente {i % 7},c{i % 7}@email.com,,,Luis,soporte it,Falla {i},80,30\n" for i in range(50)]
+    lineas.append("Sin técnico,,,,Nadie,reparacion,Falla,10,\n")
+    lineas.append("Mal,correo-invalido,,,Luis,reparacion,Falla,10,\n")
+    archivo.write_text(ENCABEZADO + "".join(lineas), encoding="utf-8")
+
+    stats = run_pipeline([str(archivo)], ruta_db, workers=2, chunk_size=8, commit_size=20)
+    assert (stats.leidas, stats.validas, stats.escritas, stats.rechazadas) == (52, 51, 50, 2)
+    DatabaseConnection.configure(ruta_db)
+    db = DatabaseConnection()
+    assert db.fetch_one("SELECT COUNT(*) FROM clientes")[0] == 7
+    assert db.fetch_one("SELECT SUM(costo_total) FROM ordenes_trabajo")[0] == pytest.approx(50 * 96.0)
+
+def test_campo_con_salto_de_linea(tmp_path):
+    ruta_db = str(tmp_path / "ingesta.db")
+    DatabaseConnection.configure(ruta_db)
+    Tecnico("Luis", "Hardware").guardar()
+    DatabaseConnection.reset()
+
+    archivo = tmp_path / "ordenes.csv"
+    archivo.write_text(ENCABEZADO + 'Ana,ana@email.com,,,Luis,reparacion,"Pantalla rota\ny batería",100,\n'
+                       "Mal,correo-invalido,,,Luis,reparacion,Falla,10,\n", encoding="utf-8")
+
+    stats = run_pipeline([str(archivo)], ruta_db, workers=1)
+    assert (stats.leidas, stats.escritas, stats.rechazadas) == (2, 1, 1)
+    assert [(linea, motivo) for _, linea, motivo in stats.errores] == [(4, "email no tiene un formato válido")]
+    DatabaseConnection.configure(ruta_db)
+    assert DatabaseConnection().fetch_one(
+        "SELECT desempaquetar_texto(d.texto) FROM ordenes_trabajo o JOIN descripciones d ON o.descripcion_id = d.id"
+    )[0] == "Pantalla rota\ny batería"
+
+def test_error_en_procesador_no_cuelga(tmp_path, monkeypatch):
+    def fallar(*args):
+        raise KeyError("columna")
+
+    # Los procesadores se crean con fork y heredan el reemplazo
+    monkeypatch.setattr(ingest, "procesar_bloque", fallar)
+    archivo = tmp_path / "ordenes.csv"
+    archivo.write_text(ENCABEZADO + "".join(f"C{i},,,,Luis,reparacion,Falla,10,\n" for i in range(20)),
+                       encoding="utf-8")
+    with pytest.raises(RuntimeError, match="KeyError"):
+        run_pipeline([str(archivo)], str(tmp_path / "ingesta.db"), workers=2, chunk_size=2)
+
+def test_base_inaccesible_no_cuelga(tmp_path):
+    archivo = tmp_path / "ordenes.csv"
+    archivo.write_text(ENCABEZADO + "".join(f"C{i},,,,Luis,reparacion,Falla,10,\n" for i in range(50)),
+                       encoding="utf-8")
+    with pytest.raises(RuntimeError, match="escritor"):
+        run_pipeline([str(archivo)], str(tmp_path / "no_existe" / "x.db"), workers=1, chunk_size=1)
+
+def test_nombre_ambiguo_sin_email_se_rechaza(tmp_path):
+    ruta_db = str(tmp_path / "ingesta.db")
+    DatabaseConnection.configure(ruta_db)
+    Tecnico("Luis", "Hardware").guardar()
+    Cliente("Ana", "ana1@email.com").guardar()
+    Cliente("Ana", "ana2@email.com").guardar()
+    Cliente("Beto", "beto@email.com").guardar()
+    DatabaseConnection.reset()
+
+    archivo = tmp_path / "ordenes.csv"
+    archivo.write_text(ENCABEZADO + "Ana,,,,Luis,reparacion,Falla,10,\n"
+                       "Beto,,,,Luis,reparacion,Falla,10,\n"
+                       "Carla,,,,Luis,reparacion,Falla,10,\n", encoding="utf-8")
+
+    stats = run_pipeline([str(archivo)], ruta_db, workers=1)
+    assert (stats.escritas, stats.rechazadas) == (2, 1)
+    assert [(linea, motivo) for _, linea, motivo in stats.errores] == [
+        (2, "Hay 2 clientes llamados 'Ana'; indique el email")]
+    DatabaseConnection.configure(ruta_db)
+    assert DatabaseConnection().fetch_all(
+        "SELECT c.nombre, c.email FROM ordenes_trabajo o JOIN clientes c ON o.cliente_id = c.id ORDER BY o.id"
+    ) == [("Beto", "beto@email.com"), ("Carla", None)]
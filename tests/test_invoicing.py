@@ -0,0 +1,61 @@
+import json
+import os
+import pytest
+from models.invoicing import (ARCHIVO_CONTROL, PLANTILLA_HTML, compilar_plantilla, renderizar,
+                              run_invoicing, valores_factura)
+from models.models import Cliente, Tecnico, ServicioReparacion, OrdenDeTrabajo
+from models.timestamps import rango_mes
+
+def _ordenes(cantidad: int, completadas: bool = True, primero: int = 0):
+    tecnico = Tecnico("Luis", "Hardware")
+    ordenes = []
+    for i in range(primero, primero + cantidad):
+        orden = OrdenDeTrabajo(Cliente(f"Cliente <{i}>", f"c{i}@email.com", direccion="Calle 1"),
+                               ServicioReparacion("Pantalla", 100.0), tecnico, f"Pantalla {i}")
+        orden.guardar()
+        if completadas:
+            orden.actualizar(estado="Completada")
+        ordenes.append(orden)
+    return ordenes
+
+def test_plantilla_compilada_una_vez_y_escapada():
+    plantilla = compilar_plantilla(PLANTILLA_HTML)
+    assert compilar_plantilla(PLANTILLA_HTML) is plantilla
+    assert renderizar(compilar_plantilla("{cliente} {total:.2f}"), {"cliente": "<b>", "total": 1.5}, True) == "&lt;b&gt; 1.50"
+    with pytest.raises(ValueError):
+        compilar_plantilla("{precio}")
+
+def test_factura_y_retoma_desde_el_punto_de_control(tmp_path):
+    ordenes = _ordenes(3)
+    _ordenes(1, completadas=False, primero=3)
+    desde, hasta = rango_mes()
+    salida = str(tmp_path / "facturas")
+
+    stats = run_invoicing(salida, desde, hasta, "texto", workers=1, chunk_size=2)
+    assert (stats.facturas, stats.bloques) == (3, 2)
+    nombres = sorted(n for n in os.listdir(salida) if n.startswith("F-"))
+    assert nombres == [f"F-{orden.id:08d}.txt" for orden in ordenes]
+    texto = (tmp_path / "facturas" / nombres[0]).read_text(encoding="utf-8")
+    assert "Cliente <0>" in texto and "TOTAL: 110.00" in texto and "Reparación" in texto
+
+    # Una ejecución interrumpida tras la primera factura retoma desde ahí
+    ruta_control = os.path.join(salida, ARCHIVO_CONTROL)
+    with open(ruta_control, encoding="utf-8") as f:
+        control = json.load(f)
+    control.update(ultimo_id=ordenes[0].id, facturas=1)
+    with open(ruta_control, "w", encoding="utf-8") as f:
+        json.dump(control, f)
+    stats = run_invoicing(salida, desde, hasta, "texto", workers=1)
+    assert (stats.facturas, stats.retomadas) == (2, 1)
+    assert run_invoicing(salida, desde, hasta, "texto", workers=1).facturas == 0
+    with pytest.raises(ValueError):
+        run_invoicing(salida, desde, hasta, "html", workers=1)
+
+def test_pdf_en_pool_de_procesos(tmp_path):
+    ordenes = _ordenes(3)
+    desde, hasta = rango_mes()
+    stats = run_invoicing(str(tmp_path), desde, hasta, "pdf", workers=2, chunk_size=1)
+    assert stats.facturas == 3 and stats.bytes > 0
+    for orden in ordenes:
+        assert (tmp_path / f"F-{orden.id:08d}.pdf").read_bytes().startswith(b"%PDF")
+    assert valores_factura((7, 0, None) + (None,) * 10)["numero"] == "F-00000007"
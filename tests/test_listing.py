@@ -0,0 +1,51 @@
+import pytest
+from models.db_connection import DatabaseConnection
+from models.listing import ListingPager, LISTADO_CLIENTES, LISTADO_ORDENES, LISTADO_TECNICOS
+
+def _paginas(pager):
+    filas = []
+    while not pager.agotado:
+        filas.extend(pager.siguiente_pagina())
+    return filas
+
+def _datos(db):
+    db.execute_many("INSERT INTO clientes (nombre, email, nombre_norm, email_norm) VALUES (?, ?, ?, ?)",
+                    [(nombre, email, nombre.lower(), email) for nombre, email in
+                     [("Ana", "b@x.com"), ("Luis", None), ("Ana", None), ("Bea", "a@x.com"), ("Luis", "c@x.com")]])
+    db.execute_many("INSERT INTO tecnicos (nombre, especialidad) VALUES (?, ?)",
+                    [("Tito", "Hardware"), ("Rosa", "Software"), ("Tito", "Software")])
+    filas = []
+    for i in range(40):
+        servicio = db.execute_write("INSERT INTO servicios (tipo, costo_base) VALUES ('x', 1)")
+        filas.append((i % 5 + 1, i % 3 + 1, servicio, 1_700_000_000 + (i * 7) % 11 * 3600,
+                      ("Pendiente", "Cerrada")[i % 2], 10.0))
+    db.execute_many("""INSERT INTO ordenes_trabajo (cliente_id, tecnico_id, servicio_id, creado_en, estado, costo_total)
+                       VALUES (?, ?, ?, ?, ?, ?)""", filas)
+
+@pytest.mark.parametrize("listado", [LISTADO_CLIENTES, LISTADO_TECNICOS, LISTADO_ORDENES])
+def test_keyset_recorre_todo_sin_repetir(listado):
+    db = DatabaseConnection()
+    _datos(db)
+    for orden in listado.ordenables:
+        for descendente in (False, True):
+            completo = ListingPager(listado, db, orden, descendente, page_size=1000).siguiente_pagina()
+            paginado = _paginas(ListingPager(listado, db, orden, descendente, page_size=3))
+            assert paginado == completo, (orden, descendente)
+            assert len({fila[0] for fila in paginado}) == len(paginado)
+
+def test_filtros_y_orden():
+    db = DatabaseConnection()
+    _datos(db)
+    emails = [fila[2] for fila in ListingPager(LISTADO_CLIENTES, db, "Email", page_size=2).siguiente_pagina()]
+    assert emails == [None, None]
+    nombres = _paginas(ListingPager(LISTADO_CLIENTES, db, "Nombre", True, {"nombre": "lu"}, page_size=1))
+    assert [(fila[0], fila[1]) for fila in nombres] == [(5, "Luis"), (2, "Luis")]
+    pager = ListingPager(LISTADO_ORDENES, db, "Fecha", filtros={"estado": "Cerrada", "tecnico_id": 2,
+                                                                "desde": 1_700_000_000 + 3600})
+    filas = _paginas(pager)
+    assert filas and all(fila[4] == "Cerrada" and fila[2] == "Rosa" for fila in filas)
+    assert [fila[5] for fila in filas] == sorted(fila[5] for fila in filas)
+    with pytest.raises(ValueError):
+        pager.ordenar("Servicio")
+    with pytest.raises(ValueError):
+        pager.filtrar(color="rojo")
@@ -0,0 +1,69 @@
+import sqlite3
+import pytest
+from models.cdc import ChangeFeed
+from models.db_connection import DatabaseConnection
+from models.maintenance import MaintenanceRunner, TAREAS_PROGRAMADAS, restore
+from models.models import Cliente
+
+@pytest.fixture
+def runner(tmp_path):
+    DatabaseConnection.configure(str(tmp_path / "database.db"))
+    for i in range(200):
+        Cliente(f"Cliente {i}", f"c{i}@email.com", direccion="x" * 200).guardar()
+    runner = MaintenanceRunner(pages=4, pause=0)
+    yield runner
+    runner.close()
+
+def test_backup_por_tramos_y_verificado(runner, tmp_path):
+    pasos = []
+    resultado = runner.backup(str(tmp_path / "copia.db"), progreso=lambda *p: pasos.append(p))
+    assert resultado.startswith(str(tmp_path / "copia.db"))
+    assert len(pasos) > 1
+    copia = sqlite3.connect(str(tmp_path / "copia.db"))
+    assert copia.execute("SELECT COUNT(*) FROM clientes").fetchone()[0] == 200
+    copia.close()
+
+def test_backup_automatico_conserva_las_ultimas(runner, tmp_path):
+    runner.keep = 1
+    runner.backup()
+    assert len(list((tmp_path / "backups").iterdir())) == 1
+
+def test_tareas_registran_duracion_y_vencimiento(runner):
+    registros = [runner.run(tarea) for tarea in ("quick_check", "optimize", "analyze")]
+    assert [r.resultado for r in registros] == ["ok", "ok", "ok"]
+    assert all(r.duracion >= 0 for r in registros)
+    pendientes = runner.due()
+    assert "quick_check" not in pendientes and "backup" in pendientes
+    assert runner.due(registros[0].ultima_ejecucion + max(TAREAS_PROGRAMADAS.values())) == list(TAREAS_PROGRAMADAS)
+
+def test_vacuum_incremental_libera_paginas(runner):
+    DatabaseConnection().execute_write("DELETE FROM clientes")
+    assert runner.incremental_vacuum().split()[0] != "0"
+
+def test_hilo_de_fondo_ejecuta_las_vencidas(runner):
+    runner.start(interval=60)
+    runner.stop()
+    assert {r.tarea for r in runner.status()} == set(TAREAS_PROGRAMADAS)
+
+def test_restore_verifica_la_copia(runner, tmp_path):
+    copia = str(tmp_path / "copia.db")
+    runner.backup(copia)
+    DatabaseConnection().execute_write("DELETE FROM clientes WHERE id > 10")
+    assert restore(copia)["clientes"] == 200
+    assert DatabaseConnection().fetch_one("SELECT COUNT(*) FROM clientes")[0] == 200
+
+def test_restore_rechaza_copia_invalida(tmp_path):
+    invalida = tmp_path / "invalida.db"
+    sqlite3.connect(str(invalida)).execute("CREATE TABLE otra (x)").connection.commit()
+    with pytest.raises(RuntimeError):
+        restore(str(invalida), destino=str(tmp_path / "destino.db"))
+
+def test_purga_de_cambios_con_retencion(runner):
+    db = DatabaseConnection()
+    total = db.fetch_one("SELECT COUNT(*) FROM cambios")[0]
+    # Sin consumidores solo se borra lo que supera la retención
+    db.execute_write("UPDATE cambios SET momento = datetime('now', '-40 days') WHERE seq <= 50")
+    assert runner.run("purgar_cambios").resultado == "50 cambios borrados"
+    ChangeFeed("reportes").confirmar(120)
+    assert runner.purgar_cambios() == "70 cambios borrados"
+    assert db.fetch_one("SELECT MIN(seq), COUNT(*) FROM cambios") == (121, total - 120)
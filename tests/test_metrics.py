@@ -0,0 +1,90 @@
+import urllib.error
+import urllib.request
+import pytest
+from models.db_connection import DatabaseConnection, METODOS_MEDIDOS
+from models.metrics import REGISTRO, MetricsRegistry, MetricsServer, instrumentar_db, main
+from models.models import Cliente, Tecnico, ServicioReparacion, OrdenDeTrabajo
+from models.observer import Observer, OrdenSubject
+
+def test_formato_prometheus():
+    registro = MetricsRegistry()
+    pedidos = registro.counter("pedidos_total", "Pedidos atendidos", ("ruta",))
+    registro.gauge("temperatura", "Con \"comillas\"", ("sala",), lambda: {("a\\b",): 21.5})
+    latencia = registro.histogram("latencia_segundos", "Latencia", limites=(0.1, 1))
+    pedidos.inc("/x")
+    pedidos.inc("/x", cantidad=2)
+    for valor in (0.05, 0.1, 0.5, 3):
+        latencia.observe(valor)
+    with pytest.raises(ValueError):
+        pedidos.inc()
+    with pytest.raises(ValueError):
+        registro.counter("pedidos_total", "Repetido")
+    assert registro.exportar().splitlines() == [
+        "# HELP pedidos_total Pedidos atendidos",
+        "# TYPE pedidos_total counter",
+        'pedidos_total{ruta="/x"} 3',
+        '# HELP temperatura Con "comillas"',
+        "# TYPE temperatura gauge",
+        'temperatura{sala="a\\\\b"} 21.5',
+        "# HELP latencia_segundos Latencia",
+        "# TYPE latencia_segundos histogram",
+        'latencia_segundos_bucket{le="0.1"} 2',
+        'latencia_segundos_bucket{le="1"} 3',
+        'latencia_segundos_bucket{le="+Inf"} 4',
+        "latencia_segundos_sum 3.65",
+        "latencia_segundos_count 4",
+    ]
+
+def test_instrumentacion_solo_mientras_esta_activa():
+    originales = {nombre: getattr(DatabaseConnection, nombre) for nombre in METODOS_MEDIDOS}
+    consultas, commits = REGISTRO["sgst_db_consulta_segundos"], REGISTRO["sgst_db_commits_total"]
+    instrumentar_db()
+    try:
+        db = DatabaseConnection()
+        commits_antes = commits.valores().get(("default",), 0)
+        Cliente("Ana", "ana@email.com").guardar()
+        antes = consultas.valores().get(("default", "fetch_one"), 0)
+        db.fetch_one("SELECT COUNT(*) FROM clientes")
+        assert consultas.valores()[("default", "fetch_one")] == antes + 1
+        assert commits.valores()[("default",)] > commits_antes
+    finally:
+        instrumentar_db(False)
+    assert {nombre: getattr(DatabaseConnection, nombre) for nombre in METODOS_MEDIDOS} == originales
+    DatabaseConnection().fetch_one("SELECT 1")
+    assert consultas.valores()[("default", "fetch_one")] == antes + 1
+
+def test_servidor_publica_metricas(capsys):
+    class Silencioso(Observer):
+        def update(self, orden):
+            pass
+
+    cliente = Cliente("Ana", "ana@email.com")
+    cliente.guardar()
+    tecnico = Tecnico("Luis", "Reparación")
+    tecnico.guardar()
+    orden = OrdenDeTrabajo(cliente, ServicioReparacion("Pantalla", 100.0, 60), tecnico, "Pantalla rota")
+    orden.guardar()
+    sujeto = OrdenSubject()
+    sujeto.attach(Silencioso())
+    sujeto.nueva_orden(orden)
+
+    servidor = MetricsServer(0, inactividad=60).start()
+    try:
+        url = f"http://127.0.0.1:{servidor.puerto}/metrics"
+        urllib.request.urlopen(url).read()
+        DatabaseConnection().fetch_all("SELECT id FROM clientes")
+        with urllib.request.urlopen(url) as respuesta:
+            assert respuesta.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            texto = respuesta.read().decode("utf-8")
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{servidor.puerto}/otro")
+    finally:
+        servidor.stop()
+    assert 'sgst_ordenes_abiertas{estado="Pendiente"} 1' in texto
+    assert 'sgst_cola_pendientes{cola="planificador"} 1' in texto
+    assert 'sgst_notificaciones_total{sujeto="OrdenSubject"}' in texto
+    assert 'sgst_db_consulta_segundos_count{base="default",operacion="fetch_all"}' in texto
+    assert DatabaseConnection._metricas is None
+
+    main(["--imprimir"])
+    assert 'sgst_ordenes_abiertas{estado="Pendiente"} 1' in capsys.readouterr().out
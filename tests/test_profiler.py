@@ -0,0 +1,50 @@
+import time
+import tkinter
+from ui.profiler import UIProfiler, leer_log, main, nombre_handler
+
+class Ventana:
+    def cargar(self):
+        pass
+
+def _programado(func):
+    # Misma forma que el envoltorio de tkinter.Misc.after()
+    def callit():
+        func()
+    return callit
+
+def test_nombre_handler():
+    assert nombre_handler(Ventana().cargar) == "Ventana.cargar"
+    assert nombre_handler(_programado(Ventana().cargar)) == "Ventana.cargar"
+    assert nombre_handler(lambda: None).startswith("test_nombre_handler.<locals>.<lambda> (test_profiler.py:")
+
+def test_callbacks_medidos_y_bloqueos(tmp_path, capsys):
+    log = str(tmp_path / "ui.log")
+    perfil = UIProfiler(umbral=0.05, log_path=log, registro_min=0).start()
+    try:
+        tkinter.CallWrapper(Ventana().cargar, None, None)()
+        tkinter.CallWrapper(_programado(lambda: time.sleep(0.01)), None, None)()
+        perfil.latido()
+        with perfil.medir("consulta_lenta"):
+            time.sleep(0.2)
+    finally:
+        perfil.stop()
+    assert tkinter.CallWrapper.__call__.__name__ == "__call__"
+    nombres = {fila[0] for fila in perfil.resumen()}
+    assert "Ventana.cargar" in nombres and "consulta_lenta" in nombres
+    assert perfil.bloqueos == 1
+
+    handlers, bloqueos = leer_log(log)
+    assert handlers["consulta_lenta"][0] >= 200
+    assert any("test_callbacks_medidos_y_bloqueos [consulta_lenta]" in lugar for lugar in bloqueos)
+    main(["--log", log])
+    salida = capsys.readouterr().out
+    assert "consulta_lenta" in salida and "Ventana.cargar" in salida
+
+def test_leer_log_ordena_rotados_por_numero(tmp_path):
+    log = tmp_path / "ui.log"
+    for numero in range(12):
+        ruta = tmp_path / (f"ui.log.{numero}" if numero else "ui.log")
+        ruta.write_text(f"t\thandler\th\t{numero}\n", encoding="utf-8")
+    (tmp_path / "ui.log.bak").write_text("t\thandler\th\t99\n", encoding="utf-8")
+    handlers, _ = leer_log(str(log))
+    assert handlers["h"] == [float(n) for n in range(11, -1, -1)]
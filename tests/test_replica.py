@@ -0,0 +1,62 @@
+from models.cdc import purgar
+from models.db_connection import DatabaseConnection
+from models.models import Cliente, Tecnico
+from models.replica import ReadReplica
+
+def test_lecturas_en_memoria_y_cambios():
+    db = DatabaseConnection()
+    Cliente("José Núñez", "JOSE@mail.com").guardar()
+    Cliente("Ana Ruiz", "ana@mail.com").guardar()
+    Tecnico("Luis Paz", "Hardware").guardar()
+    replica = ReadReplica(db, max_lag=60)
+    assert [c.nombre for c in replica.todos("clientes")] == ["José Núñez", "Ana Ruiz"]
+    assert replica.buscar("clientes", "nombre", "jose nunez")[0].email == "JOSE@mail.com"
+    assert replica.buscar("clientes", "email", " jose@MAIL.com")[0].nombre == "José Núñez"
+    assert replica.buscar("tecnicos", "especialidad", "hardware")[0].nombre == "Luis Paz"
+
+    # Escrituras de esta conexión: se ven en la siguiente lectura
+    tercero = Cliente("Eva Sol", "eva@mail.com")
+    tercero.guardar()
+    db.execute_write("UPDATE clientes SET email = ?, email_norm = ? WHERE nombre = ?",
+                     ("ana@otro.com", "ana@otro.com", "Ana Ruiz"))
+    db.execute_write("DELETE FROM clientes WHERE nombre = ?", ("José Núñez",))
+    assert [c.nombre for c in replica.todos("clientes")] == ["Ana Ruiz", "Eva Sol"]
+    assert replica.buscar("clientes", "email", "ana@mail.com") == []
+    assert replica.buscar("clientes", "email", "ana@otro.com")[0].nombre == "Ana Ruiz"
+    assert replica.por_id("clientes", tercero.id).nombre == "Eva Sol"
+    assert replica.buscar("clientes", "nombre", "jose nunez") == []
+
+    # Cambios purgados antes de leerlos: recarga completa
+    db.execute_write("INSERT INTO cambios_cursores (consumidor, seq) VALUES ('x', 1000000)")
+    Cliente("Raúl Gil").guardar()
+    purgar(db)
+    assert [c.nombre for c in replica.todos("clientes")][-1] == "Raúl Gil"
+    assert replica.lecturas_sqlite == 0
+
+def test_limite_de_memoria():
+    db = DatabaseConnection()
+    for i in range(50):
+        Cliente(f"Cliente {i}", f"c{i}@mail.com").guardar()
+    Tecnico("Luis Paz", "Hardware").guardar()
+    replica = ReadReplica(db, max_lag=60)
+    replica.todos("clientes")
+    replica.todos("tecnicos")
+    memoria = replica.memoria()
+    assert set(memoria) == {"clientes", "tecnicos"}
+
+    # Solo cabe la tabla usada más recientemente
+    replica.max_bytes = memoria["clientes"] + 1
+    replica.limpiar()
+    replica.todos("tecnicos")
+    replica.todos("clientes")
+    assert set(replica.memoria()) == {"clientes"}
+    # Una tabla que no cabe sola se lee siempre de SQLite
+    replica.max_bytes = memoria["tecnicos"] + 1
+    replica.limpiar()
+    assert len(replica.todos("clientes")) == 50
+    assert replica.buscar("clientes", "email", "C7@mail.com")[0].nombre == "Cliente 7"
+    assert replica.memoria() == {} and replica.lecturas_sqlite == 2
+
+    desactivada = ReadReplica(db, max_bytes=0)
+    assert desactivada.buscar("tecnicos", "nombre", "luis paz")[0].especialidad == "Hardware"
+    assert desactivada.memoria() == {}
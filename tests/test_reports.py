@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+from models.models import Cliente, Tecnico, ServicioReparacion, OrdenDeTrabajo
+from models.reports import OrderReport
+from models.timestamps import a_epoch, formatear, rango_mes, rango_semana
+
+def _crear_orden(fecha, estado="Pendiente", costo=100.0):
+    orden = OrdenDeTrabajo(Cliente("Ana"), ServicioReparacion("Falla", costo), Tecnico("Luis", "Hardware"))
+    orden.fecha_creacion = fecha
+    orden.estado = estado
+    return orden.guardar()
+
+def test_rangos_de_periodo():
+    # 2026-10-21 es miércoles
+    assert rango_semana("2026-10-21 15:00:00") == (a_epoch("2026-10-19"), a_epoch("2026-10-26"))
+    assert rango_mes("2026-12-31") == (a_epoch("2026-12-01"), a_epoch("2027-01-01"))
+
+def test_fecha_con_zona_se_guarda_como_el_mismo_instante():
+    momento = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+    assert a_epoch(momento) == 1792411200
+    assert formatear(a_epoch(momento)) == momento.astimezone().strftime("%Y-%m-%d %H:%M:%S")
+
+def test_ordenes_y_resumen_de_la_semana():
+    fuera = _crear_orden("2026-10-18 23:59:59")
+    lunes = _crear_orden("2026-10-19 00:00:00", "Completada", 100.0)
+    viernes = _crear_orden("2026-10-23 18:00:00", "Completada", 50.0)
+    pendiente = _crear_orden("2026-10-22 09:00:00")
+    reporte = OrderReport()
+    desde, hasta = reporte.periodo("semana", "2026-10-21")
+    assert [o.id for o in reporte.ordenes(desde, hasta)] == [lunes, pendiente, viernes]
+    assert [o.id for o in reporte.ordenes(desde, hasta, "Completada")] == [lunes, viernes]
+    assert fuera not in [o.id for o in reporte.ordenes(*reporte.periodo("mes", "2026-11-01"))]
+    resumen = reporte.resumen(desde, hasta)
+    assert resumen["Completada"][0] == 2 and resumen["Pendiente"][0] == 1
+    assert reporte.ordenes(desde, hasta)[0].fecha_creacion == "2026-10-19 00:00:00"
@@ -0,0 +1,57 @@
+import pytest
+from models.db_connection import DatabaseConnection
+from models.models import Cliente, Tecnico, ServicioReparacion, OrdenDeTrabajo
+from models.routing import DispatchRouter, Gazetteer, caja, distancia_km
+
+LUGARES = [("CABA", -34.6037, -58.3816), ("Palermo, CABA", -34.5885, -58.4304),
+           ("La Plata", -34.9205, -57.9536), ("Córdoba", -31.4201, -64.1888)]
+
+def test_gazetteer_usa_la_localidad_mas_precisa(tmp_path):
+    archivo = tmp_path / "lugares.csv"
+    archivo.write_text("lugar,latitud,longitud\n" + "".join(f'"{l}",{a},{o}\n' for l, a, o in LUGARES),
+                       encoding="utf-8")
+    gazetteer = Gazetteer.desde_csv(str(archivo))
+    assert gazetteer.ubicar("Av. Santa Fe 3200,  palermo , caba") == (-34.5885, -58.4304)
+    assert gazetteer.ubicar("Florida 100, CABA") == (-34.6037, -58.3816)
+    assert gazetteer.ubicar("cordoba") == (-31.4201, -64.1888)
+    assert gazetteer.ubicar("Rosario") is None and gazetteer.ubicar(None) is None
+    with pytest.raises(ValueError):
+        gazetteer.agregar("Fuera", 91, 0)
+
+def test_caja_contiene_el_circulo():
+    lat_min, lat_max, lon_min, lon_max = caja((-34.6, -58.4), 50)
+    for punto in ((-34.6 + 0.449, -58.4), (-34.6, -58.4 - 0.546)):
+        assert distancia_km((-34.6, -58.4), punto) <= 50
+        assert lat_min <= punto[0] <= lat_max and lon_min <= punto[1] <= lon_max
+    assert caja((0, 179.9), 50)[2:] == (-180.0, 180.0)
+
+def test_tecnicos_mas_cercanos_capacitados():
+    router = DispatchRouter()
+    ubicaciones = {"Norte": (-34.55, -58.45), "Centro": (-34.60, -58.38), "Sur": (-34.92, -57.95),
+                   "Lejos": (-31.42, -64.19)}
+    tecnicos = {}
+    for nombre, (lat, lon) in ubicaciones.items():
+        tecnicos[nombre] = Tecnico(nombre, "Hardware")
+        tecnicos[nombre].guardar()
+        router.ubicar("tecnicos", tecnicos[nombre].id, lat, lon)
+    software = Tecnico("Programador", "Software")
+    software.guardar()
+    router.ubicar("tecnicos", software.id, -34.59, -58.43)
+    Tecnico("Sin ubicación", "Hardware").guardar()
+
+    cliente = Cliente("Ana", None, direccion="Av. Santa Fe 3200, Palermo, CABA")
+    orden = OrdenDeTrabajo(cliente, ServicioReparacion("Pantalla", 10.0), tecnicos["Centro"], "Pantalla")
+    orden.guardar()
+    with pytest.raises(ValueError):
+        router.nearest_technicians(orden.id)
+    assert router.geocodificar_clientes(Gazetteer(LUGARES)) == (1, 0)
+
+    cercanos = router.nearest_technicians(orden.id, k=3)
+    assert [nombre for _, nombre, _, _ in cercanos] == ["Norte", "Centro", "Sur"]
+    assert cercanos[0][3] == pytest.approx(distancia_km((-34.5885, -58.4304), (-34.55, -58.45)))
+    # Con más k que técnicos ubicados se recorre todo el índice
+    assert len(router.nearest_technicians(orden.id, k=10)) == 4
+    assert router.cercanos((-34.5885, -58.4304), k=1)[0][1] == "Programador"
+
+    DatabaseConnection().execute_update("DELETE FROM tecnicos WHERE id = ?", (tecnicos["Norte"].id,))
+    assert router.ubicacion("tecnicos", tecnicos["Norte"].id) is None
@@ -0,0 +1,81 @@
+import random
+from datetime import datetime
+from models.db_connection import DatabaseConnection
+from models.models import Cliente, Tecnico, ServicioReparacion, ServicioSoporteIT, OrdenDeTrabajo
+from models.scheduling import Jornada, Timeline, Scheduler, a_minutos, desde_minutos
+
+LUNES = datetime(2026, 10, 19, 8, 0)
+
+def test_timeline_encuentra_hueco_y_salta_jornada():
+    jornada = Jornada()
+    timeline = Timeline()
+    timeline.agregar(a_minutos(LUNES), a_minutos(LUNES.replace(hour=9)))
+    timeline.agregar(a_minutos(LUNES.replace(hour=10)), a_minutos(LUNES.replace(hour=17)))
+    assert timeline.primer_hueco(a_minutos(LUNES), 60, jornada) == a_minutos(LUNES.replace(hour=9))
+    # 90 minutos no caben entre 9 y 10 ni entre 17 y 18: pasa al martes
+    assert timeline.primer_hueco(a_minutos(LUNES), 90, jornada) == a_minutos(datetime(2026, 10, 20, 8, 0))
+
+def test_jornada_salta_fin_de_semana():
+    viernes_tarde = datetime(2026, 10, 23, 17, 30)
+    assert Jornada().ajustar(a_minutos(viernes_tarde), 60) == a_minutos(datetime(2026, 10, 26, 8, 0))
+
+def test_duracion_se_guarda():
+    servicio_id = ServicioReparacion("Pantalla", 100.0, 120).guardar()
+    assert DatabaseConnection().fetch_one("SELECT duracion_estimada FROM servicios WHERE id = ?", (servicio_id,)) == (120,)
+
+def test_plan_day_reparte_entre_tecnicos_capacitados():
+    cliente = Cliente("Ana")
+    cliente.guardar()
+    ana, beto = Tecnico("Ana", "Reparación"), Tecnico("Beto", "Hardware")
+    soporte = Tecnico("Carla", "Soporte IT")
+    for tecnico in (ana, beto, soporte):
+        tecnico.guardar()
+    for duracion in (300, 300, 240):
+        OrdenDeTrabajo(cliente, ServicioReparacion("Falla", 100.0, duracion), ana).guardar()
+    OrdenDeTrabajo(cliente, ServicioSoporteIT("Red", 80.0, 60), soporte).guardar()
+
+    asignaciones = Scheduler().plan_day(LUNES, reasignar=True)
+    por_tecnico = {}
+    for orden_id, tecnico_id, inicio, fin in asignaciones:
+        por_tecnico.setdefault(tecnico_id, []).append((inicio, fin))
+    assert sorted(len(v) for k, v in por_tecnico.items() if k != soporte.id) == [1, 2]
+    assert por_tecnico[soporte.id] == [(LUNES, LUNES.replace(hour=9))]
+    # Una segunda planificación no vuelve a programar las mismas órdenes
+    assert Scheduler().plan_day(LUNES) == []
+
+def test_agenda_guarda_epoch_y_se_recarga():
+    tecnico = Tecnico("Ana", "Reparación")
+    tecnico.guardar()
+    Scheduler().programar(1, tecnico.id, LUNES, LUNES.replace(hour=10))
+    assert DatabaseConnection().fetch_one("SELECT inicio, fin FROM agenda") == (
+        int(LUNES.timestamp()), int(LUNES.replace(hour=10).timestamp()))
+    recargado = Scheduler()
+    recargado.cargar(LUNES)
+    assert recargado.earliest_slot("servicioreparacion", 60, LUNES) == (
+        tecnico.id, LUNES.replace(hour=10), LUNES.replace(hour=11))
+
+def test_earliest_slot_coincide_con_recorrer_todos():
+    for i in range(30):
+        Tecnico(f"T{i}", "Reparación").guardar()
+    Tecnico("Carla", "Soporte IT").guardar()
+    scheduler = Scheduler()
+    azar = random.Random(7)
+    tecnicos = scheduler.tecnicos_por_tipo["servicioreparacion"]
+    for tecnico_id in tecnicos:
+        t = a_minutos(LUNES)
+        for _ in range(azar.randrange(6)):
+            t += azar.randrange(0, 240)
+            fin = t + azar.randrange(30, 300)
+            scheduler.timelines[tecnico_id].agregar(t, fin)
+            t = fin
+
+    def recorrer_todos(duracion):
+        inicio, tecnico_id = min((scheduler.timelines[t].primer_hueco(a_minutos(LUNES), duracion, scheduler.jornada), t)
+                                 for t in tecnicos)
+        return tecnico_id, desde_minutos(inicio), desde_minutos(inicio + duracion)
+
+    for orden_id in range(60):
+        duracion = azar.choice((30, 60, 120, 240))
+        slot = scheduler.earliest_slot("servicioreparacion", duracion, LUNES)
+        assert slot == recorrer_todos(duracion)
+        scheduler.programar(orden_id, *slot)
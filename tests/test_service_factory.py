@@ -0,0 +1,56 @@
+import pytest
+from models.models import ServicioReparacion, ServicioSoporteIT
+from models.scheduling import especialidades_por_tipo
+from models.service_factory import ServiceFactory
+
+class ServicioInstalacion(ServicioReparacion):
+    pass
+
+@pytest.fixture
+def instalacion():
+    yield ServiceFactory.register(
+        "instalacion", ServicioInstalacion, (("tipo_reparacion", str),), aliases=("montaje",),
+        defaults={"costo_base": 50.0}, etiqueta="Instalación", especialidades=("Hardware",),
+    )
+    ServiceFactory.unregister("instalacion")
+
+def test_alias_y_defaults():
+    for nombre in ("reparacion", "Reparación", "REPARACION"):
+        servicio = ServiceFactory.create_service(nombre, descripcion="Pantalla")
+        assert isinstance(servicio, ServicioReparacion)
+        assert (servicio.costo_base, servicio.duracion_estimada, servicio.tipo_reparacion) == (100.0, 60, "General")
+    servicio = ServiceFactory.create_service("Soporte IT", descripcion="Correo", costo="90")
+    assert isinstance(servicio, ServicioSoporteIT)
+    assert servicio.costo_base == 90.0 and servicio.nivel_soporte == "Nivel 1"
+    with pytest.raises(ValueError):
+        ServiceFactory.create_service("garantia", descripcion="x")
+    with pytest.raises(ValueError):
+        ServiceFactory.create_service("reparacion", descripcion="x", color="rojo")
+    with pytest.raises(ValueError):
+        ServiceFactory.create_service("reparacion", costo=10.0)
+
+def test_costo_base_tiene_precedencia_sobre_costo():
+    for campos in ({"costo": 10.0, "costo_base": 50.0}, {"costo_base": 50.0, "costo": 10.0}):
+        assert ServiceFactory.create_service("reparacion", descripcion="x", **campos).costo_base == 50.0
+
+def test_create_services_en_lote():
+    servicios = ServiceFactory.create_services(
+        [("reparacion", "Disco", 200, 90), ("soporte it", "VPN", None, None, "Nivel 2"), ("reparacion", "Teclado")]
+    )
+    assert [type(s) for s in servicios] == [ServicioReparacion, ServicioSoporteIT, ServicioReparacion]
+    assert servicios[0].calcular_costo() == pytest.approx(220.0)
+    assert (servicios[1].costo_base, servicios[1].nivel_soporte) == (80.0, "Nivel 2")
+    mismos = ServiceFactory.create_services([("A", 10.0), ("B", 20.0)], service_type="soporte_it")
+    assert [s.costo_base for s in mismos] == [10.0, 20.0]
+    with pytest.raises(ValueError):
+        ServiceFactory.create_services([("reparacion", "Disco", "caro")])
+
+def test_registro_de_plugin(instalacion):
+    servicio = ServiceFactory.create_service("Montaje", descripcion="Rack")
+    assert isinstance(servicio, ServicioInstalacion) and servicio.costo_base == 50.0
+    assert "Instalación" in ServiceFactory.labels()
+    assert especialidades_por_tipo()["servicioinstalacion"] == ("hardware",)
+    with pytest.raises(ValueError):
+        ServiceFactory.register("otro", ServicioInstalacion, aliases=("montaje",))
+    with pytest.raises(TypeError):
+        ServiceFactory.register("roto", ServicioInstalacion, (("garantia", str),))
@@ -0,0 +1,89 @@
+import pytest
+from models.db_connection import DatabaseConnection
+from models.models import Cliente, Tecnico, ServicioReparacion, OrdenDeTrabajo
+from models.queries import ClienteQueries
+from models.sync import CENTRAL_NAME, SyncClient, registrar_cambio
+
+@pytest.fixture
+def nodos():
+    DatabaseConnection.configure(DatabaseConnection.memory_dsn("central"), name=CENTRAL_NAME)
+    DatabaseConnection.configure(DatabaseConnection.memory_dsn("nodo_b"), name="nodo_b")
+    central = DatabaseConnection(CENTRAL_NAME)
+    return SyncClient(central=central), SyncClient(DatabaseConnection("nodo_b"), central)
+
+def _guardar_cliente(db, cliente):
+    with db.transaction():
+        cliente.id = db.execute_write(ClienteQueries.INSERTAR, cliente.valores_insercion())
+        registrar_cambio(db, "clientes", cliente.id)
+    return cliente.id
+
+def test_guardar_registra_en_el_diario():
+    orden = OrdenDeTrabajo(Cliente("Ana", "ana@email.com"), ServicioReparacion("Pantalla", 10.0), Tecnico("Luis", "Hardware"))
+    orden.guardar()
+    diario = DatabaseConnection().fetch_all("SELECT tabla, uuid FROM sync_journal ORDER BY seq")
+    assert [tabla for tabla, _ in diario] == ["clientes", "tecnicos", "servicios", "ordenes_trabajo"]
+    assert diario[-1][1] == orden.uuid
+
+def test_push_pull_replica_por_uuid(nodos):
+    nodo_a, nodo_b = nodos
+    _guardar_cliente(nodo_b.local, Cliente("Beto", "beto@email.com"))
+    orden = OrdenDeTrabajo(Cliente("Ana", "ana@email.com"), ServicioReparacion("Pantalla", 10.0), Tecnico("Luis", "Hardware"))
+    orden.guardar()
+
+    assert nodo_a.sync() == (4, 0)
+    assert nodo_b.sync() == (1, 4)
+    assert nodo_a.sync() == (0, 1)
+    # Reenviar o volver a traer no duplica nada
+    assert nodo_b.sync() == (0, 0)
+
+    fila = nodo_b.local.fetch_one(
+        "SELECT c.email, o.costo_total FROM ordenes_trabajo o JOIN clientes c ON c.id = o.cliente_id WHERE o.uuid = ?",
+        (orden.uuid,))
+    assert fila == ("ana@email.com", orden.costo_total)
+    for db in (nodo_a.local, nodo_b.local, nodo_a.central):
+        assert db.fetch_one("SELECT COUNT(*) FROM clientes")[0] == 2
+
+def test_mismo_email_en_dos_nodos_usa_alias(nodos):
+    nodo_a, nodo_b = nodos
+    _guardar_cliente(nodo_b.local, Cliente("Ana B", "ana@email.com"))
+    nodo_b.push()
+    OrdenDeTrabajo(Cliente("Ana A", "ana@email.com"), ServicioReparacion("Pantalla", 10.0), Tecnico("Luis", "Hardware")).guardar()
+    nodo_a.sync()
+    nodo_b.pull()
+
+    central = nodo_a.central
+    assert central.fetch_one("SELECT COUNT(*) FROM clientes")[0] == 1
+    assert central.fetch_one("SELECT COUNT(*) FROM sync_alias")[0] == 1
+    # La orden de A queda asociada al cliente que ya existía en la central y en B
+    for db in (central, nodo_b.local):
+        assert db.fetch_one(
+            "SELECT c.nombre FROM ordenes_trabajo o JOIN clientes c ON c.id = o.cliente_id")[0] == "Ana B"
+
+def test_node_id_se_lee_una_vez_por_conexion():
+    db = DatabaseConnection()
+    consultas = []
+    db._conn.set_trace_callback(lambda sql: consultas.append(sql) if "sync_estado" in sql else None)
+    for i in range(5):
+        Cliente(f"Cliente {i}", f"c{i}@email.com").guardar()
+    db._conn.set_trace_callback(None)
+    # Lectura sin resultado, alta del id y una única lectura que queda en memoria
+    assert len(consultas) == 3
+
+def test_entrada_sin_referencia_se_aparta(nodos):
+    nodo_a, _ = nodos
+    cliente = Cliente("Ana", "ana@email.com")
+    OrdenDeTrabajo(cliente, ServicioReparacion("Pantalla", 10.0), Tecnico("Luis", "Hardware")).guardar()
+    # La central nunca recibe al cliente: la orden no se puede aplicar
+    nodo_a.local.execute_write("DELETE FROM sync_journal WHERE tabla = 'clientes'")
+    _guardar_cliente(nodo_a.local, Cliente("Beto", "beto@email.com"))
+
+    assert nodo_a.push() == 3
+    assert nodo_a.push() == 0
+    rechazos = nodo_a.local.fetch_all("SELECT sentido, tabla, error FROM sync_rechazos")
+    assert rechazos == [("push", "ordenes_trabajo", f"Referencia inexistente: clientes {cliente.uuid}")]
+    assert nodo_a.central.fetch_one("SELECT COUNT(*) FROM clientes")[0] == 1
+
+    registrar_cambio(nodo_a.local, "clientes", cliente.id)
+    assert nodo_a.sync() == (1, 0)
+    assert nodo_a.local.fetch_one("SELECT COUNT(*) FROM sync_rechazos")[0] == 0
+    assert nodo_a.central.fetch_one("SELECT COUNT(*) FROM ordenes_trabajo")[0] == 1
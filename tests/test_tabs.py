@@ -0,0 +1,57 @@
+from ui.tabs import LazyTabs
+
+class NotebookFalso:
+    def __init__(self):
+        self.bindings = {}
+        self.pestanas = []
+        self.seleccionada = ""
+        self.idle = []
+
+    def bind(self, evento, funcion, add=None):
+        self.bindings[evento] = funcion
+
+    def add(self, frame, text):
+        self.pestanas.append(text)
+        if not self.seleccionada:
+            self.seleccionada = frame
+
+    def select(self):
+        return self.seleccionada
+
+    def after_idle(self, funcion, *args):
+        self.idle.append((funcion, args))
+
+    def cambiar(self, frame):
+        self.seleccionada = frame
+        self.bindings["<<NotebookTabChanged>>"]()
+
+    def procesar_idle(self):
+        while self.idle:
+            funcion, args = self.idle.pop(0)
+            funcion(*args)
+
+def test_pestanas_se_construyen_y_cargan_al_mostrarse():
+    notebook = NotebookFalso()
+    eventos, cargadas = [], []
+    tabs = LazyTabs(notebook, on_loaded=lambda texto, segundos: cargadas.append(texto))
+    for nombre in ("clientes", "tecnicos", "ordenes"):
+        tabs.add(nombre, nombre.title(), lambda n=nombre: eventos.append(("construir", n)),
+                 lambda n=nombre: eventos.append(("cargar", n)))
+    assert eventos == [] and notebook.pestanas == ["Clientes", "Tecnicos", "Ordenes"]
+
+    notebook.cambiar("clientes")
+    # La carga de datos espera al idle, después de dibujar la pestaña
+    assert eventos == [("construir", "clientes")]
+    notebook.procesar_idle()
+    assert eventos[-1] == ("cargar", "clientes") and cargadas == ["Clientes"]
+
+    notebook.cambiar("ordenes")
+    notebook.cambiar("clientes")
+    notebook.cambiar("ordenes")
+    notebook.procesar_idle()
+    assert eventos.count(("construir", "ordenes")) == 1 and eventos.count(("cargar", "clientes")) == 1
+    assert not tabs.construida("tecnicos") and tabs.construida("ordenes")
+    assert set(tabs.tiempos) == {"Clientes", "Ordenes"}
+
+    tabs.asegurar("tecnicos", cargar=False)
+    assert ("construir", "tecnicos") in eventos and ("cargar", "tecnicos") not in eventos
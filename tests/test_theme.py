@@ -0,0 +1,49 @@
+from ui.theme import ThemeManager, PALETTES
+
+class WidgetFalso:
+    def __init__(self):
+        self.llamadas = []
+
+    def configure(self, **opciones):
+        self.llamadas.append(opciones)
+
+    def bind(self, *args, **kwargs):
+        pass
+
+class EstiloFalso:
+    def __init__(self):
+        self.configurados = {}
+
+    def theme_use(self, nombre):
+        pass
+
+    def configure(self, nombre, **opciones):
+        self.configurados[nombre] = opciones
+
+    def map(self, nombre, **opciones):
+        pass
+
+def test_cambio_aplica_solo_diferencias():
+    estilo = EstiloFalso()
+    theme = ThemeManager(style=estilo)
+    boton, header = WidgetFalso(), WidgetFalso()
+    theme.register(boton, "button")
+    theme.register(header, "header")
+    theme.apply()
+    estilo.configurados.clear()
+
+    theme.switch()
+    assert theme.current == "light"
+    # El azul del header es igual en ambas paletas: no se reconfigura
+    assert len(header.llamadas) == 2
+    assert boton.llamadas[-1] == {"fg": PALETTES["light"]["TEXT_LIGHT"],
+                                  "activeforeground": PALETTES["light"]["TEXT_LIGHT"]}
+    assert estilo.configurados["TButton"] == {"foreground": PALETTES["light"]["TEXT_LIGHT"]}
+
+def test_oyentes_reciben_paleta_activa():
+    theme = ThemeManager(style=EstiloFalso())
+    recibidas = []
+    theme.on_change(recibidas.append)
+    theme.switch("light")
+    theme.switch("light")
+    assert recibidas == [PALETTES["light"]]
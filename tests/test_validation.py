@@ -0,0 +1,27 @@
+from models.validation import compilar, email_valido, especialidades_conocidas, validar_csv, validar_lote, validar_registro
+
+def test_validar_registro_devuelve_todos_los_errores():
+    assert validar_registro({"nombre": "Ana", "email": "ana@email.com", "telefono": "+54 (11) 5555-0101"}, "cliente") == []
+    errores = validar_registro({"nombre": "  ", "email": "correo-invalido", "telefono": "abc"}, "cliente")
+    assert errores == ["nombre es obligatorio", "email no tiene un formato válido",
+                       "telefono no tiene un formato válido"]
+    assert email_valido("a.b@c.io") and not email_valido("a@b")
+
+def test_especialidades_segun_tipos_de_servicio():
+    assert {"reparacion", "soporte it"} <= especialidades_conocidas()
+    assert validar_registro({"nombre": "Luis", "especialidad": "Reparación"}, "tecnico") == []
+    assert validar_registro({"nombre": "Luis", "especialidad": "Jardinería"}, "tecnico") == [
+        "especialidad no es una especialidad conocida"]
+    # Las reglas compiladas se reutilizan mientras no cambien las especialidades
+    assert compilar("tecnico", especialidades_conocidas()) is compilar("tecnico", especialidades_conocidas())
+
+def test_validar_lote_con_procesos_conserva_el_orden(tmp_path):
+    filas = [{"nombre": f"Cliente {i}", "email": "malo" if i % 3 == 0 else f"c{i}@email.com"} for i in range(30)]
+    esperado = validar_lote(filas, "cliente", workers=1)
+    assert [bool(errores) for errores in esperado] == [i % 3 == 0 for i in range(30)]
+    assert validar_lote(filas, "cliente", workers=2, chunk_size=4) == esperado
+
+    archivo = tmp_path / "clientes.csv"
+    archivo.write_text("Nombre,Email\nAna,ana@email.com\n\n,malo\n", encoding="utf-8")
+    assert validar_csv(str(archivo), "cliente") == [
+        (4, ["nombre es obligatorio", "email no tiene un formato válido"])]
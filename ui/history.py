@@ -0,0 +1,96 @@
+import tkinter as tk
+from tkinter import ttk
+from models.history import ClientHistory
+from models.timestamps import formatear
+from ui.theme import ThemeManager, FONT_MAIN
+
+# Hijo provisional que permite expandir una orden antes de leer su detalle
+_PENDIENTE = "cargando"
+
+class ClientHistoryWindow:
+    """
+    Ventana con el historial de órdenes de un cliente.
+
+    Carga una página al abrirse y la siguiente cuando la lista llega al
+    final (o con el botón "Cargar más"). El detalle de cada orden se lee
+    de la base solo al expandirla.
+
+    Atributos:
+        window (tk.Toplevel): Ventana del historial
+        historial (ClientHistory): Paginador de las órdenes del cliente
+        tabla (ttk.Treeview): Órdenes cargadas y sus detalles
+    """
+    def __init__(self, parent, theme: ThemeManager, cliente_id: int, nombre: str,
+                 page_size: int = 50):
+        self.theme = theme
+        self.historial = ClientHistory(cliente_id, page_size=page_size)
+        self.total = self.historial.total()
+        self.cargadas = 0
+        self._pagina_pedida = False
+
+        self.window = theme.register(tk.Toplevel(parent), "page")
+        self.window.title(f"Historial de {nombre}")
+        self.window.geometry("760x480")
+        self.window.grid_rowconfigure(1, weight=1)
+        self.window.grid_columnconfigure(0, weight=1)
+
+        self.resumen = theme.register(ttk.Label(self.window, font=FONT_MAIN), "label")
+        self.resumen.grid(row=0, column=0, columnspan=2, sticky='w', padx=20, pady=(15, 5))
+
+        columnas = ("Fecha", "Servicio", "Estado", "Costo")
+        self.tabla = ttk.Treeview(self.window, columns=columnas, show='tree headings', style="Treeview")
+        self.tabla.heading("#0", text="Orden")
+        self.tabla.column("#0", width=160)
+        for col in columnas:
+            self.tabla.heading(col, text=col)
+            self.tabla.column(col, anchor='center', width=130)
+        scroll = ttk.Scrollbar(self.window, orient='vertical', command=self.tabla.yview)
+        self.tabla.configure(yscrollcommand=lambda primero, ultimo: self._on_scroll(scroll, primero, ultimo))
+        self.tabla.grid(row=1, column=0, sticky='nsew', padx=(20, 0), pady=5)
+        scroll.grid(row=1, column=1, sticky='ns', padx=(0, 20), pady=5)
+        self.tabla.bind("<<TreeviewOpen>>", self._on_expand)
+
+        self.btn_mas = tk.Button(self.window, text="Cargar más", command=self.cargar_pagina,
+                                 relief="flat", bd=0, font=FONT_MAIN, cursor="hand2")
+        theme.register(self.btn_mas, "button")
+        self.btn_mas.grid(row=2, column=0, columnspan=2, pady=10)
+
+        self.cargar_pagina()
+
+    def cargar_pagina(self):
+        """
+        Agrega a la tabla la siguiente página del historial.
+        """
+        self._pagina_pedida = False
+        for orden in self.historial.siguiente_pagina():
+            item = self.tabla.insert("", "end", iid=str(orden.id), text=f"Orden #{orden.id}",
+                                     values=(formatear(orden.creado_en), orden.servicio, orden.estado,
+                                             f"{orden.costo_total:.2f}" if orden.costo_total is not None else ""))
+            self.tabla.insert(item, "end", iid=f"{item}:{_PENDIENTE}", text="…")
+            self.cargadas += 1
+        self.resumen.configure(text=f"Mostrando {self.cargadas} de {self.total} órdenes")
+        if self.historial.agotado:
+            self.btn_mas.configure(state='disabled')
+
+    def _on_scroll(self, scroll, primero, ultimo):
+        scroll.set(primero, ultimo)
+        # Al llegar al final de lo cargado se pide (una vez) la página siguiente
+        if float(ultimo) >= 1.0 and self.cargadas and not self.historial.agotado and not self._pagina_pedida:
+            self._pagina_pedida = True
+            self.window.after_idle(self.cargar_pagina)
+
+    def _on_expand(self, event=None):
+        item = self.tabla.focus()
+        pendiente = f"{item}:{_PENDIENTE}"
+        if not self.tabla.exists(pendiente):
+            return
+        self.tabla.delete(pendiente)
+        detalle = self.historial.detalle(int(item))
+        if detalle is None:
+            return
+        descripcion, servicio, costo_base, duracion, tecnico = detalle
+        for texto, valor in (("Descripción", descripcion), ("Servicio", servicio),
+                             ("Técnico", tecnico or "Sin asignar"),
+                             ("Costo base", f"{costo_base:.2f}"),
+                             ("Duración", f"{duracion} min" if duracion else "")):
+            self.tabla.insert(item, "end", text=texto, values=(valor,))
@@ -0,0 +1,77 @@
+"""
+Icono de la ventana con el decodificado en caché.
+
+Decodificar image.ico con PIL (importar PIL, leer el ICO y convertirlo a
+PhotoImage) era uno de los pasos más lentos del arranque. La primera vez
+el icono se convierte a PNG en el directorio temporal, con una clave que
+depende de la ruta, el tamaño y la fecha de modificación del archivo. Los
+arranques siguientes cargan ese PNG directamente con tk.PhotoImage, sin
+importar PIL.
+"""
+import hashlib
+import os
+import tempfile
+import tkinter as tk
+from typing import Optional
+
+ICONO_POR_DEFECTO = "image.ico"
+
+# Imagen ya cargada por (ventana, ruta): tk.PhotoImage debe seguir referenciada
+_cargados = {}
+
+def ruta_cache(ruta: str) -> str:
+    """
+    Ruta del PNG en caché para un icono; cambia si el icono se modifica.
+
+    Raises:
+        OSError: Si el icono no existe
+    """
+    info = os.stat(ruta)
+    clave = f"{os.path.abspath(ruta)}|{info.st_size}|{info.st_mtime_ns}"
+    return os.path.join(tempfile.gettempdir(),
+                        f"sgst_icono_{hashlib.sha1(clave.encode()).hexdigest()[:16]}.png")
+
+def icono_png(ruta: str = ICONO_POR_DEFECTO) -> str:
+    """
+    Devuelve el icono convertido a PNG y lo genera con PIL solo si no está en caché.
+
+    Args:
+        ruta (str): Icono original (.ico o cualquier formato que lea PIL)
+
+    Returns:
+        str: Ruta del PNG
+
+    Raises:
+        OSError: Si el icono no existe o no se puede leer
+    """
+    destino = ruta_cache(ruta)
+    if not os.path.exists(destino):
+        from PIL import Image
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        with Image.open(ruta) as imagen:
+            imagen.save(temporal, format="PNG")
+        # Renombrar es atómico: otra instancia nunca lee un PNG a medio escribir
+        os.replace(temporal, destino)
+    return destino
+
+def aplicar_icono(root: tk.Tk, ruta: str = ICONO_POR_DEFECTO) -> Optional[tk.PhotoImage]:
+    """
+    Pone el icono en la ventana (y en las ventanas que se creen después).
+
+    Args:
+        root (tk.Tk): Ventana principal
+        ruta (str): Icono original
+
+    Returns:
+        tk.PhotoImage: Imagen aplicada, o None si no se pudo cargar
+    """
+    try:
+        foto = _cargados.get((root, ruta))
+        if foto is None:
+            foto = tk.PhotoImage(master=root, file=icono_png(ruta))
+            _cargados[(root, ruta)] = foto
+        root.iconphoto(True, foto)
+        return foto
+    except Exception as e:
+        print(f"Error al cargar el icono: {e}")
+        return None
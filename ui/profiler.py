@@ -0,0 +1,294 @@
+"""
+Instrumentación opcional de la interfaz para localizar congelamientos.
+
+Con SGST_PROFILE=1 la aplicación mide cada callback que Tk invoca
+(comandos de botones, bindings y handlers de root.after) y registra su
+duración. Un hilo vigía comprueba que el bucle de eventos siga atendiendo
+un latido periódico; si se detiene más de 'umbral' segundos toma una
+muestra de la pila del hilo principal, que indica si el tiempo se va en
+SQLite, en inserciones del Treeview, en el tema o en un messagebox.
+
+Los resultados van a un log rotativo (por defecto sgst_ui.log junto al
+código, o SGST_PROFILE_LOG) y se resumen con:
+
+    python -m ui.profiler [--log sgst_ui.log] [--top 20]
+"""
+import argparse
+import glob
+import logging
+import os
+import sys
+import threading
+import time
+import tkinter
+import traceback
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+ENV_PROFILE = "SGST_PROFILE"
+ENV_PROFILE_LOG = "SGST_PROFILE_LOG"
+LOG_POR_DEFECTO = os.path.join(os.path.dirname(os.path.dirname(__file__)), "sgst_ui.log")
+
+# Duraciones guardadas por handler para calcular percentiles
+_MUESTRAS_POR_HANDLER = 1000
+# Latido del bucle de eventos (segundos)
+_INTERVALO_LATIDO = 0.05
+_NOMBRE_LATIDO = "UIProfiler._latir"
+# Muestras de pila como máximo por cada bloqueo
+_MUESTRAS_POR_BLOQUEO = 10
+
+_call_original = tkinter.CallWrapper.__call__
+_activo: Optional["UIProfiler"] = None
+
+def nombre_handler(func: Callable) -> str:
+    """
+    Nombre legible de un callback de Tk.
+
+    Los métodos se muestran como 'Clase.metodo', las lambdas con su archivo
+    y línea, y los handlers de after() con el nombre de la función
+    programada en lugar del envoltorio interno de tkinter.
+
+    Args:
+        func (Callable): Callback registrado en Tk
+
+    Returns:
+        str: Nombre del handler
+    """
+    codigo = getattr(func, "__code__", None)
+    if codigo is not None and codigo.co_name == "callit" and func.__closure__:
+        # Misc.after() envuelve la función en 'callit'; se usa la original
+        celdas = dict(zip(codigo.co_freevars, func.__closure__))
+        if "func" in celdas:
+            return nombre_handler(celdas["func"].cell_contents)
+    nombre = getattr(func, "__qualname__", None) or repr(func)
+    if codigo is not None and "<lambda>" in nombre:
+        nombre = f"{nombre} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+    return nombre
+
+def _call_medido(self, *args):
+    perfil = _activo
+    if perfil is None:
+        return _call_original(self, *args)
+    with perfil.medir(nombre_handler(self.func)):
+        return _call_original(self, *args)
+
+class UIProfiler:
+    """
+    Mide los callbacks de Tk y vigila los bloqueos del bucle de eventos.
+
+    Atributos:
+        root (tk.Tk): Ventana principal (None para medir sin bucle de Tk)
+        umbral (float): Segundos sin latido a partir de los cuales se
+            considera que la interfaz está bloqueada
+        registro_min (float): Duración mínima para escribir un handler en el log
+        logger (logging.Logger): Log rotativo de resultados
+        bloqueos (int): Bloqueos detectados (cada uno con una o más muestras de pila)
+    """
+    def __init__(self, root: Optional[tkinter.Misc] = None, umbral: float = 0.2,
+                 log_path: str = None, registro_min: float = 0.005,
+                 max_bytes: int = 1024 * 1024, backups: int = 3):
+        self.root = root
+        self.umbral = umbral
+        self.registro_min = registro_min
+        self.log_path = log_path or os.environ.get(ENV_PROFILE_LOG) or LOG_POR_DEFECTO
+        self.logger = logging.getLogger(f"sgst.ui.{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self._handler_log = RotatingFileHandler(self.log_path, maxBytes=max_bytes,
+                                                backupCount=backups, encoding="utf-8")
+        self._handler_log.setFormatter(logging.Formatter("%(asctime)s\t%(message)s"))
+        self.logger.addHandler(self._handler_log)
+        self.bloqueos = 0
+        self._duraciones: Dict[str, List[float]] = {}
+        self._totales: Dict[str, Tuple[int, float, float]] = {}
+        self._lock = threading.Lock()
+        self._hilo_principal = threading.main_thread().ident
+        self._ultimo_latido = time.monotonic()
+        self._actual: Optional[str] = None
+        self._muestras = 0
+        self._detener = threading.Event()
+        self._vigia: Optional[threading.Thread] = None
+        self._latido_id = None
+
+    def start(self) -> "UIProfiler":
+        """
+        Activa la medición de callbacks, el latido y el hilo vigía.
+
+        Returns:
+            UIProfiler: La misma instancia, para encadenar
+        """
+        global _activo
+        _activo = self
+        tkinter.CallWrapper.__call__ = _call_medido
+        self._hilo_principal = threading.get_ident()
+        self.latido()
+        self._detener.clear()
+        self._vigia = threading.Thread(target=self._vigilar, name="ui-vigia", daemon=True)
+        self._vigia.start()
+        self.logger.info(f"inicio\tumbral={self.umbral * 1000:.0f}ms")
+        return self
+
+    def stop(self):
+        """
+        Detiene la medición y escribe el resumen en el log.
+        """
+        global _activo
+        if _activo is self:
+            _activo = None
+            tkinter.CallWrapper.__call__ = _call_original
+        self._detener.set()
+        if self._vigia is not None:
+            self._vigia.join()
+            self._vigia = None
+        if self._latido_id is not None and self.root is not None:
+            try:
+                self.root.after_cancel(self._latido_id)
+            except tkinter.TclError:
+                pass
+        for nombre, llamadas, total, maximo, p95 in self.resumen():
+            self.logger.info(f"resumen\t{nombre}\t{llamadas}\t{total * 1000:.1f}\t{maximo * 1000:.1f}\t{p95 * 1000:.1f}")
+        self._handler_log.close()
+        self.logger.removeHandler(self._handler_log)
+
+    @contextmanager
+    def medir(self, nombre: str) -> Iterator[None]:
+        """
+        Mide un bloque ejecutado en el hilo principal como handler 'nombre'.
+        """
+        anterior = self._actual
+        self._actual = nombre
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._actual = anterior
+            if nombre != _NOMBRE_LATIDO:
+                self.registrar(nombre, time.perf_counter() - inicio)
+
+    def registrar(self, nombre: str, duracion: float):
+        """
+        Acumula la duración de una ejecución del handler.
+        """
+        with self._lock:
+            llamadas, total, maximo = self._totales.get(nombre, (0, 0.0, 0.0))
+            self._totales[nombre] = (llamadas + 1, total + duracion, max(maximo, duracion))
+            muestras = self._duraciones.setdefault(nombre, [])
+            if len(muestras) >= _MUESTRAS_POR_HANDLER:
+                muestras[llamadas % _MUESTRAS_POR_HANDLER] = duracion
+            else:
+                muestras.append(duracion)
+        if duracion >= self.registro_min:
+            self.logger.info(f"handler\t{nombre}\t{duracion * 1000:.1f}")
+
+    def resumen(self) -> List[Tuple[str, int, float, float, float]]:
+        """
+        Estadísticas por handler, del que más tiempo consumió al que menos.
+
+        Returns:
+            List[Tuple[str, int, float, float, float]]: (handler, llamadas,
+            total, máximo, percentil 95), tiempos en segundos
+        """
+        with self._lock:
+            filas = [(nombre, llamadas, total, maximo, _percentil(self._duraciones[nombre], 0.95))
+                     for nombre, (llamadas, total, maximo) in self._totales.items()]
+        return sorted(filas, key=lambda fila: fila[2], reverse=True)
+
+    def latido(self):
+        """
+        Marca que el bucle de eventos está atendiendo y programa el siguiente.
+        """
+        self._ultimo_latido = time.monotonic()
+        self._muestras = 0
+        if self.root is not None and not self._detener.is_set():
+            self._latido_id = self.root.after(int(_INTERVALO_LATIDO * 1000), self._latir)
+
+    def _latir(self):
+        self.latido()
+
+    def _vigilar(self):
+        while not self._detener.wait(min(self.umbral / 4, _INTERVALO_LATIDO)):
+            # Una muestra al superar el umbral y otra por cada umbral adicional
+            detenido = time.monotonic() - self._ultimo_latido
+            if detenido >= self.umbral * (self._muestras + 1) and self._muestras < _MUESTRAS_POR_BLOQUEO:
+                if self._muestras == 0:
+                    self.bloqueos += 1
+                self._muestras += 1
+                self._muestrear(detenido)
+
+    def _muestrear(self, detenido: float):
+        frame = sys._current_frames().get(self._hilo_principal)
+        if frame is None:
+            return
+        pila = traceback.extract_stack(frame)
+        propio = _frame_de_la_app(pila)
+        texto = "".join(f"\n    {linea.strip()}" for linea in traceback.format_list(pila[-12:]))
+        self.logger.warning(f"bloqueo\t{detenido * 1000:.0f}\t{self._actual or '-'}\t{propio}{texto}")
+
+def _frame_de_la_app(pila: traceback.StackSummary) -> str:
+    # Frame más interno que no pertenece a la biblioteca estándar (o el último)
+    biblioteca = os.path.dirname(os.__file__)
+    for frame in reversed(pila):
+        if not frame.filename.startswith(biblioteca) and os.path.abspath(frame.filename) != os.path.abspath(__file__):
+            return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+    ultimo = pila[-1]
+    return f"{os.path.basename(ultimo.filename)}:{ultimo.lineno} {ultimo.name}"
+
+def _percentil(valores: List[float], fraccion: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(fraccion * len(ordenados)))]
+
+def leer_log(log_path: str) -> Tuple[Dict[str, List[float]], Dict[str, List[float]]]:
+    """
+    Lee un log (y sus copias rotadas) del perfilador.
+
+    Args:
+        log_path (str): Log principal
+
+    Returns:
+        Tuple[Dict[str, List[float]], Dict[str, List[float]]]: duraciones en
+        ms por handler y duraciones de los bloqueos en ms por frame de la
+        aplicación donde estaba detenido el hilo principal (una por muestra)
+    """
+    handlers: Dict[str, List[float]] = {}
+    bloqueos: Dict[str, List[float]] = {}
+    # Copias rotadas de la más antigua (sufijo mayor) a la más reciente; el
+    # sufijo se compara como número para que '.10' quede antes que '.9'
+    rotados = [(int(archivo.rsplit(".", 1)[1]), archivo) for archivo in glob.glob(log_path + ".*")
+               if archivo.rsplit(".", 1)[1].isdigit()]
+    archivos = [archivo for _, archivo in sorted(rotados, reverse=True)] + [log_path]
+    for archivo in archivos:
+        if not os.path.exists(archivo):
+            continue
+        with open(archivo, encoding="utf-8") as f:
+            for linea in f:
+                campos = linea.rstrip("\n").split("\t")
+                if len(campos) >= 4 and campos[1] == "handler":
+                    handlers.setdefault(campos[2], []).append(float(campos[3]))
+                elif len(campos) >= 5 and campos[1] == "bloqueo":
+                    bloqueos.setdefault(f"{campos[4]} [{campos[3]}]", []).append(float(campos[2]))
+    return handlers, bloqueos
+
+def main(argv: List[str] = None):
+    """
+    Punto de entrada de línea de comandos: resumen del log.
+    """
+    parser = argparse.ArgumentParser(description="Resumen del log de rendimiento de la interfaz")
+    parser.add_argument("--log", default=os.environ.get(ENV_PROFILE_LOG) or LOG_POR_DEFECTO)
+    parser.add_argument("--top", type=int, default=20, help="Filas por sección")
+    args = parser.parse_args(argv)
+    handlers, bloqueos = leer_log(args.log)
+    print(f"{'handler':<50} {'llamadas':>8} {'total ms':>10} {'máx ms':>9} {'p95 ms':>9}")
+    filas = sorted(handlers.items(), key=lambda item: sum(item[1]), reverse=True)
+    for nombre, duraciones in filas[:args.top]:
+        print(f"{nombre[:50]:<50} {len(duraciones):>8} {sum(duraciones):>10.1f} "
+              f"{max(duraciones):>9.1f} {_percentil(duraciones, 0.95):>9.1f}")
+    if bloqueos:
+        print(f"\n{'bloqueo en [handler]':<70} {'muestras':>8} {'máx ms':>9}")
+        for lugar, duraciones in sorted(bloqueos.items(), key=lambda item: len(item[1]), reverse=True)[:args.top]:
+            print(f"{lugar[:70]:<70} {len(duraciones):>8} {max(duraciones):>9.0f}")
+
+if __name__ == "__main__":
+    main()
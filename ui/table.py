@@ -0,0 +1,96 @@
+import tkinter as tk
+from tkinter import ttk
+from models.db_connection import DatabaseConnection
+from models.listing import Listado, ListingPager
+from ui.theme import ThemeManager
+
+# Indicadores del orden activo en el encabezado
+_FLECHAS = {False: " ▲", True: " ▼"}
+
+class SortableTable:
+    """
+    Treeview paginado con orden por encabezado y filtros resueltos en SQLite.
+
+    Un clic en un encabezado ordena por esa columna y otro clic invierte el
+    sentido. Cada cambio de orden o filtro vuelve a pedir la primera página
+    a la base; las siguientes se piden al llegar al final de la lista, así
+    que la tabla nunca carga ni ordena todas las filas.
+
+    Atributos:
+        frame (tk.Frame): Contenedor de la tabla y su barra de desplazamiento
+        tree (ttk.Treeview): Tabla
+        pager (ListingPager): Páginas del listado con el orden y filtros actuales
+        cargadas (int): Filas mostradas
+    """
+    def __init__(self, parent, theme: ThemeManager, listado: Listado, db: DatabaseConnection = None,
+                 orden: str = "ID", descendente: bool = False, page_size: int = 200, width: int = 120):
+        self.listado = listado
+        self.pager = ListingPager(listado, db, orden, descendente, page_size=page_size)
+        self.cargadas = 0
+        self._pagina_pedida = False
+
+        self.frame = theme.register(tk.Frame(parent), "page")
+        self.frame.grid_rowconfigure(0, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+        self.tree = ttk.Treeview(self.frame, columns=listado.encabezados, show='headings', style="Treeview")
+        for col in listado.encabezados:
+            if col in listado.ordenables:
+                self.tree.heading(col, text=col, command=lambda c=col: self.ordenar(c))
+            else:
+                self.tree.heading(col, text=col)
+            self.tree.column(col, anchor='center', width=width)
+        scroll = ttk.Scrollbar(self.frame, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=lambda primero, ultimo: self._on_scroll(scroll, primero, ultimo))
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        scroll.grid(row=0, column=1, sticky='ns')
+        self._marcar_orden()
+
+    def ordenar(self, columna: str):
+        """
+        Ordena por la columna; si ya era la columna de orden invierte el sentido.
+        """
+        descendente = not self.pager.descendente if columna == self.pager.orden else False
+        self.pager.ordenar(columna, descendente)
+        self._marcar_orden()
+        self.recargar()
+
+    def filtrar(self, **filtros):
+        """
+        Reemplaza los filtros (los vacíos se ignoran) y recarga la tabla.
+
+        Raises:
+            ValueError: Si un filtro no existe o su valor no es válido
+        """
+        self.pager.filtrar(**filtros)
+        self.recargar()
+
+    def recargar(self):
+        """
+        Vacía la tabla y carga la primera página.
+        """
+        self.tree.delete(*self.tree.get_children())
+        self.cargadas = 0
+        self.pager.reiniciar()
+        self.cargar_pagina()
+        self.tree.yview_moveto(0)
+
+    def cargar_pagina(self):
+        """
+        Agrega a la tabla la siguiente página.
+        """
+        self._pagina_pedida = False
+        for fila in self.pager.siguiente_pagina():
+            self.tree.insert("", "end", values=["" if valor is None else valor for valor in fila])
+            self.cargadas += 1
+
+    def _marcar_orden(self):
+        for col in self.listado.ordenables:
+            flecha = _FLECHAS[self.pager.descendente] if col == self.pager.orden else ""
+            self.tree.heading(col, text=col + flecha)
+
+    def _on_scroll(self, scroll, primero, ultimo):
+        scroll.set(primero, ultimo)
+        # Al llegar al final de lo cargado se pide (una vez) la página siguiente
+        if float(ultimo) >= 1.0 and self.cargadas and not self.pager.agotado and not self._pagina_pedida:
+            self._pagina_pedida = True
+            self.tree.after_idle(self.cargar_pagina)
@@ -0,0 +1,90 @@
+"""
+Pestañas de un ttk.Notebook que se construyen la primera vez que se muestran.
+"""
+import time
+from tkinter import ttk
+from typing import Callable, Dict, Optional, Tuple
+
+class LazyTabs:
+    """
+    Construcción y carga diferida de las pestañas de un Notebook.
+
+    Cada pestaña se agrega vacía junto con dos funciones: una que crea sus
+    widgets y otra que carga sus datos. Las dos se llaman solo la primera
+    vez que la pestaña queda seleccionada (<<NotebookTabChanged>>, que el
+    Notebook genera también al agregar la primera pestaña). La carga se
+    difiere con after_idle para que la pestaña se dibuje antes de consultar
+    la base, así que la ventana aparece sin esperar a los datos y el costo
+    del arranque no depende de las pestañas que no se abren.
+
+    Atributos:
+        notebook (ttk.Notebook): Notebook administrado
+        tiempos (Dict[str, float]): Segundos de construcción más carga por pestaña
+    """
+    def __init__(self, notebook: ttk.Notebook, on_loaded: Callable[[str, float], None] = None):
+        """
+        Args:
+            notebook (ttk.Notebook): Notebook administrado
+            on_loaded (callable, opcional): Se llama con (texto, segundos) al
+                terminar de cargar cada pestaña
+        """
+        self.notebook = notebook
+        self.on_loaded = on_loaded
+        self.tiempos: Dict[str, float] = {}
+        self._pendientes: Dict[str, Tuple[str, Callable[[], None], Optional[Callable[[], None]]]] = {}
+        notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed, add="+")
+
+    def add(self, frame, text: str, construir: Callable[[], None], cargar: Callable[[], None] = None):
+        """
+        Agrega una pestaña que se construye al mostrarse por primera vez.
+
+        Args:
+            frame: Contenedor de la pestaña (vacío hasta construirla)
+            text (str): Título de la pestaña
+            construir (callable): Crea los widgets dentro de frame
+            cargar (callable, opcional): Carga los datos de la pestaña
+        """
+        self._pendientes[str(frame)] = (text, construir, cargar)
+        self.notebook.add(frame, text=text)
+
+    def construida(self, frame) -> bool:
+        """
+        Indica si la pestaña ya se construyó.
+        """
+        return str(frame) not in self._pendientes
+
+    def asegurar(self, frame, cargar: bool = True):
+        """
+        Construye la pestaña si aún no lo está, por ejemplo antes de leer
+        sus widgets desde otra pestaña.
+
+        Args:
+            frame: Contenedor de la pestaña
+            cargar (bool): Si también se cargan sus datos (en el próximo idle)
+        """
+        pendiente = self._pendientes.pop(str(frame), None)
+        if pendiente is None:
+            return
+        texto, construir, cargar_datos = pendiente
+        inicio = time.perf_counter()
+        construir()
+        construccion = time.perf_counter() - inicio
+        if cargar and cargar_datos is not None:
+            self.notebook.after_idle(self._cargar, texto, cargar_datos, construccion)
+        else:
+            self._terminar(texto, construccion)
+
+    def _on_tab_changed(self, event=None):
+        seleccionada = self.notebook.select()
+        if seleccionada:
+            self.asegurar(seleccionada)
+
+    def _cargar(self, texto: str, cargar_datos: Callable[[], None], construccion: float):
+        inicio = time.perf_counter()
+        cargar_datos()
+        self._terminar(texto, construccion + time.perf_counter() - inicio)
+
+    def _terminar(self, texto: str, segundos: float):
+        self.tiempos[texto] = segundos
+        if self.on_loaded is not None:
+            self.on_loaded(texto, segundos)
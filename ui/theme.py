@@ -0,0 +1,223 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, List, Tuple, Callable, Any
+
+FONT_MAIN = ("Segoe UI", 11)
+FONT_HEADER = ("Segoe UI", 14, "bold")
+FONT_TABLE_HEADING = ("Segoe UI", 12, "bold")
+
+# Paletas por tema. En el tema claro TEXT_LIGHT es el texto principal
+# (oscuro) y TEXT_DARK el secundario, para que los roles no cambien.
+PALETTES: Dict[str, Dict[str, str]] = {
+    "dark": {
+        "PRIMARY_BG": "#1C1C1C",    # Fondo principal muy oscuro
+        "SECONDARY_BG": "#2C2C2C",  # Fondo de tarjetas/frames
+        "HEADER_BLUE": "#2196F3",   # Azul vibrante para header y acentos
+        "ACCENT_BLUE": "#1976D2",   # Azul un poco más oscuro para botones/hover
+        "TEXT_LIGHT": "#FFFFFF",    # Texto principal blanco
+        "TEXT_DARK": "#CCCCCC",     # Texto secundario/placeholder gris claro
+        "ENTRY_BG": "#3C3C3C",      # Fondo de campos de entrada
+        "ENTRY_FG": "#FFFFFF",      # Texto de campos de entrada
+        "BORDER": "#2196F3",        # Borde de campos de entrada, igual que accent
+    },
+    "light": {
+        "PRIMARY_BG": "#F0F0F0",
+        "SECONDARY_BG": "#FFFFFF",
+        "HEADER_BLUE": "#2196F3",
+        "ACCENT_BLUE": "#1976D2",
+        "TEXT_LIGHT": "#333333",
+        "TEXT_DARK": "#666666",
+        "ENTRY_BG": "#E0E0E0",
+        "ENTRY_FG": "#333333",
+        "BORDER": "#BBBBBB",
+    },
+}
+
+# Opciones de cada rol de widget tk en función de la paleta
+WIDGET_ROLES: Dict[str, Callable[[Dict[str, str]], Dict[str, str]]] = {
+    "root": lambda c: {"bg": c["PRIMARY_BG"]},
+    "page": lambda c: {"bg": c["PRIMARY_BG"]},
+    "header": lambda c: {"bg": c["HEADER_BLUE"]},
+    "card": lambda c: {"bg": c["SECONDARY_BG"], "fg": c["TEXT_LIGHT"]},
+    "label": lambda c: {"background": c["SECONDARY_BG"], "foreground": c["TEXT_LIGHT"]},
+    "button": lambda c: {"bg": c["ACCENT_BLUE"], "fg": c["TEXT_LIGHT"],
+                         "activebackground": c["HEADER_BLUE"], "activeforeground": c["TEXT_LIGHT"]},
+    "entry": lambda c: {"bg": c["ENTRY_BG"], "fg": c["ENTRY_FG"], "insertbackground": c["ENTRY_FG"],
+                        "highlightbackground": c["BORDER"], "highlightcolor": c["BORDER"]},
+}
+
+def _style_set(c: Dict[str, str]) -> List[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+    """
+    Estilos ttk de una paleta como (estilo, opciones de configure, opciones de map).
+    """
+    return [
+        ("TFrame", {"background": c["PRIMARY_BG"]}, {}),
+        ("Card.TFrame", {"background": c["SECONDARY_BG"], "relief": "flat"}, {}),
+        ("TNotebook", {"background": c["PRIMARY_BG"], "borderwidth": 0}, {}),
+        ("TNotebook.Tab", {"font": FONT_MAIN, "padding": [20, 10], "background": c["SECONDARY_BG"],
+                           "foreground": c["TEXT_LIGHT"], "borderwidth": 0},
+         {"background": [("selected", c["HEADER_BLUE"]), ("active", c["ACCENT_BLUE"])],
+          "foreground": [("selected", c["TEXT_LIGHT"]), ("active", c["TEXT_LIGHT"])]}),
+        ("TLabel", {"background": c["SECONDARY_BG"], "foreground": c["TEXT_LIGHT"], "font": FONT_MAIN}, {}),
+        ("TLabelFrame.Label", {"background": c["SECONDARY_BG"], "foreground": c["TEXT_LIGHT"], "font": FONT_MAIN}, {}),
+        ("TButton", {"background": c["ACCENT_BLUE"], "foreground": c["TEXT_LIGHT"], "font": FONT_MAIN,
+                     "borderwidth": 0, "focusthickness": 3, "focuscolor": c["ACCENT_BLUE"]},
+         {"background": [("active", c["HEADER_BLUE"]), ("pressed", c["ACCENT_BLUE"])]}),
+        ("Treeview", {"background": c["SECONDARY_BG"], "foreground": c["TEXT_LIGHT"],
+                      "fieldbackground": c["SECONDARY_BG"], "font": FONT_MAIN, "rowheight": 28, "borderwidth": 0}, {}),
+        ("Treeview.Heading", {"background": c["ACCENT_BLUE"], "foreground": c["TEXT_LIGHT"],
+                              "font": FONT_TABLE_HEADING, "borderwidth": 0},
+         {"background": [("active", c["HEADER_BLUE"])]}),
+        ("TEntry", {"fieldbackground": c["ENTRY_BG"], "foreground": c["ENTRY_FG"], "borderwidth": 0,
+                    "relief": "flat", "insertbackground": c["ENTRY_FG"]}, {}),
+        ("TCombobox", {"fieldbackground": c["ENTRY_BG"], "foreground": c["ENTRY_FG"],
+                       "selectbackground": c["ACCENT_BLUE"], "selectforeground": c["TEXT_LIGHT"],
+                       "background": c["ENTRY_BG"], "borderwidth": 0, "relief": "flat",
+                       "insertbackground": c["ENTRY_FG"]},
+         {"fieldbackground": [("readonly", c["ENTRY_BG"])]}),
+        ("TText", {"background": c["ENTRY_BG"], "foreground": c["ENTRY_FG"], "borderwidth": 0,
+                   "relief": "flat", "insertbackground": c["ENTRY_FG"]}, {}),
+    ]
+
+def _delta(anterior: Dict[str, Any], nuevo: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Devuelve solo las opciones cuyo valor cambia entre dos configuraciones.
+    """
+    return {clave: valor for clave, valor in nuevo.items() if anterior.get(clave) != valor}
+
+class ThemeManager:
+    """
+    Subsistema de temas de la interfaz.
+    
+    Precalcula una sola vez, para cada paleta, las opciones de cada rol de
+    widget y los estilos ttk, además de las diferencias entre cada par de
+    paletas. Los widgets se registran con su rol al crearse; al cambiar de
+    tema solo se reconfiguran las opciones que realmente cambian, sin
+    recorrer el árbol de widgets.
+    
+    Atributos:
+        current (str): Nombre de la paleta activa
+        colors (Dict[str, str]): Colores de la paleta activa
+    """
+    def __init__(self, style: ttk.Style = None, current: str = "dark"):
+        """
+        Inicializa el gestor de temas y precalcula las paletas.
+        
+        Args:
+            style (ttk.Style, opcional): Estilo ttk a configurar; se crea al aplicar si es None
+            current (str): Paleta inicial
+        """
+        self.current = current
+        self._style = style
+        self._widgets: Dict[tk.Misc, str] = {}
+        self._listeners: List[Callable[[Dict[str, str]], None]] = []
+        self._roles = {nombre: {rol: opciones(paleta) for rol, opciones in WIDGET_ROLES.items()}
+                       for nombre, paleta in PALETTES.items()}
+        self._styles = {nombre: _style_set(paleta) for nombre, paleta in PALETTES.items()}
+        self._role_deltas = {
+            (origen, destino): {rol: _delta(self._roles[origen][rol], self._roles[destino][rol])
+                                for rol in WIDGET_ROLES}
+            for origen in PALETTES for destino in PALETTES if origen != destino
+        }
+        self._style_deltas = {
+            (origen, destino): [
+                (nombre, _delta(conf_origen, conf_destino), mapa_destino if mapa_origen != mapa_destino else {})
+                for (nombre, conf_origen, mapa_origen), (_, conf_destino, mapa_destino)
+                in zip(self._styles[origen], self._styles[destino])
+            ]
+            for origen in PALETTES for destino in PALETTES if origen != destino
+        }
+
+    @property
+    def colors(self) -> Dict[str, str]:
+        """
+        Colores de la paleta activa; los callbacks de hover los leen en cada evento.
+        """
+        return PALETTES[self.current]
+
+    @property
+    def is_dark(self) -> bool:
+        return self.current == "dark"
+
+    def options(self, role: str) -> Dict[str, str]:
+        """
+        Opciones precalculadas de un rol para la paleta activa.
+        """
+        return self._roles[self.current][role]
+
+    def register(self, widget: tk.Misc, role: str) -> tk.Misc:
+        """
+        Registra un widget con su rol y le aplica la paleta activa.
+        
+        Args:
+            widget (tk.Misc): Widget a tematizar
+            role (str): Rol definido en WIDGET_ROLES
+            
+        Returns:
+            tk.Misc: El mismo widget, para poder encadenar la creación
+        """
+        self._widgets[widget] = role
+        widget.configure(**self.options(role))
+        widget.bind("<Destroy>", lambda e, w=widget: self._widgets.pop(w, None) if e.widget is w else None, add="+")
+        return widget
+
+    def on_change(self, callback: Callable[[Dict[str, str]], None]):
+        """
+        Registra una función que se llama con la paleta nueva en cada cambio
+        (por ejemplo para elementos de un Canvas).
+        """
+        self._listeners.append(callback)
+
+    def apply(self):
+        """
+        Aplica completa la paleta activa: estilos ttk, widgets registrados y
+        oyentes. Se usa una vez al iniciar la aplicación.
+        """
+        style = self._get_style()
+        style.theme_use('clam')
+        for nombre, configuracion, mapa in self._styles[self.current]:
+            style.configure(nombre, **configuracion)
+            if mapa:
+                style.map(nombre, **mapa)
+        self._configure_widgets(self._roles[self.current])
+        self._notify()
+
+    def switch(self, name: str = None):
+        """
+        Cambia a otra paleta aplicando solo las diferencias.
+        
+        Args:
+            name (str, opcional): Paleta destino; por defecto alterna entre oscuro y claro
+        """
+        destino = name or ("light" if self.is_dark else "dark")
+        if destino == self.current:
+            return
+        clave = (self.current, destino)
+        self.current = destino
+        style = self._get_style()
+        for nombre, configuracion, mapa in self._style_deltas[clave]:
+            if configuracion:
+                style.configure(nombre, **configuracion)
+            if mapa:
+                style.map(nombre, **mapa)
+        self._configure_widgets(self._role_deltas[clave])
+        self._notify()
+
+    def _get_style(self) -> ttk.Style:
+        if self._style is None:
+            self._style = ttk.Style()
+        return self._style
+
+    def _configure_widgets(self, por_rol: Dict[str, Dict[str, str]]):
+        for widget, rol in list(self._widgets.items()):
+            opciones = por_rol[rol]
+            if not opciones:
+                continue
+            try:
+                widget.configure(**opciones)
+            except tk.TclError:  # widget destruido sin pasar por <Destroy>
+                self._widgets.pop(widget, None)
+
+    def _notify(self):
+        for callback in self._listeners:
+            callback(self.colors)